@@ -0,0 +1,235 @@
+"""
+Interpretation Archetypes for Spiritual G-Code.
+Users sharing sun/moon/ascendant signs, tone and (orb-bucketed) active
+transit aspects on a day get the same AI interpretation. It is generated
+once per archetype, shared through the Django cache and personalized per
+user with cheap string templates instead of another model call. Only one
+worker generates a missing archetype; the others wait for its result.
+"""
+
+import string
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .fingerprints import stable_hash
+from .prompt_encoding import get_prompt_encoder
+from .result_cache import ResultCache
+
+# Shared interpretation store; entries must outlive a night of timezone
+# buckets that precompute the same horizon dates
+ARCHETYPE_CACHE_PREFIX = "gcode_archetype"
+ARCHETYPE_CACHE_TIMEOUT = 60 * 60 * 24 * 2
+ARCHETYPE_MEMO_SIZE = 4096
+
+# Single-flight generation: the worker holding an archetype's lock makes the
+# AI call, the others poll the store until the result appears or the wait
+# runs out (then they generate it themselves)
+ARCHETYPE_LOCK_PREFIX = "gcode_archetype_lock"
+ARCHETYPE_LOCK_TIMEOUT = 60
+ARCHETYPE_WAIT_SECONDS = 30
+ARCHETYPE_POLL_INTERVAL = 0.1
+
+# Orb bucket upper bounds in degrees; wider orbs fall in the last bucket
+ARCHETYPE_ORB_BUCKETS = (2.0, 5.0)
+
+# Per-field templates applied to a shared interpretation. Placeholders:
+# {text} (the shared value), {name}, {username}, {sun_sign}, {moon_sign},
+# {ascendant} and {date}; unknown placeholders are left as they are.
+# GCODE_ARCHETYPE_PERSONALIZATION overrides them.
+DEFAULT_PERSONALIZATION = {
+    "interpretation": "{name}, here is your G-Code for {date}. {text}",
+}
+
+
+def personalization_templates() -> Dict[str, str]:
+    """Personalization templates in effect."""
+    return getattr(settings, "GCODE_ARCHETYPE_PERSONALIZATION", DEFAULT_PERSONALIZATION)
+
+
+def orb_bucket(orb: float) -> int:
+    """Index of the orb bucket an aspect falls into."""
+    for index, limit in enumerate(ARCHETYPE_ORB_BUCKETS):
+        if orb <= limit:
+            return index
+    return len(ARCHETYPE_ORB_BUCKETS)
+
+
+def archetype_key(
+    natal_data: Dict, transit_data: Dict, tone: str, target_date: date
+) -> str:
+    """
+    Derive the archetype an interpretation request belongs to.
+
+    Transit planet positions are the same for every user on a date, so the
+    date stands in for them; the aspects are the ones the compact prompt
+    shows (PromptEncoder.rank_aspects).
+
+    Args:
+        natal_data: Natal sun_sign, moon_sign and ascendant
+        transit_data: Transit data with the aspects to the natal chart
+        tone: Preferred tone
+        target_date: Date of the interpretation
+
+    Returns:
+        Hex archetype key
+    """
+    aspects = sorted(
+        (
+            aspect.get("transit_planet", ""),
+            aspect.get("aspect", ""),
+            aspect.get("natal_planet", ""),
+            orb_bucket(float(aspect.get("orb", 0))),
+        )
+        for aspect in get_prompt_encoder().rank_aspects(transit_data.get("aspects", []))
+    )
+    return stable_hash(
+        {
+            "date": target_date,
+            "natal": [
+                natal_data.get("sun_sign"),
+                natal_data.get("moon_sign"),
+                natal_data.get("ascendant"),
+            ],
+            "tone": tone,
+            "aspects": aspects,
+        }
+    )
+
+
+class _Placeholders(dict):
+    """Template context leaving unknown placeholders untouched."""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+def personalize(
+    interpretation: Dict,
+    user,
+    target_date: date,
+    templates: Optional[Dict[str, str]] = None,
+) -> Dict:
+    """
+    Apply the personalization templates to a shared interpretation.
+
+    Args:
+        interpretation: Shared interpretation (not modified)
+        user: GCodeUser instance with natal_chart loaded
+        target_date: Date of the interpretation
+        templates: Field -> template (defaults to personalization_templates())
+
+    Returns:
+        Personalized copy of the interpretation
+    """
+    if templates is None:
+        templates = personalization_templates()
+
+    natal_chart = user.natal_chart
+    context = _Placeholders(
+        name=user.first_name or user.username,
+        username=user.username,
+        sun_sign=natal_chart.sun_sign,
+        moon_sign=natal_chart.moon_sign,
+        ascendant=natal_chart.ascendant,
+        date=target_date.strftime("%B %d").replace(" 0", " "),
+    )
+
+    personalized = dict(interpretation)
+    for field, template in templates.items():
+        if isinstance(personalized.get(field), str):
+            context["text"] = personalized[field]
+            personalized[field] = string.Formatter().vformat(template, (), context)
+    return personalized
+
+
+class ArchetypeStore:
+    """
+    Shared store of generated interpretations keyed by archetype.
+
+    Backed by a ResultCache, so Celery workers and timezone buckets reuse
+    each other's interpretations; a cache lock per archetype makes sure
+    only one of them generates it. Counts generated vs reused for logging.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        wait_seconds: float = ARCHETYPE_WAIT_SECONDS,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            cache: Result cache to store interpretations in
+            wait_seconds: Longest wait for another worker's generation
+        """
+        self.wait_seconds = wait_seconds
+        self.cache = cache or ResultCache(
+            ARCHETYPE_CACHE_PREFIX, ARCHETYPE_CACHE_TIMEOUT, ARCHETYPE_MEMO_SIZE
+        )
+        self._lock = threading.Lock()
+        self._counts = {"generated": 0, "reused": 0}
+
+    def get_or_generate(self, key: str, generate: Callable[[], Dict]) -> Dict:
+        """
+        Get an archetype's interpretation, generating it on first use.
+
+        Concurrent callers missing the same archetype do not all call the
+        model: the one that takes the archetype's lock generates, the others
+        wait for its result. Fallback interpretations ("fallback": True)
+        are returned but not shared.
+
+        Args:
+            key: Archetype key
+            generate: Callable making the AI call
+
+        Returns:
+            Shared (unpersonalized) interpretation
+        """
+        lock = f"{ARCHETYPE_LOCK_PREFIX}:{key}"
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            interpretation = self.cache.get(key)
+            if interpretation is not None:
+                self._count("reused")
+                return interpretation
+            if cache.add(lock, True, ARCHETYPE_LOCK_TIMEOUT):
+                break
+            if time.monotonic() >= deadline:
+                # The generating worker is stuck or gone; stop waiting
+                lock = None
+                break
+            time.sleep(ARCHETYPE_POLL_INTERVAL)
+
+        try:
+            # The previous holder may have stored it just before we locked
+            interpretation = self.cache.get(key) if lock else None
+            if interpretation is not None:
+                self._count("reused")
+                return interpretation
+            interpretation = generate()
+            if not interpretation.get("fallback"):
+                self.cache.set(key, interpretation)
+        finally:
+            if lock:
+                cache.delete(lock)
+        self._count("generated")
+        return interpretation
+
+    def stats(self) -> Dict:
+        """Get generated/reused counts and the share of calls saved."""
+        with self._lock:
+            stats = dict(self._counts)
+        total = stats["generated"] + stats["reused"]
+        stats["dedup_rate"] = round(stats["reused"] / total, 4) if total else 0.0
+        return stats
+
+    def _count(self, outcome: str) -> None:
+        """Count one lookup outcome."""
+        with self._lock:
+            self._counts[outcome] += 1
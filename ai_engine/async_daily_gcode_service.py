@@ -0,0 +1,192 @@
+"""
+Async Daily G-Code Service for Spiritual G-Code.
+Async variant of DailyGCodeService for Django async views and Channels
+consumers: calculator work runs in a thread pool and AI calls run
+concurrently under a concurrency limit.
+"""
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+
+from .daily_gcode_service import DailyGCodeService
+
+# Concurrent AI interpretation calls per event loop
+ASYNC_AI_CONCURRENCY = 4
+
+# Threads for CPU-bound transit calculation
+ASYNC_CALCULATOR_WORKERS = 4
+
+
+class AsyncDailyGCodeService(DailyGCodeService):
+    """
+    DailyGCodeService with async ("a"-prefixed) methods.
+
+    Database and cache reads go through sync_to_async (thread sensitive, so
+    they share Django's connection handling), transit calculation runs in a
+    dedicated thread pool and AI calls are gathered under a semaphore.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = ASYNC_AI_CONCURRENCY,
+        calculator_workers: int = ASYNC_CALCULATOR_WORKERS,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            concurrency: Maximum in-flight AI calls per event loop
+            calculator_workers: Threads for transit calculation
+        """
+        super().__init__()
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(
+            max_workers=calculator_workers, thread_name_prefix="gcode-calculator"
+        )
+        # One semaphore per event loop (semaphores are bound to their loop)
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    async def acalculate_daily_gcode_for_user(
+        self, user, target_date: Optional[date] = None, use_cache: bool = True
+    ) -> Dict:
+        """
+        Calculate complete daily G-Code for a user.
+
+        Args:
+            user: GCodeUser instance
+            target_date: Date to calculate for (defaults to today)
+            use_cache: Serve from and store into the result cache
+
+        Returns:
+            Complete daily G-Code data with interpretation
+        """
+        if target_date is None:
+            target_date = date.today()
+
+        key = self._result_key(user, target_date)
+        if use_cache:
+            cached = await sync_to_async(self.result_cache.get)(key)
+            if cached is not None:
+                return cached
+
+        try:
+            context = await sync_to_async(self._load_daily_context)(user, target_date)
+
+            loop = asyncio.get_running_loop()
+            transit_data, g_code_score = await loop.run_in_executor(
+                self.executor,
+                self._calculate_daily_transits,
+                user,
+                target_date,
+                context,
+            )
+
+            async with self._semaphore():
+                ai_interpretation = await sync_to_async(
+                    self.ai_client.generate_daily_gcode, thread_sensitive=False
+                )(
+                    natal_data=context["natal_chart"],
+                    transit_data=transit_data,
+                    user_preferences=context["user_preferences"],
+                )
+
+            daily_gcode = self._compile_daily_gcode(
+                user,
+                target_date,
+                context,
+                transit_data,
+                g_code_score,
+                ai_interpretation,
+            )
+
+        except Exception as e:
+            raise Exception(f"Error calculating daily G-Code: {str(e)}")
+
+        if use_cache:
+            await sync_to_async(self.result_cache.set)(key, daily_gcode)
+        return daily_gcode
+
+    async def acalculate_daily_gcodes(
+        self, user, dates: List[date], use_cache: bool = True
+    ) -> List[Dict]:
+        """
+        Calculate daily G-Codes for several dates concurrently.
+
+        Args:
+            user: GCodeUser instance
+            dates: Dates to calculate for
+            use_cache: Serve from and store into the result cache
+
+        Returns:
+            Daily G-Codes in the order of dates
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.acalculate_daily_gcode_for_user(user, day, use_cache)
+                    for day in dates
+                )
+            )
+        )
+
+    async def acalculate_week(
+        self, user, start_date: Optional[date] = None, days: int = 7
+    ) -> Dict:
+        """
+        Calculate a full daily G-Code (with interpretation) for each day.
+
+        Unlike calculate_period_forecast, every day gets its own daily
+        interpretation; the AI calls run concurrently.
+
+        Args:
+            user: GCodeUser instance
+            start_date: First day (defaults to today)
+            days: Number of days
+
+        Returns:
+            Dictionary with start/end date and the daily G-Codes
+        """
+        if start_date is None:
+            start_date = date.today()
+
+        dates = [start_date + timedelta(days=i) for i in range(days)]
+        return {
+            "user": user.username,
+            "start_date": start_date,
+            "end_date": dates[-1],
+            "daily_gcodes": await self.acalculate_daily_gcodes(user, dates),
+        }
+
+    async def acalculate_period_forecast(
+        self, user, start_date: Optional[date] = None, period="week"
+    ) -> Dict:
+        """Async calculate_period_forecast (one AI call for the period)."""
+        return await sync_to_async(self.calculate_period_forecast)(
+            user, start_date, period
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Get the AI concurrency semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+
+# Singleton instance
+_async_service_instance = None
+
+
+def get_async_daily_gcode_service() -> AsyncDailyGCodeService:
+    """Get or create the async daily G-Code service instance."""
+    global _async_service_instance
+    if _async_service_instance is None:
+        _async_service_instance = AsyncDailyGCodeService()
+    return _async_service_instance
@@ -0,0 +1,270 @@
+"""
+Batch Metrics for Spiritual G-Code.
+Per-stage timings of nightly batch jobs (DB load with natal charts, transit
+compute, AI call, DB write) summarized as histograms with p50/p95/p99 and
+throughput, written to SystemLog and a JSON report file after each run.
+Celery chunk tasks export their metrics with their result, so the chord
+callback can merge them into one report for the whole run.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open)
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Report file directory when BATCH_REPORT_DIR is not configured
+DEFAULT_REPORT_DIR = "batch_reports"
+
+
+class BatchMetrics:
+    """
+    Stage timings and counters of one batch run.
+
+    Samples are kept as compact float arrays, so percentiles are exact.
+    """
+
+    def __init__(self, job: str, started_at: Optional[datetime] = None):
+        """
+        Initialize the metrics.
+
+        Args:
+            job: Job name the report is filed under
+            started_at: When the run started (defaults to now); elapsed
+                time and throughput are measured from it
+        """
+        self.job = job
+        self.started_at = started_at or timezone.now()
+        self._started = time.perf_counter() - max(
+            (timezone.now() - self.started_at).total_seconds(), 0.0
+        )
+        self._samples: Dict[str, array] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one sample of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one duration sample (in seconds) to a stage."""
+        with self._lock:
+            self._samples.setdefault(name, array("d")).append(seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increase a counter (e.g. users, ai_calls)."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def export(self) -> Dict:
+        """
+        Raw samples and counters as a JSON-serializable dict (see merge()).
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "samples": {
+                    name: [round(value, 6) for value in values]
+                    for name, values in self._samples.items()
+                },
+            }
+
+    def merge(self, exported: Dict) -> None:
+        """Add the samples and counters of another run's export()."""
+        with self._lock:
+            for name, values in exported.get("samples", {}).items():
+                self._samples.setdefault(name, array("d")).extend(values)
+            for name, amount in exported.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def report(self, **extra) -> Dict:
+        """
+        Summarize the run so far.
+
+        Args:
+            **extra: Additional top-level fields (run ID, target date, ...)
+
+        Returns:
+            JSON-serializable report with elapsed time, counters, users and
+            AI calls per second and per-stage summaries
+        """
+        elapsed = time.perf_counter() - self._started
+        with self._lock:
+            counters = dict(self._counters)
+            samples = {name: np.array(values) for name, values in self._samples.items()}
+
+        users = counters.get("users", 0)
+        ai_calls = counters.get("ai_calls", 0)
+        report = {
+            "job": self.job,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": timezone.now().isoformat(),
+            "elapsed_seconds": round(elapsed, 3),
+            "counters": counters,
+            "users_per_second": round(users / elapsed, 2) if elapsed else 0.0,
+            "ai_calls_per_second": round(ai_calls / elapsed, 2) if elapsed else 0.0,
+            "stages": {
+                name: summarize_stage(values) for name, values in samples.items()
+            },
+        }
+        report.update(extra)
+        return report
+
+    def save(self, **extra) -> Dict:
+        """
+        Write the report to SystemLog and a JSON file.
+
+        Args:
+            **extra: Additional top-level report fields
+
+        Returns:
+            The report, with "report_file" set to the file written
+        """
+        from api.models import SystemLog
+
+        report = self.report(**extra)
+        report["report_file"] = self._write_file(report)
+        SystemLog.objects.create(
+            level="INFO",
+            message=f"{self.job} batch report: {stage_summary_line(report)}",
+            module=__name__,
+            function="BatchMetrics.save",
+            extra_data=report,
+        )
+        return report
+
+    def _write_file(self, report: Dict) -> Optional[str]:
+        """Write the report as JSON; returns the path, or None on failure."""
+        directory = getattr(settings, "BATCH_REPORT_DIR", None) or os.path.join(
+            settings.LOG_DIR, DEFAULT_REPORT_DIR
+        )
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        job = self.job.replace("/", "_").replace("@", "-")
+        path = os.path.join(directory, f"{job}-{stamp}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as report_file:
+                json.dump(report, report_file, indent=2, default=str)
+        except OSError:
+            return None
+        return path
+
+
+def summarize_stage(seconds: np.ndarray) -> Dict:
+    """
+    Summarize one stage's samples.
+
+    Args:
+        seconds: Durations in seconds
+
+    Returns:
+        Dictionary with count, total, mean, p50/p95/p99, max (milliseconds)
+        and histogram [[upper bound ms or None, count], ...] of non-empty
+        buckets
+    """
+    ms = seconds * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    buckets = np.bincount(
+        np.searchsorted(HISTOGRAM_BOUNDS_MS, ms, side="left"),
+        minlength=len(HISTOGRAM_BOUNDS_MS) + 1,
+    )
+    bounds = list(HISTOGRAM_BOUNDS_MS) + [None]
+    return {
+        "count": int(ms.size),
+        "total_seconds": round(float(seconds.sum()), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "histogram": [
+            [bound, int(count)] for bound, count in zip(bounds, buckets) if count
+        ],
+    }
+
+
+def stage_summary_line(report: Dict) -> str:
+    """One-line summary of a report's throughput and stage p95s."""
+    stages = ", ".join(
+        f"{name} p95 {stage['p95_ms']}ms"
+        for name, stage in sorted(
+            report["stages"].items(),
+            key=lambda item: item[1]["total_seconds"],
+            reverse=True,
+        )
+    )
+    return (
+        f"{report['users_per_second']} users/s, "
+        f"{report['ai_calls_per_second']} AI calls/s"
+        + (f"; {stages}" if stages else "")
+    )
+
+
+def merged_metrics(
+    job: str, exports: Iterable[Optional[Dict]], started_at: Optional[datetime] = None
+) -> BatchMetrics:
+    """
+    Combine the exported metrics of a run's chunks.
+
+    Args:
+        job: Job name the report is filed under
+        exports: BatchMetrics.export() of each chunk (None entries skipped)
+        started_at: When the run started
+
+    Returns:
+        BatchMetrics holding every chunk's samples and counters
+    """
+    metrics = BatchMetrics(job, started_at=started_at)
+    for exported in exports:
+        if exported:
+            metrics.merge(exported)
+    return metrics
+
+
+def save_batch_report(
+    metrics: BatchMetrics, target_date: date, stats: Dict, run_id=None
+) -> Optional[Dict]:
+    """
+    Write a run's stage timing report to SystemLog and a JSON file.
+
+    Args:
+        metrics: The run's metrics
+        target_date: Date the run calculated for
+        stats: Totals returned by the run
+        run_id: Ledger run ID
+
+    Returns:
+        The report, or None if it could not be saved
+    """
+    try:
+        report = metrics.save(
+            run_id=str(run_id) if run_id else None,
+            target_date=target_date.isoformat(),
+            totals=stats,
+        )
+    except Exception as e:
+        logger.error(f"Batch report not saved: {str(e)}")
+        return None
+
+    logger.info(f"Stage report: {stage_summary_line(report)}")
+    if report["report_file"]:
+        logger.info(f"Report written to {report['report_file']}")
+    return report
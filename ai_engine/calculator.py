@@ -9,6 +9,8 @@ from typing import Dict, List, Optional
 import ephem
 import pytz
 
+from .scoring import get_gcode_scorer
+
 
 class GCodeCalculator:
     """
@@ -159,6 +161,7 @@ class GCodeCalculator:
         birth_location: str,
         target_date: date,
         birth_time: Optional[str] = None,
+        transit_positions: Optional[Dict] = None,
     ) -> Dict:
         """
         Calculate current transits and aspects to natal chart.
@@ -168,6 +171,7 @@ class GCodeCalculator:
             birth_location: Birth location
             target_date: Date to calculate transits for
             birth_time: Birth time (optional)
+            transit_positions: Precomputed positions for target_date (optional)
 
         Returns:
             Dictionary with transit data
@@ -178,23 +182,10 @@ class GCodeCalculator:
                 birth_date, birth_time, birth_location
             )
 
-            # Create observer for target date
-            dt = datetime.combine(target_date, datetime.min.time())
-            observer = self._create_observer(birth_location, dt)
-
-            # Calculate current planetary positions (including asteroids and centaurs)
-            transit_data = {}
-            for planet_name, planet in self.all_celestial_bodies.items():
-                planet.compute(observer)
-                lon = ephem.degrees(planet.ra + observer.sidereal_time())
-                sign = self._get_zodiac_sign(lon)
-                degree = self._get_degree_in_sign(lon)
-
-                transit_data[planet_name] = {
-                    "sign": sign,
-                    "degree": degree,
-                    "longitude": float(lon),
-                }
+            # Transit positions are the same for every user on a given day
+            transit_data = transit_positions or self.calculate_transit_positions(
+                target_date
+            )
 
             # Calculate aspects to natal positions
             aspects = self._calculate_transit_aspects(
@@ -210,6 +201,49 @@ class GCodeCalculator:
         except Exception as e:
             raise Exception(f"Error calculating transits: {str(e)}")
 
+    def calculate_transit_positions(self, target_date: date) -> Dict:
+        """
+        Calculate planetary positions for a date (including asteroids and centaurs).
+
+        The observer does not depend on the user, so these positions can be
+        shared by every user's transit calculation for the day.
+
+        Args:
+            target_date: Date to calculate positions for
+
+        Returns:
+            Dictionary of body -> sign, degree and longitude
+        """
+        dt = datetime.combine(target_date, datetime.min.time())
+        observer = self._create_observer("Unknown", dt)
+
+        transit_data = {}
+        for planet_name, planet in self.all_celestial_bodies.items():
+            planet.compute(observer)
+            lon = ephem.degrees(planet.ra + observer.sidereal_time())
+            sign = self._get_zodiac_sign(lon)
+            degree = self._get_degree_in_sign(lon)
+
+            transit_data[planet_name] = {
+                "sign": sign,
+                "degree": degree,
+                "longitude": float(lon),
+            }
+
+        return transit_data
+
+    def calculate_mundane_aspects(self, positions: Dict) -> List[Dict]:
+        """
+        Calculate aspects between transiting bodies themselves.
+
+        Args:
+            positions: Output of calculate_transit_positions
+
+        Returns:
+            List of aspects with planet1, planet2, aspect and orb
+        """
+        return self._calculate_aspects(positions)
+
     def _create_observer(self, location: str, dt: datetime) -> ephem.Observer:
         """Create PyEphem observer for location and time."""
         observer = ephem.Observer()
@@ -339,6 +373,21 @@ class GCodeCalculator:
 
         return aspects
 
+    def calculate_g_code_intensity(
+        self, transit_data: Dict, aspects: List[Dict]
+    ) -> int:
+        """
+        Calculate G-Code intensity score based on transits and aspects.
+
+        Args:
+            transit_data: Current planetary positions
+            aspects: Aspects to natal chart
+
+        Returns:
+            Intensity score (1-100)
+        """
+        return get_gcode_scorer().score(aspects)
+
     def calculate_extended_aspects(
         self, natal_data: Dict, transit_data: Dict = None
     ) -> Dict:
@@ -0,0 +1,298 @@
+"""
+Calculator Differential Harness for Spiritual G-Code.
+Runs calculator backends over random birth data / date pairs and reports
+longitude error, aspect-set differences and throughput against a reference.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+# Default sample size; override with GCODE_HARNESS_SAMPLES or --samples
+DEFAULT_SAMPLES = 200
+
+SAMPLE_LOCATIONS = [
+    "Taipei, Taiwan",
+    "New York, USA",
+    "London, UK",
+    "Sydney, Australia",
+    "São Paulo, Brazil",
+    "Unknown",
+]
+
+
+@dataclass
+class HarnessCase:
+    """One birth data / target date pair."""
+
+    birth_date: date
+    birth_time: Optional[str]
+    birth_location: str
+    target_date: date
+
+
+@dataclass
+class BackendReport:
+    """Differential results for one backend."""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    errors: int = 0
+    bodies_compared: int = 0
+    max_longitude_error: float = 0.0
+    total_longitude_error: float = 0.0
+    aspect_mismatch_cases: int = 0
+    aspect_differences: int = 0
+    worst_case: Optional[Dict] = field(default=None, repr=False)
+
+    @property
+    def calls_per_second(self) -> float:
+        """Throughput of calculate_transits calls."""
+        return self.calls / self.seconds if self.seconds else 0.0
+
+    @property
+    def mean_longitude_error(self) -> float:
+        """Mean absolute longitude error in degrees."""
+        if not self.bodies_compared:
+            return 0.0
+        return self.total_longitude_error / self.bodies_compared
+
+    def to_dict(self) -> Dict:
+        """Serialize the report."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "calls_per_second": round(self.calls_per_second, 1),
+            "errors": self.errors,
+            "bodies_compared": self.bodies_compared,
+            "max_longitude_error": round(self.max_longitude_error, 6),
+            "mean_longitude_error": round(self.mean_longitude_error, 6),
+            "aspect_mismatch_cases": self.aspect_mismatch_cases,
+            "aspect_differences": self.aspect_differences,
+            "worst_case": self.worst_case,
+        }
+
+
+class SharedPositionsBackend:
+    """
+    GCodeCalculator using the shared per-date transit positions fast path.
+
+    Positions are memoized per target date and passed to calculate_transits,
+    the same way the daily service reuses the collective sky.
+    """
+
+    def __init__(self):
+        from .calculator import GCodeCalculator
+
+        self.calculator = GCodeCalculator()
+        self._positions: Dict[date, Dict] = {}
+
+    def calculate_transits(self, target_date: date, **kwargs) -> Dict:
+        if target_date not in self._positions:
+            self._positions[target_date] = self.calculator.calculate_transit_positions(
+                target_date
+            )
+        return self.calculator.calculate_transits(
+            target_date=target_date,
+            transit_positions=dict(self._positions[target_date]),
+            **kwargs,
+        )
+
+
+def _ephem_backend():
+    from .calculator import GCodeCalculator
+
+    return GCodeCalculator()
+
+
+def _mock_backend():
+    from .mock_calculator import MockGCodeCalculator
+
+    return MockGCodeCalculator()
+
+
+# Backend name -> factory returning an object with calculate_transits()
+BACKENDS: Dict[str, Callable] = {
+    "ephem": _ephem_backend,
+    "ephem_shared": SharedPositionsBackend,
+    "mock": _mock_backend,
+}
+
+
+def register_backend(name: str, factory: Callable) -> None:
+    """
+    Register a calculator backend for differential runs.
+
+    Args:
+        name: Backend name used on the command line and in reports
+        factory: Callable returning an object with calculate_transits()
+    """
+    BACKENDS[name] = factory
+
+
+def generate_cases(samples: int, seed: int = 0) -> List[HarnessCase]:
+    """
+    Generate reproducible random birth data / target date pairs.
+
+    Args:
+        samples: Number of cases
+        seed: Random seed
+
+    Returns:
+        List of harness cases
+    """
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(samples):
+        birth_date = date(1940, 1, 1) + timedelta(days=rng.randrange(70 * 365))
+        birth_time = (
+            f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+            if rng.random() > 0.1
+            else None
+        )
+        target_date = date(2000, 1, 1) + timedelta(days=rng.randrange(40 * 365))
+        cases.append(
+            HarnessCase(
+                birth_date=birth_date,
+                birth_time=birth_time,
+                birth_location=rng.choice(SAMPLE_LOCATIONS),
+                target_date=target_date,
+            )
+        )
+    return cases
+
+
+class CalculatorHarness:
+    """
+    Differential harness comparing calculator backends to a reference.
+    """
+
+    def __init__(self, reference: str = "ephem", backends: Optional[List[str]] = None):
+        """
+        Initialize the harness.
+
+        Args:
+            reference: Backend whose results are treated as ground truth
+            backends: Backends to compare (defaults to every registered one)
+        """
+        self.reference = reference
+        self.backends = backends or [name for name in BACKENDS if name != reference]
+
+    def run(self, cases: List[HarnessCase]) -> Dict:
+        """
+        Run every backend over the cases.
+
+        Returns:
+            Dictionary with the reference report and one report per backend
+        """
+        reference_report, reference_results = self._run_backend(self.reference, cases)
+
+        reports = []
+        for name in self.backends:
+            report, results = self._run_backend(name, cases)
+            self._compare(report, cases, reference_results, results)
+            reports.append(report.to_dict())
+
+        return {
+            "samples": len(cases),
+            "reference": reference_report.to_dict(),
+            "backends": reports,
+        }
+
+    def _run_backend(self, name: str, cases: List[HarnessCase]):
+        """Time calculate_transits for every case."""
+        calculator = BACKENDS[name]()
+        report = BackendReport(name=name)
+        results = []
+
+        started = time.perf_counter()
+        for case in cases:
+            try:
+                results.append(
+                    calculator.calculate_transits(
+                        birth_date=case.birth_date,
+                        birth_time=case.birth_time,
+                        birth_location=case.birth_location,
+                        target_date=case.target_date,
+                    )
+                )
+            except Exception:
+                report.errors += 1
+                results.append(None)
+        report.seconds = time.perf_counter() - started
+        report.calls = len(cases)
+
+        return report, results
+
+    def _compare(
+        self,
+        report: BackendReport,
+        cases: List[HarnessCase],
+        expected: List[Optional[Dict]],
+        actual: List[Optional[Dict]],
+    ) -> None:
+        """Accumulate longitude and aspect differences into a report."""
+        for case, reference, candidate in zip(cases, expected, actual):
+            if reference is None or candidate is None:
+                continue
+
+            pairs = [
+                (reference["planets"], candidate["planets"]),
+                (
+                    reference["natal_chart"]["chart_data"],
+                    candidate["natal_chart"]["chart_data"],
+                ),
+            ]
+            for ref_positions, positions in pairs:
+                for body, ref_position in ref_positions.items():
+                    if body not in positions:
+                        continue
+                    error = abs(
+                        (positions[body]["longitude"] - ref_position["longitude"] + 180)
+                        % 360
+                        - 180
+                    )
+                    report.bodies_compared += 1
+                    report.total_longitude_error += error
+                    if error > report.max_longitude_error:
+                        report.max_longitude_error = error
+                        report.worst_case = {
+                            "body": body,
+                            "birth_date": case.birth_date.isoformat(),
+                            "target_date": case.target_date.isoformat(),
+                        }
+
+            differences = self._aspect_set(reference) ^ self._aspect_set(candidate)
+            if differences:
+                report.aspect_mismatch_cases += 1
+                report.aspect_differences += len(differences)
+
+    def _aspect_set(self, result: Dict) -> set:
+        """Reduce transit aspects to a comparable set."""
+        return {
+            (a["transit_planet"], a["natal_planet"], a["aspect"])
+            for a in result["aspects"]
+        }
+
+
+def format_report(result: Dict) -> str:
+    """Format a harness result as a text table."""
+    lines = [
+        f"Samples: {result['samples']}",
+        f"Reference: {result['reference']['name']} "
+        f"({result['reference']['calls_per_second']} calls/s)",
+        "",
+        f"{'backend':<14}{'calls/s':>10}{'max err°':>12}{'mean err°':>12}"
+        f"{'aspect diff cases':>20}{'errors':>8}",
+    ]
+    for report in result["backends"]:
+        lines.append(
+            f"{report['name']:<14}{report['calls_per_second']:>10}"
+            f"{report['max_longitude_error']:>12.6f}"
+            f"{report['mean_longitude_error']:>12.6f}"
+            f"{report['aspect_mismatch_cases']:>20}{report['errors']:>8}"
+        )
+    return "\n".join(lines)
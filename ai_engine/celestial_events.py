@@ -0,0 +1,408 @@
+"""
+Celestial Events Calendar for Spiritual G-Code.
+Precomputes lunations, void-of-course Moon windows and eclipses once per year.
+"""
+
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.core.cache import cache
+
+from .ephemeris import (
+    create_body,
+    ecliptic_longitude,
+    ecliptic_position,
+    find_crossings,
+    find_root,
+    mean_lunar_node,
+    sample_longitudes,
+    sign_of,
+    to_datetime,
+    to_ephem_date,
+    wrap180,
+)
+
+# Cache settings for the shared yearly calendar
+CALENDAR_CACHE_PREFIX = "celestial_events"
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # One week; rows never change
+
+# Longest date range served by one API request (years are only read there;
+# scripts/build_celestial_calendar.py builds them ahead of time)
+MAX_RANGE_DAYS = 366
+
+
+class CelestialEventCalculator:
+    """
+    Calculator for yearly celestial events.
+
+    Lunations are found by root-finding on the Sun-Moon elongation, eclipses
+    by the Sun's distance from the lunar nodes at each syzygy, and void-of-course
+    windows from the Moon's last major aspect before each sign ingress.
+    """
+
+    # Sun-Moon elongation of each lunation
+    LUNATIONS = {
+        "new_moon": 0.0,
+        "first_quarter": 90.0,
+        "full_moon": 180.0,
+        "last_quarter": 270.0,
+    }
+
+    # Bodies the Moon must aspect to be "on course"
+    VOC_BODIES = [
+        "sun",
+        "mercury",
+        "venus",
+        "mars",
+        "jupiter",
+        "saturn",
+        "uranus",
+        "neptune",
+        "pluto",
+    ]
+
+    ASPECT_ANGLES = {
+        "conjunction": 0,
+        "sextile": 60,
+        "square": 90,
+        "trine": 120,
+        "opposition": 180,
+    }
+
+    # Maximum Sun-node distance (degrees) at which an eclipse is possible
+    SOLAR_ECLIPSE_LIMIT = 18.5
+    LUNAR_ECLIPSE_LIMIT = 17.4
+
+    def __init__(self, step_hours: float = 2.0):
+        """
+        Initialize the calculator.
+
+        Args:
+            step_hours: Sampling grid spacing used to bracket events
+        """
+        self.step_days = step_hours / 24.0
+        self.sun = create_body("sun")
+        self.moon = create_body("moon")
+
+    def calculate_year(self, year: int) -> List[Dict]:
+        """Calculate all events for a calendar year."""
+        return self.calculate_events(date(year, 1, 1), date(year, 12, 31))
+
+    def calculate_events(self, start_date: date, end_date: date) -> List[Dict]:
+        """
+        Calculate lunations, eclipses and void-of-course windows.
+
+        Args:
+            start_date: First day of the range (UTC)
+            end_date: Last day of the range (UTC, inclusive)
+
+        Returns:
+            List of event dictionaries sorted by start time
+        """
+        range_start = to_ephem_date(start_date)
+        range_end = to_ephem_date(end_date + timedelta(days=1))
+
+        # Look back far enough to catch the ingress opening the first window
+        times, longitudes = sample_longitudes(
+            ["sun", "moon"] + [b for b in self.VOC_BODIES if b != "sun"],
+            range_start - 3,
+            range_end + 1,
+            self.step_days,
+        )
+
+        events = self._find_lunations(times, longitudes)
+        events += self._find_void_of_course(times, longitudes)
+
+        start_dt = to_datetime(range_start)
+        end_dt = to_datetime(range_end)
+        events = [
+            event
+            for event in events
+            if event["starts_at"] < end_dt
+            and (event["ends_at"] or event["starts_at"]) >= start_dt
+        ]
+        return sorted(events, key=lambda event: event["starts_at"])
+
+    def _elongation(self, when: float) -> float:
+        """Moon minus Sun ecliptic longitude at an instant."""
+        return ecliptic_longitude(self.moon, when) - ecliptic_longitude(self.sun, when)
+
+    def _find_lunations(self, times: np.ndarray, longitudes: Dict) -> List[Dict]:
+        """Find lunation instants and classify eclipses."""
+        events = []
+        elongation = longitudes["moon"] - longitudes["sun"]
+
+        for event_type, angle in self.LUNATIONS.items():
+            approximations = find_crossings(times, wrap180(elongation - angle))
+            for approx in approximations:
+                exact = find_root(
+                    lambda t: float(wrap180(self._elongation(t) - angle)),
+                    approx - self.step_days,
+                    approx + self.step_days,
+                )
+                moon_lon, moon_lat = ecliptic_position(self.moon, exact)
+                sun_lon = ecliptic_longitude(self.sun, exact)
+
+                node_distance = abs(float(wrap180(sun_lon - mean_lunar_node(exact))))
+                node_distance = min(node_distance, 180.0 - node_distance)
+
+                data = {
+                    "moon_latitude": round(moon_lat, 4),
+                    "node_distance": round(node_distance, 4),
+                }
+                events.append(self._event(event_type, exact, None, moon_lon, data=data))
+
+                if (
+                    event_type == "new_moon"
+                    and node_distance <= self.SOLAR_ECLIPSE_LIMIT
+                ):
+                    events.append(
+                        self._event("solar_eclipse", exact, None, sun_lon, data=data)
+                    )
+                elif (
+                    event_type == "full_moon"
+                    and node_distance <= self.LUNAR_ECLIPSE_LIMIT
+                ):
+                    events.append(
+                        self._event("lunar_eclipse", exact, None, moon_lon, data=data)
+                    )
+
+        return events
+
+    def _find_void_of_course(self, times: np.ndarray, longitudes: Dict) -> List[Dict]:
+        """Find void-of-course Moon windows (last aspect until sign ingress)."""
+        moon = longitudes["moon"]
+
+        # Sign ingresses: Moon longitude crossing each 30 degree boundary
+        ingresses = []
+        for index in range(12):
+            for when in find_crossings(times, wrap180(moon - index * 30)):
+                ingresses.append((when, index))
+        ingresses.sort()
+
+        # Exact Ptolemaic aspects from the Moon to every other body
+        aspects = []
+        for body in self.VOC_BODIES:
+            separation = moon - longitudes[body]
+            for aspect_name, angle in self.ASPECT_ANGLES.items():
+                for signed_angle in {angle, (360 - angle) % 360}:
+                    offsets = wrap180(separation - signed_angle)
+                    for when in find_crossings(times, offsets):
+                        aspects.append((when, body, aspect_name))
+        aspects.sort()
+        aspect_times = np.array([a[0] for a in aspects])
+
+        events = []
+        for (entered, sign_index), (leaves, next_index) in zip(
+            ingresses, ingresses[1:]
+        ):
+            position = np.searchsorted(aspect_times, leaves) - 1
+            if position >= 0 and aspect_times[position] > entered:
+                starts, body, aspect_name = aspects[position]
+                last_aspect = {"body": body, "aspect": aspect_name}
+            else:
+                starts, last_aspect = entered, None
+
+            events.append(
+                self._event(
+                    "void_of_course",
+                    starts,
+                    leaves,
+                    sign_index * 30.0,
+                    data={
+                        "last_aspect": last_aspect,
+                        "next_sign": sign_of(next_index * 30.0),
+                    },
+                )
+            )
+
+        return events
+
+    def _event(
+        self,
+        event_type: str,
+        starts: float,
+        ends: Optional[float],
+        longitude: float,
+        data: Optional[Dict] = None,
+    ) -> Dict:
+        """Build an event dictionary."""
+        return {
+            "event_type": event_type,
+            "starts_at": to_datetime(starts),
+            "ends_at": to_datetime(ends) if ends is not None else None,
+            "sign": sign_of(longitude),
+            "longitude": round(longitude % 360.0, 4),
+            "data": data or {},
+        }
+
+
+class CelestialCalendarService:
+    """
+    Shared, cached access to the celestial events calendar.
+
+    Each year is computed once, stored in the CelestialEvent table and served
+    from the Django cache to every user.
+    """
+
+    # Lunation that opens each phase of the synodic month
+    PHASE_AFTER = {
+        "new_moon": "waxing_crescent",
+        "first_quarter": "waxing_gibbous",
+        "full_moon": "waning_gibbous",
+        "last_quarter": "waning_crescent",
+    }
+
+    def __init__(self, calculator: Optional[CelestialEventCalculator] = None):
+        """Initialize the service with an event calculator."""
+        self.calculator = calculator or CelestialEventCalculator()
+
+    def get_year(self, year: int, build_missing: bool = True) -> List[Dict]:
+        """
+        Get all events for a year.
+
+        Args:
+            year: Calendar year
+            build_missing: Compute and store the year if it isn't stored yet
+
+        Returns:
+            List of serialized events sorted by start time
+        """
+        cache_key = f"{CALENDAR_CACHE_PREFIX}:{year}"
+        events = cache.get(cache_key)
+        if events is not None:
+            return events
+
+        from api.models import CelestialEvent
+
+        rows = CelestialEvent.objects.filter(year=year).order_by("starts_at")
+        if not rows.exists():
+            if not build_missing:
+                return []
+            self.build_year(year)
+
+        events = [self._serialize(row) for row in rows.all()]
+        cache.set(cache_key, events, CALENDAR_CACHE_TIMEOUT)
+        return events
+
+    def build_year(self, year: int, force: bool = False) -> int:
+        """
+        Compute and store a year's events.
+
+        Args:
+            year: Calendar year
+            force: Recompute even if the year is already stored
+
+        Returns:
+            Number of events stored
+        """
+        from api.models import CelestialEvent
+
+        existing = CelestialEvent.objects.filter(year=year)
+        if existing.exists() and not force:
+            return existing.count()
+
+        events = self.calculator.calculate_year(year)
+        existing.delete()
+        CelestialEvent.objects.bulk_create(
+            [CelestialEvent(year=year, **event) for event in events]
+        )
+        cache.delete(f"{CALENDAR_CACHE_PREFIX}:{year}")
+        return len(events)
+
+    def events_between(
+        self,
+        start_date: date,
+        end_date: date,
+        event_types: Optional[List[str]] = None,
+        build_missing: bool = True,
+    ) -> List[Dict]:
+        """
+        Get events overlapping a date range.
+
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+            event_types: Optional filter on event type
+            build_missing: Compute years that aren't stored yet
+
+        Returns:
+            List of serialized events
+        """
+        start_dt = datetime.combine(start_date, datetime.min.time(), dt_timezone.utc)
+        end_dt = start_dt + timedelta(days=(end_date - start_date).days + 1)
+
+        events = []
+        # Events spanning Dec 31/Jan 1 are stored with both years
+        seen = set()
+        for year in range(start_date.year, end_date.year + 1):
+            for event in self.get_year(year, build_missing=build_missing):
+                if event_types and event["event_type"] not in event_types:
+                    continue
+                key = (event["event_type"], event["starts_at"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                starts = datetime.fromisoformat(event["starts_at"])
+                ends = (
+                    datetime.fromisoformat(event["ends_at"])
+                    if event["ends_at"]
+                    else starts
+                )
+                if starts < end_dt and ends >= start_dt:
+                    events.append(event)
+        return events
+
+    def events_on(self, day: date, build_missing: bool = True) -> List[Dict]:
+        """Get events happening on a single day."""
+        return self.events_between(day, day, build_missing=build_missing)
+
+    def lunar_phase_on(self, day: date, build_missing: bool = True) -> Optional[str]:
+        """
+        Get the Moon's phase on a day from the stored lunations.
+
+        Args:
+            day: Date to look up
+            build_missing: Compute years that aren't stored yet
+
+        Returns:
+            Lunation name on lunation days, otherwise the phase in between
+        """
+        lunations = self.events_between(
+            day - timedelta(days=10),
+            day,
+            event_types=list(self.PHASE_AFTER),
+            build_missing=build_missing,
+        )
+        if not lunations:
+            return None
+
+        latest = lunations[-1]
+        if datetime.fromisoformat(latest["starts_at"]).date() == day:
+            return latest["event_type"]
+        return self.PHASE_AFTER[latest["event_type"]]
+
+    def _serialize(self, event) -> Dict:
+        """Serialize a CelestialEvent row for caching and API output."""
+        return {
+            "event_type": event.event_type,
+            "starts_at": event.starts_at.isoformat(),
+            "ends_at": event.ends_at.isoformat() if event.ends_at else None,
+            "sign": event.sign,
+            "longitude": event.longitude,
+            "data": event.data or {},
+        }
+
+
+# Singleton instance
+_calendar_instance = None
+
+
+def get_celestial_calendar() -> CelestialCalendarService:
+    """Get or create the celestial calendar service instance."""
+    global _calendar_instance
+    if _calendar_instance is None:
+        _calendar_instance = CelestialCalendarService()
+    return _calendar_instance
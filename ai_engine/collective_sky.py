@@ -0,0 +1,268 @@
+"""
+Collective Sky for Spiritual G-Code.
+Daily snapshot of the sky shared by all users: positions, mundane aspects,
+sign ingresses, retrogrades and a collective intensity score.
+"""
+
+import copy
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+
+from .mock_calculator import MockGCodeCalculator
+from .scoring import get_gcode_scorer
+
+logger = logging.getLogger(__name__)
+
+# Cache settings for daily snapshots
+SKY_CACHE_PREFIX = "collective_sky"
+SKY_CACHE_TIMEOUT = 60 * 60 * 48  # Two days; a snapshot never changes
+
+# Only tight aspects between classical bodies count toward the collective
+# score; with every asteroid and a wide orb the score would always saturate
+COLLECTIVE_ORB = 2.0
+COLLECTIVE_BODIES = {
+    "sun",
+    "moon",
+    "mercury",
+    "venus",
+    "mars",
+    "jupiter",
+    "saturn",
+    "uranus",
+    "neptune",
+    "pluto",
+}
+
+# Slowest body last; an aspect is attributed to its slower body when scoring
+BODY_SPEED_ORDER = [
+    "moon",
+    "mercury",
+    "venus",
+    "sun",
+    "earth",
+    "mars",
+    "vesta",
+    "juno",
+    "ceres",
+    "pallas",
+    "jupiter",
+    "saturn",
+    "chiron",
+    "uranus",
+    "neptune",
+    "pluto",
+]
+
+
+class CollectiveSkyService:
+    """
+    Shared, cached access to daily collective sky snapshots.
+
+    Each day is computed once, stored in the CollectiveSky table and served
+    from the Django cache, so per-user code reuses the same positions.
+    """
+
+    def __init__(self, calculator=None):
+        """
+        Initialize the service.
+
+        Args:
+            calculator: Calculator providing calculate_transit_positions and
+                calculate_mundane_aspects (defaults to the service's mock)
+        """
+        self.calculator = calculator or MockGCodeCalculator()
+        self.scorer = get_gcode_scorer()
+
+    def get_snapshot(self, day: date, build_missing: bool = True) -> Optional[Dict]:
+        """
+        Get the collective sky for a day.
+
+        Args:
+            day: Snapshot date
+            build_missing: Compute and store the snapshot if it isn't stored yet
+
+        Returns:
+            Serialized snapshot, or None if missing and not built
+        """
+        cache_key = f"{SKY_CACHE_PREFIX}:{day.isoformat()}"
+        snapshot = cache.get(cache_key)
+        if snapshot is not None:
+            return snapshot
+
+        from api.models import CollectiveSky
+
+        row = CollectiveSky.objects.filter(snapshot_date=day).first()
+        if row is None:
+            if not build_missing:
+                return None
+            row = self.build_snapshot(day)
+
+        snapshot = self._serialize(row)
+        cache.set(cache_key, snapshot, SKY_CACHE_TIMEOUT)
+        return snapshot
+
+    def build_snapshot(self, day: date, force: bool = False):
+        """
+        Compute and store a day's snapshot.
+
+        Args:
+            day: Snapshot date
+            force: Recompute even if the day is already stored
+
+        Returns:
+            CollectiveSky instance
+        """
+        from api.models import CollectiveSky
+
+        existing = CollectiveSky.objects.filter(snapshot_date=day).first()
+        if existing is not None and not force:
+            return existing
+
+        data = self.calculate_snapshot(day)
+        row, _ = CollectiveSky.objects.update_or_create(
+            snapshot_date=day, defaults=data
+        )
+        cache.delete(f"{SKY_CACHE_PREFIX}:{day.isoformat()}")
+        return row
+
+    def calculate_snapshot(self, day: date) -> Dict:
+        """
+        Calculate a day's snapshot without storing it.
+
+        Returns:
+            Dictionary matching the CollectiveSky fields
+        """
+        positions = self.calculator.calculate_transit_positions(day)
+        previous = self.calculator.calculate_transit_positions(day - timedelta(days=1))
+
+        retrogrades = self._get_retrogrades(positions, day)
+        mundane_aspects = sorted(
+            self.calculator.calculate_mundane_aspects(positions),
+            key=lambda aspect: aspect["orb"],
+        )
+
+        ingresses = [
+            {"body": body, "from_sign": previous[body]["sign"], "to_sign": pos["sign"]}
+            for body, pos in positions.items()
+            if body in previous and previous[body]["sign"] != pos["sign"]
+        ]
+
+        score = self.score_aspects(mundane_aspects)
+        return {
+            "positions": positions,
+            "mundane_aspects": mundane_aspects,
+            "ingresses": ingresses,
+            "retrogrades": retrogrades,
+            "intensity_score": score,
+            "intensity_level": self.scorer.intensity_level(score),
+        }
+
+    def score_aspects(self, mundane_aspects: List[Dict]) -> int:
+        """
+        Score tight mundane aspects with the shared G-Code weights.
+
+        Each aspect is attributed to its slower body, the one that sets the
+        aspect's duration.
+        """
+        tight = [
+            {
+                "aspect": aspect["aspect"],
+                "transit_planet": self._slower_body(
+                    aspect["planet1"], aspect["planet2"]
+                ),
+                "orb": aspect["orb"],
+            }
+            for aspect in mundane_aspects
+            if aspect["orb"] <= COLLECTIVE_ORB
+            and aspect["planet1"] in COLLECTIVE_BODIES
+            and aspect["planet2"] in COLLECTIVE_BODIES
+        ]
+        return self.scorer.score(tight)
+
+    def transit_positions(
+        self, day: date, build_missing: bool = True
+    ) -> Optional[Dict]:
+        """
+        Get a copy of the day's positions for per-user transit calculation.
+
+        Args:
+            day: Snapshot date
+            build_missing: Compute and store the snapshot if it isn't stored yet
+
+        Returns:
+            Positions dictionary, or None if the snapshot can't be loaded
+        """
+        try:
+            snapshot = self.get_snapshot(day, build_missing=build_missing)
+        except Exception as e:
+            logger.warning(f"Collective sky unavailable for {day}: {str(e)}")
+            return None
+        return copy.deepcopy(snapshot["positions"]) if snapshot else None
+
+    def summarize(self, snapshot: Dict, limit: int = 5) -> Dict:
+        """
+        Get the compact part of a snapshot used by prompts and views.
+
+        Args:
+            snapshot: Serialized snapshot
+            limit: Number of tightest mundane aspects to keep
+
+        Returns:
+            Dictionary without the full positions table
+        """
+        return {
+            "date": snapshot["date"],
+            "mundane_aspects": snapshot["mundane_aspects"][:limit],
+            "ingresses": snapshot["ingresses"],
+            "retrogrades": snapshot["retrogrades"],
+            "intensity_score": snapshot["intensity_score"],
+            "intensity_level": snapshot["intensity_level"],
+        }
+
+    def _get_retrogrades(self, positions: Dict, day: date) -> Dict:
+        """Flag positions and return each body's phase from the retrograde calendar."""
+        from .retrograde_calendar import get_retrograde_calendar
+
+        try:
+            calendar = get_retrograde_calendar()
+            status = calendar.status_on(day, build_missing=False)
+            calendar.flag_transits(positions, day, build_missing=False)
+            return status
+        except Exception:
+            # Retrograde flags are an optional enrichment
+            return {}
+
+    def _slower_body(self, first: str, second: str) -> str:
+        """Get the slower-moving of two bodies."""
+
+        def rank(body: str) -> int:
+            return BODY_SPEED_ORDER.index(body) if body in BODY_SPEED_ORDER else -1
+
+        return first if rank(first) >= rank(second) else second
+
+    def _serialize(self, row) -> Dict:
+        """Serialize a CollectiveSky row for caching and API output."""
+        return {
+            "date": row.snapshot_date.isoformat(),
+            "positions": row.positions,
+            "mundane_aspects": row.mundane_aspects,
+            "ingresses": row.ingresses,
+            "retrogrades": row.retrogrades,
+            "intensity_score": row.intensity_score,
+            "intensity_level": row.intensity_level,
+        }
+
+
+# Singleton instance
+_sky_instance = None
+
+
+def get_collective_sky() -> CollectiveSkyService:
+    """Get or create the collective sky service instance."""
+    global _sky_instance
+    if _sky_instance is None:
+        _sky_instance = CollectiveSkyService()
+    return _sky_instance
@@ -4,12 +4,28 @@ Orchestrates natal chart calculation, transit calculation, and AI interpretation
 """
 
 from datetime import date, datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 
 from django.utils import timezone
 
+from .collective_sky import get_collective_sky
+from .fingerprints import birth_data_fingerprint
 from .mock_calculator import MockGCodeCalculator
 from .mock_gemini_client import MockGeminiGCodeClient
+from .result_cache import (
+    DAILY_GCODE_CACHE_PREFIX,
+    DAILY_GCODE_CACHE_TIMEOUT,
+    DAILY_GCODE_MEMO_SIZE,
+    ResultCache,
+)
+from .scoring import get_gcode_scorer
+
+# Named forecast periods and their length in days
+FORECAST_PERIODS = {"week": 7, "month": 30, "quarter": 91}
+MAX_FORECAST_DAYS = 366
+
+# Aspects per day included in the combined forecast prompt
+FORECAST_ASPECTS_PER_DAY = 3
 
 
 class DailyGCodeService:
@@ -21,16 +37,26 @@ class DailyGCodeService:
         """Initialize the service with calculator and AI client."""
         self.calculator = MockGCodeCalculator()
         self.ai_client = MockGeminiGCodeClient()
+        self.scorer = get_gcode_scorer()
+        self.result_cache = ResultCache(
+            prefix=DAILY_GCODE_CACHE_PREFIX,
+            timeout=DAILY_GCODE_CACHE_TIMEOUT,
+            memo_size=DAILY_GCODE_MEMO_SIZE,
+        )
 
     def calculate_daily_gcode_for_user(
-        self, user, target_date: Optional[date] = None
+        self, user, target_date: Optional[date] = None, use_cache: bool = True
     ) -> Dict:
         """
         Calculate complete daily G-Code for a user.
 
+        Results are cached per user, date, birth data and tone, so repeated
+        requests for the same day skip the calculation and the AI call.
+
         Args:
             user: GCodeUser instance
             target_date: Date to calculate for (defaults to today)
+            use_cache: Serve from and store into the result cache
 
         Returns:
             Complete daily G-Code data with interpretation
@@ -38,57 +64,118 @@ class DailyGCodeService:
         if target_date is None:
             target_date = date.today()
 
-        try:
-            # Step 1: Calculate natal chart (cached)
-            natal_chart = self._get_or_calculate_natal_chart(user)
+        if not use_cache:
+            return self._calculate_daily_gcode(user, target_date)
 
-            # Step 2: Calculate transits for target date
-            transit_data = self.calculator.calculate_transits(
-                birth_date=user.birth_date,
-                birth_time=(
-                    user.birth_time.strftime("%H:%M") if user.birth_time else None
-                ),
-                birth_location=user.birth_location,
-                target_date=target_date,
-            )
+        return self.result_cache.get_or_compute(
+            self._result_key(user, target_date),
+            lambda: self._calculate_daily_gcode(user, target_date),
+        )
+
+    def invalidate_daily_gcode(self, user, target_date: date) -> None:
+        """Drop a user's cached daily G-Code for a date."""
+        self.result_cache.invalidate(self._result_key(user, target_date))
+
+    def _calculate_daily_gcode(self, user, target_date: date) -> Dict:
+        """Calculate and interpret a daily G-Code without caching."""
+        try:
+            # Step 1: Load the natal chart and the shared sky for the day
+            context = self._load_daily_context(user, target_date)
 
-            # Step 3: Calculate G-Code intensity score
-            g_code_score = self.calculator.calculate_g_code_intensity(
-                transit_data=transit_data["planets"], aspects=transit_data["aspects"]
+            # Step 2-3: Calculate transits and the G-Code intensity score
+            transit_data, g_code_score = self._calculate_daily_transits(
+                user, target_date, context
             )
 
             # Step 4: Generate AI interpretation
-            user_preferences = {"tone": user.preferred_tone, "timezone": user.timezone}
-
             ai_interpretation = self.ai_client.generate_daily_gcode(
-                natal_data=natal_chart,
+                natal_data=context["natal_chart"],
                 transit_data=transit_data,
-                user_preferences=user_preferences,
+                user_preferences=context["user_preferences"],
             )
 
-            # Step 5: Determine intensity level
-            intensity_level = self._get_intensity_level(g_code_score)
-
-            # Step 6: Compile complete daily G-Code
-            daily_gcode = {
-                "user": user.username,
-                "transit_date": target_date,
-                "natal_chart": natal_chart,
-                "transit_data": transit_data,
-                "g_code_score": g_code_score,
-                "intensity_level": intensity_level,
-                "themes": ai_interpretation["themes"],
-                "interpretation": ai_interpretation["interpretation"],
-                "affirmation": ai_interpretation["affirmation"],
-                "practical_guidance": ai_interpretation["practical_guidance"],
-                "generated_at": timezone.now().isoformat(),
-            }
-
-            return daily_gcode
+            # Step 5-6: Compile complete daily G-Code
+            return self._compile_daily_gcode(
+                user,
+                target_date,
+                context,
+                transit_data,
+                g_code_score,
+                ai_interpretation,
+            )
 
         except Exception as e:
             raise Exception(f"Error calculating daily G-Code: {str(e)}")
 
+    def _load_daily_context(self, user, target_date: date) -> Dict:
+        """
+        Load the stored inputs of a daily G-Code (database and cache reads).
+
+        Returns:
+            Dictionary with natal chart, shared transit positions, collective
+            sky summary, celestial events, retrograde status and preferences
+        """
+        natal_chart = self._get_or_calculate_natal_chart(user)
+
+        # Reuse the shared collective sky positions when available
+        sky = get_collective_sky()
+        return {
+            "natal_chart": natal_chart,
+            "transit_positions": sky.transit_positions(target_date),
+            "collective_sky": self._get_collective_summary(sky, target_date),
+            # Shared sky events (lunations, eclipses, void-of-course Moon)
+            "celestial_events": self._get_celestial_events(target_date),
+            "retrograde_status": self._get_retrograde_status(target_date),
+            "user_preferences": {
+                "tone": user.preferred_tone,
+                "timezone": user.timezone,
+            },
+        }
+
+    def _calculate_daily_transits(self, user, target_date: date, context: Dict):
+        """
+        Calculate a day's transits and score (CPU only, no database access).
+
+        Returns:
+            Tuple of (transit data, G-Code score)
+        """
+        transit_data = self.calculator.calculate_transits(
+            birth_date=user.birth_date,
+            birth_time=(user.birth_time.strftime("%H:%M") if user.birth_time else None),
+            birth_location=user.birth_location,
+            target_date=target_date,
+            transit_positions=context["transit_positions"],
+        )
+        transit_data["collective_sky"] = context["collective_sky"]
+        transit_data["celestial_events"] = context["celestial_events"]
+        self._flag_retrogrades(transit_data["planets"], context["retrograde_status"])
+
+        return transit_data, self.scorer.score(transit_data["aspects"])
+
+    def _compile_daily_gcode(
+        self,
+        user,
+        target_date: date,
+        context: Dict,
+        transit_data: Dict,
+        g_code_score: int,
+        ai_interpretation: Dict,
+    ) -> Dict:
+        """Compile the complete daily G-Code."""
+        return {
+            "user": user.username,
+            "transit_date": target_date,
+            "natal_chart": context["natal_chart"],
+            "transit_data": transit_data,
+            "g_code_score": g_code_score,
+            "intensity_level": self._get_intensity_level(g_code_score),
+            "themes": ai_interpretation["themes"],
+            "interpretation": ai_interpretation["interpretation"],
+            "affirmation": ai_interpretation["affirmation"],
+            "practical_guidance": ai_interpretation["practical_guidance"],
+            "generated_at": timezone.now().isoformat(),
+        }
+
     def calculate_weekly_forecast(
         self, user, start_date: Optional[date] = None
     ) -> Dict:
@@ -102,25 +189,95 @@ class DailyGCodeService:
         Returns:
             Weekly forecast with daily G-Codes
         """
+        return self.calculate_period_forecast(user, start_date, period="week")
+
+    def calculate_period_forecast(
+        self,
+        user,
+        start_date: Optional[date] = None,
+        period: Union[str, int] = "week",
+    ) -> Dict:
+        """
+        Calculate a G-Code forecast for a period in one batch.
+
+        The natal chart is loaded once, every day is scored from the user's
+        transit timeline in a single range pass and the interpretation for
+        the whole period comes from one AI request.
+
+        Args:
+            user: GCodeUser instance
+            start_date: Start date of forecast (defaults to today)
+            period: "week", "month", "quarter" or a number of days
+
+        Returns:
+            Period forecast with an overview and per-day G-Codes
+        """
         if start_date is None:
             start_date = date.today()
 
-        weekly_data = {
-            "user": user.username,
-            "start_date": start_date,
-            "end_date": start_date.strftime("%Y-%m-%d"),
-            "daily_gcodes": [],
-        }
+        days = FORECAST_PERIODS.get(period) if isinstance(period, str) else period
+        if not days or days < 1 or days > MAX_FORECAST_DAYS:
+            raise ValueError(f"Invalid forecast period: {period}")
+        end_date = start_date + timedelta(days=days - 1)
 
-        # Calculate for 7 days
-        for i in range(7):
-            target_date = start_date + timedelta(days=i)
-            daily_gcode = self.calculate_daily_gcode_for_user(
-                user=user, target_date=target_date
+        try:
+            from .transit_timeline import get_transit_timeline
+
+            natal_chart = self._get_or_calculate_natal_chart(user)
+
+            daily_scores = get_transit_timeline().daily_scores(
+                user, start_date, end_date
+            )
+            daily_summaries = [
+                {
+                    "date": day["date"],
+                    "score": day["score"],
+                    "intensity": day["intensity"],
+                    "aspects": self._key_aspects(day),
+                }
+                for day in daily_scores
+            ]
+
+            user_preferences = {"tone": user.preferred_tone, "timezone": user.timezone}
+            ai_forecast = self.ai_client.generate_period_forecast(
+                natal_data=natal_chart,
+                daily_summaries=daily_summaries,
+                user_preferences=user_preferences,
             )
-            weekly_data["daily_gcodes"].append(daily_gcode)
 
-        return weekly_data
+            daily_gcodes = [
+                {
+                    "transit_date": date.fromisoformat(day["date"]),
+                    "g_code_score": day["score"],
+                    "intensity_level": day["intensity"],
+                    "key_aspects": day["aspects"],
+                    "theme": ai_day["theme"],
+                    "guidance": ai_day["guidance"],
+                }
+                for day, ai_day in zip(daily_summaries, ai_forecast["daily"])
+            ]
+            scores = [day["score"] for day in daily_summaries]
+            peak_days = sorted(daily_summaries, key=lambda d: -d["score"])[:3]
+
+            return {
+                "user": user.username,
+                "period": period,
+                "start_date": start_date,
+                "end_date": end_date,
+                "days": days,
+                "natal_chart": natal_chart,
+                "average_score": round(sum(scores) / len(scores)),
+                "peak_days": [day["date"] for day in peak_days],
+                "overview": ai_forecast["overview"],
+                "themes": ai_forecast["themes"],
+                "affirmation": ai_forecast["affirmation"],
+                "practical_guidance": ai_forecast["practical_guidance"],
+                "daily_gcodes": daily_gcodes,
+                "generated_at": timezone.now().isoformat(),
+            }
+
+        except Exception as e:
+            raise Exception(f"Error calculating period forecast: {str(e)}")
 
     def generate_spiritual_patch_note(
         self,
@@ -183,16 +340,64 @@ class DailyGCodeService:
 
             return natal_data
 
+    def _result_key(self, user, target_date: date) -> str:
+        """Build the result cache key; birth data changes always miss."""
+        return (
+            f"{user.pk}:{target_date.isoformat()}:"
+            f"{birth_data_fingerprint(user)}:{user.preferred_tone}"
+        )
+
+    def _key_aspects(self, day: Dict) -> List[str]:
+        """Describe a day's aspects closest to exact, for the forecast prompt."""
+        today = date.fromisoformat(day["date"])
+        closest = sorted(
+            day["aspects"],
+            key=lambda a: abs((date.fromisoformat(a["exact"]) - today).days),
+        )
+        return [
+            f"{a['transit_planet']} {a['aspect']} natal {a['natal_planet']}"
+            for a in closest[:FORECAST_ASPECTS_PER_DAY]
+        ]
+
+    def _get_celestial_events(self, target_date: date) -> list:
+        """Look up the day's events from the shared celestial calendar."""
+        from .celestial_events import get_celestial_calendar
+
+        try:
+            # Never compute a year inline; the monthly build job owns that
+            return get_celestial_calendar().events_on(target_date, build_missing=False)
+        except Exception:
+            # The calendar is an enrichment; never fail the G-Code over it
+            return []
+
+    def _get_collective_summary(self, sky, target_date: date) -> Optional[Dict]:
+        """Get the compact collective sky summary for prompts."""
+        try:
+            snapshot = sky.get_snapshot(target_date)
+            return sky.summarize(snapshot) if snapshot else None
+        except Exception:
+            return None
+
+    def _get_retrograde_status(self, target_date: date) -> Optional[Dict]:
+        """Get the day's retrograde/shadow phases from the shared calendar."""
+        from .retrograde_calendar import get_retrograde_calendar
+
+        try:
+            return get_retrograde_calendar().status_on(target_date, build_missing=False)
+        except Exception:
+            # Like the celestial calendar, flags are an optional enrichment
+            return None
+
+    def _flag_retrogrades(self, planets: dict, status: Optional[Dict]) -> None:
+        """Flag retrograde and shadow transiting bodies from a day's status."""
+        from .retrograde_calendar import get_retrograde_calendar
+
+        if status is not None:
+            get_retrograde_calendar().apply_status(planets, status)
+
     def _get_intensity_level(self, score: int) -> str:
         """Convert numeric score to intensity level."""
-        if score < 25:
-            return "low"
-        elif score < 50:
-            return "medium"
-        elif score < 75:
-            return "high"
-        else:
-            return "intense"
+        return self.scorer.intensity_level(score)
 
 
 # Singleton instance
@@ -0,0 +1,195 @@
+"""
+Ephemeris helpers for Spiritual G-Code.
+Shared sampling and root-finding utilities for the precomputed sky calendars.
+"""
+
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import ephem
+import numpy as np
+
+# Julian Date of ephem's day zero (1899 Dec 31 12:00 UT)
+EPHEM_JD_OFFSET = 2415020.0
+J2000_JD = 2451545.0
+
+# Bodies with a geocentric ephemeris in PyEphem
+BODY_CLASSES = {
+    "sun": ephem.Sun,
+    "moon": ephem.Moon,
+    "mercury": ephem.Mercury,
+    "venus": ephem.Venus,
+    "mars": ephem.Mars,
+    "jupiter": ephem.Jupiter,
+    "saturn": ephem.Saturn,
+    "uranus": ephem.Uranus,
+    "neptune": ephem.Neptune,
+    "pluto": ephem.Pluto,
+}
+
+ZODIAC_SIGNS = [
+    "Aries",
+    "Taurus",
+    "Gemini",
+    "Cancer",
+    "Leo",
+    "Virgo",
+    "Libra",
+    "Scorpio",
+    "Sagittarius",
+    "Capricorn",
+    "Aquarius",
+    "Pisces",
+]
+
+
+def create_body(name: str):
+    """Create a fresh PyEphem body by name."""
+    return BODY_CLASSES[name]()
+
+
+def to_ephem_date(value) -> ephem.Date:
+    """Convert a date/datetime (naive = UTC) to an ephem.Date."""
+    if isinstance(value, ephem.Date):
+        return value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+        return ephem.Date(value)
+    if isinstance(value, date):
+        return ephem.Date(datetime.combine(value, datetime.min.time()))
+    return ephem.Date(value)
+
+
+def to_datetime(value: float) -> datetime:
+    """Convert an ephem date (float days) to an aware UTC datetime."""
+    return ephem.Date(value).datetime().replace(tzinfo=dt_timezone.utc)
+
+
+def wrap180(angle):
+    """Wrap an angle (scalar or array) into the [-180, 180) range."""
+    return (np.asarray(angle) + 180.0) % 360.0 - 180.0
+
+
+def ecliptic_position(body, when: float) -> Tuple[float, float]:
+    """
+    Geocentric ecliptic longitude and latitude of date, in degrees.
+
+    Args:
+        body: PyEphem body instance (re-used between calls)
+        when: ephem date
+
+    Returns:
+        Tuple of (longitude 0-360, latitude)
+    """
+    body.compute(when, epoch=when)
+    ecl = ephem.Ecliptic(body)
+    return float(np.degrees(ecl.lon)) % 360.0, float(np.degrees(ecl.lat))
+
+
+def ecliptic_longitude(body, when: float) -> float:
+    """Geocentric ecliptic longitude of date, in degrees."""
+    return ecliptic_position(body, when)[0]
+
+
+def mean_lunar_node(when: float) -> float:
+    """
+    Mean longitude of the Moon's ascending node (Meeus, ch. 47).
+
+    Args:
+        when: ephem date
+
+    Returns:
+        Longitude in degrees (0-360)
+    """
+    t = (float(when) + EPHEM_JD_OFFSET - J2000_JD) / 36525.0
+    node = 125.0445479 - 1934.1362891 * t + 0.0020754 * t**2 + t**3 / 467441.0
+    return node % 360.0
+
+
+def sign_of(longitude: float) -> str:
+    """Zodiac sign for an ecliptic longitude."""
+    return ZODIAC_SIGNS[int((longitude % 360.0) // 30) % 12]
+
+
+def sample_longitudes(
+    bodies: Iterable[str], start: float, end: float, step_days: float
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Sample ecliptic longitudes of several bodies on a uniform time grid.
+
+    Args:
+        bodies: Body names (keys of BODY_CLASSES)
+        start: ephem date of the first sample
+        end: ephem date of the last sample (inclusive)
+        step_days: Grid spacing in days
+
+    Returns:
+        Tuple of (times array, {body: longitude array})
+    """
+    times = np.arange(float(start), float(end) + step_days / 2, step_days)
+    longitudes = {}
+    for name in bodies:
+        body = create_body(name)
+        longitudes[name] = np.array([ecliptic_longitude(body, t) for t in times])
+    return times, longitudes
+
+
+def find_crossings(
+    times: np.ndarray, offsets: np.ndarray, direction: int = 1
+) -> List[float]:
+    """
+    Find where a wrapped angular offset crosses zero on a sampled grid.
+
+    Crossings are located by linear interpolation between the bracketing
+    samples. Jumps across the +/-180 wrap are ignored.
+
+    Args:
+        times: Sample times
+        offsets: Offsets in degrees, already wrapped to [-180, 180)
+        direction: 1 for upward crossings, -1 for downward, 0 for both
+
+    Returns:
+        List of interpolated crossing times
+    """
+    before, after = offsets[:-1], offsets[1:]
+    near = np.abs(after - before) < 90.0
+    if direction > 0:
+        mask = (before < 0) & (after >= 0) & near
+    elif direction < 0:
+        mask = (before > 0) & (after <= 0) & near
+    else:
+        mask = (np.sign(before) != np.sign(after)) & near
+    indices = np.nonzero(mask)[0]
+    fraction = before[indices] / (before[indices] - after[indices])
+    return list(times[indices] + fraction * (times[indices + 1] - times[indices]))
+
+
+def find_root(
+    func: Callable[[float], float],
+    lo: float,
+    hi: float,
+    tolerance: float = 1.0 / 1440,
+) -> float:
+    """
+    Bisection root finder for a continuous function of ephem time.
+
+    Args:
+        func: Function whose sign differs at lo and hi
+        lo: Lower bracket (ephem date)
+        hi: Upper bracket (ephem date)
+        tolerance: Bracket width to stop at, in days (default one minute)
+
+    Returns:
+        ephem date of the root
+    """
+    f_lo = func(lo)
+    while hi - lo > tolerance:
+        mid = (lo + hi) / 2
+        f_mid = func(mid)
+        if (f_mid < 0) == (f_lo < 0):
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
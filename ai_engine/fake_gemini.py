@@ -0,0 +1,377 @@
+"""
+Fake Gemini Server for Spiritual G-Code.
+Local HTTP stand-in for the Gemini REST `generateContent` and
+`streamGenerateContent` endpoints with configurable latency, error and
+rate-limit behaviour, so the AI pipeline can be load-tested on a laptop.
+Point GeminiGCodeClient at it with GEMINI_API_ENDPOINT.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Default listen address of the CLI (scripts/fake_gemini_server.py)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+
+# Gemini's finishReason STOP as the integer enum the REST client requests
+FINISH_REASON_STOP = 1
+
+# REST paths served: /v1beta/models/<model>:generateContent (or :stream...)
+ENDPOINT_PATTERN = re.compile(
+    r"^/v1(?:beta)?/models/(?P<model>[^/:]+)"
+    r":(?P<method>generateContent|streamGenerateContent)$"
+)
+
+THEMES = ["#Transformation", "#Clarity", "#Grounding", "#Expansion", "#Release"]
+
+
+class LatencyModel:
+    """
+    Response latency distribution parsed from a spec string.
+
+    Specs (milliseconds): "fixed:800", "uniform:200:1500",
+    "normal:900:250" (mean, standard deviation) and "lognormal:800:0.6"
+    (median, sigma; long right tail like real model latency).
+    """
+
+    # Parameters each distribution takes
+    PARAMETERS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+    def __init__(self, spec: str = "fixed:0", rng: Optional[random.Random] = None):
+        """
+        Parse a latency spec.
+
+        Args:
+            spec: Distribution spec
+            rng: Random source (seeded for reproducible runs)
+
+        Raises:
+            ValueError: On an unknown distribution or bad parameters
+        """
+        kind, *params = spec.split(":")
+        if len(params) != self.PARAMETERS.get(kind):
+            raise ValueError(
+                f"Invalid latency spec '{spec}', expected one of "
+                "fixed:MS, uniform:MIN:MAX, normal:MEAN:SD, lognormal:MEDIAN:SIGMA"
+            )
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = self.rng.uniform(*self.params)
+        elif self.kind == "normal":
+            ms = self.rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = self.rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+        return max(0.0, ms) / 1000.0
+
+
+@dataclass
+class FakeGeminiConfig:
+    """Behaviour of the fake server."""
+
+    latency: str = "lognormal:800:0.5"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    rate_limit_per_minute: float = 0.0
+    stream_chunks: int = 8
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakeGeminiStats:
+    """Request counts since the server started."""
+
+    requests: int = 0
+    streamed: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    latency_seconds: float = 0.0
+    models: Dict[str, int] = field(default_factory=dict)
+
+
+def prompt_text(body: Dict) -> str:
+    """Join the text parts of a generateContent request body."""
+    return "\n".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def fake_response(prompt: str, rng: random.Random) -> str:
+    """
+    Build a plausible model answer for a prompt.
+
+    Prompts asking for JSON get the schema GeminiGCodeClient parses (daily,
+    period forecast or multi-platform patch notes); other prompts get short
+    text with hashtags.
+    """
+    themes = rng.sample(THEMES, 3)
+    platforms = re.search(r"^Platforms: (.+)$", prompt, re.MULTILINE)
+    if platforms:
+        return json.dumps(
+            {
+                platform.strip(): {
+                    "body": (
+                        f"Today's G-Code for {platform.strip()}: the cosmos is "
+                        "recalibrating. Trust the quiet downloads."
+                    ),
+                    "hashtags": themes,
+                }
+                for platform in platforms.group(1).split(",")
+            }
+        )
+    if "Forecast Period" in prompt:
+        dates = re.findall(r"^- (\d{4}-\d{2}-\d{2}):", prompt, re.MULTILINE)
+        return json.dumps(
+            {
+                "overview": "A period of steady recalibration and quiet growth.",
+                "themes": themes,
+                "affirmation": "I move with the rhythm of the sky.",
+                "practical_guidance": ["Rest early", "Write it down", "Ask once"],
+                "daily": [
+                    {"date": day, "theme": themes[i % 3][1:], "guidance": "Pause."}
+                    for i, day in enumerate(dates)
+                ],
+            }
+        )
+    if "JSON" in prompt:
+        return json.dumps(
+            {
+                "theme": f"{themes[0][1:]} asks for attention",
+                "interpretation": (
+                    "The sky leans on old patterns today. Notice what resists, "
+                    "then choose the smaller, truer step."
+                ),
+                "themes": themes,
+                "affirmation": "I trust the timing of my growth.",
+                "practical_guidance": ["Name one intention", "Move your body"],
+                "score": rng.randint(30, 90),
+            }
+        )
+    return (
+        "Today's G-Code: the cosmos is recalibrating. Trust the quiet "
+        f"downloads and take one brave step. {' '.join(themes)}"
+    )
+
+
+def candidate(text: str) -> Dict:
+    """generateContent response body carrying one text candidate."""
+    return {
+        "candidates": [
+            {
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": FINISH_REASON_STOP,
+                "index": 0,
+            }
+        ]
+    }
+
+
+class FakeGeminiServer:
+    """
+    Threaded fake Gemini HTTP server.
+    """
+
+    def __init__(
+        self,
+        config: Optional[FakeGeminiConfig] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ):
+        """
+        Initialize the server (port 0 picks a free port).
+
+        Args:
+            config: Latency, error and rate-limit behaviour
+            host: Listen address
+            port: Listen port
+        """
+        self.config = config or FakeGeminiConfig()
+        self.rng = random.Random(self.config.seed)
+        self.latency = LatencyModel(self.config.latency, self.rng)
+        self.stats = FakeGeminiStats()
+        self._lock = threading.Lock()
+        self._bucket_tat = 0.0
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as GEMINI_API_ENDPOINT."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeminiServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread until interrupted."""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def snapshot(self) -> Dict:
+        """Get the request counts and mean simulated latency."""
+        with self._lock:
+            stats = {
+                "requests": self.stats.requests,
+                "streamed": self.stats.streamed,
+                "errors": self.stats.errors,
+                "rate_limited": self.stats.rate_limited,
+                "models": dict(self.stats.models),
+            }
+            served = self.stats.requests - self.stats.errors - self.stats.rate_limited
+            stats["mean_latency_ms"] = (
+                round(self.stats.latency_seconds / served * 1000, 1) if served else 0.0
+            )
+        stats["config"] = self.config.__dict__.copy()
+        return stats
+
+    def decide(self, model: str, stream: bool) -> Dict:
+        """
+        Decide one request's outcome.
+
+        Returns:
+            {"status": 200 | 429 | 500, "latency": seconds}
+        """
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.models[model] = self.stats.models.get(model, 0) + 1
+            if stream:
+                self.stats.streamed += 1
+
+            status = 200
+            if (
+                self._over_rate_limit()
+                or self.rng.random() < self.config.rate_limit_rate
+            ):
+                status = 429
+                self.stats.rate_limited += 1
+            elif self.rng.random() < self.config.error_rate:
+                status = 500
+                self.stats.errors += 1
+            latency = self.latency.sample() if status == 200 else 0.0
+            self.stats.latency_seconds += latency
+        return {"status": status, "latency": latency}
+
+    def _over_rate_limit(self) -> bool:
+        """Whether the simulated per-minute quota is used up (lock held)."""
+        if not self.config.rate_limit_per_minute:
+            return False
+        now = time.monotonic()
+        if self._bucket_tat > now:
+            return True
+        self._bucket_tat = now + 60.0 / self.config.rate_limit_per_minute
+        return False
+
+    def _handler_class(self):
+        """Request handler bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] == "/stats":
+                    self._json(200, server.snapshot())
+                else:
+                    self._json(404, _error(404, "Not found", "NOT_FOUND"))
+
+            def do_POST(self):
+                match = ENDPOINT_PATTERN.match(self.path.split("?")[0])
+                if not match:
+                    self._json(404, _error(404, "Not found", "NOT_FOUND"))
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._json(400, _error(400, "Invalid JSON", "INVALID_ARGUMENT"))
+                    return
+
+                stream = match["method"] == "streamGenerateContent"
+                outcome = server.decide(match["model"], stream)
+                if outcome["status"] == 429:
+                    self._json(
+                        429,
+                        _error(
+                            429, "Resource has been exhausted", "RESOURCE_EXHAUSTED"
+                        ),
+                    )
+                    return
+                if outcome["status"] == 500:
+                    self._json(500, _error(500, "Internal error", "INTERNAL"))
+                    return
+
+                with server._lock:
+                    text = fake_response(prompt_text(body), server.rng)
+                if stream:
+                    self._stream(text, outcome["latency"])
+                else:
+                    time.sleep(outcome["latency"])
+                    self._json(200, candidate(text))
+
+            def _stream(self, text: str, latency: float) -> None:
+                """Send the text as a JSON array of chunks spread over latency."""
+                chunks = _split(text, server.config.stream_chunks)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b"[")
+                for index, chunk in enumerate(chunks):
+                    time.sleep(latency / len(chunks))
+                    prefix = b"," if index else b""
+                    self.wfile.write(prefix + json.dumps(candidate(chunk)).encode())
+                    self.wfile.flush()
+                self.wfile.write(b"]")
+
+            def _json(self, status: int, payload: Dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _error(code: int, message: str, status: str) -> Dict:
+    """Google API error body."""
+    return {"error": {"code": code, "message": message, "status": status}}
+
+
+def _split(text: str, parts: int) -> List[str]:
+    """Split text into at most `parts` word-aligned chunks."""
+    words = re.findall(r"\S+\s*", text)
+    size = max(1, math.ceil(len(words) / max(1, parts)))
+    return ["".join(words[i : i + size]) for i in range(0, len(words), size)] or [""]
@@ -0,0 +1,46 @@
+"""
+Input Fingerprints for Spiritual G-Code.
+Stable hashes of the inputs a precomputed result depends on, used to detect
+when stored data is stale.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+
+def stable_hash(value: Any, length: int = 16) -> str:
+    """
+    Hash a JSON-serializable value independently of dict ordering.
+
+    Args:
+        value: Value to hash (dates and times are stringified)
+        length: Number of hex characters to keep
+
+    Returns:
+        Hex digest prefix
+    """
+    payload = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:length]
+
+
+def birth_data_fingerprint(user) -> str:
+    """
+    Fingerprint the birth data a user's charts are calculated from.
+
+    Args:
+        user: GCodeUser instance
+
+    Returns:
+        Hex fingerprint that changes whenever the birth data changes
+    """
+    return stable_hash(
+        {
+            "birth_date": user.birth_date,
+            "birth_time": user.birth_time,
+            "birth_location": user.birth_location,
+            "birth_lat": user.birth_lat,
+            "birth_lng": user.birth_lng,
+            "timezone": user.timezone,
+        }
+    )
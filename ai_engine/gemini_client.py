@@ -3,12 +3,44 @@ Google Gemini AI Client for Spiritual G-Code.
 """
 
 import json
+import logging
 import re
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
 import google.generativeai as genai
 from django.conf import settings
 
+from .patch_notes import (
+    DEFAULT_PATCH_NOTE_PLATFORMS,
+    check_platforms,
+    parse_patch_note_set,
+    platform_requirements,
+    validate_patch_note,
+)
+from .prompt_cache import get_prompt_cache
+from .prompt_encoding import get_prompt_encoder
+from .prompt_templates import CompiledTemplate, get_template_registry
+from .rate_limiter import get_gemini_rate_limiter
+from .resilience import AIUnavailable, get_gemini_call_guard
+from .scoring import get_gcode_scorer
+
+logger = logging.getLogger(__name__)
+
+# Methods whose fallback answers are marked {"fallback": True}, so callers
+# do not store or share mock interpretations as AI output
+MARKED_FALLBACK_METHODS = ("generate_daily_gcode", "generate_period_forecast")
+
+
+def has_json_object(response_text: str) -> bool:
+    """Whether a response contains a parseable JSON object."""
+    json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    if not json_match:
+        return False
+    try:
+        return isinstance(json.loads(json_match.group()), dict)
+    except json.JSONDecodeError:
+        return False
+
 
 class GeminiGCodeClient:
     """
@@ -16,13 +48,46 @@ class GeminiGCodeClient:
     """
 
     def __init__(self, api_key: Optional[str] = None):
-        """Initialize Gemini client with API key."""
+        """
+        Initialize Gemini client with API key.
+
+        In prompt cache replay mode no API key is needed: only recorded
+        responses are served. With GEMINI_API_ENDPOINT set (e.g. the local
+        fake server, see fake_gemini.py) requests go there over REST.
+
+        Model calls run under a deadline, hedge and circuit breaker (see
+        resilience.py); when they cannot complete, the same method of the
+        fallback client (GEMINI_FALLBACK, "mock" by default) answers.
+        """
         self.api_key = api_key or settings.GEMINI_API_KEY
-        if not self.api_key:
+        self.model_name = settings.GEMINI_MODEL
+        self.prompt_cache = get_prompt_cache()
+        self.limiter = get_gemini_rate_limiter()
+        self.templates = get_template_registry()
+        self.encoder = get_prompt_encoder()
+        self.guard = get_gemini_call_guard()
+        self.model = None
+        self._fallback = None
+
+        if self.prompt_cache.replay:
+            return
+
+        endpoint = getattr(settings, "GEMINI_API_ENDPOINT", "")
+        if endpoint:
+            genai.configure(
+                api_key=self.api_key or "local",
+                transport="rest",
+                client_options={"api_endpoint": endpoint},
+            )
+        elif not self.api_key:
             raise ValueError("GEMINI_API_KEY is not configured")
+        else:
+            genai.configure(api_key=self.api_key)
+        self.model = genai.GenerativeModel(self.model_name)
 
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    def wait_time(self) -> float:
+        """Seconds a request made now would queue behind the rate limiter."""
+        return self.limiter.wait_time()
 
     def generate_daily_gcode(
         self,
@@ -46,15 +111,59 @@ class GeminiGCodeClient:
         )
 
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text
+            response_text = self._generate(prompt, valid=has_json_object)
 
             # Parse AI response
             return self._parse_daily_response(response_text, transit_data)
 
+        except AIUnavailable as e:
+            return self._fall_back(
+                "generate_daily_gcode",
+                e,
+                natal_data=natal_data,
+                transit_data=transit_data,
+                user_preferences=user_preferences,
+            )
         except Exception as e:
             raise Exception(f"Error generating daily G-Code: {str(e)}")
 
+    def generate_period_forecast(
+        self,
+        natal_data: Dict,
+        daily_summaries: List[Dict],
+        user_preferences: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Generate a forecast for a whole period in one request.
+
+        Args:
+            natal_data: User's natal chart data
+            daily_summaries: Per-day {"date", "score", "intensity", "aspects"}
+            user_preferences: User's preferences (tone, etc.)
+
+        Returns:
+            Dictionary with overview, themes, affirmation, guidance and
+            a per-day theme and tip
+        """
+        prompt = self._build_period_prompt(
+            natal_data, daily_summaries, user_preferences or {}
+        )
+
+        try:
+            response_text = self._generate(prompt, valid=has_json_object)
+            return self._parse_period_response(response_text, daily_summaries)
+
+        except AIUnavailable as e:
+            return self._fall_back(
+                "generate_period_forecast",
+                e,
+                natal_data=natal_data,
+                daily_summaries=daily_summaries,
+                user_preferences=user_preferences,
+            )
+        except Exception as e:
+            raise Exception(f"Error generating period forecast: {str(e)}")
+
     def generate_spiritual_patch_note(
         self,
         daily_gcode: Dict,
@@ -72,8 +181,8 @@ class GeminiGCodeClient:
         Returns:
             Dictionary with generated content
         """
-        template = self._load_template(f"patch_note_{platform}")
-        prompt = template.format(
+        prompt = self._render_template(
+            f"patch_note_{platform}",
             themes=", ".join(daily_gcode.get("themes", [])),
             score=daily_gcode.get("g_code_score", 50),
             interpretation=daily_gcode.get("interpretation", "")[:200],
@@ -83,19 +192,105 @@ class GeminiGCodeClient:
             prompt += f"\n\nAdditional instructions: {custom_instructions}"
 
         try:
-            response = self.model.generate_content(prompt)
+            response_text = self._generate(prompt)
+            transit_date = daily_gcode.get("transit_date", "Today")
 
             return {
                 "content_type": "patch_note",
-                "title": f"Spiritual Patch Note - {daily_gcode.get('transit_date', 'Today')}",
-                "body": response.text,
+                "title": f"Spiritual Patch Note - {transit_date}",
+                "body": response_text,
                 "platform": platform,
-                "hashtags": self._extract_hashtags(response.text),
+                "hashtags": self._extract_hashtags(response_text),
             }
 
+        except AIUnavailable as e:
+            return self._fall_back(
+                "generate_spiritual_patch_note",
+                e,
+                daily_gcode=daily_gcode,
+                platform=platform,
+                custom_instructions=custom_instructions,
+            )
         except Exception as e:
             raise Exception(f"Error generating patch note: {str(e)}")
 
+    def generate_patch_notes(
+        self,
+        daily_gcode: Dict,
+        platforms: Optional[List[str]] = None,
+        custom_instructions: str = "",
+    ) -> Dict[str, Dict]:
+        """
+        Generate Spiritual Patch Notes for several platforms in one call.
+
+        The model returns a JSON object with one variant per platform; each
+        is fitted to its platform's length limit (see patch_notes.py).
+        Platforms missing from the answer are generated one by one.
+
+        Args:
+            daily_gcode: Daily G-Code data
+            platforms: Target platforms (twitter, instagram, linkedin, blog)
+            custom_instructions: Additional instructions
+
+        Returns:
+            Content dictionaries keyed by platform, in the requested order
+
+        Raises:
+            ValueError: On an unsupported platform
+        """
+        platforms = check_platforms(platforms or DEFAULT_PATCH_NOTE_PLATFORMS)
+        prompt = self._render_template(
+            "patch_note_multi",
+            themes=", ".join(daily_gcode.get("themes", [])),
+            score=daily_gcode.get("g_code_score", 50),
+            interpretation=daily_gcode.get("interpretation", "")[:200],
+            platforms=", ".join(platforms),
+            requirements=platform_requirements(platforms),
+        )
+
+        if custom_instructions:
+            prompt += f"\n\nAdditional instructions: {custom_instructions}"
+
+        try:
+            variants = parse_patch_note_set(
+                self._generate(
+                    prompt, valid=lambda text: bool(parse_patch_note_set(text))
+                )
+            )
+        except AIUnavailable as e:
+            return self._fall_back(
+                "generate_patch_notes",
+                e,
+                daily_gcode=daily_gcode,
+                platforms=platforms,
+                custom_instructions=custom_instructions,
+            )
+        except Exception as e:
+            raise Exception(f"Error generating patch notes: {str(e)}")
+
+        title = f"Spiritual Patch Note - {daily_gcode.get('transit_date', 'Today')}"
+        notes = {}
+        for platform in platforms:
+            variant = variants.get(platform)
+            if variant is None:
+                logger.warning(
+                    "Patch note set is missing %s, generating it alone", platform
+                )
+                note = self.generate_spiritual_patch_note(
+                    daily_gcode, platform, custom_instructions
+                )
+            else:
+                body = str(variant["body"])
+                note = {
+                    "content_type": "patch_note",
+                    "title": str(variant.get("title") or title)[:200],
+                    "body": body,
+                    "platform": platform,
+                    "hashtags": variant.get("hashtags") or self._extract_hashtags(body),
+                }
+            notes[platform] = validate_patch_note(note)
+        return notes
+
     def generate_content(
         self,
         transit_data: Dict,
@@ -117,40 +312,221 @@ class GeminiGCodeClient:
         Returns:
             Dictionary with generated content
         """
-        template = self._load_template(f"content_{content_type}")
-        tone = user_preferences.get("tone", "inspiring")
-
-        prompt = template.format(
-            content_type=content_type,
-            platform=platform,
-            tone=tone,
-            custom_instructions=custom_instructions,
+        prompt = self._build_content_prompt(
+            content_type, platform, user_preferences, custom_instructions
         )
 
         try:
-            response = self.model.generate_content(prompt)
+            # User-facing content is generated fresh, never served from cache
+            response_text = self._generate(prompt, cached=False)
+            return self.content_from_text(content_type, platform, response_text)
+
+        except AIUnavailable as e:
+            return self._fall_back(
+                "generate_content",
+                e,
+                transit_data=transit_data,
+                content_type=content_type,
+                platform=platform,
+                user_preferences=user_preferences,
+                custom_instructions=custom_instructions,
+            )
+        except Exception as e:
+            raise Exception(f"Error generating content: {str(e)}")
 
-            return {
-                "content_type": content_type,
-                "title": self._generate_title(content_type, response.text),
-                "body": response.text,
-                "platform": platform,
-                "hashtags": self._extract_hashtags(response.text),
-            }
+    def stream_content(
+        self,
+        transit_data: Dict,
+        content_type: str,
+        platform: str,
+        user_preferences: Dict,
+        custom_instructions: str = "",
+    ) -> Iterator[str]:
+        """
+        Generate content like generate_content, yielding text chunks as the
+        model produces them.
+
+        Args:
+            transit_data: Transit data
+            content_type: Type of content to generate
+            platform: Target platform
+            user_preferences: User preferences
+            custom_instructions: Additional instructions
 
+        Yields:
+            Text chunks; joined they form the body for content_from_text()
+        """
+        prompt = self._build_content_prompt(
+            content_type, platform, user_preferences, custom_instructions
+        )
+
+        streamed = False
+        try:
+            for chunk in self._generate_stream(prompt, cached=False):
+                streamed = True
+                yield chunk
+
+        except AIUnavailable as e:
+            if streamed:
+                # Mock text can't continue a partly streamed answer
+                raise
+            yield from self._fall_back(
+                "stream_content",
+                e,
+                transit_data=transit_data,
+                content_type=content_type,
+                platform=platform,
+                user_preferences=user_preferences,
+                custom_instructions=custom_instructions,
+            )
         except Exception as e:
             raise Exception(f"Error generating content: {str(e)}")
 
+    def content_from_text(self, content_type: str, platform: str, text: str) -> Dict:
+        """
+        Build GeneratedContent fields from generated text.
+
+        Args:
+            content_type: Type of content generated
+            platform: Target platform
+            text: Generated text
+
+        Returns:
+            Dictionary with content type, title, body, platform and hashtags
+        """
+        return {
+            "content_type": content_type,
+            "title": self._generate_title(content_type, text),
+            "body": text,
+            "platform": platform,
+            "hashtags": self._extract_hashtags(text),
+        }
+
+    def _generate(
+        self,
+        prompt: str,
+        valid: Optional[Callable[[str], bool]] = None,
+        cached: bool = True,
+    ) -> str:
+        """
+        Get the response text of a prompt.
+
+        Recorded responses come from the prompt cache; other prompts wait
+        for the shared rate limiter, are sent to the model under the call
+        guard and are recorded if they pass `valid`.
+
+        Args:
+            prompt: Prompt text
+            valid: Check a response must pass to be recorded
+            cached: Use the prompt cache (replay mode always does)
+
+        Raises:
+            AIUnavailable: If the breaker is open or the deadline passed
+        """
+
+        def call_model():
+            return self.guard.call(
+                lambda: self.model.generate_content(prompt).text,
+                admit=self.limiter.admit,
+            )
+
+        if not cached and not self.prompt_cache.replay:
+            return call_model()
+        return self.prompt_cache.get_or_generate(
+            self.model_name, prompt, call_model, valid
+        )
+
+    def _generate_stream(self, prompt: str, cached: bool = True) -> Iterator[str]:
+        """
+        Stream the response text of a prompt.
+
+        A recorded response is yielded as a single chunk; otherwise the
+        model's streamed chunks are yielded as they arrive, under the call
+        guard's deadline per chunk and holding a rate limiter slot, and the
+        full non-empty text is recorded at the end.
+
+        Args:
+            prompt: Prompt text
+            cached: Use the prompt cache (replay mode always does)
+
+        Raises:
+            CircuitOpen: If the breaker is open (before any chunk)
+            DeadlineExceeded: If the first or a following chunk is late
+        """
+        cached = cached or self.prompt_cache.replay
+        if cached:
+            recorded = self.prompt_cache.lookup(self.model_name, prompt)
+            if recorded is not None:
+                yield recorded
+                return
+
+        def stream_model():
+            for chunk in self.model.generate_content(prompt, stream=True):
+                yield chunk.text
+
+        chunks = []
+        for text in self.guard.stream(stream_model, admit=self.limiter.admit):
+            if text:
+                chunks.append(text)
+                yield text
+        if cached and chunks:
+            self.prompt_cache.record(self.model_name, prompt, "".join(chunks))
+
+    def _fall_back(self, method: str, error: AIUnavailable, **kwargs):
+        """
+        Answer a call with the fallback client.
+
+        Interpretations (MARKED_FALLBACK_METHODS) come back with
+        "fallback": True.
+
+        Raises:
+            AIUnavailable: The original error when no fallback is configured
+        """
+        if self._fallback is None:
+            fallback = getattr(settings, "GEMINI_FALLBACK", "mock")
+            if fallback != "mock":
+                raise error
+
+            from .mock_gemini_client import MockGeminiGCodeClient
+
+            self._fallback = MockGeminiGCodeClient()
+
+        logger.warning(
+            f"Gemini unavailable ({str(error)}), {method} falls back to mock"
+        )
+        result = getattr(self._fallback, method)(**kwargs)
+        if method in MARKED_FALLBACK_METHODS:
+            result = {**result, "fallback": True}
+        return result
+
+    def _build_content_prompt(
+        self,
+        content_type: str,
+        platform: str,
+        user_preferences: Dict,
+        custom_instructions: str,
+    ) -> str:
+        """Build the prompt for generate_content/stream_content."""
+        return self._render_template(
+            f"content_{content_type}",
+            content_type=content_type,
+            platform=platform,
+            tone=user_preferences.get("tone", "inspiring"),
+            custom_instructions=custom_instructions,
+        )
+
     def _build_daily_prompt(
         self, natal_data: Dict, transit_data: Dict, user_preferences: Dict
     ) -> str:
         """Build prompt for daily G-Code generation."""
-        base_template = self._load_template("daily_gcode_base")
+        template = self._template("daily_gcode_base")
 
-        # Format transit data for prompt
-        major_transits = self._format_transits(transit_data)
+        # Compact transit data, fitted to the daily prompt's token budget
+        major_transits = self.encoder.encode_transits(
+            transit_data, "daily_gcode", template.text
+        )
 
-        prompt = base_template.format(
+        prompt = template.render(
             sun_sign=natal_data.get("sun_sign", "Unknown"),
             moon_sign=natal_data.get("moon_sign", "Unknown"),
             ascendant=natal_data.get("ascendant", "Unknown"),
@@ -160,6 +536,63 @@ class GeminiGCodeClient:
 
         return prompt
 
+    def _build_period_prompt(
+        self, natal_data: Dict, daily_summaries: List[Dict], user_preferences: Dict
+    ) -> str:
+        """Build prompt for a multi-day forecast."""
+        template = self._template("period_forecast")
+
+        daily_transits = self.encoder.encode_period(
+            daily_summaries, "period_forecast", template.text
+        )
+
+        return template.render(
+            sun_sign=natal_data.get("sun_sign", "Unknown"),
+            moon_sign=natal_data.get("moon_sign", "Unknown"),
+            ascendant=natal_data.get("ascendant", "Unknown"),
+            start_date=daily_summaries[0]["date"],
+            end_date=daily_summaries[-1]["date"],
+            days=len(daily_summaries),
+            daily_transits=daily_transits,
+            tone=user_preferences.get("tone", "inspiring"),
+        )
+
+    def _parse_period_response(
+        self, response_text: str, daily_summaries: List[Dict]
+    ) -> Dict:
+        """Parse a period forecast response into structured data."""
+        data = {}
+        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+        if json_match:
+            try:
+                data = json.loads(json_match.group())
+            except json.JSONDecodeError:
+                pass
+
+        # Align per-day entries to the requested days; missing ones stay blank
+        returned = {
+            entry.get("date"): entry
+            for entry in data.get("daily", [])
+            if isinstance(entry, dict)
+        }
+        daily = [
+            {
+                "date": day["date"],
+                "theme": returned.get(day["date"], {}).get("theme", ""),
+                "guidance": returned.get(day["date"], {}).get("guidance", ""),
+            }
+            for day in daily_summaries
+        ]
+
+        return {
+            "overview": data.get("overview", response_text),
+            "themes": data.get("themes") or self._extract_themes(response_text),
+            "affirmation": data.get("affirmation")
+            or self._extract_affirmation(response_text),
+            "practical_guidance": data.get("practical_guidance", []),
+            "daily": daily,
+        }
+
     def _parse_daily_response(self, response_text: str, transit_data: Dict) -> Dict:
         """Parse AI response into structured data."""
         # Try to extract JSON from response
@@ -189,39 +622,12 @@ class GeminiGCodeClient:
         }
 
     def _format_transits(self, transit_data: Dict) -> str:
-        """Format transit data for prompt."""
-        # Extract major planetary positions
-        planets = transit_data.get("planets", {})
-        aspects = transit_data.get("aspects", [])
-
-        formatted = []
-        for planet, position in planets.items():
-            formatted.append(f"{planet}: {position}")
-
-        if aspects:
-            formatted.append("\nMajor Aspects:")
-            for aspect in aspects[:5]:  # Limit to 5 major aspects
-                formatted.append(f"- {aspect}")
-
-        return "\n".join(formatted)
+        """Format transit data for prompt (compact, within the daily budget)."""
+        return self.encoder.encode_transits(transit_data, "daily_gcode")
 
     def _calculate_gcode_score(self, transit_data: Dict) -> int:
         """Calculate G-Code intensity score (1-100)."""
-        # Simple heuristic based on aspect intensity
-        aspects = transit_data.get("aspects", [])
-        score = 50  # Base score
-
-        for aspect in aspects:
-            if "conjunction" in aspect.lower():
-                score += 10
-            elif "opposition" in aspect.lower():
-                score += 8
-            elif "square" in aspect.lower():
-                score += 6
-            elif "trine" in aspect.lower():
-                score += 4
-
-        return min(max(score, 1), 100)  # Clamp between 1-100
+        return get_gcode_scorer().score(transit_data.get("aspects", []))
 
     def _extract_themes(self, text: str) -> List[str]:
         """Extract themes from AI response."""
@@ -257,17 +663,17 @@ class GeminiGCodeClient:
             return first_sentence[:57] + "..."
         return first_sentence
 
+    def _template(self, template_name: str) -> CompiledTemplate:
+        """Get a compiled prompt template (DB, file or default)."""
+        return self.templates.get(template_name, self._get_default_template)
+
     def _load_template(self, template_name: str) -> str:
-        """Load prompt template from file."""
-        try:
-            from pathlib import Path
+        """Get the text of a prompt template (DB, file or default)."""
+        return self._template(template_name).text
 
-            template_path = Path(__file__).parent / "prompts" / f"{template_name}.txt"
-            with open(template_path, "r") as f:
-                return f.read()
-        except FileNotFoundError:
-            # Fallback to default template
-            return self._get_default_template(template_name)
+    def _render_template(self, template_name: str, **context) -> str:
+        """Render a compiled prompt template from the registry."""
+        return self._template(template_name).render(**context)
 
     def _get_default_template(self, template_name: str) -> str:
         """Get default template if file not found."""
@@ -303,6 +709,46 @@ Return your response in this JSON format:
   "practical_guidance": ["tip1", "tip2"],
   "score": 75
 }}
+"""
+        elif "period_forecast" in template_name:
+            return """You are the Spiritual G-Code interpreter.
+
+## Natal Configuration
+- Sun Sign: {sun_sign}
+- Moon Sign: {moon_sign}
+- Ascendant: {ascendant}
+
+## Forecast Period
+{start_date} to {end_date} ({days} days)
+
+## Daily G-Code Scores and Key Transits
+{daily_transits}
+
+## Tone
+{tone}, precise, poetic, and practical.
+
+## Output Format
+Return your response in this JSON format:
+{{
+  "overview": "Interpretation of the whole period",
+  "themes": ["#theme1", "#theme2", "#theme3"],
+  "affirmation": "Affirmation for the period",
+  "practical_guidance": ["tip1", "tip2", "tip3"],
+  "daily": [{{"date": "YYYY-MM-DD", "theme": "Theme", "guidance": "Tip"}}]
+}}
+"""
+        elif template_name == "patch_note_multi":
+            return """Create a spiritual patch note for each platform.
+
+Themes: {themes}
+G-Code Score: {score}
+Key Insight: {interpretation}
+
+Platforms: {platforms}
+{requirements}
+
+Return only a JSON object keyed by platform:
+{{"twitter": {{"body": "Post text", "hashtags": ["#tag1", "#tag2"]}}}}
 """
         elif "patch_note" in template_name:
             return """Create a spiritual patch note for social media.
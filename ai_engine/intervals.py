@@ -0,0 +1,126 @@
+"""
+Interval Index for Spiritual G-Code.
+Static centered interval tree for fast "what's active on date X" lookups.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+class _Node:
+    """Interval tree node holding the intervals that contain its center."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, intervals: List[Tuple]):
+        self.center = center
+        self.by_start = sorted(intervals, key=lambda item: item[0])
+        self.by_end = sorted(intervals, key=lambda item: item[1], reverse=True)
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+
+class IntervalIndex:
+    """
+    Immutable index over closed [start, end] intervals.
+
+    Point and range lookups run in O(log n + k). Bounds can be any mutually
+    comparable values (dates, datetimes, floats). Rebuild the index when the
+    underlying intervals change.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, Any]] = ()):
+        """
+        Build the index.
+
+        Args:
+            intervals: Iterable of (start, end, payload) tuples
+        """
+        items = [(start, end, payload) for start, end, payload in intervals]
+        items.sort(key=lambda item: (item[0], item[1]))
+
+        self._items = items
+        self._starts = [item[0] for item in items]
+        self._root = self._build(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def at(self, point) -> List[Any]:
+        """Get payloads of intervals containing a point, ordered by start."""
+        found = []
+        node = self._root
+        while node is not None:
+            if point < node.center:
+                for item in node.by_start:
+                    if item[0] > point:
+                        break
+                    found.append(item)
+                node = node.left
+            elif point > node.center:
+                for item in node.by_end:
+                    if item[1] < point:
+                        break
+                    found.append(item)
+                node = node.right
+            else:
+                found.extend(node.by_start)
+                break
+        return self._payloads(found)
+
+    def overlapping(self, start, end) -> List[Any]:
+        """Get payloads of intervals overlapping [start, end], ordered by start."""
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if end < node.center:
+                for item in node.by_start:
+                    if item[0] > end:
+                        break
+                    found.append(item)
+                stack.append(node.left)
+            elif start > node.center:
+                for item in node.by_end:
+                    if item[1] < start:
+                        break
+                    found.append(item)
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+        return self._payloads(found)
+
+    def starting_between(self, start, end) -> List[Any]:
+        """Get payloads of intervals whose start lies in [start, end]."""
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._starts, end)
+        return [item[2] for item in self._items[lo:hi]]
+
+    def _build(self, items: List[Tuple]) -> Optional[_Node]:
+        """Recursively build the tree around the median endpoint."""
+        if not items:
+            return None
+
+        endpoints = sorted([item[0] for item in items] + [item[1] for item in items])
+        center = endpoints[len(endpoints) // 2]
+
+        left = [item for item in items if item[1] < center]
+        right = [item for item in items if item[0] > center]
+        here = [item for item in items if item[0] <= center <= item[1]]
+
+        node = _Node(center, here)
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def _payloads(self, found: List[Tuple]) -> List[Any]:
+        """Order matches by (start, end) and strip bounds."""
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [item[2] for item in found]
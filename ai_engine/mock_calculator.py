@@ -9,6 +9,8 @@ import math
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
 
+from .scoring import get_gcode_scorer
+
 
 class MockGCodeCalculator:
     """
@@ -183,6 +185,7 @@ class MockGCodeCalculator:
         birth_location: str,
         target_date: date,
         birth_time: Optional[str] = None,
+        transit_positions: Optional[Dict] = None,
     ) -> Dict:
         """
         Calculate current transits and aspects to natal chart (simulated).
@@ -192,6 +195,7 @@ class MockGCodeCalculator:
             birth_location: Birth location
             target_date: Date to calculate transits for
             birth_time: Birth time (optional)
+            transit_positions: Precomputed positions for target_date (optional)
 
         Returns:
             Dictionary with transit data
@@ -202,14 +206,10 @@ class MockGCodeCalculator:
                 birth_date, birth_time, birth_location
             )
 
-            # Calculate current planetary positions
-            transit_data = {}
-            for planet_name in self.planet_periods.keys():
-                position = self._calculate_planet_position(
-                    planet_name, target_date, self._create_seed(target_date)
-                )
-
-                transit_data[planet_name] = position
+            # Transit positions depend only on the date
+            transit_data = transit_positions or self.calculate_transit_positions(
+                target_date
+            )
 
             # Calculate aspects to natal positions
             aspects = self._calculate_transit_aspects(
@@ -225,6 +225,37 @@ class MockGCodeCalculator:
         except Exception as e:
             raise Exception(f"Error calculating transits: {str(e)}")
 
+    def calculate_transit_positions(self, target_date: date) -> Dict:
+        """
+        Calculate planetary positions for a date (simulated).
+
+        Positions depend only on the date, so they can be shared by every
+        user's transit calculation for the day.
+
+        Args:
+            target_date: Date to calculate positions for
+
+        Returns:
+            Dictionary of body -> sign, degree and longitude
+        """
+        seed = self._create_seed(target_date)
+        return {
+            planet_name: self._calculate_planet_position(planet_name, target_date, seed)
+            for planet_name in self.planet_periods.keys()
+        }
+
+    def calculate_mundane_aspects(self, positions: Dict) -> List[Dict]:
+        """
+        Calculate aspects between transiting bodies themselves.
+
+        Args:
+            positions: Output of calculate_transit_positions
+
+        Returns:
+            List of aspects with planet1, planet2, aspect and orb
+        """
+        return self._calculate_aspects(positions)
+
     def calculate_g_code_intensity(
         self, transit_data: Dict, aspects: List[Dict]
     ) -> int:
@@ -238,31 +269,7 @@ class MockGCodeCalculator:
         Returns:
             Intensity score (1-100)
         """
-        # Base score
-        score = 50
-
-        # Add points for major aspects
-        major_aspects = ["conjunction", "opposition", "square"]
-        for aspect in aspects:
-            if aspect["aspect"] in major_aspects:
-                score += 5
-            elif aspect["aspect"] in ["trine", "sextile"]:
-                score += 3
-
-        # Consider planetary positions
-        # Outer planets (slow movers) in aspect = more intensity
-        outer_planets = ["uranus", "neptune", "pluto"]
-        for aspect in aspects:
-            if aspect.get("transit_planet") in outer_planets:
-                score += 7
-
-        # Moon aspects add emotional intensity
-        for aspect in aspects:
-            if aspect.get("transit_planet") == "moon":
-                score += 4
-
-        # Normalize to 1-100 range
-        return max(1, min(100, score))
+        return get_gcode_scorer().score(aspects)
 
     def _create_seed(
         self, date_obj: date, time_str: Optional[str] = None, location: str = "Unknown"
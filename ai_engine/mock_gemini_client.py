@@ -6,7 +6,14 @@ Use this for development and testing.
 
 import random
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+from .patch_notes import (
+    DEFAULT_PATCH_NOTE_PLATFORMS,
+    check_platforms,
+    validate_patch_note,
+)
+from .scoring import get_gcode_scorer
 
 
 class MockGeminiGCodeClient:
@@ -21,6 +28,10 @@ class MockGeminiGCodeClient:
         # Use random seed for consistency
         random.seed(42)
 
+    def wait_time(self) -> float:
+        """Seconds a request would queue (the mock is never rate limited)."""
+        return 0.0
+
     def generate_daily_gcode(
         self,
         natal_data: Dict,
@@ -82,6 +93,58 @@ class MockGeminiGCodeClient:
         except Exception as e:
             raise Exception(f"Error generating daily G-Code: {str(e)}")
 
+    def generate_period_forecast(
+        self,
+        natal_data: Dict,
+        daily_summaries: List[Dict],
+        user_preferences: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Generate a forecast for a whole period (simulated).
+
+        Args:
+            natal_data: User's natal chart data
+            daily_summaries: Per-day {"date", "score", "intensity", "aspects"}
+            user_preferences: User's preferences (tone, etc.)
+
+        Returns:
+            Dictionary with overview, themes, affirmation, guidance and
+            a per-day theme and tip
+        """
+        try:
+            sun_sign = natal_data.get("sun_sign", "Unknown")
+            moon_sign = natal_data.get("moon_sign", "Unknown")
+
+            scores = [day["score"] for day in daily_summaries]
+            average = round(sum(scores) / len(scores))
+
+            themes = self._generate_themes(sun_sign, moon_sign, {})
+            guidance = self._generate_guidance(themes, average)
+
+            daily = []
+            for i, day in enumerate(daily_summaries):
+                theme = themes[i % len(themes)][1:]
+                daily.append(
+                    {
+                        "date": day["date"],
+                        "theme": f"{theme} ({day['intensity']} energy)",
+                        "guidance": guidance[i % len(guidance)],
+                    }
+                )
+
+            return {
+                "overview": self._generate_interpretation(
+                    sun_sign, moon_sign, themes, average
+                ),
+                "themes": themes[:3],
+                "affirmation": self._generate_affirmation(sun_sign, themes),
+                "practical_guidance": guidance,
+                "daily": daily,
+            }
+
+        except Exception as e:
+            raise Exception(f"Error generating period forecast: {str(e)}")
+
     def generate_spiritual_patch_note(
         self,
         daily_gcode: Dict,
@@ -121,6 +184,32 @@ class MockGeminiGCodeClient:
             "hashtags": themes + ["#SpiritualGCode", "#DailyGCode"],
         }
 
+    def generate_patch_notes(
+        self,
+        daily_gcode: Dict,
+        platforms: Optional[List[str]] = None,
+        custom_instructions: str = "",
+    ) -> Dict[str, Dict]:
+        """
+        Generate patch notes for several platforms (simulated).
+
+        Args:
+            daily_gcode: Daily G-Code data
+            platforms: Target platforms (twitter, instagram, linkedin, blog)
+            custom_instructions: Additional instructions
+
+        Returns:
+            Content dictionaries keyed by platform
+        """
+        return {
+            platform: validate_patch_note(
+                self.generate_spiritual_patch_note(
+                    daily_gcode, platform, custom_instructions
+                )
+            )
+            for platform in check_platforms(platforms or DEFAULT_PATCH_NOTE_PLATFORMS)
+        }
+
     def generate_content(
         self,
         transit_data: Dict,
@@ -160,24 +249,48 @@ class MockGeminiGCodeClient:
             "hashtags": ["#SpiritualGCode", "#DailyGuidance"],
         }
 
+    def stream_content(
+        self,
+        transit_data: Dict,
+        content_type: str,
+        platform: str,
+        user_preferences: Dict,
+        custom_instructions: str = "",
+    ) -> Iterator[str]:
+        """
+        Generate content (simulated), yielding it a few words at a time.
+
+        Args:
+            transit_data: Transit data
+            content_type: Type of content to generate
+            platform: Target platform
+            user_preferences: User preferences
+            custom_instructions: Additional instructions
+
+        Yields:
+            Text chunks; joined they form the body for content_from_text()
+        """
+        body = self.generate_content(
+            transit_data, content_type, platform, user_preferences, custom_instructions
+        )["body"]
+        words = body.split(" ")
+        for index in range(0, len(words), 5):
+            chunk = " ".join(words[index : index + 5])
+            yield chunk if index + 5 >= len(words) else chunk + " "
+
+    def content_from_text(self, content_type: str, platform: str, text: str) -> Dict:
+        """Build GeneratedContent fields from generated text (simulated)."""
+        return {
+            "content_type": content_type,
+            "title": f"{content_type.replace('_', ' ').title()} - {date.today().strftime('%Y-%m-%d')}",
+            "body": text,
+            "platform": platform,
+            "hashtags": ["#SpiritualGCode", "#DailyGuidance"],
+        }
+
     def _calculate_gcode_score(self, transit_data: Dict) -> int:
         """Calculate G-Code intensity score (1-100)."""
-        aspects = transit_data.get("aspects", [])
-        score = 50  # Base score
-
-        # Score based on aspects
-        for aspect in aspects:
-            aspect_type = aspect.get("aspect", "")
-            if aspect_type == "conjunction":
-                score += 10
-            elif aspect_type == "opposition":
-                score += 8
-            elif aspect_type == "square":
-                score += 6
-            elif aspect_type == "trine":
-                score += 4
-            elif aspect_type == "sextile":
-                score += 2
+        score = get_gcode_scorer().score(transit_data.get("aspects", []))
 
         # Add some randomness
         score += random.randint(-5, 5)
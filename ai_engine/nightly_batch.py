@@ -0,0 +1,572 @@
+"""
+Nightly G-Code Batch for Spiritual G-Code.
+Calculates every enabled user's Daily G-Code in chunks: users are streamed
+with their natal chart joined, transit positions are shared across users
+and each chunk is written with one bulk upsert. Each run keeps a rolling
+horizon of upcoming days precomputed and only rewrites rows whose inputs
+changed, so forecast and trend views are pure reads; a backfill of many
+stale days is spread over several nights. Interpretations are shared
+between users of the same archetype (see archetypes.py).
+"""
+
+import copy
+import logging
+from datetime import date, timedelta
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from .archetypes import (
+    ArchetypeStore,
+    archetype_key,
+    personalization_templates,
+    personalize,
+)
+from .batch_metrics import BatchMetrics
+from .fingerprints import birth_data_fingerprint, stable_hash
+from .run_ledger import DEFAULT_JOB
+from .scoring import get_gcode_scorer
+
+logger = logging.getLogger(__name__)
+
+# Users per chunk (one iterator fetch and one upsert per chunk)
+DEFAULT_CHUNK_SIZE = 500
+
+# Days after the target date kept precomputed
+DEFAULT_HORIZON_DAYS = 14
+
+# Stale horizon days (besides the target date) recalculated per user per run
+DEFAULT_BACKFILL_DAYS = 4
+
+# DailyTransit fields refreshed when a row for the user and date exists
+UPSERT_FIELDS = [
+    "transit_data",
+    "aspects_to_natal",
+    "g_code_score",
+    "themes",
+    "intensity_level",
+    "interpretation",
+    "affirmation",
+    "practical_guidance",
+    "input_fingerprint",
+    "updated_at",
+]
+
+# Fields refreshed on an existing row when only the fallback interpretation
+# is available, so AI-written text is kept
+SCORE_FIELDS = [
+    "transit_data",
+    "aspects_to_natal",
+    "g_code_score",
+    "intensity_level",
+    "input_fingerprint",
+    "updated_at",
+]
+
+# Interpretation used when no AI client is available
+FALLBACK_INTERPRETATION = {
+    "interpretation": "Cosmic energies are shifting. Stay aligned with your intentions.",
+    "themes": ["#SpiritualGCode", "#DailyGCode"],
+    "affirmation": "I am aligned with cosmic energies.",
+    "practical_guidance": ["Stay present", "Trust the process"],
+}
+
+
+class NightlyGCodeBatch:
+    """
+    Chunked Daily G-Code calculation with bulk upserts.
+    """
+
+    def __init__(
+        self,
+        calculator=None,
+        ai_client=None,
+        chunk_size: Optional[int] = None,
+        roll_timelines: bool = True,
+        horizon_days: Optional[int] = None,
+        archetypes: Optional[ArchetypeStore] = None,
+        backfill_days: Optional[int] = None,
+    ):
+        """
+        Initialize the batch.
+
+        Args:
+            calculator: Object with calculate_transit_positions/calculate_transits
+                (defaults to GCodeCalculator)
+            ai_client: Gemini client, or None to use the fallback interpretation
+            chunk_size: Users per chunk (defaults to GCODE_BATCH_CHUNK_SIZE)
+            roll_timelines: Roll each user's transit timeline forward
+            horizon_days: Days after the target date kept precomputed
+                (defaults to GCODE_PRECOMPUTE_HORIZON_DAYS)
+            archetypes: Store sharing interpretations between users of an
+                archetype (defaults to a new store when GCODE_ARCHETYPE_DEDUP
+                is enabled)
+            backfill_days: Stale horizon days after the target date
+                recalculated per user per run (defaults to
+                GCODE_HORIZON_BACKFILL_DAYS)
+        """
+        if calculator is None:
+            from .calculator import GCodeCalculator
+
+            calculator = GCodeCalculator()
+
+        self.calculator = calculator
+        self.ai_client = ai_client
+        self.scorer = get_gcode_scorer()
+        self.chunk_size = chunk_size or getattr(
+            settings, "GCODE_BATCH_CHUNK_SIZE", DEFAULT_CHUNK_SIZE
+        )
+        self.roll_timelines = roll_timelines
+        self.horizon_days = (
+            horizon_days
+            if horizon_days is not None
+            else getattr(
+                settings, "GCODE_PRECOMPUTE_HORIZON_DAYS", DEFAULT_HORIZON_DAYS
+            )
+        )
+        self.backfill_days = (
+            backfill_days
+            if backfill_days is not None
+            else getattr(settings, "GCODE_HORIZON_BACKFILL_DAYS", DEFAULT_BACKFILL_DAYS)
+        )
+        # Transit positions per date, shared by every chunk of the batch
+        self._positions = {}
+        if archetypes is None and getattr(settings, "GCODE_ARCHETYPE_DEDUP", True):
+            archetypes = ArchetypeStore()
+        self.archetypes = archetypes
+        # Stage timings of the current run (replaced at the start of run())
+        self.metrics = BatchMetrics(DEFAULT_JOB)
+
+    def eligible_users(self):
+        """Users due a Daily G-Code, with their natal chart joined."""
+        from api.models import GCodeUser
+
+        return (
+            GCodeUser.objects.filter(
+                daily_gcode_enabled=True,
+                is_active=True,
+                natal_chart__isnull=False,
+            )
+            .select_related("natal_chart")
+            .order_by("pk")
+        )
+
+    def shard_user_ids(self, users=None) -> List[List[int]]:
+        """
+        Split eligible user ids into chunk_size shards for fan-out.
+
+        Args:
+            users: Queryset to shard (defaults to eligible_users())
+
+        Returns:
+            Lists of user primary keys
+        """
+        users = self.eligible_users() if users is None else users
+        ids = users.values_list("pk", flat=True).iterator(chunk_size=self.chunk_size)
+        shards = []
+        while True:
+            shard = list(islice(ids, self.chunk_size))
+            if not shard:
+                return shards
+            shards.append(shard)
+
+    def users_by_id(self, user_ids: List[int]) -> List:
+        """Load a shard of users with their natal chart joined."""
+        return list(self.eligible_users().filter(pk__in=user_ids))
+
+    def chunks(self, users) -> Iterable[List]:
+        """Stream a queryset in lists of chunk_size users."""
+        iterator = users.iterator(chunk_size=self.chunk_size)
+        while True:
+            with self.metrics.stage("db_load"):
+                chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def run(self, target_date: date, users=None, ledger=None) -> Dict:
+        """
+        Calculate and store Daily G-Codes for all eligible users, from the
+        target date through the precompute horizon.
+
+        Args:
+            target_date: Date to calculate for
+            users: Queryset to process (defaults to eligible_users())
+            ledger: RunLedger to resume from and checkpoint into
+
+        Stage timings of the run are collected in self.metrics.
+
+        Returns:
+            Dictionary with users, success, errors and chunks counts
+        """
+        self.metrics = BatchMetrics(ledger.run.job if ledger else DEFAULT_JOB)
+        users = self.eligible_users() if users is None else users
+        if ledger is not None:
+            users = ledger.pending(users)
+
+        stats = {"users": 0, "success": 0, "errors": 0, "chunks": 0}
+        for number, chunk in enumerate(self.chunks(users), start=1):
+            result = self.process_chunk(
+                chunk, target_date, ledger=ledger, checkpoint=True
+            )
+            stats["chunks"] += 1
+            stats["users"] += len(chunk)
+            stats["success"] += result["success"]
+            stats["errors"] += result["errors"]
+            logger.info(
+                f"Chunk {number}: {result['success']}/{len(chunk)} users "
+                f"stored ({result['rows']} rows written, {result['unchanged']} "
+                f"unchanged, {result['deferred']} deferred), "
+                f"{result['errors']} errors"
+            )
+
+        if self.archetypes is not None:
+            archetype_stats = self.archetypes.stats()
+            logger.info(
+                f"AI interpretations: {archetype_stats['generated']} generated, "
+                f"{archetype_stats['reused']} reused by archetype"
+            )
+
+        encoder = getattr(self.ai_client, "encoder", None)
+        if encoder is not None:
+            token_stats = encoder.stats()
+            logger.info(
+                f"Prompt tokens: ~{token_stats['tokens']} sent, "
+                f"~{token_stats['saved_tokens']} saved by compact encoding "
+                f"({token_stats['saved_rate']:.0%})"
+            )
+
+        return stats
+
+    def process_chunk(
+        self,
+        users: List,
+        target_date: date,
+        positions: Optional[Dict] = None,
+        ledger=None,
+        checkpoint: bool = False,
+    ) -> Dict:
+        """
+        Calculate one chunk of users and upsert their Daily G-Codes.
+
+        Every date from target_date through the horizon is covered; rows
+        whose input fingerprint is unchanged are left as they are, so a
+        nightly run normally only adds the new last day of the horizon.
+        At most backfill_days stale days after the target date are
+        recalculated per user; the rest are deferred to later runs.
+
+        Without an AI client, or when the AI client answered with its
+        fallback, existing rows only get their scores refreshed and are
+        marked so the next run with AI rewrites their text.
+
+        Args:
+            users: GCodeUser instances with natal_chart loaded
+            target_date: First date to calculate for
+            positions: Shared transit positions for target_date
+            ledger: RunLedger recording per-user outcomes
+            checkpoint: Advance the ledger checkpoint to the chunk's last user
+                (only valid when chunks are processed in user ID order)
+
+        Returns:
+            Dictionary with success and errors counts (users) and rows
+            written, unchanged and deferred counts
+        """
+        if positions is not None:
+            self._positions[target_date] = positions
+
+        dates = self.horizon(target_date)
+        self.metrics.count("users", len(users))
+        with self.metrics.stage("db_load"):
+            stored = self.stored_fingerprints(users, dates)
+
+        rows = []
+        score_rows = []
+        succeeded = []
+        failed = {}
+        unchanged = 0
+        deferred = 0
+        for user in users:
+            fingerprint = self.input_fingerprint(user)
+            current = {fingerprint}
+            if self.ai_client is None:
+                current.add(fallback_fingerprint(fingerprint))
+            try:
+                user_rows = []
+                user_score_rows = []
+                user_deferred = 0
+                backfilled = 0
+                for day in dates:
+                    stored_fingerprint = stored.get((user.pk, day))
+                    if stored_fingerprint in current:
+                        continue
+                    if day != target_date:
+                        if backfilled >= self.backfill_days:
+                            user_deferred += 1
+                            continue
+                        backfilled += 1
+                    row = self.build_daily_transit(user, day, self.positions(day))
+                    if row.ai_fallback:
+                        row.input_fingerprint = fallback_fingerprint(fingerprint)
+                    else:
+                        row.input_fingerprint = fingerprint
+                    if row.ai_fallback and stored_fingerprint is not None:
+                        user_score_rows.append(row)
+                    else:
+                        user_rows.append(row)
+            except Exception as e:
+                logger.error(f"❌ Error processing {user.username}: {str(e)}")
+                failed[user.pk] = str(e)
+                continue
+            rows.extend(user_rows)
+            score_rows.extend(user_score_rows)
+            succeeded.append(user.pk)
+            deferred += user_deferred
+            unchanged += (
+                len(dates) - len(user_rows) - len(user_score_rows) - user_deferred
+            )
+
+        with self.metrics.stage("db_write"):
+            self.upsert(rows)
+            if score_rows:
+                self.upsert(score_rows, update_fields=SCORE_FIELDS)
+
+            if ledger is not None and users:
+                ledger.record_chunk(
+                    succeeded=succeeded,
+                    failed=failed,
+                    checkpoint=users[-1].pk if checkpoint else None,
+                )
+        self.metrics.count("rows_written", len(rows) + len(score_rows))
+
+        if self.roll_timelines:
+            self._roll_timelines(users)
+
+        return {
+            "success": len(succeeded),
+            "errors": len(failed),
+            "rows": len(rows) + len(score_rows),
+            "unchanged": unchanged,
+            "deferred": deferred,
+        }
+
+    def horizon(self, target_date: date) -> List[date]:
+        """Dates kept precomputed: the target date plus horizon_days."""
+        return [target_date + timedelta(days=i) for i in range(self.horizon_days + 1)]
+
+    def positions(self, day: date) -> Dict:
+        """Transit positions for a date, calculated once per batch."""
+        if day not in self._positions:
+            self._positions[day] = self.calculator.calculate_transit_positions(day)
+        return self._positions[day]
+
+    def input_fingerprint(self, user) -> str:
+        """
+        Fingerprint everything a user's DailyTransit rows are derived from.
+
+        Args:
+            user: GCodeUser instance with natal_chart loaded
+
+        Returns:
+            Hex fingerprint that changes with the birth data, natal signs,
+            tone, score weights or personalization
+        """
+        natal_chart = user.natal_chart
+        return stable_hash(
+            {
+                "birth": birth_data_fingerprint(user),
+                "natal": [
+                    natal_chart.sun_sign,
+                    natal_chart.moon_sign,
+                    natal_chart.ascendant,
+                ],
+                "tone": user.preferred_tone,
+                "weights": self.scorer.weights,
+                "personalization": (
+                    personalization_templates() if self.archetypes is not None else None
+                ),
+            }
+        )
+
+    def stored_fingerprints(self, users: List, dates: List[date]) -> Dict:
+        """
+        Get the input fingerprints of a chunk's existing rows (one query).
+
+        Args:
+            users: GCodeUser instances
+            dates: Dates of the horizon
+
+        Returns:
+            Dictionary mapping (user ID, date) to the stored fingerprint
+        """
+        from api.models import DailyTransit
+
+        if not users:
+            return {}
+
+        rows = DailyTransit.objects.filter(
+            user__in=[user.pk for user in users],
+            transit_date__gte=dates[0],
+            transit_date__lte=dates[-1],
+        ).values_list("user_id", "transit_date", "input_fingerprint")
+        return {(user_id, day): fingerprint for user_id, day, fingerprint in rows}
+
+    def build_daily_transit(self, user, target_date: date, positions: Dict):
+        """
+        Calculate one user's Daily G-Code as an unsaved DailyTransit.
+
+        Args:
+            user: GCodeUser instance with natal_chart loaded
+            target_date: Date to calculate for
+            positions: Shared transit positions for target_date
+
+        Returns:
+            Unsaved DailyTransit instance; its ai_fallback attribute is true
+            when the text is a fallback rather than an AI interpretation
+        """
+        from api.models import DailyTransit
+
+        with self.metrics.stage("transit_compute"):
+            transit_data = self.calculator.calculate_transits(
+                birth_date=user.birth_date,
+                birth_time=(
+                    user.birth_time.strftime("%H:%M") if user.birth_time else None
+                ),
+                birth_location=user.birth_location,
+                target_date=target_date,
+                transit_positions=copy.deepcopy(positions),
+            )
+
+            # Score with the shared engine so AI and fallback paths agree
+            g_code_score = self.scorer.score(transit_data.get("aspects", []))
+
+        if self.ai_client:
+            interpretation = self.interpret(user, target_date, transit_data)
+        else:
+            interpretation = FALLBACK_INTERPRETATION
+
+        row = DailyTransit(
+            user=user,
+            transit_date=target_date,
+            transit_data=transit_data.get("planets", {}),
+            aspects_to_natal=transit_data.get("aspects", []),
+            g_code_score=g_code_score,
+            themes=interpretation.get("themes", []),
+            intensity_level=self.scorer.intensity_level(g_code_score),
+            interpretation=interpretation.get("interpretation", ""),
+            affirmation=interpretation.get("affirmation", ""),
+            practical_guidance=interpretation.get("practical_guidance", []),
+        )
+        row.ai_fallback = not self.ai_client or bool(interpretation.get("fallback"))
+        return row
+
+    def interpret(self, user, target_date: date, transit_data: Dict) -> Dict:
+        """
+        Get a user's AI interpretation, shared by archetype when enabled.
+
+        Args:
+            user: GCodeUser instance with natal_chart loaded
+            target_date: Date of the interpretation
+            transit_data: The user's transit data
+
+        Returns:
+            Interpretation dictionary
+        """
+        # The natal chart was joined when the chunk was loaded (db_load)
+        natal_chart = user.natal_chart
+        natal_data = {
+            "sun_sign": natal_chart.sun_sign,
+            "moon_sign": natal_chart.moon_sign,
+            "ascendant": natal_chart.ascendant,
+        }
+
+        def generate():
+            self.metrics.count("ai_calls")
+            with self.metrics.stage("ai_call"):
+                return self.ai_client.generate_daily_gcode(
+                    natal_data=natal_data,
+                    transit_data=transit_data,
+                    user_preferences={"tone": user.preferred_tone},
+                )
+
+        if self.archetypes is None:
+            return generate()
+
+        key = archetype_key(natal_data, transit_data, user.preferred_tone, target_date)
+        return personalize(
+            self.archetypes.get_or_generate(key, generate), user, target_date
+        )
+
+    def upsert(self, rows: List, update_fields: List[str] = UPSERT_FIELDS) -> None:
+        """Insert or update DailyTransit rows in one statement."""
+        from api.models import DailyTransit
+
+        if not rows:
+            return
+
+        DailyTransit.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user", "transit_date"],
+            update_fields=update_fields,
+        )
+
+    def _roll_timelines(self, users: List) -> None:
+        """
+        Roll a chunk's transit timelines forward (only the new tail is
+        computed) with one read and one upsert.
+        """
+        from .transit_timeline import get_transit_timeline
+
+        try:
+            failures = get_transit_timeline().roll_timelines(users)
+        except Exception as e:
+            logger.warning(f"Timelines not updated for chunk: {str(e)}")
+            return
+        for user in users:
+            if user.pk in failures:
+                logger.warning(
+                    f"Timeline not updated for {user.username}: {failures[user.pk]}"
+                )
+
+
+def fallback_fingerprint(fingerprint: str) -> str:
+    """Fingerprint of rows whose text is the fallback interpretation."""
+    return stable_hash({"inputs": fingerprint, "interpretation": "fallback"})
+
+
+def get_nightly_ai_client():
+    """Get the Gemini client, or None to use the fallback interpretation."""
+    from .gemini_client import GeminiGCodeClient
+
+    try:
+        return GeminiGCodeClient()
+    except Exception as e:
+        logger.error(f"Failed to initialize Gemini client: {str(e)}")
+        logger.warning("Using fallback interpretation (no AI available)")
+        return None
+
+
+def log_batch_summary(stats: Dict) -> None:
+    """Log the totals of a nightly run."""
+    logger.info("=" * 50)
+    logger.info("Daily G-Code calculation complete!")
+    logger.info(f"Users: {stats['users']} in {stats['chunks']} chunks")
+    logger.info(f"Success: {stats['success']}")
+    logger.info(f"Errors: {stats['errors']}")
+    logger.info("=" * 50)
+
+
+def send_error_summary(error_count: int) -> None:
+    """Send error summary email to admin."""
+    from django.core import mail
+
+    subject = f"Daily G-Code Calculation: {error_count} Errors"
+    message = f"Daily G-Code calculation completed with {error_count} errors."
+
+    mail.send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [settings.ADMINS[0][1]] if settings.ADMINS else [],
+    )
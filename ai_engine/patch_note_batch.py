@@ -0,0 +1,273 @@
+"""
+Patch Note Batch for Spiritual G-Code.
+Generates the daily Spiritual Patch Notes of every eligible user: today's
+transits are prefetched with their users in one query, AI generation runs
+on a bounded worker pool (one call per user covering every platform) and
+GeneratedContent rows are written with bulk_create in chunks. A failing
+user is recorded and skipped; the rest of the batch carries on. A chunk
+whose insert fails is retried one user at a time, so a bad row only fails
+its own user.
+"""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .batch_metrics import BatchMetrics
+from .patch_notes import DEFAULT_PATCH_NOTE_PLATFORMS, check_platforms
+
+logger = logging.getLogger(__name__)
+
+# Batch job name (BatchMetrics reports and SystemLog)
+PATCH_NOTE_JOB = "patch_notes"
+
+# Users generated concurrently
+DEFAULT_PATCH_NOTE_WORKERS = 4
+
+# GeneratedContent rows per bulk insert
+DEFAULT_WRITE_CHUNK_SIZE = 500
+
+
+class PatchNoteBatch:
+    """
+    Concurrent patch note generation with chunked bulk inserts.
+    """
+
+    def __init__(
+        self,
+        ai_client,
+        platforms: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        """
+        Initialize the batch.
+
+        Args:
+            ai_client: Client with generate_patch_notes (Gemini or mock)
+            platforms: Platforms per user (defaults to
+                GCODE_PATCH_NOTE_PLATFORMS)
+            workers: Users generated concurrently (defaults to
+                GCODE_PATCH_NOTE_WORKERS)
+            chunk_size: Rows per bulk insert (defaults to
+                GCODE_BATCH_CHUNK_SIZE)
+        """
+        self.ai_client = ai_client
+        self.platforms = check_platforms(
+            platforms
+            or getattr(
+                settings, "GCODE_PATCH_NOTE_PLATFORMS", DEFAULT_PATCH_NOTE_PLATFORMS
+            )
+        )
+        self.workers = max(
+            1,
+            workers
+            or getattr(
+                settings, "GCODE_PATCH_NOTE_WORKERS", DEFAULT_PATCH_NOTE_WORKERS
+            ),
+        )
+        self.chunk_size = chunk_size or getattr(
+            settings, "GCODE_BATCH_CHUNK_SIZE", DEFAULT_WRITE_CHUNK_SIZE
+        )
+        # Stage timings of the current run (replaced at the start of run())
+        self.metrics = BatchMetrics(PATCH_NOTE_JOB)
+        # Error message per failed user ID of the current run
+        self.failures = {}
+
+    def eligible_users(self):
+        """Users who receive auto-generated content."""
+        from api.models import GCodeUser
+
+        return GCodeUser.objects.filter(
+            daily_gcode_enabled=True, is_active=True, email_notifications=True
+        )
+
+    def transits(self, target_date: date) -> List:
+        """Eligible users' DailyTransits for a date, users joined (one query)."""
+        from api.models import DailyTransit
+
+        return list(
+            DailyTransit.objects.filter(
+                transit_date=target_date,
+                user__in=self.eligible_users(),
+            )
+            .select_related("user")
+            .order_by("user_id")
+        )
+
+    def run(self, target_date: date) -> Dict:
+        """
+        Generate and store patch notes for every eligible user.
+
+        Args:
+            target_date: Date whose DailyTransits are turned into content
+
+        Returns:
+            Dictionary with users, success, errors, skipped (no DailyTransit)
+            and rows counts
+        """
+        self.metrics = BatchMetrics(PATCH_NOTE_JOB)
+        self.failures = {}
+
+        with self.metrics.stage("db_load"):
+            users = self.eligible_users().count()
+            transits = self.transits(target_date)
+        self.metrics.count("users", len(transits))
+        logger.info(
+            f"Generating {', '.join(self.platforms)} content for "
+            f"{len(transits)} users ({users - len(transits)} without a Daily G-Code)"
+        )
+
+        stats = {
+            "users": users,
+            "success": 0,
+            "errors": 0,
+            "skipped": users - len(transits),
+            "rows": 0,
+        }
+        rows = []
+        queue = iter(transits)
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="patch-notes"
+        ) as executor:
+            pending = {}
+            while True:
+                # Keep at most `workers` users in flight
+                while len(pending) < self.workers:
+                    transit = next(queue, None)
+                    if transit is None:
+                        break
+                    pending[executor.submit(self.generate, transit)] = transit
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    user = pending.pop(future).user
+                    try:
+                        rows.extend(future.result())
+                    except Exception as e:
+                        logger.error(f"❌ Error processing {user.username}: {str(e)}")
+                        self.failures[user.pk] = str(e)
+                        stats["errors"] += 1
+                        continue
+                    stats["success"] += 1
+
+                if len(rows) >= self.chunk_size:
+                    stats["rows"] += self.write(rows)
+                    rows = []
+
+        stats["rows"] += self.write(rows)
+
+        # Users whose rows could not be written are errors too
+        write_errors = len(self.failures) - stats["errors"]
+        stats["success"] -= write_errors
+        stats["errors"] += write_errors
+        return stats
+
+    def generate(self, transit) -> List:
+        """
+        Generate one user's patch notes (runs on a worker thread).
+
+        Returns:
+            Unsaved GeneratedContent rows, one per platform
+        """
+        from api.models import GeneratedContent
+
+        try:
+            self.metrics.count("ai_calls")
+            with self.metrics.stage("ai_call"):
+                notes = self.ai_client.generate_patch_notes(
+                    daily_gcode={
+                        "themes": transit.themes,
+                        "g_code_score": transit.g_code_score,
+                        "interpretation": transit.interpretation,
+                        "transit_date": transit.transit_date,
+                    },
+                    platforms=self.platforms,
+                )
+        finally:
+            # Template lookups may open a connection on this worker thread
+            connections.close_all()
+
+        return [
+            GeneratedContent(
+                user=transit.user,
+                related_transit=transit,
+                status="generated",
+                **content,
+            )
+            for content in notes.values()
+        ]
+
+    def write(self, rows: List) -> int:
+        """
+        Insert GeneratedContent rows in chunk_size bulk inserts.
+
+        If the insert fails, the rows are retried one user at a time; users
+        whose rows still fail are recorded in self.failures.
+
+        Returns:
+            Number of rows written
+        """
+        from api.models import GeneratedContent
+
+        if not rows:
+            return 0
+
+        with self.metrics.stage("db_write"):
+            try:
+                with transaction.atomic():
+                    GeneratedContent.objects.bulk_create(
+                        rows, batch_size=self.chunk_size
+                    )
+                written = len(rows)
+            except Exception as e:
+                logger.warning(
+                    f"Bulk insert of {len(rows)} rows failed, "
+                    f"retrying per user: {str(e)}"
+                )
+                written = self.write_per_user(rows)
+        self.metrics.count("rows_written", written)
+        return written
+
+    def write_per_user(self, rows: List) -> int:
+        """
+        Insert GeneratedContent rows one user at a time.
+
+        Returns:
+            Number of rows written
+        """
+        from api.models import GeneratedContent
+
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row.user.pk, []).append(row)
+
+        written = 0
+        for user_rows in by_user.values():
+            user = user_rows[0].user
+            try:
+                with transaction.atomic():
+                    GeneratedContent.objects.bulk_create(user_rows)
+            except Exception as e:
+                logger.error(f"❌ Error saving {user.username}: {str(e)}")
+                self.failures[user.pk] = str(e)
+                continue
+            written += len(user_rows)
+        return written
+
+
+def log_patch_note_summary(stats: Dict) -> None:
+    """Log the totals of a patch note run."""
+    logger.info("=" * 50)
+    logger.info("Content generation complete!")
+    logger.info(f"Users: {stats['users']} ({stats['skipped']} skipped)")
+    logger.info(f"Success: {stats['success']}")
+    logger.info(f"Errors: {stats['errors']}")
+    logger.info(f"Rows: {stats['rows']}")
+    logger.info("=" * 50)
@@ -0,0 +1,134 @@
+"""
+Multi-Platform Patch Notes for Spiritual G-Code.
+Platform limits and style notes for Spiritual Patch Notes generated for
+several platforms in one model call, and validation of the variants the
+model returns.
+"""
+
+import json
+import re
+from typing import Dict, Iterable, List
+
+# Platforms a patch note set can cover: body length limit (characters) and
+# the style note given to the model
+PATCH_NOTE_PLATFORMS = {
+    "twitter": {
+        "limit": 280,
+        "style": "hook, one insight, one action, 2-3 hashtags",
+    },
+    "instagram": {
+        "limit": 2200,
+        "style": "evocative caption with line breaks, a call to action, "
+        "5-8 hashtags",
+    },
+    "linkedin": {
+        "limit": 3000,
+        "style": "professional reflection in 3 short paragraphs, 3-5 hashtags",
+    },
+    "blog": {
+        "limit": 10000,
+        "style": "titled post of 300-500 words with a practical section",
+    },
+}
+
+# Platforms generated when the caller does not choose
+DEFAULT_PATCH_NOTE_PLATFORMS = ["twitter", "instagram"]
+
+TRUNCATION_MARK = "..."
+
+
+def check_platforms(platforms: Iterable[str]) -> List[str]:
+    """
+    Validate and de-duplicate requested platforms, keeping their order.
+
+    Raises:
+        ValueError: On an unsupported platform or an empty list
+    """
+    selected = list(dict.fromkeys(platforms))
+    unknown = [p for p in selected if p not in PATCH_NOTE_PLATFORMS]
+    if unknown:
+        raise ValueError(
+            f"Unsupported patch note platforms: {', '.join(unknown)} "
+            f"(supported: {', '.join(PATCH_NOTE_PLATFORMS)})"
+        )
+    if not selected:
+        raise ValueError("At least one patch note platform is required")
+    return selected
+
+
+def platform_requirements(platforms: Iterable[str]) -> str:
+    """Prompt lines with each platform's length limit and style."""
+    return "\n".join(
+        f'- "{platform}": at most {PATCH_NOTE_PLATFORMS[platform]["limit"]} '
+        f'characters; {PATCH_NOTE_PLATFORMS[platform]["style"]}'
+        for platform in platforms
+    )
+
+
+def fit_to_limit(text: str, limit: int) -> str:
+    """
+    Shorten text to a platform limit, cutting at a word boundary.
+
+    Args:
+        text: Body text
+        limit: Maximum length in characters
+
+    Returns:
+        The text unchanged if it fits, else cut with a trailing "..."
+    """
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    cut = text[: limit - len(TRUNCATION_MARK)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+def parse_patch_note_set(response_text: str) -> Dict[str, Dict]:
+    """
+    Parse the model's JSON object of variants keyed by platform.
+
+    Each value may be {"body": ..., "hashtags": [...], "title": ...} or a
+    bare body string. Unparseable responses give an empty dict.
+    """
+    json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+    if not json_match:
+        return {}
+    try:
+        data = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    variants = {}
+    for platform, entry in data.items():
+        if isinstance(entry, str):
+            entry = {"body": entry}
+        if isinstance(entry, dict) and str(entry.get("body") or "").strip():
+            variants[platform] = entry
+    return variants
+
+
+def validate_patch_note(note: Dict) -> Dict:
+    """
+    Enforce the platform's length limit on a patch note content dict.
+
+    Args:
+        note: {"platform", "body", "hashtags", ...} as stored in
+            GeneratedContent
+
+    Returns:
+        The note with its body fitted to the limit and hashtags normalized
+    """
+    limit = PATCH_NOTE_PLATFORMS.get(note["platform"], {}).get("limit")
+    body = note.get("body", "")
+    if limit:
+        body = fit_to_limit(body, limit)
+    hashtags = [
+        tag if tag.startswith("#") else f"#{tag}"
+        for tag in (note.get("hashtags") or [])
+        if isinstance(tag, str) and tag.strip("# ")
+    ]
+    return {**note, "body": body, "hashtags": hashtags}
@@ -0,0 +1,301 @@
+"""
+Prompt Cache for Spiritual G-Code.
+Durable prompt -> response cache under GeminiGCodeClient, keyed by a
+normalized hash of (model, prompt) and stored in a local SQLite file or the
+Django cache. Replay mode serves recorded responses only, so load tests
+and local development can run the full AI pipeline offline.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Cache modes: "off" (always call the model), "on" (read and record) and
+# "replay" (recorded responses only, never call the model)
+PROMPT_CACHE_MODES = ("off", "on", "replay")
+
+# Defaults when the GEMINI_PROMPT_CACHE_* settings are missing
+DEFAULT_PROMPT_CACHE_MODE = "off"
+DEFAULT_PROMPT_CACHE_BACKEND = "sqlite"
+DEFAULT_PROMPT_CACHE_TTL = 60 * 60 * 24 * 30
+DEFAULT_PROMPT_CACHE_MAX_ENTRIES = 50000
+
+# Django cache key prefix of the "django" backend
+PROMPT_CACHE_PREFIX = "gemini_prompt"
+
+
+class PromptCacheMiss(Exception):
+    """Raised in replay mode when no response was recorded for a prompt."""
+
+
+def prompt_key(model: str, prompt: str) -> str:
+    """
+    Hash a prompt independently of insignificant whitespace.
+
+    Args:
+        model: Model name
+        prompt: Prompt text
+
+    Returns:
+        Hex SHA-256 of the model and normalized prompt
+    """
+    normalized = re.sub(r"[ \t]+", " ", prompt.strip())
+    normalized = re.sub(r"\s*\n\s*", "\n", normalized)
+    return hashlib.sha256(f"{model}\x00{normalized}".encode()).hexdigest()
+
+
+class SQLitePromptStore:
+    """
+    Prompt responses in a local SQLite file with TTL and LRU eviction.
+
+    A connection is opened per operation, so the store is safe to share
+    between threads and processes (SQLite serializes the writes).
+    """
+
+    def __init__(self, path: str, ttl: int, max_entries: int):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite file path (created on first use)
+            ttl: Seconds a response stays valid
+            max_entries: Entries kept; least recently used are evicted
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._ready = False
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a fresh response and mark it recently used."""
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            row = db.execute(
+                "SELECT response, created_at FROM prompt_responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl and row[1] + self.ttl < now:
+                db.execute("DELETE FROM prompt_responses WHERE key = ?", (key,))
+                return None
+            db.execute(
+                "UPDATE prompt_responses SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+        return row[0]
+
+    def set(self, key: str, model: str, response: str) -> None:
+        """Store a response, evicting the least recently used overflow."""
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO prompt_responses "
+                "(key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            if self.max_entries:
+                db.execute(
+                    "DELETE FROM prompt_responses WHERE key IN ("
+                    "SELECT key FROM prompt_responses "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def count(self) -> int:
+        """Number of stored responses."""
+        with closing(self._connect()) as db:
+            return db.execute("SELECT COUNT(*) FROM prompt_responses").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the file and table on first use."""
+        if not self._ready:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            with db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS prompt_responses ("
+                    "key TEXT PRIMARY KEY, model TEXT, response TEXT, "
+                    "created_at REAL, accessed_at REAL)"
+                )
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS prompt_responses_accessed "
+                    "ON prompt_responses (accessed_at)"
+                )
+            self._ready = True
+        return db
+
+
+class DjangoPromptStore:
+    """
+    Prompt responses in the Django cache.
+
+    The TTL is the cache timeout; LRU eviction is left to the cache backend
+    (Redis maxmemory-policy, locmem MAX_ENTRIES).
+    """
+
+    def __init__(self, ttl: int):
+        """
+        Initialize the store.
+
+        Args:
+            ttl: Seconds a response stays valid
+        """
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a stored response."""
+        return cache.get(f"{PROMPT_CACHE_PREFIX}:{key}")
+
+    def set(self, key: str, model: str, response: str) -> None:
+        """Store a response."""
+        cache.set(f"{PROMPT_CACHE_PREFIX}:{key}", response, self.ttl or None)
+
+
+class PromptCache:
+    """
+    Prompt -> response cache in front of a model call.
+    """
+
+    def __init__(self, store, mode: str = DEFAULT_PROMPT_CACHE_MODE):
+        """
+        Initialize the cache.
+
+        Args:
+            store: SQLitePromptStore or DjangoPromptStore
+            mode: "off", "on" or "replay"
+        """
+        if mode not in PROMPT_CACHE_MODES:
+            raise ValueError(
+                f"Invalid prompt cache mode '{mode}', expected one of "
+                f"{', '.join(PROMPT_CACHE_MODES)}"
+            )
+        self.store = store
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @property
+    def replay(self) -> bool:
+        """Whether only recorded responses are served."""
+        return self.mode == "replay"
+
+    def get_or_generate(
+        self,
+        model: str,
+        prompt: str,
+        generate: Callable[[], str],
+        valid: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        Get the recorded response of a prompt or generate and record it.
+
+        Args:
+            model: Model name
+            prompt: Prompt text
+            generate: Callable calling the model and returning the text
+            valid: Check a generated response must pass to be recorded
+                (e.g. that it parses); failing responses are returned but
+                not recorded, so the next call asks the model again
+
+        Returns:
+            Response text
+
+        Raises:
+            PromptCacheMiss: In replay mode when the prompt was never recorded
+        """
+        if self.mode == "off":
+            return generate()
+
+        response = self.lookup(model, prompt)
+        if response is None:
+            response = generate()
+            if valid is None or valid(response):
+                self.record(model, prompt, response)
+        return response
+
+    def lookup(self, model: str, prompt: str) -> Optional[str]:
+        """
+        Get the recorded response of a prompt.
+
+        Args:
+            model: Model name
+            prompt: Prompt text
+
+        Returns:
+            Response text, or None on a miss (always None when off)
+
+        Raises:
+            PromptCacheMiss: In replay mode when the prompt was never recorded
+        """
+        if self.mode == "off":
+            return None
+
+        key = prompt_key(model, prompt)
+        response = self.store.get(key)
+        self._count("hits" if response is not None else "misses")
+        if response is None and self.replay:
+            raise PromptCacheMiss(f"No recorded response for prompt {key[:12]}")
+        return response
+
+    def record(self, model: str, prompt: str, response: str) -> None:
+        """Record a model response (only in "on" mode)."""
+        if self.mode == "on":
+            self.store.set(prompt_key(model, prompt), model, response)
+
+    def stats(self) -> Dict:
+        """Get the mode and this process' hit counts."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["mode"] = self.mode
+        return stats
+
+    def _count(self, outcome: str) -> None:
+        """Count one lookup outcome."""
+        with self._lock:
+            self._stats[outcome] += 1
+
+
+# Singleton instance
+_prompt_cache_instance = None
+
+
+def get_prompt_cache() -> PromptCache:
+    """Get or create the prompt cache configured in settings."""
+    global _prompt_cache_instance
+    if _prompt_cache_instance is None:
+        ttl = getattr(settings, "GEMINI_PROMPT_CACHE_TTL", DEFAULT_PROMPT_CACHE_TTL)
+        backend = getattr(
+            settings, "GEMINI_PROMPT_CACHE_BACKEND", DEFAULT_PROMPT_CACHE_BACKEND
+        )
+        if backend == "django":
+            store = DjangoPromptStore(ttl)
+        else:
+            store = SQLitePromptStore(
+                settings.GEMINI_PROMPT_CACHE_PATH,
+                ttl,
+                getattr(
+                    settings,
+                    "GEMINI_PROMPT_CACHE_MAX_ENTRIES",
+                    DEFAULT_PROMPT_CACHE_MAX_ENTRIES,
+                ),
+            )
+        _prompt_cache_instance = PromptCache(
+            store,
+            getattr(settings, "GEMINI_PROMPT_CACHE", DEFAULT_PROMPT_CACHE_MODE),
+        )
+    return _prompt_cache_instance
@@ -0,0 +1,398 @@
+"""
+Prompt Encoding for Spiritual G-Code.
+Compact, token-budgeted encoding of transit data for Gemini prompts:
+abbreviated bodies and signs, whole-degree positions and only tight-orb
+aspects ranked by significance. Tracks the estimated tokens saved against
+the previous repr-based format.
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .scoring import get_gcode_scorer
+
+# Token budget of each whole prompt (template included) when
+# GEMINI_PROMPT_TOKEN_BUDGETS does not set one
+DEFAULT_TOKEN_BUDGETS = {
+    "daily_gcode": 650,
+    "period_forecast": 900,
+}
+DEFAULT_TOKEN_BUDGET = 800
+
+# Aspects wider than this are left out of prompts (degrees)
+DEFAULT_PROMPT_MAX_ORB = 3.0
+
+# Most aspects a prompt shows, before the token budget trims further
+DEFAULT_PROMPT_MAX_ASPECTS = 8
+
+# Rough size of a Gemini token in characters (for estimates only)
+CHARS_PER_TOKEN = 4
+
+BODY_ABBREVIATIONS = {
+    "sun": "Su",
+    "moon": "Mo",
+    "mercury": "Me",
+    "venus": "Ve",
+    "earth": "Ea",
+    "mars": "Ma",
+    "jupiter": "Ju",
+    "saturn": "Sa",
+    "uranus": "Ur",
+    "neptune": "Ne",
+    "pluto": "Pl",
+    "ceres": "Ce",
+    "pallas": "Pa",
+    "juno": "Jn",
+    "vesta": "Vs",
+    "chiron": "Ch",
+}
+
+SIGN_ABBREVIATIONS = {
+    "Aries": "Ari",
+    "Taurus": "Tau",
+    "Gemini": "Gem",
+    "Cancer": "Can",
+    "Leo": "Leo",
+    "Virgo": "Vir",
+    "Libra": "Lib",
+    "Scorpio": "Sco",
+    "Sagittarius": "Sag",
+    "Capricorn": "Cap",
+    "Aquarius": "Aqu",
+    "Pisces": "Pis",
+}
+
+ASPECT_ABBREVIATIONS = {
+    "conjunction": "cnj",
+    "opposition": "opp",
+    "trine": "tri",
+    "square": "sqr",
+    "sextile": "sxt",
+}
+
+# Key line preceding the encoded data, so the model can read it
+LEGEND = (
+    "(Bodies Su Mo Me Ve Ma Ju Sa Ur Ne Pl; aspects cnj opp tri sqr sxt; "
+    "R = retrograde; degrees within sign)"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens of a text (about four characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def abbreviate_body(name: str) -> str:
+    """Short name of a body."""
+    return BODY_ABBREVIATIONS.get(name, name[:3].title())
+
+
+def abbreviate_sign(sign: str) -> str:
+    """Short name of a zodiac sign."""
+    return SIGN_ABBREVIATIONS.get(sign, sign[:3])
+
+
+def verbose_transits(transit_data: Dict) -> str:
+    """
+    The previous repr-based transit format, kept as the baseline that
+    savings are measured against.
+    """
+    planets = transit_data.get("planets", {})
+    aspects = transit_data.get("aspects", [])
+
+    formatted = [f"{planet}: {position}" for planet, position in planets.items()]
+    if aspects:
+        formatted.append("\nMajor Aspects:")
+        formatted.extend(f"- {aspect}" for aspect in aspects[:5])
+
+    retrograde = [
+        planet
+        for planet, position in planets.items()
+        if isinstance(position, dict) and position.get("retrograde")
+    ]
+    if retrograde:
+        formatted.append(f"\nRetrograde: {', '.join(retrograde)}")
+
+    sky = transit_data.get("collective_sky")
+    if sky:
+        formatted.append(f"\nCollective Sky (intensity {sky['intensity_score']}/100):")
+        formatted.extend(
+            f"- {aspect['planet1']} {aspect['aspect']} {aspect['planet2']}"
+            for aspect in sky["mundane_aspects"]
+        )
+        formatted.extend(
+            f"- {ingress['body']} enters {ingress['to_sign']}"
+            for ingress in sky["ingresses"]
+        )
+
+    events = transit_data.get("celestial_events", [])
+    if events:
+        formatted.append("\nCelestial Events:")
+        formatted.extend(
+            f"- {event['event_type'].replace('_', ' ')} in {event['sign']}"
+            for event in events
+        )
+
+    return "\n".join(formatted)
+
+
+class PromptEncoder:
+    """
+    Compact transit encoder with per-prompt-type token budgets.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        max_orb: float = DEFAULT_PROMPT_MAX_ORB,
+        max_aspects: int = DEFAULT_PROMPT_MAX_ASPECTS,
+    ):
+        """
+        Initialize the encoder.
+
+        Args:
+            budgets: Prompt type -> token budget, merged over the defaults
+            max_orb: Widest aspect orb shown (degrees)
+            max_aspects: Most aspects shown
+        """
+        self.budgets = {**DEFAULT_TOKEN_BUDGETS, **(budgets or {})}
+        self.max_orb = max_orb
+        self.max_aspects = max_aspects
+        self._lock = threading.Lock()
+        self._stats = {"prompts": 0, "tokens": 0, "baseline_tokens": 0}
+
+    def budget(self, prompt_type: str) -> int:
+        """Token budget of a prompt type."""
+        return self.budgets.get(prompt_type, DEFAULT_TOKEN_BUDGET)
+
+    def rank_aspects(self, aspects: List[Dict]) -> List[Dict]:
+        """
+        Select the aspects a prompt shows.
+
+        Args:
+            aspects: Transit-to-natal aspects
+
+        Returns:
+            Aspects within max_orb, most significant first (scorer weight of
+            the aspect and transiting body, scaled down as the orb widens),
+            at most max_aspects of them
+        """
+        weights = get_gcode_scorer().weights
+        ranked = []
+        for aspect in aspects:
+            orb = float(aspect.get("orb") or 0.0)
+            if orb > self.max_orb:
+                continue
+            points = weights["aspects"].get(aspect.get("aspect"), 0) + weights[
+                "bodies"
+            ].get(aspect.get("transit_planet"), 0)
+            ranked.append((points * (1.0 - orb / (2 * self.max_orb)), orb, aspect))
+        ranked.sort(key=lambda item: (-item[0], item[1]))
+        return [aspect for _, _, aspect in ranked[: self.max_aspects]]
+
+    def encode_transits(
+        self, transit_data: Dict, prompt_type: str, fixed_text: str = ""
+    ) -> str:
+        """
+        Encode transit data within a prompt type's token budget.
+
+        Positions are always included; ranked aspects, the collective sky
+        and celestial events follow while they fit.
+
+        Args:
+            transit_data: Transit data (planets, aspects, collective_sky,
+                celestial_events)
+            prompt_type: Prompt type whose budget applies
+            fixed_text: Rest of the prompt (counted against the budget)
+
+        Returns:
+            Encoded transit section
+        """
+        planets = transit_data.get("planets", {})
+        lines = [
+            LEGEND,
+            "Sky: " + " ".join(self._position(*item) for item in planets.items()),
+        ]
+        optional = []
+
+        aspects = self.rank_aspects(transit_data.get("aspects", []))
+        if aspects:
+            optional.append((0, "Aspects to natal:"))
+            optional.extend((1, self._aspect(aspect)) for aspect in aspects)
+
+        events = transit_data.get("celestial_events", [])
+        if events:
+            optional.append(
+                (
+                    0,
+                    "Events: "
+                    + "; ".join(
+                        f"{event['event_type'].replace('_', ' ')} in "
+                        f"{abbreviate_sign(event['sign'])}"
+                        for event in events
+                    ),
+                )
+            )
+
+        sky = transit_data.get("collective_sky")
+        if sky:
+            shared = [
+                f"{abbreviate_body(a['planet1'])} "
+                f"{ASPECT_ABBREVIATIONS.get(a['aspect'], a['aspect'])} "
+                f"{abbreviate_body(a['planet2'])}"
+                for a in sky["mundane_aspects"]
+            ] + [
+                f"{abbreviate_body(i['body'])} enters {abbreviate_sign(i['to_sign'])}"
+                for i in sky["ingresses"]
+            ]
+            optional.append(
+                (
+                    0,
+                    f"Collective sky {sky['intensity_score']}/100"
+                    + (f": {'; '.join(shared)}" if shared else ""),
+                )
+            )
+
+        text = self._fit(lines, optional, self.budget(prompt_type), fixed_text)
+        self._record(
+            estimate_tokens(fixed_text + text),
+            estimate_tokens(fixed_text + verbose_transits(transit_data)),
+        )
+        return text
+
+    def encode_period(
+        self, daily_summaries: List[Dict], prompt_type: str, fixed_text: str = ""
+    ) -> str:
+        """
+        Encode a period's daily scores within a prompt type's token budget.
+
+        When over budget, the last aspect of the day listing the most is
+        dropped until the section fits; scores are always kept.
+
+        Args:
+            daily_summaries: Per-day {"date", "score", "intensity", "aspects"}
+            prompt_type: Prompt type whose budget applies
+            fixed_text: Rest of the prompt (counted against the budget)
+
+        Returns:
+            Encoded daily section
+        """
+        days = [list(day["aspects"]) for day in daily_summaries]
+        available = self.budget(prompt_type) - estimate_tokens(fixed_text)
+
+        def render() -> str:
+            return "\n".join(
+                f"- {day['date']}: {day['score']} ({day['intensity']})"
+                + (f" {', '.join(aspects)}" if aspects else "")
+                for day, aspects in zip(daily_summaries, days)
+            )
+
+        text = render()
+        while estimate_tokens(text) > available and any(days):
+            max(days, key=len).pop()
+            text = render()
+
+        baseline = "\n".join(
+            f"- {day['date']}: {day['score']}/100 ({day['intensity']})"
+            + (f" — {', '.join(day['aspects'])}" if day["aspects"] else "")
+            for day in daily_summaries
+        )
+        self._record(
+            estimate_tokens(fixed_text + text), estimate_tokens(fixed_text + baseline)
+        )
+        return text
+
+    def stats(self) -> Dict:
+        """Get prompt counts and estimated tokens sent vs the old format."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["saved_tokens"] = stats["baseline_tokens"] - stats["tokens"]
+        stats["saved_rate"] = (
+            round(stats["saved_tokens"] / stats["baseline_tokens"], 4)
+            if stats["baseline_tokens"]
+            else 0.0
+        )
+        return stats
+
+    def _position(self, body: str, position) -> str:
+        """Encode one body's position, e.g. "Me 12Gem R"."""
+        if not isinstance(position, dict):
+            return f"{abbreviate_body(body)} {position}"
+        encoded = (
+            f"{abbreviate_body(body)} {int(position.get('degree', 0))}"
+            f"{abbreviate_sign(position.get('sign', ''))}"
+        )
+        return encoded + " R" if position.get("retrograde") else encoded
+
+    def _aspect(self, aspect: Dict) -> str:
+        """Encode one transit-to-natal aspect, e.g. "- Ur sqr natal Mo 1.2"."""
+        name = aspect.get("aspect", "")
+        return (
+            f"- {abbreviate_body(aspect.get('transit_planet', ''))} "
+            f"{ASPECT_ABBREVIATIONS.get(name, name)} "
+            f"natal {abbreviate_body(aspect.get('natal_planet', ''))} "
+            f"{float(aspect.get('orb') or 0.0):.1f}"
+        )
+
+    def _fit(
+        self,
+        lines: List[str],
+        optional: List[Tuple[int, str]],
+        budget: int,
+        fixed_text: str,
+    ) -> str:
+        """
+        Append optional lines in order while the prompt fits its budget.
+
+        Headings (level 0) are only kept if at least one of their items
+        (level 1) fits; an item that does not fit ends its group.
+        """
+        used = estimate_tokens(fixed_text + "\n".join(lines))
+        heading = None
+        skipping = False
+        for level, line in optional:
+            if level == 0 and line.endswith(":"):
+                heading, skipping = line, False
+                continue
+            if level == 0:
+                heading, skipping = None, False
+            elif skipping:
+                continue
+
+            block = [heading, line] if heading else [line]
+            cost = estimate_tokens("\n" + "\n".join(block))
+            if used + cost > budget:
+                skipping = level == 1
+                continue
+            lines.extend(block)
+            used += cost
+            heading = None
+        return "\n".join(lines)
+
+    def _record(self, tokens: int, baseline_tokens: int) -> None:
+        """Count one encoded prompt."""
+        with self._lock:
+            self._stats["prompts"] += 1
+            self._stats["tokens"] += tokens
+            self._stats["baseline_tokens"] += baseline_tokens
+
+
+# Singleton instance
+_prompt_encoder_instance = None
+
+
+def get_prompt_encoder() -> PromptEncoder:
+    """Get or create the prompt encoder configured in settings."""
+    global _prompt_encoder_instance
+    if _prompt_encoder_instance is None:
+        _prompt_encoder_instance = PromptEncoder(
+            budgets=getattr(settings, "GEMINI_PROMPT_TOKEN_BUDGETS", None),
+            max_orb=getattr(settings, "GEMINI_PROMPT_MAX_ORB", DEFAULT_PROMPT_MAX_ORB),
+            max_aspects=getattr(
+                settings, "GEMINI_PROMPT_MAX_ASPECTS", DEFAULT_PROMPT_MAX_ASPECTS
+            ),
+        )
+    return _prompt_encoder_instance
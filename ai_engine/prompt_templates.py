@@ -0,0 +1,298 @@
+"""
+Prompt Templates for Spiritual G-Code.
+Registry of compiled prompt templates from `ai_engine/prompts/*.txt` and
+active GCodeTemplate rows. Templates are parsed and validated once; a file
+is recompiled when its mtime changes and DB templates are reloaded when a
+GCodeTemplate is saved or deleted, so a lookup is a dict hit.
+"""
+
+import logging
+import os
+import string
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Directory of file-based templates
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+# Shared cache key bumped on GCodeTemplate changes, so every process reloads
+TEMPLATE_VERSION_KEY = "prompt_templates:version"
+
+# Seconds between checks of file mtimes and the DB template version
+CHECK_INTERVAL = 2.0
+
+
+class TemplateError(ValueError):
+    """Raised for malformed templates and missing render variables."""
+
+
+class CompiledTemplate:
+    """
+    A prompt template parsed into literal text and placeholder segments.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        text: str,
+        source: str = "file",
+        allowed: Optional[Iterable[str]] = None,
+    ):
+        """
+        Parse and validate a template.
+
+        Args:
+            name: Template name
+            text: Template text with {variable} placeholders ({{ }} escapes)
+            source: Where the text came from ("db", "file" or "default")
+            allowed: Variables the template may use (None allows any)
+
+        Raises:
+            TemplateError: On malformed braces, positional or nested
+                placeholders, or placeholders outside allowed
+        """
+        self.name = name
+        self.text = text
+        self.source = source
+        self.segments: List[Tuple[str, Optional[str], Optional[str], str]] = []
+
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise TemplateError(f"Template '{name}' is malformed: {str(e)}")
+
+        for literal, field, spec, conversion in parsed:
+            if field is not None:
+                if not field.isidentifier():
+                    raise TemplateError(
+                        f"Template '{name}' has an unsupported placeholder "
+                        f"'{{{field}}}'"
+                    )
+                if spec and "{" in spec:
+                    raise TemplateError(
+                        f"Template '{name}' has a nested placeholder in "
+                        f"'{{{field}:{spec}}}'"
+                    )
+            self.segments.append((literal, field, conversion, spec or ""))
+
+        self.variables = frozenset(
+            field for _, field, _, _ in self.segments if field is not None
+        )
+        if allowed is not None:
+            unknown = self.variables - set(allowed)
+            if unknown:
+                raise TemplateError(
+                    f"Template '{name}' uses undeclared variables: "
+                    f"{', '.join(sorted(unknown))}"
+                )
+
+    def render(self, **context) -> str:
+        """
+        Fill the placeholders.
+
+        Args:
+            **context: Variable values (extra values are ignored)
+
+        Returns:
+            Rendered prompt
+
+        Raises:
+            TemplateError: If a placeholder has no value
+        """
+        missing = self.variables.difference(context)
+        if missing:
+            raise TemplateError(
+                f"Template '{self.name}' is missing variables: "
+                f"{', '.join(sorted(missing))}"
+            )
+
+        parts = []
+        for literal, field, conversion, spec in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = context[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "a":
+                value = ascii(value)
+            elif conversion == "s":
+                value = str(value)
+            parts.append(format(value, spec))
+        return "".join(parts)
+
+
+class PromptTemplateRegistry:
+    """
+    Compiled prompt templates by name.
+
+    DB templates override files of the same name; names found in neither
+    are compiled from a caller-supplied default once.
+    """
+
+    def __init__(
+        self,
+        directory: Path = PROMPTS_DIR,
+        use_db: bool = True,
+        check_interval: float = CHECK_INTERVAL,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            directory: Directory of `<name>.txt` templates
+            use_db: Whether active GCodeTemplate rows are loaded
+            check_interval: Seconds between staleness checks
+        """
+        self.directory = Path(directory)
+        self.use_db = use_db
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, CompiledTemplate] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._db: Dict[str, CompiledTemplate] = {}
+        self._defaults: Dict[str, CompiledTemplate] = {}
+        self._db_version = None
+        self._checked_at = None
+
+    def get(
+        self, name: str, default: Optional[Callable[[str], str]] = None
+    ) -> CompiledTemplate:
+        """
+        Get a compiled template.
+
+        Args:
+            name: Template name
+            default: Callable returning fallback text for the name
+
+        Returns:
+            Compiled template
+
+        Raises:
+            TemplateError: If the name is unknown and no default is given
+        """
+        if self._checked_at is None or (
+            time.monotonic() - self._checked_at >= self.check_interval
+        ):
+            self.refresh()
+
+        template = self._db.get(name) or self._files.get(name)
+        if template is not None:
+            return template
+
+        template = self._defaults.get(name)
+        if template is None:
+            if default is None:
+                raise TemplateError(f"Unknown prompt template '{name}'")
+            template = CompiledTemplate(name, default(name), source="default")
+            self._defaults[name] = template
+        return template
+
+    def refresh(self) -> None:
+        """Recompile changed files and reload DB templates if they changed."""
+        with self._lock:
+            self._refresh_files()
+            if self.use_db:
+                version = cache.get(TEMPLATE_VERSION_KEY, 0)
+                if version != self._db_version:
+                    templates = self._load_db()
+                    # On a DB error keep the last templates and retry next check
+                    if templates is not None:
+                        self._db = templates
+                        self._db_version = version
+            self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next lookup."""
+        with self._lock:
+            self._files = {}
+            self._mtimes = {}
+            self._db_version = None
+            self._checked_at = None
+
+    def sources(self) -> Dict[str, str]:
+        """Get the source of every loaded template by name."""
+        sources = {name: "default" for name in self._defaults}
+        sources.update({name: "file" for name in self._files})
+        sources.update({name: "db" for name in self._db})
+        return sources
+
+    def _refresh_files(self) -> None:
+        """Compile new and modified template files, drop deleted ones."""
+        mtimes = {}
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.txt"):
+                try:
+                    mtimes[path.stem] = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+
+        for name in set(self._files) - set(mtimes):
+            del self._files[name]
+            self._mtimes.pop(name, None)
+
+        for name, mtime in mtimes.items():
+            if self._mtimes.get(name) == mtime:
+                continue
+            self._mtimes[name] = mtime
+            try:
+                text = (self.directory / f"{name}.txt").read_text(encoding="utf-8")
+                self._files[name] = CompiledTemplate(name, text, source="file")
+            except (OSError, TemplateError) as e:
+                self._files.pop(name, None)
+                logger.error(f"Prompt template file skipped: {str(e)}")
+
+    def _load_db(self) -> Optional[Dict[str, CompiledTemplate]]:
+        """
+        Compile the active GCodeTemplate rows; invalid rows are skipped.
+
+        Returns:
+            Templates by name, or None if the rows could not be read
+        """
+        from api.models import GCodeTemplate
+
+        try:
+            rows = list(
+                GCodeTemplate.objects.filter(is_active=True).values_list(
+                    "name", "prompt_template", "variables"
+                )
+            )
+        except Exception as e:
+            logger.warning(f"DB prompt templates not loaded: {str(e)}")
+            return None
+
+        templates = {}
+        for name, text, variables in rows:
+            try:
+                templates[name] = CompiledTemplate(
+                    name, text, source="db", allowed=variables or None
+                )
+            except TemplateError as e:
+                logger.error(f"Prompt template row skipped: {str(e)}")
+        return templates
+
+
+def bump_template_version() -> None:
+    """Make every process reload its DB templates on the next check."""
+    try:
+        cache.incr(TEMPLATE_VERSION_KEY)
+    except ValueError:
+        cache.set(TEMPLATE_VERSION_KEY, 1, None)
+
+
+# Singleton instance
+_template_registry_instance = None
+
+
+def get_template_registry() -> PromptTemplateRegistry:
+    """Get or create the shared prompt template registry."""
+    global _template_registry_instance
+    if _template_registry_instance is None:
+        _template_registry_instance = PromptTemplateRegistry()
+    return _template_registry_instance
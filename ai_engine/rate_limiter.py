@@ -0,0 +1,261 @@
+"""
+Rate Limiter for Spiritual G-Code.
+Token-bucket rate limit plus a concurrency cap for Gemini calls, shared by
+every process (web, scripts, Celery workers) through the Django cache.
+Requests over the limit wait their turn instead of failing.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Cache key prefix of limiter state
+RATE_LIMIT_CACHE_PREFIX = "rate_limit"
+
+# Defaults when the GEMINI_RATE_LIMIT_* settings are missing
+DEFAULT_RATE_PER_MINUTE = 60
+DEFAULT_BURST = 10
+DEFAULT_MAX_CONCURRENCY = 4
+
+# A concurrency slot held longer than this is treated as leaked
+DEFAULT_SLOT_TIMEOUT = 120
+
+# Short lock guarding the bucket state (seconds)
+LOCK_TIMEOUT = 5
+POLL_SECONDS = 0.05
+
+
+class RateLimiter:
+    """
+    Cross-process token bucket with a concurrency cap.
+
+    The bucket is kept as a GCRA "theoretical arrival time": each request
+    reserves the next free send time, so concurrent callers queue in order
+    instead of racing for tokens. Concurrency slots are cache keys that
+    expire if their holder dies.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_minute: float,
+        burst: int = 1,
+        max_concurrency: int = 0,
+        slot_timeout: int = DEFAULT_SLOT_TIMEOUT,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Limiter name (processes sharing a name share the limit)
+            rate_per_minute: Sustained requests per minute (0 disables)
+            burst: Requests that may be sent back to back
+            max_concurrency: Requests in flight at once (0 disables)
+            slot_timeout: Seconds after which a held slot is reclaimed
+            clock: Wall-clock function (shared across processes)
+            sleep: Sleep function
+        """
+        self.name = name
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.slot_timeout = slot_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self.interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self.tolerance = self.interval * (self.burst - 1)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "waited": 0, "wait_seconds": 0.0}
+
+    @contextmanager
+    def acquire(self):
+        """
+        Wait for a rate-limit token and a concurrency slot, then hold the
+        slot for the duration of the block.
+        """
+        release = self.admit()
+        try:
+            yield
+        finally:
+            release()
+
+    def admit(self, block: bool = True) -> Optional[Callable[[], None]]:
+        """
+        Take a rate-limit token and a concurrency slot for one request.
+
+        The slot is held until the returned function is called, which may
+        happen on another thread (see CallGuard).
+
+        Args:
+            block: Wait for the token and slot; otherwise only take them if
+                both are free now
+
+        Returns:
+            Function releasing the slot once the request is done, or None
+            if block is False and the request would have to queue
+        """
+        slot = None
+        if not block and self.max_concurrency:
+            slot = self._acquire_slot(block=False)
+            if slot is None:
+                return None
+        wait = self.reserve(block=block)
+        if wait is None:
+            if slot:
+                cache.delete(slot)
+            return None
+        if wait > 0:
+            self.sleep(wait)
+        if block:
+            slot = self._acquire_slot()
+        started = self.clock()
+
+        def release():
+            if slot:
+                cache.delete(slot)
+            self._record_duration(self.clock() - started)
+
+        return release
+
+    def reserve(self, block: bool = True) -> Optional[float]:
+        """
+        Reserve the next send time in the shared bucket.
+
+        Args:
+            block: Reserve even if the send time is in the future
+
+        Returns:
+            Seconds to wait before sending, or None if block is False and
+            no token is free now (nothing is reserved)
+        """
+        wait = 0.0
+        if self.interval:
+            with self._locked():
+                now = self.clock()
+                arrival = max(cache.get(self._key("tat"), now), now)
+                wait = max(0.0, arrival - self.tolerance - now)
+                if wait > 0 and not block:
+                    return None
+                cache.set(
+                    self._key("tat"),
+                    arrival + self.interval,
+                    int(arrival + self.interval - now) + 60,
+                )
+
+        with self._lock:
+            self._stats["requests"] += 1
+            if wait > 0:
+                self._stats["waited"] += 1
+                self._stats["wait_seconds"] += wait
+        return wait
+
+    def wait_time(self) -> float:
+        """
+        Estimate how long a request made now would wait.
+
+        Returns:
+            Seconds until a token is free, plus one average call duration
+            if every concurrency slot is taken
+        """
+        wait = 0.0
+        if self.interval:
+            now = self.clock()
+            arrival = max(cache.get(self._key("tat"), now), now)
+            wait = max(0.0, arrival - self.tolerance - now)
+        if self.max_concurrency and self.in_flight() >= self.max_concurrency:
+            wait += cache.get(self._key("avg_duration"), 0.0)
+        return round(wait, 3)
+
+    def in_flight(self) -> int:
+        """Number of concurrency slots currently held."""
+        if not self.max_concurrency:
+            return 0
+        return len(cache.get_many(self._slot_keys()))
+
+    def status(self) -> Dict:
+        """Get the limits, current load and this process' wait stats."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats.update(
+            {
+                "name": self.name,
+                "rate_per_minute": self.rate_per_minute,
+                "burst": self.burst,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight(),
+                "current_wait_seconds": self.wait_time(),
+            }
+        )
+        return stats
+
+    def _acquire_slot(self, block: bool = True) -> Optional[str]:
+        """
+        Take a free concurrency slot, polling until one frees up.
+
+        Returns:
+            The slot's cache key; None if concurrency is not capped, or if
+            block is False and every slot is taken
+        """
+        if not self.max_concurrency:
+            return None
+        while True:
+            for key in self._slot_keys():
+                if cache.add(key, self.clock(), self.slot_timeout):
+                    return key
+            if not block:
+                return None
+            self.sleep(POLL_SECONDS)
+
+    def _record_duration(self, seconds: float) -> None:
+        """Fold a call duration into the shared moving average."""
+        key = self._key("avg_duration")
+        average = cache.get(key)
+        average = seconds if average is None else 0.8 * average + 0.2 * seconds
+        cache.set(key, average, None)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the short cross-process lock of the bucket state."""
+        key = self._key("lock")
+        while not cache.add(key, True, LOCK_TIMEOUT):
+            self.sleep(POLL_SECONDS)
+        try:
+            yield
+        finally:
+            cache.delete(key)
+
+    def _slot_keys(self):
+        """Cache keys of the concurrency slots."""
+        return [self._key(f"slot:{index}") for index in range(self.max_concurrency)]
+
+    def _key(self, suffix: str) -> str:
+        """Cache key of a piece of limiter state."""
+        return f"{RATE_LIMIT_CACHE_PREFIX}:{self.name}:{suffix}"
+
+
+# Singleton instance
+_gemini_limiter_instance = None
+
+
+def get_gemini_rate_limiter() -> RateLimiter:
+    """Get or create the limiter shared by all Gemini calls."""
+    global _gemini_limiter_instance
+    if _gemini_limiter_instance is None:
+        _gemini_limiter_instance = RateLimiter(
+            "gemini",
+            rate_per_minute=getattr(
+                settings, "GEMINI_RATE_LIMIT_PER_MINUTE", DEFAULT_RATE_PER_MINUTE
+            ),
+            burst=getattr(settings, "GEMINI_RATE_LIMIT_BURST", DEFAULT_BURST),
+            max_concurrency=getattr(
+                settings, "GEMINI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY
+            ),
+        )
+    return _gemini_limiter_instance
@@ -0,0 +1,458 @@
+"""
+AI Call Resilience for Spiritual G-Code.
+Per-call deadlines, hedged requests and a circuit breaker around model
+calls, so a slow or failing Gemini cannot hold a worker: callers get an
+AIUnavailable error in bounded time and fall back to recorded or mock
+content. Requests take their rate limiter turn before the deadline starts,
+and only provider errors and timeouts count towards the breaker.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Type
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from google.api_core import exceptions as google_exceptions
+
+# Cache key prefix of circuit breaker state
+CIRCUIT_CACHE_PREFIX = "circuit"
+
+# Defaults when the GEMINI_* resilience settings are missing
+DEFAULT_TIMEOUT_SECONDS = 20.0
+DEFAULT_HEDGE_DELAY_SECONDS = 2.0
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30
+DEFAULT_CALL_THREADS = 16
+
+# Latency samples kept for the hedge delay, and samples needed before the
+# observed p95 replaces the configured delay
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+# End-of-stream marker passed from a stream's producer thread
+STREAM_END = object()
+
+# Errors that mean Gemini itself is failing (server errors, quota, network);
+# other errors (bad requests, blocked responses) leave the breaker closed
+GEMINI_PROVIDER_ERRORS = (
+    google_exceptions.ServerError,
+    google_exceptions.TooManyRequests,
+    google_exceptions.RetryError,
+    OSError,
+)
+
+
+class AIUnavailable(Exception):
+    """Raised when a model call cannot complete in time or is not allowed."""
+
+
+class DeadlineExceeded(AIUnavailable):
+    """Raised when a model call misses its deadline."""
+
+
+class CircuitOpen(AIUnavailable):
+    """Raised when the circuit breaker is rejecting calls."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker shared through the Django cache.
+
+    Closed until `failure_threshold` calls fail in a row; then open (calls
+    rejected) for `reset_timeout` seconds; then half-open, letting a single
+    probe through whose outcome closes or reopens the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURES,
+        reset_timeout: float = DEFAULT_BREAKER_RESET_SECONDS,
+        probe_timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        clock=time.time,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Breaker name (processes sharing a name share the state)
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+            probe_timeout: Seconds a half-open probe holds its turn
+            clock: Wall-clock function (shared across processes)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+
+    def allow(self) -> bool:
+        """Whether a call may go through now."""
+        opened_at = cache.get(self._key("opened_at"))
+        if opened_at is None:
+            return True
+        if self.clock() - opened_at < self.reset_timeout:
+            return False
+        return cache.add(self._key("probe"), True, int(self.probe_timeout) + 1)
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        cache.delete_many(
+            [self._key("failures"), self._key("opened_at"), self._key("probe")]
+        )
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        key = self._key("failures")
+        cache.add(key, 0, None)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            failures = 1
+            cache.set(key, failures, None)
+
+        half_open = cache.get(self._key("opened_at")) is not None
+        if half_open or failures >= self.failure_threshold:
+            cache.set(self._key("opened_at"), self.clock(), None)
+            cache.delete(self._key("probe"))
+
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        opened_at = cache.get(self._key("opened_at"))
+        if opened_at is None:
+            return "closed"
+        if self.clock() - opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def status(self) -> Dict:
+        """Get the state, failure count and thresholds."""
+        return {
+            "name": self.name,
+            "state": self.state(),
+            "consecutive_failures": cache.get(self._key("failures"), 0),
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+        }
+
+    def _key(self, suffix: str) -> str:
+        """Cache key of a piece of breaker state."""
+        return f"{CIRCUIT_CACHE_PREFIX}:{self.name}:{suffix}"
+
+
+class LatencyTracker:
+    """Recent call latencies of this process, for the hedge delay."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Most recent samples kept
+        """
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add one successful call's latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile, or None until enough samples are in."""
+        with self._lock:
+            if len(self._samples) < LATENCY_MIN_SAMPLES:
+                return None
+            samples = np.array(self._samples)
+        return float(np.percentile(samples, q))
+
+
+class CallGuard:
+    """
+    Runs model calls with a deadline, an optional hedge and a breaker.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        hedge: bool = True,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY_SECONDS,
+        executor: Optional[ThreadPoolExecutor] = None,
+        failure_types: Tuple[Type[BaseException], ...] = (Exception,),
+    ):
+        """
+        Initialize the guard.
+
+        Args:
+            breaker: Circuit breaker the outcomes are recorded in
+            timeout: Seconds a call may take, hedge included
+            hedge: Whether a second request is sent when the first is slow
+            hedge_delay: Seconds before hedging until the observed p95 is known
+            executor: Thread pool the calls run on
+            failure_types: Errors counted as breaker failures (timeouts
+                always are)
+        """
+        self.breaker = breaker
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.failure_types = failure_types
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=DEFAULT_CALL_THREADS, thread_name_prefix="ai-call"
+        )
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "hedges_skipped": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "rejected": 0,
+        }
+
+    def call(
+        self,
+        fn: Callable[[], str],
+        admit: Optional[Callable[[bool], Optional[Callable[[], None]]]] = None,
+    ) -> str:
+        """
+        Run a model call under the guard.
+
+        With `admit` (e.g. RateLimiter.admit) the first request waits for
+        its turn before the deadline and hedge clock start; a hedge is only
+        sent if it can be admitted without queueing.
+
+        Args:
+            fn: Callable making one request; must be safe to run twice
+            admit: admit(block) takes a request's turn and returns the
+                function ending it, or None if block is False and the
+                request would have to queue
+
+        Returns:
+            The first successful result
+
+        Raises:
+            CircuitOpen: If the breaker rejects the call
+            DeadlineExceeded: If no request succeeded before the deadline
+            Exception: The request's own error when every request failed
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpen(f"Circuit '{self.breaker.name}' is open")
+        release = admit(True) if admit else None
+        self._count("calls")
+
+        started = time.monotonic()
+        deadline = started + self.timeout
+        hedge_at = self.hedge_after()
+        first = self.executor.submit(self._run, fn, release)
+        releases = {first: release}
+        pending = {first}
+        hedged = None
+        error = None
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if hedged is None and hedge_at is not None:
+                remaining = min(
+                    remaining, max(0.0, started + hedge_at - time.monotonic())
+                )
+
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    self.latency.record(time.monotonic() - started)
+                    self.breaker.record_success()
+                    if future is hedged:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+            if (
+                hedged is None
+                and hedge_at is not None
+                and (not pending or time.monotonic() - started >= hedge_at)
+            ):
+                release = admit(False) if admit else None
+                if admit and release is None:
+                    # Never hedge a request that would queue
+                    hedge_at = None
+                    self._count("hedges_skipped")
+                    continue
+                hedged = self.executor.submit(self._run, fn, release)
+                releases[hedged] = release
+                pending.add(hedged)
+                self._count("hedged")
+
+        if pending or error is None:
+            for future in pending:
+                if future.cancel() and releases[future]:
+                    releases[future]()
+            self.breaker.record_failure()
+            self._count("timeouts")
+            raise DeadlineExceeded(f"Model call exceeded {self.timeout:g}s deadline")
+        self.record_outcome(error)
+        self._count("failures")
+        raise error
+
+    def stream(
+        self,
+        fn: Callable[[], Iterable[str]],
+        admit: Optional[Callable[[bool], Optional[Callable[[], None]]]] = None,
+    ) -> Iterator[str]:
+        """
+        Run a streaming model call under the guard.
+
+        The stream is read on the guard's thread pool; the first chunk and
+        every following chunk must arrive within the timeout. Streams are
+        not hedged. As in call(), `admit` is waited for before the clock
+        starts.
+
+        Args:
+            fn: Callable starting one request and returning its chunks
+            admit: See call()
+
+        Yields:
+            The stream's chunks
+
+        Raises:
+            CircuitOpen: If the breaker rejects the call
+            DeadlineExceeded: If the stream stalls for longer than the timeout
+            Exception: The request's own error
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpen(f"Circuit '{self.breaker.name}' is open")
+        release = admit(True) if admit else None
+        self._count("calls")
+
+        chunks = queue.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for chunk in fn():
+                    if stop.is_set():
+                        return
+                    chunks.put((chunk, None))
+                chunks.put((STREAM_END, None))
+            except Exception as e:
+                chunks.put((None, e))
+            finally:
+                if release:
+                    release()
+
+        self.executor.submit(produce)
+        try:
+            while True:
+                try:
+                    chunk, error = chunks.get(timeout=self.timeout)
+                except queue.Empty:
+                    self.breaker.record_failure()
+                    self._count("timeouts")
+                    raise DeadlineExceeded(
+                        f"Model stream stalled for {self.timeout:g}s"
+                    ) from None
+                if error is not None:
+                    self.record_outcome(error)
+                    self._count("failures")
+                    raise error
+                if chunk is STREAM_END:
+                    self.breaker.record_success()
+                    return
+                yield chunk
+        finally:
+            # Stops the producer at its next chunk if the reader gave up
+            stop.set()
+
+    def record_outcome(self, error: Optional[BaseException] = None) -> None:
+        """
+        Record a finished request in the breaker.
+
+        Only errors of `failure_types` count as failures; any other outcome
+        shows the provider answered and closes the circuit.
+        """
+        if isinstance(error, self.failure_types):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    @staticmethod
+    def _run(fn: Callable[[], str], release: Optional[Callable[[], None]]) -> str:
+        """Make one request, then end its rate limiter turn."""
+        try:
+            return fn()
+        finally:
+            if release:
+                release()
+
+    def hedge_after(self) -> Optional[float]:
+        """Seconds after which a second request is sent, or None."""
+        if not self.hedge:
+            return None
+        p95 = self.latency.percentile(95)
+        delay = self.hedge_delay if p95 is None else p95
+        return delay if delay < self.timeout else None
+
+    def status(self) -> Dict:
+        """Get the breaker state, hedge delay and this process' call stats."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            {
+                "circuit": self.breaker.status(),
+                "timeout": self.timeout,
+                "hedge_after": self.hedge_after(),
+            }
+        )
+        return stats
+
+    def _count(self, outcome: str) -> None:
+        """Count one call outcome."""
+        with self._lock:
+            self._stats[outcome] += 1
+
+
+# Singleton instance
+_gemini_guard_instance = None
+
+
+def get_gemini_call_guard() -> CallGuard:
+    """Get or create the guard shared by all Gemini calls in this process."""
+    global _gemini_guard_instance
+    if _gemini_guard_instance is None:
+        timeout = getattr(settings, "GEMINI_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)
+        _gemini_guard_instance = CallGuard(
+            CircuitBreaker(
+                "gemini",
+                failure_threshold=getattr(
+                    settings, "GEMINI_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES
+                ),
+                reset_timeout=getattr(
+                    settings,
+                    "GEMINI_BREAKER_RESET_SECONDS",
+                    DEFAULT_BREAKER_RESET_SECONDS,
+                ),
+                probe_timeout=timeout,
+            ),
+            timeout=timeout,
+            hedge=getattr(settings, "GEMINI_HEDGE", True),
+            hedge_delay=getattr(
+                settings, "GEMINI_HEDGE_DELAY_SECONDS", DEFAULT_HEDGE_DELAY_SECONDS
+            ),
+            failure_types=GEMINI_PROVIDER_ERRORS,
+        )
+    return _gemini_guard_instance
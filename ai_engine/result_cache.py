@@ -0,0 +1,117 @@
+"""
+Result Cache for Spiritual G-Code.
+Two-level cache for computed results: an in-process LRU in front of the
+configured Django cache (Redis in production, locmem in tests).
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+
+# Cache settings for daily G-Code results
+DAILY_GCODE_CACHE_PREFIX = "daily_gcode"
+DAILY_GCODE_CACHE_TIMEOUT = 60 * 60 * 24  # A day's G-Code is fixed once made
+DAILY_GCODE_MEMO_SIZE = 256
+
+
+class ResultCache:
+    """
+    In-process LRU backed by the shared Django cache, with hit-rate stats.
+
+    Values are deep-copied in and out of the in-process level so callers
+    can never mutate a cached result.
+    """
+
+    def __init__(self, prefix: str, timeout: int, memo_size: int):
+        """
+        Initialize the cache.
+
+        Args:
+            prefix: Key prefix in the Django cache
+            timeout: Seconds a result stays valid in either level
+            memo_size: Maximum entries kept in process
+        """
+        self.prefix = prefix
+        self.timeout = timeout
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "cache_hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look a result up in process, then in the Django cache."""
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._memo.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return copy.deepcopy(value)
+                del self._memo[key]
+
+        value = cache.get(f"{self.prefix}:{key}")
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["cache_hits"] += 1
+        self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a result in both levels."""
+        cache.set(f"{self.prefix}:{key}", value, self.timeout)
+        self._remember(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached result or compute and store it.
+
+        Args:
+            key: Cache key (without prefix)
+            compute: Callable producing the result on a miss
+
+        Returns:
+            Cached or freshly computed result
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: str) -> None:
+        """Drop a result from both levels."""
+        with self._lock:
+            self._memo.pop(key, None)
+        cache.delete(f"{self.prefix}:{key}")
+
+    def clear(self) -> None:
+        """Drop the in-process level and reset stats."""
+        with self._lock:
+            self._memo.clear()
+            self._stats = {key: 0 for key in self._stats}
+
+    def stats(self) -> Dict:
+        """Get hit counts and the overall hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memo)
+        lookups = stats["memory_hits"] + stats["cache_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["cache_hits"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Store a copy in the in-process LRU."""
+        entry = (time.monotonic() + self.timeout, copy.deepcopy(value))
+        with self._lock:
+            self._memo[key] = entry
+            self._memo.move_to_end(key)
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
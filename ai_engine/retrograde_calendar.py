@@ -0,0 +1,312 @@
+"""
+Retrograde Calendar for Spiritual G-Code.
+Precomputes retrograde stations and shadow periods once per year.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.core.cache import cache
+
+from .ephemeris import (
+    create_body,
+    ecliptic_longitude,
+    find_crossings,
+    find_root,
+    sample_longitudes,
+    sign_of,
+    to_datetime,
+    to_ephem_date,
+    wrap180,
+)
+from .intervals import IntervalIndex
+
+# Cache settings for the shared yearly calendar
+RETROGRADE_CACHE_PREFIX = "retrograde_calendar"
+RETROGRADE_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # One week; rows never change
+
+
+class RetrogradeCalculator:
+    """
+    Calculator for retrograde periods with pre- and post-shadow.
+
+    Stations are found where the daily motion changes sign and refined by
+    bisection on the instantaneous speed. The pre-shadow starts when the body
+    first reaches the station-direct degree; the post-shadow ends when it
+    returns to the station-retrograde degree.
+    """
+
+    BODIES = [
+        "mercury",
+        "venus",
+        "mars",
+        "jupiter",
+        "saturn",
+        "uranus",
+        "neptune",
+        "pluto",
+    ]
+
+    # Outer-planet shadows span most of a year, so sample a year either side
+    MARGIN_DAYS = 366
+
+    def calculate_year(self, year: int) -> List[Dict]:
+        """
+        Calculate retrograde periods touching a calendar year.
+
+        Returns:
+            List of period dictionaries sorted by pre-shadow start
+        """
+        year_start = to_ephem_date(date(year, 1, 1))
+        year_end = to_ephem_date(date(year + 1, 1, 1))
+
+        times, longitudes = sample_longitudes(
+            self.BODIES,
+            year_start - self.MARGIN_DAYS,
+            year_end + self.MARGIN_DAYS,
+            1.0,
+        )
+
+        periods = []
+        for name in self.BODIES:
+            for period in self._find_periods(name, times, longitudes[name]):
+                starts = period["pre_shadow_start"]
+                ends = period["post_shadow_end"]
+                if starts < to_datetime(year_end) and ends >= to_datetime(year_start):
+                    periods.append(period)
+
+        return sorted(periods, key=lambda period: period["pre_shadow_start"])
+
+    def _find_periods(
+        self, name: str, times: np.ndarray, longitudes: np.ndarray
+    ) -> List[Dict]:
+        """Find complete retrograde cycles for one body."""
+        body = create_body(name)
+
+        def speed(when: float) -> float:
+            return float(
+                wrap180(
+                    ecliptic_longitude(body, when + 0.25)
+                    - ecliptic_longitude(body, when - 0.25)
+                )
+            )
+
+        # Daily motion, aligned with the midpoint of each sample pair
+        motion = wrap180(np.diff(longitudes))
+        midpoints = (times[:-1] + times[1:]) / 2
+
+        stations = []
+        for direction, kind in ((-1, "retrograde"), (1, "direct")):
+            for approx in find_crossings(midpoints, motion, direction=direction):
+                exact = find_root(speed, approx - 1.0, approx + 1.0)
+                stations.append((exact, kind))
+        stations.sort()
+
+        periods = []
+        for (retro_at, retro_kind), (direct_at, direct_kind) in zip(
+            stations, stations[1:]
+        ):
+            if retro_kind != "retrograde" or direct_kind != "direct":
+                continue
+
+            retro_lon = ecliptic_longitude(body, retro_at)
+            direct_lon = ecliptic_longitude(body, direct_at)
+
+            entering = [
+                t
+                for t in find_crossings(times, wrap180(longitudes - direct_lon))
+                if t < retro_at
+            ]
+            leaving = [
+                t
+                for t in find_crossings(times, wrap180(longitudes - retro_lon))
+                if t > direct_at
+            ]
+            if not entering or not leaving:
+                # Shadow runs past the sampled window; skip partial cycles
+                continue
+
+            periods.append(
+                {
+                    "body": name,
+                    "pre_shadow_start": to_datetime(entering[-1]),
+                    "station_retrograde": to_datetime(retro_at),
+                    "station_direct": to_datetime(direct_at),
+                    "post_shadow_end": to_datetime(leaving[0]),
+                    "retrograde_longitude": round(retro_lon, 4),
+                    "direct_longitude": round(direct_lon, 4),
+                }
+            )
+
+        return periods
+
+
+class RetrogradeCalendarService:
+    """
+    Shared, cached access to the retrograde calendar.
+
+    Each year is computed once, stored in the RetrogradePeriod table, served
+    from the Django cache and queried through an in-process interval index.
+    """
+
+    # Status priority when a day sits on a phase boundary
+    PHASES = ("retrograde", "pre_shadow", "post_shadow")
+
+    def __init__(self, calculator: Optional[RetrogradeCalculator] = None):
+        """Initialize the service with a retrograde calculator."""
+        self.calculator = calculator or RetrogradeCalculator()
+        self._indexes: Dict[int, IntervalIndex] = {}
+
+    def get_year(self, year: int, build_missing: bool = True) -> List[Dict]:
+        """
+        Get all retrograde periods touching a year.
+
+        Args:
+            year: Calendar year
+            build_missing: Compute and store the year if it isn't stored yet
+
+        Returns:
+            List of serialized periods
+        """
+        cache_key = f"{RETROGRADE_CACHE_PREFIX}:{year}"
+        periods = cache.get(cache_key)
+        if periods is not None:
+            return periods
+
+        from api.models import RetrogradePeriod
+
+        rows = RetrogradePeriod.objects.filter(year=year).order_by("pre_shadow_start")
+        if not rows.exists():
+            if not build_missing:
+                return []
+            self.build_year(year)
+
+        periods = [self._serialize(row) for row in rows.all()]
+        cache.set(cache_key, periods, RETROGRADE_CACHE_TIMEOUT)
+        return periods
+
+    def build_year(self, year: int, force: bool = False) -> int:
+        """
+        Compute and store a year's retrograde periods.
+
+        Args:
+            year: Calendar year
+            force: Recompute even if the year is already stored
+
+        Returns:
+            Number of periods stored
+        """
+        from api.models import RetrogradePeriod
+
+        existing = RetrogradePeriod.objects.filter(year=year)
+        if existing.exists() and not force:
+            return existing.count()
+
+        periods = self.calculator.calculate_year(year)
+        existing.delete()
+        RetrogradePeriod.objects.bulk_create(
+            [RetrogradePeriod(year=year, **period) for period in periods]
+        )
+        cache.delete(f"{RETROGRADE_CACHE_PREFIX}:{year}")
+        self._indexes.pop(year, None)
+        return len(periods)
+
+    def index(self, year: int, build_missing: bool = True) -> IntervalIndex:
+        """
+        Get the interval index of a year's retrograde and shadow phases.
+
+        Payloads are (body, phase, period) tuples keyed on UTC dates.
+        """
+        if year in self._indexes:
+            return self._indexes[year]
+
+        intervals = []
+        for period in self.get_year(year, build_missing=build_missing):
+            pre = datetime.fromisoformat(period["pre_shadow_start"]).date()
+            retro = datetime.fromisoformat(period["station_retrograde"]).date()
+            direct = datetime.fromisoformat(period["station_direct"]).date()
+            post = datetime.fromisoformat(period["post_shadow_end"]).date()
+
+            intervals.append((pre, retro, (period["body"], "pre_shadow", period)))
+            intervals.append((retro, direct, (period["body"], "retrograde", period)))
+            intervals.append((direct, post, (period["body"], "post_shadow", period)))
+
+        index = IntervalIndex(intervals)
+        if intervals or build_missing:
+            self._indexes[year] = index
+        return index
+
+    def status_on(self, day: date, build_missing: bool = True) -> Dict[str, str]:
+        """
+        Get each body's retrograde phase on a day.
+
+        Returns:
+            Dictionary of body -> "retrograde", "pre_shadow" or "post_shadow"
+            (bodies moving direct outside any shadow are omitted)
+        """
+        status = {}
+        for body, phase, _ in self.index(day.year, build_missing).at(day):
+            current = status.get(body)
+            if current is None or self.PHASES.index(phase) < self.PHASES.index(current):
+                status[body] = phase
+        return status
+
+    def retrograde_bodies(self, day: date, build_missing: bool = True) -> List[str]:
+        """Get the bodies stationed or moving retrograde on a day."""
+        status = self.status_on(day, build_missing)
+        return sorted(body for body, phase in status.items() if phase == "retrograde")
+
+    def flag_transits(
+        self, planets: Dict, day: date, build_missing: bool = True
+    ) -> Dict:
+        """
+        Flag retrograde and shadow bodies in a transit positions dict.
+
+        Adds "retrograde" (bool) and "shadow" (phase or None) to each planet's
+        position in place, using only the stored calendar.
+
+        Returns:
+            The same planets dictionary
+        """
+        return self.apply_status(planets, self.status_on(day, build_missing))
+
+    def apply_status(self, planets: Dict, status: Dict) -> Dict:
+        """
+        Flag planets from a status_on() result (no calendar access).
+
+        Returns:
+            The same planets dictionary
+        """
+        for name, position in planets.items():
+            phase = status.get(name)
+            position["retrograde"] = phase == "retrograde"
+            position["shadow"] = (
+                phase if phase in ("pre_shadow", "post_shadow") else None
+            )
+        return planets
+
+    def _serialize(self, period) -> Dict:
+        """Serialize a RetrogradePeriod row for caching and API output."""
+        return {
+            "body": period.body,
+            "sign": sign_of(period.retrograde_longitude),
+            "pre_shadow_start": period.pre_shadow_start.isoformat(),
+            "station_retrograde": period.station_retrograde.isoformat(),
+            "station_direct": period.station_direct.isoformat(),
+            "post_shadow_end": period.post_shadow_end.isoformat(),
+            "retrograde_longitude": period.retrograde_longitude,
+            "direct_longitude": period.direct_longitude,
+        }
+
+
+# Singleton instance
+_retrograde_instance = None
+
+
+def get_retrograde_calendar() -> RetrogradeCalendarService:
+    """Get or create the retrograde calendar service instance."""
+    global _retrograde_instance
+    if _retrograde_instance is None:
+        _retrograde_instance = RetrogradeCalendarService()
+    return _retrograde_instance
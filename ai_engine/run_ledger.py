@@ -0,0 +1,228 @@
+"""
+Run Ledger for Spiritual G-Code.
+Checkpoints nightly batch runs (run ID, target date, last processed user and
+per-user status) so a restarted run resumes instead of redoing every user.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+DEFAULT_JOB = "daily_gcode"
+
+
+class RunLedger:
+    """
+    Ledger of one BatchRun.
+
+    Sequential runs checkpoint on the last user ID processed in order;
+    users with a successful item for the target date are always skipped,
+    which also covers parallel (Celery) chunks that finish out of order.
+    """
+
+    def __init__(self, run):
+        """
+        Initialize the ledger.
+
+        Args:
+            run: BatchRun instance
+        """
+        self.run = run
+
+    @classmethod
+    def start(cls, target_date: date, users, job: str = DEFAULT_JOB) -> "RunLedger":
+        """
+        Resume the unfinished run for a target date or start a new one.
+
+        Args:
+            target_date: Date the batch calculates for
+            users: Queryset of eligible users (counted for new runs)
+            job: Job name
+
+        Returns:
+            RunLedger for the resumed or new run
+        """
+        from api.models import BatchRun
+
+        run = (
+            BatchRun.objects.filter(job=job, target_date=target_date)
+            .exclude(status="completed")
+            .order_by("-started_at")
+            .first()
+        )
+        if run is None:
+            run = BatchRun.objects.create(
+                job=job, target_date=target_date, total_users=users.count()
+            )
+        elif run.status == "failed":
+            run.status = "running"
+            run.save(update_fields=["status", "updated_at"])
+        return cls(run)
+
+    @classmethod
+    def get(cls, run_id: str) -> "RunLedger":
+        """Load the ledger of a run by run ID."""
+        from api.models import BatchRun
+
+        return cls(BatchRun.objects.get(run_id=run_id))
+
+    @property
+    def resumed(self) -> bool:
+        """Whether the run already has progress from an earlier attempt."""
+        return self.run.last_user_id is not None or self.run.processed_users > 0
+
+    def pending(self, users):
+        """
+        Filter users down to those the run still has to process.
+
+        Args:
+            users: Queryset of eligible users
+
+        Returns:
+            Queryset past the checkpoint, without users already done for the
+            target date
+        """
+        from api.models import BatchRunItem
+
+        if self.run.last_user_id is not None:
+            # Past the checkpoint, plus this run's failures to retry them
+            failed = self.run.items.filter(status="error").values("user_id")
+            users = users.filter(Q(pk__gt=self.run.last_user_id) | Q(pk__in=failed))
+
+        done = BatchRunItem.objects.filter(
+            run__job=self.run.job,
+            run__target_date=self.run.target_date,
+            status="success",
+        ).values("user_id")
+        return users.exclude(pk__in=done)
+
+    def record_chunk(
+        self,
+        succeeded: List[int],
+        failed: Dict[int, str],
+        checkpoint: Optional[int] = None,
+    ) -> None:
+        """
+        Record one chunk's per-user outcomes and advance the checkpoint.
+
+        Args:
+            succeeded: IDs of users whose G-Code was stored
+            failed: User ID -> error message
+            checkpoint: Last user ID processed in order (sequential runs only)
+        """
+        from api.models import BatchRun, BatchRunItem
+
+        items = [
+            BatchRunItem(run=self.run, user_id=user_id, status="success")
+            for user_id in succeeded
+        ] + [
+            BatchRunItem(run=self.run, user_id=user_id, status="error", error=error)
+            for user_id, error in failed.items()
+        ]
+        BatchRunItem.objects.bulk_create(
+            items,
+            update_conflicts=True,
+            unique_fields=["run", "user"],
+            update_fields=["status", "error"],
+        )
+
+        # Recount from the items in the same statement, so parallel chunks
+        # and retried users never double count
+        updates = {
+            "success_count": self._item_count("success"),
+            "error_count": self._item_count("error"),
+            "updated_at": timezone.now(),
+        }
+        if checkpoint is not None:
+            updates["last_user_id"] = checkpoint
+        BatchRun.objects.filter(pk=self.run.pk).update(**updates)
+        self.run.refresh_from_db()
+
+    def finish(self, status: str = "completed") -> None:
+        """Mark the run completed or failed."""
+        self.run.status = status
+        self.run.finished_at = timezone.now()
+        self.run.save(update_fields=["status", "finished_at", "updated_at"])
+
+    def status(self) -> Dict:
+        """Get progress and throughput of the run."""
+        return run_status(self.run)
+
+    def _item_count(self, status: str):
+        """Subquery counting the run's items with a status."""
+        from api.models import BatchRunItem
+
+        count = (
+            BatchRunItem.objects.filter(run=OuterRef("pk"), status=status)
+            .values("run")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return Coalesce(Subquery(count), 0)
+
+
+def run_status(run) -> Dict:
+    """
+    Summarize a BatchRun's progress and throughput.
+
+    Args:
+        run: BatchRun instance
+
+    Returns:
+        Dictionary with counts, percent done, users per second and ETA
+    """
+    end = run.finished_at or timezone.now()
+    elapsed = max((end - run.started_at).total_seconds(), 0.0)
+    processed = run.processed_users
+    throughput = processed / elapsed if elapsed else 0.0
+    remaining = max(run.total_users - processed, 0)
+
+    return {
+        "run_id": str(run.run_id),
+        "job": run.job,
+        "target_date": run.target_date.isoformat(),
+        "status": run.status,
+        "total_users": run.total_users,
+        "processed_users": processed,
+        "success": run.success_count,
+        "errors": run.error_count,
+        "percent": round(100 * processed / run.total_users, 1)
+        if run.total_users
+        else 100.0,
+        "last_user_id": run.last_user_id,
+        "elapsed_seconds": round(elapsed, 1),
+        "users_per_second": round(throughput, 2),
+        "eta_seconds": (
+            round(remaining / throughput)
+            if run.status == "running" and throughput
+            else None
+        ),
+        "started_at": run.started_at.isoformat(),
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
+
+
+def recent_runs(
+    target_date: Optional[date] = None, job: str = DEFAULT_JOB, limit: int = 10
+) -> List[Dict]:
+    """
+    Get the status of recent runs.
+
+    Args:
+        target_date: Only runs for this date
+        job: Job name (timezone bucket runs of the job are included)
+        limit: Maximum runs returned
+
+    Returns:
+        List of run_status() dictionaries, newest first
+    """
+    from api.models import BatchRun
+
+    # Include the job's timezone buckets ("<job>@<timezone>")
+    runs = BatchRun.objects.filter(Q(job=job) | Q(job__startswith=f"{job}@"))
+    if target_date is not None:
+        runs = runs.filter(target_date=target_date)
+    return [run_status(run) for run in runs.order_by("-started_at")[:limit]]
@@ -0,0 +1,195 @@
+"""
+G-Code Intensity Scoring for Spiritual G-Code.
+Single, configurable scoring engine shared by calculators, AI clients and jobs.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+# Default weights reproduce the original MockGCodeCalculator heuristic
+DEFAULT_SCORE_WEIGHTS = {
+    "base": 50,
+    # Points per aspect type
+    "aspects": {
+        "conjunction": 5,
+        "opposition": 5,
+        "square": 5,
+        "trine": 3,
+        "sextile": 3,
+    },
+    # Extra points per aspect made by a transiting body
+    "bodies": {
+        "uranus": 7,
+        "neptune": 7,
+        "pluto": 7,
+        "moon": 4,
+    },
+    # Linear orb falloff: an aspect at max_orb keeps (1 - falloff) of its points
+    "orb_falloff": 0.0,
+    "max_orb": 8.0,
+    "min_score": 1,
+    "max_score": 100,
+}
+
+# Lower bound of each intensity level
+INTENSITY_LEVELS = [
+    (75, "intense"),
+    (50, "high"),
+    (25, "medium"),
+    (0, "low"),
+]
+
+
+class GCodeScorer:
+    """
+    Vectorized G-Code intensity scorer.
+
+    Aspects are encoded into integer/float arrays and scored with numpy, so a
+    whole batch (many users, many days) is a single pass.
+    """
+
+    def __init__(self, weights: Optional[Dict] = None):
+        """
+        Initialize the scorer.
+
+        Args:
+            weights: Partial weight table merged over DEFAULT_SCORE_WEIGHTS
+        """
+        self.weights = self._merge_weights(weights or {})
+
+        self._aspect_codes = {
+            name: code for code, name in enumerate(self.weights["aspects"], start=1)
+        }
+        self._body_codes = {
+            name: code for code, name in enumerate(self.weights["bodies"], start=1)
+        }
+        # Code 0 is "unweighted" in both lookup tables
+        self._aspect_weights = np.array(
+            [0.0] + [float(w) for w in self.weights["aspects"].values()]
+        )
+        self._body_weights = np.array(
+            [0.0] + [float(w) for w in self.weights["bodies"].values()]
+        )
+
+    def score(self, aspects: List[Dict]) -> int:
+        """
+        Score one chart's aspects.
+
+        Args:
+            aspects: Aspect dictionaries with "aspect", "transit_planet", "orb"
+
+        Returns:
+            Intensity score (min_score-max_score)
+        """
+        return self.score_many([aspects])[0]
+
+    def score_many(self, aspect_lists: Iterable[List[Dict]]) -> List[int]:
+        """
+        Score many charts' aspects in one vectorized pass.
+
+        Args:
+            aspect_lists: One aspect list per user/day
+
+        Returns:
+            Scores in the same order
+        """
+        aspect_codes, body_codes, orbs, groups = [], [], [], []
+        count = 0
+        for group, aspects in enumerate(aspect_lists):
+            count += 1
+            for aspect in aspects or []:
+                aspect_codes.append(self._aspect_codes.get(aspect.get("aspect"), 0))
+                body_codes.append(self._body_codes.get(aspect.get("transit_planet"), 0))
+                orbs.append(aspect.get("orb") or 0.0)
+                groups.append(group)
+
+        return self.score_arrays(
+            np.array(aspect_codes, dtype=np.intp),
+            np.array(body_codes, dtype=np.intp),
+            np.array(orbs, dtype=float),
+            np.array(groups, dtype=np.intp),
+            count,
+        ).tolist()
+
+    def score_arrays(
+        self,
+        aspect_codes: np.ndarray,
+        body_codes: np.ndarray,
+        orbs: np.ndarray,
+        groups: np.ndarray,
+        group_count: int,
+    ) -> np.ndarray:
+        """
+        Score pre-encoded aspect arrays.
+
+        Args:
+            aspect_codes: Aspect type code per aspect (see encode_aspect)
+            body_codes: Transiting body code per aspect
+            orbs: Orb in degrees per aspect
+            groups: Index of the chart each aspect belongs to
+            group_count: Number of charts
+
+        Returns:
+            Integer score per chart
+        """
+        points = self._aspect_weights[aspect_codes] + self._body_weights[body_codes]
+
+        falloff = float(self.weights["orb_falloff"])
+        if falloff:
+            ratio = np.clip(orbs / float(self.weights["max_orb"]), 0.0, 1.0)
+            points = points * (1.0 - falloff * ratio)
+
+        totals = self.weights["base"] + np.bincount(
+            groups, weights=points, minlength=group_count
+        )
+        totals = np.clip(
+            np.rint(totals), self.weights["min_score"], self.weights["max_score"]
+        )
+        return totals.astype(int)
+
+    def encode_aspect(self, aspect: str, transit_planet: str) -> tuple:
+        """Get the (aspect_code, body_code) pair used by score_arrays."""
+        return (
+            self._aspect_codes.get(aspect, 0),
+            self._body_codes.get(transit_planet, 0),
+        )
+
+    def intensity_level(self, score: int) -> str:
+        """Convert a numeric score to an intensity level."""
+        for threshold, level in INTENSITY_LEVELS:
+            if score >= threshold:
+                return level
+        return "low"
+
+    def _merge_weights(self, overrides: Dict) -> Dict:
+        """Merge partial overrides (nested for aspects/bodies) over defaults."""
+        weights = {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in DEFAULT_SCORE_WEIGHTS.items()
+        }
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(weights.get(key), dict):
+                weights[key].update(value)
+            else:
+                weights[key] = value
+        return weights
+
+
+# Singleton instance
+_scorer_instance = None
+
+
+def get_gcode_scorer() -> GCodeScorer:
+    """Get or create the scorer configured by settings.GCODE_SCORE_WEIGHTS."""
+    global _scorer_instance
+    if _scorer_instance is None:
+        # Calculators are also used standalone (scripts) without Django settings
+        weights = (
+            getattr(settings, "GCODE_SCORE_WEIGHTS", None)
+            if settings.configured
+            else None
+        )
+        _scorer_instance = GCodeScorer(weights)
+    return _scorer_instance
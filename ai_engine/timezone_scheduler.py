@@ -0,0 +1,292 @@
+"""
+Timezone-Rolling Scheduler for Spiritual G-Code.
+Buckets users by timezone and calculates each bucket's Daily G-Code shortly
+before that bucket's local midnight, so the nightly load spreads over the
+day and every user gets the G-Code of their own local date.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .batch_metrics import save_batch_report
+from .fingerprints import stable_hash
+from .nightly_batch import NightlyGCodeBatch, log_batch_summary
+from .run_ledger import DEFAULT_JOB, RunLedger
+
+logger = logging.getLogger(__name__)
+
+# Minutes before local midnight a bucket becomes due
+DEFAULT_LEAD_MINUTES = 60
+
+# Buckets start up to this many extra minutes early (stable per bucket/day)
+DEFAULT_JITTER_MINUTES = 45
+
+# Chunk tasks of one bucket running at the same time (Celery path)
+DEFAULT_BUCKET_CONCURRENCY = 2
+
+# Hours after local midnight a missed bucket is still caught up
+CATCH_UP_HOURS = 6
+
+# A running bucket not updated for this long is treated as crashed
+STALE_RUN_MINUTES = 30
+
+# Cache lock preventing two scheduler ticks dispatching the same bucket
+BUCKET_LOCK_PREFIX = "gcode_bucket"
+BUCKET_LOCK_TIMEOUT = 60 * 15
+
+
+def bucket_job(tz_name: str) -> str:
+    """Ledger job name of a timezone bucket."""
+    return f"{DEFAULT_JOB}@{tz_name}"
+
+
+def get_zone(tz_name: str):
+    """Get a timezone by name, falling back to UTC for unknown names."""
+    try:
+        return ZoneInfo(tz_name)
+    except Exception:
+        return dt_timezone.utc
+
+
+class TimezoneScheduler:
+    """
+    Decides which timezone buckets are due and processes them.
+
+    Called every few minutes (cron or Celery beat); each call is a "tick".
+    """
+
+    def __init__(
+        self,
+        lead_minutes: Optional[int] = None,
+        jitter_minutes: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        batch: Optional[NightlyGCodeBatch] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            lead_minutes: Minutes before local midnight a bucket is due
+            jitter_minutes: Maximum extra minutes a bucket starts early
+            concurrency: Chunk tasks per bucket running at once (Celery path)
+            batch: Batch used for in-process runs
+        """
+        self.lead = timedelta(
+            minutes=lead_minutes
+            if lead_minutes is not None
+            else getattr(settings, "GCODE_SCHEDULER_LEAD_MINUTES", DEFAULT_LEAD_MINUTES)
+        )
+        self.jitter_minutes = (
+            jitter_minutes
+            if jitter_minutes is not None
+            else getattr(
+                settings, "GCODE_SCHEDULER_JITTER_MINUTES", DEFAULT_JITTER_MINUTES
+            )
+        )
+        self.concurrency = concurrency or getattr(
+            settings, "GCODE_BUCKET_CONCURRENCY", DEFAULT_BUCKET_CONCURRENCY
+        )
+        self._batch = batch
+
+    @property
+    def batch(self) -> NightlyGCodeBatch:
+        """Batch for in-process runs (created on first use)."""
+        if self._batch is None:
+            from .nightly_batch import get_nightly_ai_client
+
+            self._batch = NightlyGCodeBatch(ai_client=get_nightly_ai_client())
+        return self._batch
+
+    def buckets(self) -> Dict[str, int]:
+        """Eligible user counts per timezone (one query)."""
+        from api.models import GCodeUser
+
+        rows = (
+            GCodeUser.objects.filter(
+                daily_gcode_enabled=True,
+                is_active=True,
+                natal_chart__isnull=False,
+            )
+            .values("timezone")
+            .annotate(users=Count("pk"))
+        )
+        return {row["timezone"]: row["users"] for row in rows}
+
+    def next_run(self, tz_name: str, now: datetime) -> Dict:
+        """
+        Get a bucket's next local day and when to calculate it.
+
+        Args:
+            tz_name: Bucket timezone
+            now: Current time (aware)
+
+        Returns:
+            Dictionary with target_date (the bucket's next local day),
+            midnight and run_at (aware datetimes)
+        """
+        zone = get_zone(tz_name)
+        target_date = now.astimezone(zone).date() + timedelta(days=1)
+        midnight = datetime.combine(target_date, time.min, tzinfo=zone)
+        return {
+            "target_date": target_date,
+            "midnight": midnight,
+            "run_at": midnight - self.lead - self.jitter(tz_name, target_date),
+        }
+
+    def jitter(self, tz_name: str, target_date: date) -> timedelta:
+        """Stable per-bucket, per-day offset spreading same-offset buckets."""
+        if not self.jitter_minutes:
+            return timedelta()
+        seconds = int(stable_hash(f"{tz_name}:{target_date}"), 16) % (
+            self.jitter_minutes * 60
+        )
+        return timedelta(seconds=seconds)
+
+    def due_buckets(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Get the buckets to process now.
+
+        A bucket is due once its run time has passed, until a completed run
+        exists for its target date; buckets still running are skipped
+        unless their run looks crashed.
+
+        Args:
+            now: Current time (defaults to now)
+
+        Returns:
+            List of {"timezone", "target_date", "run_at", "users"}
+        """
+        from api.models import BatchRun
+
+        now = now or timezone.now()
+        due = []
+        for tz_name, users in self.buckets().items():
+            plan = self.next_run(tz_name, now)
+            # A missed run for the local day that just started is caught up
+            previous = self.next_run(tz_name, now - timedelta(days=1))
+            if now >= previous["midnight"] + timedelta(hours=CATCH_UP_HOURS):
+                previous = None
+            for candidate in (previous, plan):
+                if candidate and now >= candidate["run_at"]:
+                    due.append(
+                        {
+                            "timezone": tz_name,
+                            "target_date": candidate["target_date"],
+                            "run_at": candidate["run_at"],
+                            "users": users,
+                        }
+                    )
+
+        if not due:
+            return []
+
+        runs = BatchRun.objects.filter(
+            job__in={bucket_job(b["timezone"]) for b in due},
+            target_date__in={b["target_date"] for b in due},
+        ).values("job", "target_date", "status", "updated_at")
+        stale = now - timedelta(minutes=STALE_RUN_MINUTES)
+        skip = {
+            (run["job"], run["target_date"])
+            for run in runs
+            if run["status"] == "completed"
+            or (run["status"] == "running" and run["updated_at"] > stale)
+        }
+        return sorted(
+            (
+                b
+                for b in due
+                if (bucket_job(b["timezone"]), b["target_date"]) not in skip
+            ),
+            key=lambda b: b["run_at"],
+        )
+
+    def tick(
+        self, now: Optional[datetime] = None, use_celery: Optional[bool] = None
+    ) -> List[Dict]:
+        """
+        Process every due bucket.
+
+        Args:
+            now: Current time (defaults to now)
+            use_celery: Dispatch buckets to Celery (defaults to
+                GCODE_NIGHTLY_USE_CELERY)
+
+        Returns:
+            One result dictionary per bucket processed or dispatched
+        """
+        if use_celery is None:
+            use_celery = settings.GCODE_NIGHTLY_USE_CELERY
+
+        results = []
+        for bucket in self.due_buckets(now):
+            tz_name, target_date = bucket["timezone"], bucket["target_date"]
+            lock = f"{BUCKET_LOCK_PREFIX}:{tz_name}:{target_date.isoformat()}"
+            if not cache.add(lock, True, BUCKET_LOCK_TIMEOUT):
+                continue
+
+            if use_celery:
+                from api.tasks import run_timezone_bucket
+
+                run_timezone_bucket.delay(tz_name, target_date.isoformat())
+                result = {"dispatched": True}
+            else:
+                result = self.process_bucket(tz_name, target_date)
+            result.update(timezone=tz_name, target_date=target_date.isoformat())
+            results.append(result)
+
+        return results
+
+    def process_bucket(self, tz_name: str, target_date: date) -> Dict:
+        """
+        Calculate one bucket in this process, checkpointed in its ledger.
+
+        Args:
+            tz_name: Bucket timezone
+            target_date: The bucket's local date to calculate
+
+        Returns:
+            Dictionary with users, success, errors and chunks counts
+        """
+        users = self.batch.eligible_users().filter(timezone=tz_name)
+        ledger = RunLedger.start(target_date, users, job=bucket_job(tz_name))
+        logger.info(f"Processing {tz_name} bucket for {target_date}")
+
+        try:
+            stats = self.batch.run(target_date, users=users, ledger=ledger)
+        except Exception:
+            ledger.finish("failed")
+            raise
+        ledger.finish()
+        log_batch_summary(stats)
+        save_batch_report(self.batch.metrics, target_date, stats, ledger.run.run_id)
+        return stats
+
+    def schedule(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Get every bucket's next run, soonest first.
+
+        Returns:
+            List of {"timezone", "users", "target_date", "run_at"} with ISO
+            strings, run_at in UTC
+        """
+        now = now or timezone.now()
+        plans = []
+        for tz_name, users in self.buckets().items():
+            plan = self.next_run(tz_name, now)
+            plans.append(
+                {
+                    "timezone": tz_name,
+                    "users": users,
+                    "target_date": plan["target_date"].isoformat(),
+                    "run_at": plan["run_at"].astimezone(dt_timezone.utc).isoformat(),
+                }
+            )
+        return sorted(plans, key=lambda p: p["run_at"])
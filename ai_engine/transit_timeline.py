@@ -0,0 +1,622 @@
+"""
+Transit Timeline for Spiritual G-Code.
+Precomputes each user's transit-to-natal aspects as date intervals
+(start, exact, end) over a rolling 12-month horizon. Timelines are built and
+rolled forward by the nightly batch; request paths only read them and
+calculate just the days a stored timeline doesn't cover.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+
+from .fingerprints import birth_data_fingerprint
+from .intervals import IntervalIndex
+from .mock_calculator import MockGCodeCalculator
+from .scoring import get_gcode_scorer
+
+# Rolling horizon (days of history kept for trend charts, days ahead)
+TIMELINE_LOOKBACK_DAYS = 7
+TIMELINE_HORIZON_DAYS = 365
+
+# Cache settings for loaded timelines
+TIMELINE_CACHE_PREFIX = "transit_timeline"
+TIMELINE_CACHE_TIMEOUT = 60 * 60 * 24  # Horizon rolls daily
+TIMELINE_INDEX_MEMO_SIZE = 64
+
+# Days of transit positions kept in memory, shared by every user's timeline
+POSITION_MEMO_DAYS = 800
+
+# TransitTimeline fields written when a timeline is built or rolled
+TIMELINE_FIELDS = [
+    "horizon_start",
+    "horizon_end",
+    "birth_fingerprint",
+    "intervals",
+    "updated_at",
+]
+
+
+def pack_intervals(intervals: List[Dict], origin: date) -> List[Dict]:
+    """
+    Pack interval dictionaries into one record per aspect for storage.
+
+    Each record holds the aspect's runs as [start, length, exact, orb]: start
+    in days from origin, exact in days from start. This keeps timelines of
+    many short runs compact.
+
+    Args:
+        intervals: Interval dictionaries
+        origin: Day the offsets count from (the horizon start)
+
+    Returns:
+        Records sorted by aspect
+    """
+    records = {}
+    for interval in intervals:
+        key = (
+            interval["transit_planet"],
+            interval["natal_planet"],
+            interval["aspect"],
+        )
+        record = records.setdefault(
+            key,
+            {
+                "transit_planet": key[0],
+                "natal_planet": key[1],
+                "aspect": key[2],
+                "runs": [],
+            },
+        )
+        start, exact, end = (
+            date.fromisoformat(interval[field]) for field in ("start", "exact", "end")
+        )
+        record["runs"].append(
+            [
+                (start - origin).days,
+                (end - start).days + 1,
+                (exact - start).days,
+                interval["orb"],
+            ]
+        )
+    for record in records.values():
+        record["runs"].sort()
+    return [records[key] for key in sorted(records)]
+
+
+def unpack_intervals(records: List[Dict], origin: date) -> List[Dict]:
+    """Expand stored records (see pack_intervals) into interval dictionaries."""
+    intervals = []
+    for record in records:
+        for offset, length, exact, orb in record["runs"]:
+            start = origin + timedelta(days=offset)
+            intervals.append(
+                {
+                    "transit_planet": record["transit_planet"],
+                    "natal_planet": record["natal_planet"],
+                    "aspect": record["aspect"],
+                    "start": start.isoformat(),
+                    "exact": (start + timedelta(days=exact)).isoformat(),
+                    "end": (start + timedelta(days=length - 1)).isoformat(),
+                    "orb": orb,
+                }
+            )
+    return sorted(intervals, key=lambda i: (i["start"], i["end"]))
+
+
+def is_packed(records: List[Dict]) -> bool:
+    """Whether stored intervals use the packed format (older rows don't)."""
+    return all("runs" in record for record in records)
+
+
+class TransitTimelineCalculator:
+    """
+    Calculator for transit-to-natal aspect intervals.
+
+    Transit positions are sampled once per day and compared with every natal
+    position in one numpy pass; the daily grid and 8 degree orb match
+    calculate_transits, so the aspects active on a day are the same. Daily
+    positions depend only on the date and are shared between users.
+    """
+
+    ASPECT_ANGLES = {
+        "conjunction": 0,
+        "opposition": 180,
+        "trine": 120,
+        "square": 90,
+        "sextile": 60,
+    }
+
+    ORB = 8.0
+
+    def __init__(self, calculator=None, memo_days: int = POSITION_MEMO_DAYS):
+        """
+        Initialize the calculator.
+
+        Args:
+            calculator: Calculator providing calculate_natal_chart and
+                calculate_transit_positions (defaults to the service's mock)
+            memo_days: Days of transit positions kept in memory
+        """
+        self.calculator = calculator or MockGCodeCalculator()
+        self.memo_days = memo_days
+        self._positions: "OrderedDict[date, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def natal_positions(self, user) -> Dict:
+        """Calculate the natal positions transits are compared with."""
+        natal_chart = self.calculator.calculate_natal_chart(
+            user.birth_date,
+            user.birth_time.strftime("%H:%M") if user.birth_time else None,
+            user.birth_location,
+        )
+        return natal_chart["chart_data"]
+
+    def calculate(self, natal_positions: Dict, start: date, end: date) -> List[Dict]:
+        """
+        Calculate aspect intervals between two dates.
+
+        Args:
+            natal_positions: Natal chart positions (body -> longitude)
+            start: First day (inclusive)
+            end: Last day (inclusive)
+
+        Returns:
+            Interval dictionaries sorted by start date
+        """
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if not days:
+            return []
+
+        daily_positions = [self.positions(day) for day in days]
+        transit_names = list(daily_positions[0].keys())
+        natal_names = list(natal_positions.keys())
+
+        # (day, transit body, natal body) angular separation in 0-180
+        transits = np.array(
+            [[p[name]["longitude"] for name in transit_names] for p in daily_positions]
+        )
+        natal = np.array([natal_positions[name]["longitude"] for name in natal_names])
+        separation = np.abs(transits[:, :, None] - natal[None, None, :]) % 360
+        separation = np.where(separation > 180, 360 - separation, separation)
+
+        intervals = []
+        for aspect_name, angle in self.ASPECT_ANGLES.items():
+            orbs = np.abs(separation - angle)
+            for first, last, body, target in self._find_runs(orbs <= self.ORB):
+                run = orbs[first : last + 1, body, target]
+                exact = first + int(np.argmin(run))
+                intervals.append(
+                    {
+                        "transit_planet": transit_names[body],
+                        "natal_planet": natal_names[target],
+                        "aspect": aspect_name,
+                        "start": days[first].isoformat(),
+                        "exact": days[exact].isoformat(),
+                        "end": days[last].isoformat(),
+                        "orb": round(float(run.min()), 2),
+                    }
+                )
+
+        return sorted(intervals, key=lambda i: (i["start"], i["end"]))
+
+    def positions(self, day: date) -> Dict:
+        """Transit positions for a day, calculated once for all users."""
+        with self._lock:
+            if day in self._positions:
+                self._positions.move_to_end(day)
+                return self._positions[day]
+
+        positions = self.calculator.calculate_transit_positions(day)
+        with self._lock:
+            self._positions[day] = positions
+            while len(self._positions) > self.memo_days:
+                self._positions.popitem(last=False)
+        return positions
+
+    def _find_runs(self, active: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Find runs of consecutive active days.
+
+        Args:
+            active: Boolean array shaped (day, transit body, natal body)
+
+        Returns:
+            (first_day, last_day, transit_index, natal_index) per run
+        """
+        padded = np.zeros((active.shape[0] + 2,) + active.shape[1:], dtype=np.int8)
+        padded[1:-1] = active
+        edges = np.diff(padded, axis=0)
+
+        starts = np.argwhere(edges == 1)
+        ends = np.argwhere(edges == -1)
+
+        # Runs alternate start/end per pair, so sorting both by pair lines them up
+        starts = starts[np.lexsort((starts[:, 0], starts[:, 2], starts[:, 1]))]
+        ends = ends[np.lexsort((ends[:, 0], ends[:, 2], ends[:, 1]))]
+
+        return [
+            (int(s[0]), int(e[0]) - 1, int(s[1]), int(s[2]))
+            for s, e in zip(starts, ends)
+        ]
+
+
+class TransitTimelineService:
+    """
+    Shared access to per-user transit timelines.
+
+    Timelines are stored in the TransitTimeline table (packed, see
+    pack_intervals), rolled forward incrementally as the horizon moves and
+    rebuilt when birth data changes. get_timeline builds them (nightly
+    batch); lookups never do, calculating only days no stored timeline covers.
+    """
+
+    def __init__(self, calculator: Optional[TransitTimelineCalculator] = None):
+        """Initialize the service with a timeline calculator."""
+        self.calculator = calculator or TransitTimelineCalculator()
+        self.scorer = get_gcode_scorer()
+        # Built indexes of recently used stored timelines, keyed like the cache
+        self._indexes: "OrderedDict[str, Tuple]" = OrderedDict()
+
+    def get_timeline(self, user, today: Optional[date] = None, force: bool = False):
+        """
+        Get a user's timeline, building or rolling it forward as needed.
+
+        Args:
+            user: GCodeUser instance
+            today: Reference day for the horizon (defaults to today)
+            force: Rebuild the whole horizon
+
+        Returns:
+            TransitTimeline instance covering the current horizon
+        """
+        from api.models import TransitTimeline
+
+        timeline = TransitTimeline.objects.filter(user=user).first()
+        fields = self._rolled_fields(user, timeline, today, force)
+        if fields is None:
+            return timeline
+
+        timeline, _ = TransitTimeline.objects.update_or_create(
+            user=user, defaults=fields
+        )
+        self._forget(user, today)
+        return timeline
+
+    def roll_timelines(self, users: List, today: Optional[date] = None) -> Dict:
+        """
+        Build or roll forward several users' timelines (nightly batch).
+
+        The stored timelines are read with one query and the changed ones
+        written with one upsert, whatever the number of users.
+
+        Args:
+            users: GCodeUser instances
+            today: Reference day for the horizon (defaults to today)
+
+        Returns:
+            Error message per user ID whose timeline could not be calculated
+        """
+        from api.models import TransitTimeline
+
+        if not users:
+            return {}
+
+        stored = {
+            timeline.user_id: timeline
+            for timeline in TransitTimeline.objects.filter(
+                user__in=[user.pk for user in users]
+            )
+        }
+        rows = []
+        failures = {}
+        for user in users:
+            try:
+                fields = self._rolled_fields(user, stored.get(user.pk), today)
+            except Exception as e:
+                failures[user.pk] = str(e)
+                continue
+            if fields is not None:
+                rows.append(TransitTimeline(user=user, **fields))
+
+        if rows:
+            TransitTimeline.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=TIMELINE_FIELDS,
+            )
+            cache_keys = [self._cache_key(row.user, today) for row in rows]
+            cache.delete_many(cache_keys)
+            for cache_key in cache_keys:
+                self._indexes.pop(cache_key, None)
+        return failures
+
+    def intervals(self, timeline) -> List[Dict]:
+        """Get the interval dictionaries of a stored timeline."""
+        return unpack_intervals(timeline.intervals, timeline.horizon_start)
+
+    def get_index(
+        self, user, start: date, end: date, today: Optional[date] = None
+    ) -> IntervalIndex:
+        """
+        Get an interval index covering a date range for a user.
+
+        The stored timeline is used as it is; days it doesn't cover (no
+        timeline yet, changed birth data, or outside its horizon) are
+        calculated in one extra pass and not stored.
+
+        Payloads are interval dictionaries keyed on start/end dates.
+        """
+        index, covered_start, covered_end = self._stored_index(user, today)
+        if covered_start is not None and covered_start <= start and end <= covered_end:
+            return index
+
+        natal = self.calculator.natal_positions(user)
+        # One day of lead-in so runs already active at start keep an earlier start
+        lead_in = start - timedelta(days=1)
+        if covered_start is None:
+            return self._build_index(self.calculator.calculate(natal, lead_in, end))
+
+        intervals = [dict(interval) for _, _, interval in index]
+        if start < covered_start:
+            # Stored runs are clipped at the seam so days aren't counted twice
+            head = self.calculator.calculate(natal, lead_in, covered_start)
+            seam = covered_start.isoformat()
+            clipped = [
+                {**interval, "start": max(interval["start"], seam)}
+                for interval in intervals
+            ]
+            intervals = self._merge(head, clipped, covered_start)
+        if end > covered_end:
+            tail = self.calculator.calculate(natal, covered_end, end)
+            intervals = self._merge(intervals, tail, covered_end)
+        return self._build_index(intervals)
+
+    def active_on(self, user, day: date, today: Optional[date] = None) -> List[Dict]:
+        """Get the aspect intervals active on a day."""
+        return self.get_index(user, day, day, today).at(day)
+
+    def upcoming(
+        self, user, start: date, days: int = 30, today: Optional[date] = None
+    ) -> List[Dict]:
+        """Get the aspect intervals beginning within the next N days."""
+        end = start + timedelta(days=days)
+        return self.get_index(user, start, end, today).starting_between(start, end)
+
+    def daily_scores(
+        self, user, start: date, end: date, today: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Score every day in a range from the timeline.
+
+        Days outside the stored horizon are calculated in one extra pass
+        (not stored), so callers never need per-day transit calculations.
+
+        Args:
+            user: GCodeUser instance
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            today: Reference day for the horizon (defaults to today)
+
+        Returns:
+            List of {"date", "score", "intensity", "aspects"} per day
+        """
+        index = self.get_index(user, start, end, today)
+
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        active = [index.at(day) for day in days]
+        scores = self.scorer.score_many(
+            [
+                [
+                    {
+                        "aspect": interval["aspect"],
+                        "transit_planet": interval["transit_planet"],
+                        "orb": self._orb_on(interval, day),
+                    }
+                    for interval in intervals
+                ]
+                for day, intervals in zip(days, active)
+            ]
+        )
+
+        return [
+            {
+                "date": day.isoformat(),
+                "score": score,
+                "intensity": self.scorer.intensity_level(score),
+                "aspects": intervals,
+            }
+            for day, score, intervals in zip(days, scores, active)
+        ]
+
+    def horizon(self, today: Optional[date] = None) -> Tuple[date, date]:
+        """Get the (start, end) of the rolling horizon."""
+        today = today or date.today()
+        return (
+            today - timedelta(days=TIMELINE_LOOKBACK_DAYS),
+            today + timedelta(days=TIMELINE_HORIZON_DAYS),
+        )
+
+    def _rolled_fields(
+        self, user, timeline, today: Optional[date] = None, force: bool = False
+    ) -> Optional[Dict]:
+        """
+        Calculate the fields of a user's timeline for the current horizon.
+
+        Args:
+            user: GCodeUser instance
+            timeline: The user's stored TransitTimeline, or None
+            today: Reference day for the horizon (defaults to today)
+            force: Rebuild the whole horizon
+
+        Returns:
+            TransitTimeline field values, or None if the stored timeline
+            already covers the horizon
+        """
+        start, end = self.horizon(today)
+        fingerprint = birth_data_fingerprint(user)
+
+        if (
+            timeline is None
+            or force
+            or timeline.birth_fingerprint != fingerprint
+            or not is_packed(timeline.intervals)
+            or timeline.horizon_start > start
+            or timeline.horizon_end < start
+        ):
+            natal = self.calculator.natal_positions(user)
+            intervals = self.calculator.calculate(natal, start, end)
+            horizon_end = end
+        elif timeline.horizon_start == start and timeline.horizon_end >= end:
+            return None
+        else:
+            # Drop intervals that ended before the horizon and extend the tail
+            intervals = [
+                i for i in self.intervals(timeline) if i["end"] >= start.isoformat()
+            ]
+            horizon_end = timeline.horizon_end
+            if horizon_end < end:
+                natal = self.calculator.natal_positions(user)
+                tail = self.calculator.calculate(natal, horizon_end, end)
+                intervals = self._merge(intervals, tail, horizon_end)
+                horizon_end = end
+
+        return {
+            "horizon_start": start,
+            "horizon_end": horizon_end,
+            "birth_fingerprint": fingerprint,
+            "intervals": pack_intervals(intervals, start),
+        }
+
+    def _forget(self, user, today: Optional[date] = None) -> None:
+        """Drop a user's cached timeline and index after it was written."""
+        cache_key = self._cache_key(user, today)
+        cache.delete(cache_key)
+        self._indexes.pop(cache_key, None)
+
+    def _merge(self, intervals: List[Dict], tail: List[Dict], seam: date) -> List[Dict]:
+        """Join intervals running across the seam between old and new ranges."""
+        seam = seam.isoformat()
+        open_at_seam = {
+            self._key(interval): interval
+            for interval in intervals
+            if interval["end"] == seam
+        }
+
+        merged = list(intervals)
+        for interval in tail:
+            previous = open_at_seam.get(self._key(interval))
+            if previous is None or interval["start"] != seam:
+                merged.append(interval)
+                continue
+            previous["end"] = interval["end"]
+            if interval["orb"] < previous["orb"]:
+                previous["exact"] = interval["exact"]
+                previous["orb"] = interval["orb"]
+
+        return sorted(merged, key=lambda i: (i["start"], i["end"]))
+
+    def _key(self, interval: Dict) -> Tuple[str, str, str]:
+        """Identity of an aspect independent of its timing."""
+        return (
+            interval["transit_planet"],
+            interval["natal_planet"],
+            interval["aspect"],
+        )
+
+    def _orb_on(self, interval: Dict, day: date) -> float:
+        """
+        Estimate an aspect's orb on a day.
+
+        Linear between the exact day (minimum orb) and the interval edge
+        (maximum orb); only used when scoring with orb falloff.
+        """
+        exact = date.fromisoformat(interval["exact"])
+        edge = date.fromisoformat(interval["start" if day < exact else "end"])
+        span = abs((edge - exact).days) + 1
+        ratio = abs((day - exact).days) / span
+        orb = interval["orb"]
+        return orb + (self.calculator.ORB - orb) * ratio
+
+    def _as_intervals(self, intervals: List[Dict]):
+        """Convert interval dictionaries into (start, end, payload) tuples."""
+        for interval in intervals:
+            yield (
+                date.fromisoformat(interval["start"]),
+                date.fromisoformat(interval["end"]),
+                interval,
+            )
+
+    def _stored_index(self, user, today: Optional[date] = None) -> Tuple:
+        """
+        Get the index of a user's stored timeline (read only, never built).
+
+        Returns:
+            (index, covered_start, covered_end); the bounds are None when
+            there is no usable stored timeline
+        """
+        from api.models import TransitTimeline
+
+        cache_key = self._cache_key(user, today)
+        if cache_key in self._indexes:
+            self._indexes.move_to_end(cache_key)
+            return self._indexes[cache_key]
+
+        stored = cache.get(cache_key)
+        if stored is None:
+            timeline = TransitTimeline.objects.filter(user=user).first()
+            if (
+                timeline is not None
+                and timeline.birth_fingerprint == birth_data_fingerprint(user)
+                and is_packed(timeline.intervals)
+            ):
+                stored = (
+                    timeline.horizon_start,
+                    timeline.horizon_end,
+                    timeline.intervals,
+                )
+            else:
+                stored = (None, None, [])
+            cache.set(cache_key, stored, TIMELINE_CACHE_TIMEOUT)
+
+        covered_start, covered_end, records = stored
+        entry = (
+            self._build_index(
+                unpack_intervals(records, covered_start) if records else []
+            ),
+            covered_start,
+            covered_end,
+        )
+        self._indexes[cache_key] = entry
+        if len(self._indexes) > TIMELINE_INDEX_MEMO_SIZE:
+            self._indexes.popitem(last=False)
+        return entry
+
+    def _cache_key(self, user, today: Optional[date] = None) -> str:
+        """Cache key of a user's stored timeline for the current horizon."""
+        start, _ = self.horizon(today)
+        return (
+            f"{TIMELINE_CACHE_PREFIX}:{user.pk}:"
+            f"{birth_data_fingerprint(user)}:{start.isoformat()}"
+        )
+
+    def _build_index(self, intervals: List[Dict]) -> IntervalIndex:
+        """Build an interval index over interval dictionaries."""
+        return IntervalIndex(self._as_intervals(intervals))
+
+
+# Singleton instance
+_timeline_instance = None
+
+
+def get_transit_timeline() -> TransitTimelineService:
+    """Get or create the transit timeline service instance."""
+    global _timeline_instance
+    if _timeline_instance is None:
+        _timeline_instance = TransitTimelineService()
+    return _timeline_instance
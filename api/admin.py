@@ -6,12 +6,17 @@ from django.contrib import admin
 from django.utils.html import format_html
 
 from .models import (
+    BatchRun,
+    CelestialEvent,
+    CollectiveSky,
     DailyTransit,
     GCodeTemplate,
     GCodeUser,
     GeneratedContent,
     NatalChart,
+    RetrogradePeriod,
     SystemLog,
+    TransitTimeline,
     UserActivity,
 )
 
@@ -145,6 +150,60 @@ class GCodeTemplateAdmin(admin.ModelAdmin):
     readonly_fields = ["created_at", "updated_at"]
 
 
+@admin.register(CelestialEvent)
+class CelestialEventAdmin(admin.ModelAdmin):
+    """Admin interface for Celestial Events."""
+
+    list_display = ["event_type", "starts_at", "ends_at", "sign", "year"]
+    list_filter = ["event_type", "year"]
+    search_fields = ["sign"]
+    readonly_fields = ["calculated_at"]
+
+
+@admin.register(RetrogradePeriod)
+class RetrogradePeriodAdmin(admin.ModelAdmin):
+    """Admin interface for Retrograde Periods."""
+
+    list_display = ["body", "station_retrograde", "station_direct", "year"]
+    list_filter = ["body", "year"]
+    readonly_fields = ["calculated_at"]
+
+
+@admin.register(CollectiveSky)
+class CollectiveSkyAdmin(admin.ModelAdmin):
+    """Admin interface for Collective Sky snapshots."""
+
+    list_display = ["snapshot_date", "intensity_score", "intensity_level"]
+    list_filter = ["intensity_level"]
+    readonly_fields = ["calculated_at"]
+
+
+@admin.register(TransitTimeline)
+class TransitTimelineAdmin(admin.ModelAdmin):
+    """Admin interface for Transit Timelines."""
+
+    list_display = ["user", "horizon_start", "horizon_end", "updated_at"]
+    search_fields = ["user__username"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
+@admin.register(BatchRun)
+class BatchRunAdmin(admin.ModelAdmin):
+    """Admin interface for Batch Runs."""
+
+    list_display = [
+        "target_date",
+        "job",
+        "status",
+        "success_count",
+        "error_count",
+        "total_users",
+        "started_at",
+    ]
+    list_filter = ["job", "status"]
+    readonly_fields = ["run_id", "started_at", "updated_at", "finished_at"]
+
+
 @admin.register(UserActivity)
 class UserActivityAdmin(admin.ModelAdmin):
     """Admin interface for User Activities."""
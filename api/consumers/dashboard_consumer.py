@@ -5,6 +5,7 @@ Handles real-time dashboard updates.
 
 import json
 import logging
+from datetime import date
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.utils import timezone
@@ -85,6 +86,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         - ping: Keep-alive message
         - subscribe: Subscribe to specific updates
         - unsubscribe: Unsubscribe from updates
+        - request_gcode: Calculate the daily G-Code (optional "date")
         """
         try:
             data = json.loads(text_data)
@@ -109,6 +111,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
                     )
                 )
 
+            elif message_type == "request_gcode":
+                await self.send_daily_gcode(data.get("date"))
+
             else:
                 logger.warning(f"Unknown message type: {message_type}")
 
@@ -117,6 +122,47 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         except Exception as e:
             logger.error(f"Error receiving WebSocket message: {str(e)}")
 
+    async def send_daily_gcode(self, target_date=None):
+        """
+        Calculate the user's daily G-Code without blocking the event loop.
+
+        Args:
+            target_date: ISO date string (defaults to today)
+        """
+        from ai_engine.async_daily_gcode_service import get_async_daily_gcode_service
+
+        try:
+            service = get_async_daily_gcode_service()
+            day = date.fromisoformat(target_date) if target_date else None
+            daily_gcode = await service.acalculate_daily_gcode_for_user(self.user, day)
+            await self.send(
+                text_data=json.dumps(
+                    {"type": "daily_gcode", "data": daily_gcode}, default=str
+                )
+            )
+
+        except Exception as e:
+            logger.error(f"Error calculating daily G-Code: {str(e)}")
+            await self.send(text_data=json.dumps({"type": "error", "message": str(e)}))
+
+    async def content_stream(self, event):
+        """
+        Forward streamed content generation events from the channel layer.
+
+        Event structure (see api.tasks.stream_generated_content):
+        {
+            'type': 'content_stream',
+            'stream_id': '...',
+            'event': 'start' | 'chunk' | 'done' | 'error',
+            ...
+        }
+        """
+        try:
+            await self.send(text_data=json.dumps(event, default=str))
+
+        except Exception as e:
+            logger.error(f"Error sending content stream: {str(e)}")
+
     async def dashboard_update(self, event):
         """
         Handle dashboard update events from channel layer.
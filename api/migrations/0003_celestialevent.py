@@ -0,0 +1,84 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0002_chartannotation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CelestialEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("new_moon", "New Moon"),
+                            ("first_quarter", "First Quarter"),
+                            ("full_moon", "Full Moon"),
+                            ("last_quarter", "Last Quarter"),
+                            ("solar_eclipse", "Solar Eclipse"),
+                            ("lunar_eclipse", "Lunar Eclipse"),
+                            ("void_of_course", "Void-of-Course Moon"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "year",
+                    models.IntegerField(db_index=True, help_text="Calendar year (UTC)"),
+                ),
+                (
+                    "starts_at",
+                    models.DateTimeField(
+                        help_text="Exact time of the event, or start of the window"
+                    ),
+                ),
+                (
+                    "ends_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="End of the window (void-of-course only)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "sign",
+                    models.CharField(
+                        help_text="Zodiac sign of the event", max_length=20
+                    ),
+                ),
+                (
+                    "longitude",
+                    models.FloatField(help_text="Ecliptic longitude in degrees"),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Event details (node distance, last aspect)",
+                        null=True,
+                    ),
+                ),
+                ("calculated_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Celestial Event",
+                "verbose_name_plural": "Celestial Events",
+                "db_table": "celestial_events",
+                "ordering": ["starts_at"],
+            },
+        ),
+    ]
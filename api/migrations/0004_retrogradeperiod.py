@@ -0,0 +1,81 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0003_celestialevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RetrogradePeriod",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "body",
+                    models.CharField(
+                        choices=[
+                            ("mercury", "Mercury"),
+                            ("venus", "Venus"),
+                            ("mars", "Mars"),
+                            ("jupiter", "Jupiter"),
+                            ("saturn", "Saturn"),
+                            ("uranus", "Uranus"),
+                            ("neptune", "Neptune"),
+                            ("pluto", "Pluto"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "year",
+                    models.IntegerField(
+                        db_index=True, help_text="Calendar year (UTC) the cycle touches"
+                    ),
+                ),
+                (
+                    "pre_shadow_start",
+                    models.DateTimeField(
+                        help_text="Body first reaches the station-direct degree"
+                    ),
+                ),
+                ("station_retrograde", models.DateTimeField()),
+                ("station_direct", models.DateTimeField()),
+                (
+                    "post_shadow_end",
+                    models.DateTimeField(
+                        help_text="Body returns to the station-retrograde degree"
+                    ),
+                ),
+                (
+                    "retrograde_longitude",
+                    models.FloatField(
+                        help_text="Ecliptic longitude at the retrograde station"
+                    ),
+                ),
+                (
+                    "direct_longitude",
+                    models.FloatField(
+                        help_text="Ecliptic longitude at the direct station"
+                    ),
+                ),
+                ("calculated_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Retrograde Period",
+                "verbose_name_plural": "Retrograde Periods",
+                "db_table": "retrograde_periods",
+                "ordering": ["pre_shadow_start"],
+            },
+        ),
+    ]
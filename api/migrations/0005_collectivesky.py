@@ -0,0 +1,72 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0004_retrogradeperiod"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectiveSky",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("snapshot_date", models.DateField(db_index=True, unique=True)),
+                ("positions", models.JSONField(help_text="Transiting body positions")),
+                (
+                    "mundane_aspects",
+                    models.JSONField(
+                        default=list, help_text="Aspects between transiting bodies"
+                    ),
+                ),
+                (
+                    "ingresses",
+                    models.JSONField(
+                        default=list,
+                        help_text="Bodies that changed sign since the previous day",
+                    ),
+                ),
+                (
+                    "retrogrades",
+                    models.JSONField(
+                        default=dict, help_text="Retrograde and shadow phase per body"
+                    ),
+                ),
+                (
+                    "intensity_score",
+                    models.IntegerField(
+                        help_text="Collective G-Code intensity score (1-100)"
+                    ),
+                ),
+                (
+                    "intensity_level",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("intense", "Intense"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("calculated_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Collective Sky",
+                "verbose_name_plural": "Collective Sky Snapshots",
+                "db_table": "collective_sky",
+                "ordering": ["-snapshot_date"],
+            },
+        ),
+    ]
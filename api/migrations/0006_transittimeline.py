@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0005_collectivesky"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransitTimeline",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("horizon_start", models.DateField(help_text="First day covered")),
+                ("horizon_end", models.DateField(help_text="Last day covered")),
+                (
+                    "birth_fingerprint",
+                    models.CharField(
+                        help_text="Hash of the birth data the timeline was built from",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "intervals",
+                    models.JSONField(
+                        default=list,
+                        help_text="Aspect intervals (transit/natal body, aspect, start, exact, end)",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transit_timeline",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Transit Timeline",
+                "verbose_name_plural": "Transit Timelines",
+                "db_table": "transit_timelines",
+            },
+        ),
+    ]
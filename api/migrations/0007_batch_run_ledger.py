@@ -0,0 +1,113 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:43
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0006_transittimeline"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BatchRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "run_id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("job", models.CharField(default="daily_gcode", max_length=50)),
+                ("target_date", models.DateField(db_index=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="running",
+                        max_length=20,
+                    ),
+                ),
+                ("total_users", models.IntegerField(default=0)),
+                ("success_count", models.IntegerField(default=0)),
+                ("error_count", models.IntegerField(default=0)),
+                (
+                    "last_user_id",
+                    models.BigIntegerField(
+                        blank=True,
+                        help_text="Checkpoint: last user processed in order",
+                        null=True,
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Batch Run",
+                "verbose_name_plural": "Batch Runs",
+                "db_table": "batch_runs",
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="BatchRunItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("success", "Success"), ("error", "Error")],
+                        max_length=20,
+                    ),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+                ("processed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="api.batchrun",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="batch_run_items",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Batch Run Item",
+                "verbose_name_plural": "Batch Run Items",
+                "db_table": "batch_run_items",
+                "unique_together": {("run", "user")},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0007_batch_run_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailytransit",
+            name="input_fingerprint",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Fingerprint of the inputs the row was calculated from",
+                max_length=16,
+            ),
+        ),
+    ]
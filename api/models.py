@@ -123,7 +123,7 @@ class NatalChart(models.Model):
 class DailyTransit(models.Model):
     """
     Daily transit calculations and interpretations.
-    Generated automatically at 4:00 AM every day.
+    Precomputed nightly for a rolling horizon of upcoming days.
     """
 
     user = models.ForeignKey(
@@ -167,6 +167,14 @@ class DailyTransit(models.Model):
 
     practical_guidance = models.JSONField(help_text="Array of practical guidance tips")
 
+    # Precompute horizon
+    input_fingerprint = models.CharField(
+        max_length=16,
+        blank=True,
+        default="",
+        help_text="Fingerprint of the inputs the row was calculated from",
+    )
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -325,6 +333,262 @@ class GCodeTemplate(models.Model):
         return f"{self.category}: {self.name}"
 
 
+class CelestialEvent(models.Model):
+    """
+    Precomputed celestial events (lunations, eclipses, void-of-course Moon).
+    Shared by all users; computed once per year.
+    """
+
+    EVENT_TYPE_CHOICES = [
+        ("new_moon", "New Moon"),
+        ("first_quarter", "First Quarter"),
+        ("full_moon", "Full Moon"),
+        ("last_quarter", "Last Quarter"),
+        ("solar_eclipse", "Solar Eclipse"),
+        ("lunar_eclipse", "Lunar Eclipse"),
+        ("void_of_course", "Void-of-Course Moon"),
+    ]
+
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    year = models.IntegerField(db_index=True, help_text="Calendar year (UTC)")
+
+    # Timing
+    starts_at = models.DateTimeField(
+        help_text="Exact time of the event, or start of the window"
+    )
+    ends_at = models.DateTimeField(
+        null=True, blank=True, help_text="End of the window (void-of-course only)"
+    )
+
+    # Position
+    sign = models.CharField(max_length=20, help_text="Zodiac sign of the event")
+    longitude = models.FloatField(help_text="Ecliptic longitude in degrees")
+
+    # Additional Data
+    data = models.JSONField(
+        null=True, blank=True, help_text="Event details (node distance, last aspect)"
+    )
+
+    # Metadata
+    calculated_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "celestial_events"
+        verbose_name = "Celestial Event"
+        verbose_name_plural = "Celestial Events"
+        ordering = ["starts_at"]
+
+    def __str__(self):
+        return f"{self.event_type} at {self.starts_at:%Y-%m-%d %H:%M}"
+
+
+class RetrogradePeriod(models.Model):
+    """
+    Precomputed retrograde cycles with pre- and post-shadow periods.
+    Shared by all users; computed once per year.
+    """
+
+    BODY_CHOICES = [
+        ("mercury", "Mercury"),
+        ("venus", "Venus"),
+        ("mars", "Mars"),
+        ("jupiter", "Jupiter"),
+        ("saturn", "Saturn"),
+        ("uranus", "Uranus"),
+        ("neptune", "Neptune"),
+        ("pluto", "Pluto"),
+    ]
+
+    body = models.CharField(max_length=20, choices=BODY_CHOICES)
+    year = models.IntegerField(
+        db_index=True, help_text="Calendar year (UTC) the cycle touches"
+    )
+
+    # Timing
+    pre_shadow_start = models.DateTimeField(
+        help_text="Body first reaches the station-direct degree"
+    )
+    station_retrograde = models.DateTimeField()
+    station_direct = models.DateTimeField()
+    post_shadow_end = models.DateTimeField(
+        help_text="Body returns to the station-retrograde degree"
+    )
+
+    # Position
+    retrograde_longitude = models.FloatField(
+        help_text="Ecliptic longitude at the retrograde station"
+    )
+    direct_longitude = models.FloatField(
+        help_text="Ecliptic longitude at the direct station"
+    )
+
+    # Metadata
+    calculated_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "retrograde_periods"
+        verbose_name = "Retrograde Period"
+        verbose_name_plural = "Retrograde Periods"
+        ordering = ["pre_shadow_start"]
+
+    def __str__(self):
+        return f"{self.body} retrograde from {self.station_retrograde:%Y-%m-%d}"
+
+
+class CollectiveSky(models.Model):
+    """
+    Daily snapshot of the sky shared by all users.
+    Positions, mundane aspects, ingresses and retrogrades; computed once per day.
+    """
+
+    INTENSITY_CHOICES = [
+        ("low", "Low"),
+        ("medium", "Medium"),
+        ("high", "High"),
+        ("intense", "Intense"),
+    ]
+
+    snapshot_date = models.DateField(unique=True, db_index=True)
+
+    # Sky Data
+    positions = models.JSONField(help_text="Transiting body positions")
+    mundane_aspects = models.JSONField(
+        default=list, help_text="Aspects between transiting bodies"
+    )
+    ingresses = models.JSONField(
+        default=list, help_text="Bodies that changed sign since the previous day"
+    )
+    retrogrades = models.JSONField(
+        default=dict, help_text="Retrograde and shadow phase per body"
+    )
+
+    # Collective Intensity
+    intensity_score = models.IntegerField(
+        help_text="Collective G-Code intensity score (1-100)"
+    )
+    intensity_level = models.CharField(max_length=10, choices=INTENSITY_CHOICES)
+
+    # Metadata
+    calculated_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "collective_sky"
+        verbose_name = "Collective Sky"
+        verbose_name_plural = "Collective Sky Snapshots"
+        ordering = ["-snapshot_date"]
+
+    def __str__(self):
+        return f"Collective sky for {self.snapshot_date}"
+
+
+class TransitTimeline(models.Model):
+    """
+    Precomputed transit-to-natal aspect intervals over a rolling horizon.
+    One per user; rolled forward incrementally and rebuilt on birth data changes.
+    """
+
+    user = models.OneToOneField(
+        GCodeUser, on_delete=models.CASCADE, related_name="transit_timeline"
+    )
+
+    # Horizon
+    horizon_start = models.DateField(help_text="First day covered")
+    horizon_end = models.DateField(help_text="Last day covered")
+    birth_fingerprint = models.CharField(
+        max_length=64, help_text="Hash of the birth data the timeline was built from"
+    )
+
+    # Timeline Data
+    intervals = models.JSONField(
+        default=list,
+        help_text="Aspect intervals (transit/natal body, aspect, start, exact, end)",
+    )
+
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "transit_timelines"
+        verbose_name = "Transit Timeline"
+        verbose_name_plural = "Transit Timelines"
+
+    def __str__(self):
+        return f"Transit timeline for {self.user.username} to {self.horizon_end}"
+
+
+class BatchRun(models.Model):
+    """
+    Ledger of a nightly batch run, used to checkpoint and resume it.
+    """
+
+    STATUS_CHOICES = [
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    run_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    job = models.CharField(max_length=50, default="daily_gcode")
+    target_date = models.DateField(db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+
+    # Progress
+    total_users = models.IntegerField(default=0)
+    success_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    last_user_id = models.BigIntegerField(
+        null=True, blank=True, help_text="Checkpoint: last user processed in order"
+    )
+
+    # Timestamps
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "batch_runs"
+        verbose_name = "Batch Run"
+        verbose_name_plural = "Batch Runs"
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.job} run for {self.target_date} ({self.status})"
+
+    @property
+    def processed_users(self):
+        """Users processed so far (success or error)."""
+        return self.success_count + self.error_count
+
+
+class BatchRunItem(models.Model):
+    """
+    Per-user outcome within a batch run.
+    """
+
+    STATUS_CHOICES = [
+        ("success", "Success"),
+        ("error", "Error"),
+    ]
+
+    run = models.ForeignKey(BatchRun, on_delete=models.CASCADE, related_name="items")
+    user = models.ForeignKey(
+        GCodeUser, on_delete=models.CASCADE, related_name="batch_run_items"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True, default="")
+    processed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "batch_run_items"
+        verbose_name = "Batch Run Item"
+        verbose_name_plural = "Batch Run Items"
+        unique_together = ["run", "user"]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.status} in {self.run}"
+
+
 class UserActivity(models.Model):
     """
     Track user activity for analytics and personalization.
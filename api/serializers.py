@@ -295,6 +295,7 @@ class GenerateContentSerializer(serializers.Serializer):
     platform = serializers.ChoiceField(choices=GeneratedContent.PLATFORM_CHOICES)
     transit_date = serializers.DateField(required=False)
     custom_instructions = serializers.CharField(required=False, allow_blank=True)
+    stream = serializers.BooleanField(required=False, default=False)
 
     def validate_transit_date(self, value):
         """Validate transit date is not in the future (for most content types)."""
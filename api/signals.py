@@ -3,10 +3,10 @@ Django Signals for Spiritual G-Code API.
 """
 
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import DailyTransit, NatalChart
+from .models import DailyTransit, GCodeTemplate, NatalChart
 
 User = get_user_model()
 
@@ -32,3 +32,16 @@ def generate_daily_content(sender, instance, created, **kwargs):
     if created and instance.user.daily_gcode_enabled:
         # This could trigger Celery task for content generation
         pass
+
+
+@receiver(post_save, sender=GCodeTemplate)
+@receiver(post_delete, sender=GCodeTemplate)
+def reload_prompt_templates(sender, instance, **kwargs):
+    """
+    Recompile prompt templates after a GCodeTemplate changes (this process
+    immediately, other processes on their next staleness check).
+    """
+    from ai_engine.prompt_templates import bump_template_version, get_template_registry
+
+    bump_template_version()
+    get_template_registry().invalidate()
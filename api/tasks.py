@@ -0,0 +1,428 @@
+"""
+Celery tasks for Spiritual G-Code.
+Fans the nightly Daily G-Code batch out across workers: active users are
+sharded into chunks, each chunk runs as its own task and a chord callback
+aggregates the success/error counts and the chunks' stage metrics into the
+run's batch report. Also streams on-demand content generation to the
+user's dashboard WebSocket.
+"""
+
+import logging
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from celery import chain, chord, shared_task
+from django.conf import settings
+
+from ai_engine.batch_metrics import merged_metrics, save_batch_report
+from ai_engine.nightly_batch import (
+    NightlyGCodeBatch,
+    get_nightly_ai_client,
+    log_batch_summary,
+    send_error_summary,
+)
+from ai_engine.run_ledger import DEFAULT_JOB, RunLedger
+
+logger = logging.getLogger(__name__)
+
+# Queue prefix for chunk tasks; shard n goes to "<prefix>-<n>"
+NIGHTLY_QUEUE_PREFIX = "gcode-nightly"
+
+
+def shard_queue(index: int) -> str:
+    """Queue for the index-th chunk, spread over GCODE_BATCH_SHARDS queues."""
+    return f"{NIGHTLY_QUEUE_PREFIX}-{index % max(1, settings.GCODE_BATCH_SHARDS)}"
+
+
+@shared_task
+def run_nightly_gcode(target_date: Optional[str] = None) -> Dict:
+    """
+    Shard active users into chunks and process them with a chord.
+
+    Args:
+        target_date: ISO date to calculate for (defaults to tomorrow, like
+            scripts/calculate_daily_gcode.py)
+
+    Returns:
+        Dictionary with the chord id and number of chunks dispatched
+    """
+    from ai_engine.collective_sky import get_collective_sky
+
+    if target_date:
+        day = date.fromisoformat(target_date)
+    else:
+        day = date.today() + timedelta(days=1)
+
+    # Build the shared collective sky once, before any chunk needs it
+    try:
+        get_collective_sky().build_snapshot(day)
+    except Exception as e:
+        logger.error(f"❌ Error building collective sky: {str(e)}")
+
+    # Resume the date's unfinished run; users already done are not resharded
+    batch = NightlyGCodeBatch()
+    users = batch.eligible_users()
+    ledger = RunLedger.start(day, users)
+    run_id = str(ledger.run.run_id)
+
+    shards = batch.shard_user_ids(ledger.pending(users))
+    logger.info(f"Dispatching {len(shards)} Daily G-Code chunks for {day}")
+    if not shards:
+        ledger.finish()
+        return {"run_id": run_id, "chunks": 0, "chord_id": None}
+
+    header = [
+        calculate_daily_gcode_chunk.s(user_ids, day.isoformat(), run_id).set(
+            queue=shard_queue(index)
+        )
+        for index, user_ids in enumerate(shards)
+    ]
+    result = chord(header)(aggregate_daily_gcode_results.s(day.isoformat(), run_id))
+
+    return {"run_id": run_id, "chunks": len(shards), "chord_id": result.id}
+
+
+@shared_task
+def calculate_daily_gcode_chunk(
+    user_ids: List[int], target_date: str, run_id: Optional[str] = None
+) -> Dict:
+    """
+    Calculate and upsert Daily G-Codes for one chunk of users.
+
+    Args:
+        user_ids: Primary keys of the users in the chunk
+        target_date: ISO date to calculate for
+        run_id: BatchRun to record per-user outcomes in
+
+    Returns:
+        Dictionary with users, success and errors counts and the chunk's
+        exported stage metrics
+    """
+    batch = NightlyGCodeBatch(ai_client=get_nightly_ai_client())
+    ledger = RunLedger.get(run_id) if run_id else None
+    users = batch.users_by_id(user_ids)
+    result = batch.process_chunk(users, date.fromisoformat(target_date), ledger=ledger)
+
+    # Users that lost eligibility between sharding and processing
+    result["users"] = len(user_ids)
+    result["skipped"] = len(user_ids) - len(users)
+    result["metrics"] = batch.metrics.export()
+    return result
+
+
+@shared_task
+def calculate_lane_chunk(
+    previous: Optional[Dict],
+    user_ids: List[int],
+    target_date: str,
+    run_id: Optional[str] = None,
+) -> Dict:
+    """
+    Calculate one chunk of a lane, adding the results of the lane so far.
+
+    Lanes are chains, so each chunk receives the previous chunk's result
+    and the chord callback gets one combined result per lane.
+
+    Args:
+        previous: Combined result of the lane's earlier chunks (None first)
+        user_ids: Primary keys of the users in the chunk
+        target_date: ISO date to calculate for
+        run_id: BatchRun to record per-user outcomes in
+
+    Returns:
+        Combined result of the lane's chunks up to this one
+    """
+    result = calculate_daily_gcode_chunk(user_ids, target_date, run_id)
+    return combine_chunk_results([previous, result])
+
+
+def combine_chunk_results(results: List[Optional[Dict]]) -> Dict:
+    """
+    Sum chunk results and merge their exported metrics.
+
+    Args:
+        results: Chunk or lane results (None entries skipped)
+
+    Returns:
+        Dictionary with summed counts, chunks processed and the merged
+        metrics export
+    """
+    results = [result for result in results if result]
+    combined = {"chunks": 0}
+    for result in results:
+        for key, value in result.items():
+            if key not in ("metrics", "chunks"):
+                combined[key] = combined.get(key, 0) + value
+        combined["chunks"] += result.get("chunks", 1)
+    combined["metrics"] = merged_metrics(
+        DEFAULT_JOB, (result.get("metrics") for result in results)
+    ).export()
+    return combined
+
+
+def save_fan_out_report(
+    results: List[Dict], target_date: date, stats: Dict, ledger=None
+) -> Optional[Dict]:
+    """
+    Save the batch report of a fanned-out run from its chunk results.
+
+    Args:
+        results: Chunk or lane results carrying exported metrics
+        target_date: Date the run calculated for
+        stats: Totals of the run
+        ledger: RunLedger of the run (sets the job and start time)
+
+    Returns:
+        The report, or None if it could not be saved
+    """
+    metrics = merged_metrics(
+        ledger.run.job if ledger else DEFAULT_JOB,
+        (result.get("metrics") for result in results),
+        started_at=ledger.run.started_at if ledger else None,
+    )
+    return save_batch_report(
+        metrics, target_date, stats, run_id=ledger.run.run_id if ledger else None
+    )
+
+
+@shared_task
+def aggregate_daily_gcode_results(
+    results: List[Dict], target_date: str, run_id: Optional[str] = None
+) -> Dict:
+    """
+    Chord callback summing the chunk results.
+
+    Args:
+        results: Return values of calculate_daily_gcode_chunk
+        target_date: ISO date the batch was calculated for
+        run_id: BatchRun to mark completed
+
+    Returns:
+        Dictionary with users, success, errors, skipped and chunks totals
+    """
+    stats = {"users": 0, "success": 0, "errors": 0, "skipped": 0}
+    for result in results:
+        for key in stats:
+            stats[key] += result.get(key, 0)
+    stats["chunks"] = len(results)
+
+    logger.info(f"Daily G-Code fan-out for {target_date} finished")
+    ledger = RunLedger.get(run_id) if run_id else None
+    if ledger is not None:
+        ledger.finish()
+    log_batch_summary(stats)
+    save_fan_out_report(results, date.fromisoformat(target_date), stats, ledger)
+
+    if settings.EMAIL_BACKEND and stats["errors"] > 0:
+        send_error_summary(stats["errors"])
+
+    return stats
+
+
+@shared_task
+def run_timezone_bucket(tz_name: str, target_date: str) -> Dict:
+    """
+    Process one timezone bucket with a per-bucket concurrency cap.
+
+    The bucket's chunks are split into GCODE_BUCKET_CONCURRENCY lanes; each
+    lane is a chain, so at most that many chunk tasks of the bucket run at
+    once. A chord callback closes the bucket's run in the ledger.
+
+    Args:
+        tz_name: Bucket timezone
+        target_date: The bucket's local date (ISO) to calculate
+
+    Returns:
+        Dictionary with the run id, chunks and lanes dispatched
+    """
+    from ai_engine.timezone_scheduler import TimezoneScheduler, bucket_job
+
+    scheduler = TimezoneScheduler()
+    day = date.fromisoformat(target_date)
+    batch = NightlyGCodeBatch()
+    users = batch.eligible_users().filter(timezone=tz_name)
+    ledger = RunLedger.start(day, users, job=bucket_job(tz_name))
+    run_id = str(ledger.run.run_id)
+
+    shards = batch.shard_user_ids(ledger.pending(users))
+    if not shards:
+        ledger.finish()
+        return {"run_id": run_id, "chunks": 0, "lanes": 0}
+
+    lanes = [shards[i :: scheduler.concurrency] for i in range(scheduler.concurrency)]
+    lanes = [lane for lane in lanes if lane]
+    header = []
+    for index, (first, *rest) in enumerate(lanes):
+        queue = shard_queue(index)
+        # Later chunks of the chain get the lane's result so far prepended
+        header.append(
+            chain(
+                calculate_lane_chunk.s(None, first, target_date, run_id).set(
+                    queue=queue
+                ),
+                *(
+                    calculate_lane_chunk.s(user_ids, target_date, run_id).set(
+                        queue=queue
+                    )
+                    for user_ids in rest
+                ),
+            )
+        )
+    chord(header)(finish_batch_run.s(run_id))
+
+    return {"run_id": run_id, "chunks": len(shards), "lanes": len(lanes)}
+
+
+@shared_task
+def finish_batch_run(results: List[Dict], run_id: str) -> Dict:
+    """
+    Mark a ledger run completed, log its totals and save its batch report.
+
+    Args:
+        results: Combined result of each lane (calculate_lane_chunk)
+        run_id: BatchRun run ID
+
+    Returns:
+        Run status dictionary
+    """
+    ledger = RunLedger.get(run_id)
+    ledger.finish()
+    status = ledger.status()
+    logger.info(
+        f"{status['job']} for {status['target_date']}: "
+        f"{status['success']} ok, {status['errors']} errors"
+    )
+    totals = combine_chunk_results(results)
+    totals.pop("metrics")
+    save_fan_out_report(results, ledger.run.target_date, totals, ledger)
+    if settings.EMAIL_BACKEND and status["errors"] > 0:
+        send_error_summary(status["errors"])
+    return status
+
+
+@shared_task
+def tick_timezone_scheduler() -> List[Dict]:
+    """Dispatch every due timezone bucket (run every few minutes)."""
+    from ai_engine.timezone_scheduler import TimezoneScheduler
+
+    return TimezoneScheduler().tick(use_celery=True)
+
+
+def can_stream() -> bool:
+    """
+    Whether events pushed by stream_generated_content reach the WebSocket.
+
+    The in-memory channel layer only delivers within one process, so it
+    works when tasks run eagerly in the web process but not from a Celery
+    worker; a shared layer (Redis) works either way.
+    """
+    from channels.layers import InMemoryChannelLayer, get_channel_layer
+
+    layer = get_channel_layer()
+    if layer is None:
+        return False
+    return not isinstance(layer, InMemoryChannelLayer) or getattr(
+        settings, "CELERY_TASK_ALWAYS_EAGER", False
+    )
+
+
+@shared_task
+def stream_generated_content(
+    user_id: int, transit_id: int, params: Dict, stream_id: str
+) -> Dict:
+    """
+    Generate content chunk by chunk, pushing each chunk to the user's
+    dashboard_<user id> channel group, then persist it.
+
+    Events sent to DashboardConsumer.content_stream: "start", one "chunk"
+    per model chunk, then "done" (with the saved content) or "error".
+
+    Args:
+        user_id: Owner of the content
+        transit_id: DailyTransit the content is generated for
+        params: content_type, platform and custom_instructions
+        stream_id: ID the client matches events against
+
+    Returns:
+        Dictionary with the stream id, content id (None on error),
+        time to first chunk and total time in milliseconds
+    """
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    from ai_engine.gemini_client import GeminiGCodeClient
+    from api.models import DailyTransit, GeneratedContent, UserActivity
+
+    channel_layer = get_channel_layer()
+    group = f"dashboard_{user_id}"
+
+    def push(event: str, **data) -> None:
+        async_to_sync(channel_layer.group_send)(
+            group,
+            {"type": "content_stream", "stream_id": stream_id, "event": event, **data},
+        )
+
+    started = time.perf_counter()
+    first_chunk_ms = None
+    push("start", content_type=params["content_type"], platform=params["platform"])
+
+    try:
+        transit = DailyTransit.objects.select_related("user").get(
+            pk=transit_id, user_id=user_id
+        )
+        ai_client = GeminiGCodeClient()
+
+        chunks = []
+        for chunk in ai_client.stream_content(
+            transit_data=transit.transit_data,
+            content_type=params["content_type"],
+            platform=params["platform"],
+            user_preferences={"tone": transit.user.preferred_tone},
+            custom_instructions=params.get("custom_instructions", ""),
+        ):
+            if first_chunk_ms is None:
+                first_chunk_ms = round((time.perf_counter() - started) * 1000)
+            chunks.append(chunk)
+            push("chunk", text=chunk)
+
+        content = GeneratedContent.objects.create(
+            user=transit.user,
+            related_transit=transit,
+            **ai_client.content_from_text(
+                params["content_type"], params["platform"], "".join(chunks)
+            ),
+        )
+        UserActivity.objects.create(
+            user=transit.user,
+            activity_type="content_generated",
+            metadata={
+                "content_type": content.content_type,
+                "platform": content.platform,
+                "streamed": True,
+            },
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Error streaming content {stream_id}: {str(e)}")
+        push("error", message=str(e))
+        return {"stream_id": stream_id, "content_id": None, "error": str(e)}
+
+    total_ms = round((time.perf_counter() - started) * 1000)
+    push(
+        "done",
+        content={
+            "id": content.id,
+            "title": content.title,
+            "body": content.body,
+            "hashtags": content.hashtags,
+        },
+        first_chunk_ms=first_chunk_ms,
+        total_ms=total_ms,
+    )
+    return {
+        "stream_id": stream_id,
+        "content_id": content.id,
+        "first_chunk_ms": first_chunk_ms,
+        "total_ms": total_ms,
+    }
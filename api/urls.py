@@ -5,8 +5,9 @@ URL Configuration for Spiritual G-Code API.
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (  # Authentication; Export Data; Account Deletion; Natal Charts; Daily Transits; Generated Content; Templates; Annotations; Dashboard; Natal Wheel; Solar System; Health Check
+from .views import (  # Authentication; Export Data; Account Deletion; Celestial Events; Natal Charts; Daily Transits; Generated Content; Templates; Annotations; Dashboard; Natal Wheel; Solar System; Transit Timeline; Health Check
     AccountDeletionView,
+    CelestialEventsView,
     ChartAnnotationViewSet,
     DailyTransitViewSet,
     DashboardChartsView,
@@ -20,6 +21,7 @@ from .views import (  # Authentication; Export Data; Account Deletion; Natal Cha
     NatalWheelView,
     RegisterView,
     SolarSystemTransitView,
+    TransitTimelineView,
     UserProfileView,
 )
 
@@ -55,6 +57,18 @@ urlpatterns = [
         SolarSystemTransitView.as_view(),
         name="solar-system-transits",
     ),
+    # Celestial Events Calendar
+    path(
+        "calendar/events/",
+        CelestialEventsView.as_view(),
+        name="celestial-events",
+    ),
+    # Transit Timeline
+    path(
+        "transits/timeline/",
+        TransitTimelineView.as_view(),
+        name="transit-timeline",
+    ),
     # ViewSet Routes
     path("", include(router.urls)),
     # Health Check
@@ -21,8 +21,13 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 
 # Import AI engine for chart data generation
+from ai_engine.collective_sky import get_collective_sky
 from ai_engine.daily_gcode_service import get_daily_gcode_service
 from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.prompt_encoding import get_prompt_encoder
+from ai_engine.rate_limiter import get_gemini_rate_limiter
+from ai_engine.resilience import get_gemini_call_guard
+from ai_engine.transit_timeline import get_transit_timeline
 
 from .annotation import ChartAnnotation
 from .filters import DailyTransitFilter, GCodeTemplateFilter, GeneratedContentFilter
@@ -728,6 +733,19 @@ class GeneratedContentViewSet(viewsets.ModelViewSet):
                     user=request.user, transit_date=transit_date
                 )
 
+                # Stream the text over the dashboard WebSocket instead
+                if serializer.validated_data["stream"]:
+                    from api.tasks import can_stream
+
+                    if can_stream():
+                        return self._start_stream(request, transit, serializer)
+
+                    import logging
+
+                    logging.getLogger(__name__).warning(
+                        "Channel layer is process-local, generating without streaming"
+                    )
+
                 # Initialize AI client
                 ai_client = GeminiGCodeClient()
 
@@ -771,6 +789,30 @@ class GeneratedContentViewSet(viewsets.ModelViewSet):
                 )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _start_stream(self, request, transit, serializer):
+        """Dispatch streamed generation; chunks arrive on dashboard_<user id>."""
+        import uuid
+
+        from api.tasks import stream_generated_content
+
+        stream_id = uuid.uuid4().hex
+        stream_generated_content.delay(
+            request.user.id,
+            transit.id,
+            {
+                "content_type": serializer.validated_data["content_type"],
+                "platform": serializer.validated_data["platform"],
+                "custom_instructions": serializer.validated_data.get(
+                    "custom_instructions", ""
+                ),
+            },
+            stream_id,
+        )
+        return Response(
+            {"stream_id": stream_id, "group": f"dashboard_{request.user.id}"},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
     @action(detail=True, methods=["post"])
     def post(self, request, pk=None):
         """Post content to social media platform."""
@@ -949,11 +991,24 @@ class DashboardChartsView(APIView):
                 transit_date__lte=end_date,
             ).order_by("transit_date")
 
-            # Generate data for all dates in range
-            trend_data = []
-            current_date = start_date
+            # Generate data for all dates in range; dates outside the
+            # nightly precompute horizon are read from the transit timeline
             transit_dict = {t.transit_date: t for t in transits}
+            missing = self._missing_dates(transit_dict, start_date, end_date)
+            timeline_scores = {}
+            if missing and NatalChart.objects.filter(user=request.user).exists():
+                try:
+                    timeline_scores = {
+                        day["date"]: day
+                        for day in get_transit_timeline().daily_scores(
+                            request.user, missing[0], missing[-1]
+                        )
+                    }
+                except Exception:
+                    timeline_scores = {}
 
+            trend_data = []
+            current_date = start_date
             while current_date <= end_date:
                 if current_date in transit_dict:
                     t = transit_dict[current_date]
@@ -965,48 +1020,14 @@ class DashboardChartsView(APIView):
                         }
                     )
                 else:
-                    # Generate mock data for missing dates
-                    calculator = MockGCodeCalculator()
-                    try:
-                        natal = NatalChart.objects.get(user=request.user)
-                        mock_transit = calculator.calculate_transits(
-                            birth_date=request.user.birth_date,
-                            birth_time=(
-                                request.user.birth_time.strftime("%H:%M")
-                                if request.user.birth_time
-                                else None
-                            ),
-                            birth_location=request.user.birth_location,
-                            target_date=current_date,
-                        )
-                        score = calculator.calculate_g_code_intensity(
-                            transit_data=mock_transit["planets"],
-                            aspects=mock_transit["aspects"],
-                        )
-                        intensity = (
-                            "low"
-                            if score < 25
-                            else (
-                                "medium"
-                                if score < 50
-                                else "high" if score < 75 else "intense"
-                            )
-                        )
-                        trend_data.append(
-                            {
-                                "date": current_date.isoformat(),
-                                "score": score,
-                                "intensity": intensity,
-                            }
-                        )
-                    except:
-                        trend_data.append(
-                            {
-                                "date": current_date.isoformat(),
-                                "score": 50,
-                                "intensity": "medium",
-                            }
-                        )
+                    day = timeline_scores.get(current_date.isoformat())
+                    trend_data.append(
+                        {
+                            "date": current_date.isoformat(),
+                            "score": day["score"] if day else 50,
+                            "intensity": day["intensity"] if day else "medium",
+                        }
+                    )
                 current_date += timedelta(days=1)
 
             data["gcode_trend_7d"] = trend_data
@@ -1105,7 +1126,6 @@ class DashboardChartsView(APIView):
         if chart_type in ["all", "weekly_forecast"]:
             # Use custom date range or default to next 7 days
             forecast_data = []
-            calculator = MockGCodeCalculator()
 
             try:
                 natal = NatalChart.objects.get(user=request.user)
@@ -1122,14 +1142,35 @@ class DashboardChartsView(APIView):
                 forecast_start = date.today() + timedelta(days=1)
                 forecast_end = date.today() + timedelta(days=7)
 
+            # Rows of the nightly precompute horizon, then the transit
+            # timeline for dates beyond it
+            transit_dict = {
+                t.transit_date: t
+                for t in DailyTransit.objects.filter(
+                    user=request.user,
+                    transit_date__gte=forecast_start,
+                    transit_date__lte=forecast_end,
+                )
+            }
+            missing = self._missing_dates(transit_dict, forecast_start, forecast_end)
+            timeline_days = {}
+            if natal and missing:
+                try:
+                    timeline_days = {
+                        day["date"]: day
+                        for day in get_transit_timeline().daily_scores(
+                            request.user, missing[0], missing[-1]
+                        )
+                    }
+                except Exception:
+                    timeline_days = {}
+
             # Generate forecast for all dates in range
             current_date = forecast_start
             while current_date <= forecast_end:
-                # Try to get existing transit data
-                try:
-                    transit = DailyTransit.objects.get(
-                        user=request.user, transit_date=current_date
-                    )
+                transit = transit_dict.get(current_date)
+                day = timeline_days.get(current_date.isoformat())
+                if transit:
                     forecast_data.append(
                         {
                             "date": current_date.isoformat(),
@@ -1138,55 +1179,27 @@ class DashboardChartsView(APIView):
                             "themes": transit.themes or [],
                         }
                     )
-                except DailyTransit.DoesNotExist:
-                    # Generate forecast data
-                    if natal:
-                        mock_transit = calculator.calculate_transits(
-                            birth_date=request.user.birth_date,
-                            birth_time=(
-                                request.user.birth_time.strftime("%H:%M")
-                                if request.user.birth_time
-                                else None
+                elif day:
+                    forecast_data.append(
+                        {
+                            "date": current_date.isoformat(),
+                            "score": day["score"],
+                            "intensity": day["intensity"],
+                            # Generate themes based on aspects
+                            "themes": self._generate_themes_from_aspects(
+                                day["aspects"][:3]
                             ),
-                            birth_location=request.user.birth_location,
-                            target_date=current_date,
-                        )
-                        score = calculator.calculate_g_code_intensity(
-                            transit_data=mock_transit["planets"],
-                            aspects=mock_transit["aspects"],
-                        )
-                        intensity = (
-                            "low"
-                            if score < 25
-                            else (
-                                "medium"
-                                if score < 50
-                                else "high" if score < 75 else "intense"
-                            )
-                        )
-
-                        # Generate themes based on aspects
-                        themes = self._generate_themes_from_aspects(
-                            mock_transit["aspects"][:3]
-                        )
-
-                        forecast_data.append(
-                            {
-                                "date": current_date.isoformat(),
-                                "score": score,
-                                "intensity": intensity,
-                                "themes": themes,
-                            }
-                        )
-                    else:
-                        forecast_data.append(
-                            {
-                                "date": current_date.isoformat(),
-                                "score": 50,
-                                "intensity": "medium",
-                                "themes": ["#Growth", "#Alignment"],
-                            }
-                        )
+                        }
+                    )
+                else:
+                    forecast_data.append(
+                        {
+                            "date": current_date.isoformat(),
+                            "score": 50,
+                            "intensity": "medium",
+                            "themes": ["#Growth", "#Alignment"],
+                        }
+                    )
 
                 current_date += timedelta(days=1)
 
@@ -1210,6 +1223,9 @@ class DashboardChartsView(APIView):
                     ),
                     birth_location=request.user.birth_location,
                     target_date=date.today(),
+                    transit_positions=get_collective_sky().transit_positions(
+                        date.today(), build_missing=False
+                    ),
                 )
 
                 # Build network data
@@ -1248,8 +1264,36 @@ class DashboardChartsView(APIView):
                 # Generate mock aspects network data for testing
                 data["aspects_network"] = self._get_mock_aspects_network()
 
+        # ========================================
+        # 6. Collective Sky (shared by all users)
+        # ========================================
+        if chart_type in ["all", "collective_sky"]:
+            try:
+                # Snapshots are built by the nightly job, never per request
+                sky = get_collective_sky()
+                snapshot = sky.get_snapshot(
+                    custom_end_date or date.today(), build_missing=False
+                )
+                data["collective_sky"] = None
+                if snapshot is not None:
+                    data["collective_sky"] = {
+                        **sky.summarize(snapshot, limit=15),
+                        "positions": snapshot["positions"],
+                    }
+            except Exception:
+                data["collective_sky"] = None
+
         return Response(data)
 
+    def _missing_dates(self, transit_dict, start_date, end_date):
+        """Get the dates in range without a stored DailyTransit, in order."""
+        days = (end_date - start_date).days + 1
+        return [
+            start_date + timedelta(days=i)
+            for i in range(days)
+            if start_date + timedelta(days=i) not in transit_dict
+        ]
+
     def _get_element(self, sign):
         """Get element from zodiac sign."""
         fire_signs = ["Aries", "Leo", "Sagittarius"]
@@ -1374,6 +1418,24 @@ class SolarSystemTransitView(APIView):
                     target_date
                 )
 
+            # Flag retrograde and shadow bodies from the shared daily snapshot
+            # (only stored days; the nightly job builds them)
+            sky = get_collective_sky()
+            try:
+                snapshot = sky.get_snapshot(target_date, build_missing=False)
+            except Exception:
+                snapshot = None
+
+            if snapshot is not None:
+                solar_system_data["collective_sky"] = sky.summarize(snapshot)
+                retrograde_status = snapshot["retrogrades"]
+                for body in solar_system_data["bodies"]:
+                    phase = retrograde_status.get(body["name"])
+                    body["retrograde"] = phase == "retrograde"
+                    body["shadow"] = (
+                        phase if phase in ("pre_shadow", "post_shadow") else None
+                    )
+
             # Log activity
             UserActivity.objects.create(
                 user=request.user,
@@ -1390,6 +1452,134 @@ class SolarSystemTransitView(APIView):
             )
 
 
+# ============================================
+# Celestial Events Calendar View
+# ============================================
+
+
+class CelestialEventsView(APIView):
+    """API endpoint for the shared celestial events calendar."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Get lunations, eclipses and void-of-course windows for a date range.
+
+        Ranges are capped at MAX_RANGE_DAYS and only stored years are read;
+        years are built by the monthly build_celestial_calendar job.
+        """
+        from ai_engine.celestial_events import MAX_RANGE_DAYS, get_celestial_calendar
+
+        start_date_param = request.query_params.get("start_date")
+        end_date_param = request.query_params.get("end_date")
+        event_type = request.query_params.get("type")
+
+        try:
+            start_date = (
+                datetime.strptime(start_date_param, "%Y-%m-%d").date()
+                if start_date_param
+                else date.today()
+            )
+            end_date = (
+                datetime.strptime(end_date_param, "%Y-%m-%d").date()
+                if end_date_param
+                else start_date + timedelta(days=30)
+            )
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if start_date > end_date:
+            return Response(
+                {"error": "start_date must be before or equal to end_date."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return Response(
+                {"error": f"Date range cannot exceed {MAX_RANGE_DAYS} days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            calendar = get_celestial_calendar()
+            events = calendar.events_between(
+                start_date,
+                end_date,
+                event_types=[event_type] if event_type else None,
+                build_missing=False,
+            )
+
+            return Response(
+                {
+                    "start_date": start_date.isoformat(),
+                    "end_date": end_date.isoformat(),
+                    "lunar_phase": calendar.lunar_phase_on(
+                        start_date, build_missing=False
+                    ),
+                    "events": events,
+                }
+            )
+
+        except Exception as e:
+            return Response(
+                {"error": f"Error loading celestial events: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+# ============================================
+# Transit Timeline View
+# ============================================
+
+
+class TransitTimelineView(APIView):
+    """API endpoint for the user's precomputed transit timeline."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Get aspects active on a date and those beginning in the next N days."""
+        date_param = request.query_params.get("date")
+        days_param = request.query_params.get("days", "30")
+
+        try:
+            target_date = (
+                datetime.strptime(date_param, "%Y-%m-%d").date()
+                if date_param
+                else date.today()
+            )
+            days = max(1, min(int(days_param), 365))
+        except ValueError:
+            return Response(
+                {"error": "Invalid parameters. Use date=YYYY-MM-DD and integer days."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            timeline = get_transit_timeline()
+            horizon_start, horizon_end = timeline.horizon()
+
+            return Response(
+                {
+                    "date": target_date.isoformat(),
+                    "horizon_start": horizon_start.isoformat(),
+                    "horizon_end": horizon_end.isoformat(),
+                    "active": timeline.active_on(request.user, target_date),
+                    "upcoming": timeline.upcoming(request.user, target_date, days),
+                }
+            )
+
+        except Exception as e:
+            return Response(
+                {"error": f"Error loading transit timeline: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
 # ============================================
 # Health Check View
 # ============================================
@@ -1449,6 +1639,22 @@ class HealthCheckView(APIView):
             }
             health_status["status"] = "degraded"
 
+        # Daily G-Code result cache hit rate (this process)
+        health_status["services"]["daily_gcode_cache"] = (
+            get_daily_gcode_service().result_cache.stats()
+        )
+
+        # Shared Gemini rate limiter load and current queueing delay
+        health_status["services"]["gemini_rate_limit"] = (
+            get_gemini_rate_limiter().status()
+        )
+
+        # Gemini circuit breaker state and deadline/hedge stats
+        health_status["services"]["gemini_calls"] = get_gemini_call_guard().status()
+
+        # Estimated prompt tokens saved by compact encoding (this process)
+        health_status["services"]["prompt_tokens"] = get_prompt_encoder().stats()
+
         return Response(health_status)
 
 
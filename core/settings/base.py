@@ -197,6 +197,101 @@ CACHES = {
 # Google Gemini API Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+# Alternative API endpoint, e.g. the local fake server for load tests
+# (python scripts/fake_gemini_server.py; then http://127.0.0.1:8787)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+
+# Gemini rate limit shared by all processes through the cache: sustained
+# requests per minute, back-to-back burst and requests in flight at once.
+# Calls over the limit queue instead of failing.
+GEMINI_RATE_LIMIT_PER_MINUTE = float(os.getenv("GEMINI_RATE_LIMIT_PER_MINUTE", "60"))
+GEMINI_RATE_LIMIT_BURST = int(os.getenv("GEMINI_RATE_LIMIT_BURST", "10"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+
+# Gemini call deadline (seconds, hedge included), a second request sent
+# after the observed p95 latency (GEMINI_HEDGE_DELAY_SECONDS until enough
+# calls were seen), and a circuit breaker opened by consecutive failures for
+# GEMINI_BREAKER_RESET_SECONDS. Calls that cannot complete are answered by
+# the fallback client: "mock" (MockGeminiGCodeClient) or "none" (raise).
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "20"))
+GEMINI_HEDGE = os.getenv("GEMINI_HEDGE", "True") == "True"
+GEMINI_HEDGE_DELAY_SECONDS = float(os.getenv("GEMINI_HEDGE_DELAY_SECONDS", "2"))
+GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+GEMINI_BREAKER_RESET_SECONDS = int(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+GEMINI_FALLBACK = os.getenv("GEMINI_FALLBACK", "mock")
+
+# Durable prompt -> response cache under the Gemini client. Modes: "off"
+# (default), "on" (serve and record; user-facing content is never served
+# from it) and "replay" (recorded responses only; no API key or network
+# needed). Backend "sqlite" (file at GEMINI_PROMPT_CACHE_PATH, LRU-capped at
+# GEMINI_PROMPT_CACHE_MAX_ENTRIES) or "django" (the cache).
+GEMINI_PROMPT_CACHE = os.getenv("GEMINI_PROMPT_CACHE", "off")
+GEMINI_PROMPT_CACHE_BACKEND = os.getenv("GEMINI_PROMPT_CACHE_BACKEND", "sqlite")
+GEMINI_PROMPT_CACHE_PATH = os.getenv(
+    "GEMINI_PROMPT_CACHE_PATH",
+    os.path.join(BASE_DIR.parent, "cache", "gemini_prompts.sqlite3"),
+)
+GEMINI_PROMPT_CACHE_TTL = int(
+    os.getenv("GEMINI_PROMPT_CACHE_TTL", str(60 * 60 * 24 * 30))
+)
+GEMINI_PROMPT_CACHE_MAX_ENTRIES = int(
+    os.getenv("GEMINI_PROMPT_CACHE_MAX_ENTRIES", "50000")
+)
+
+# Compact prompt encoding: estimated token budget of each whole prompt by
+# type (see ai_engine.prompt_encoding), widest aspect orb and most aspects
+# shown. Lower-ranked aspects are dropped first when a prompt is over budget.
+GEMINI_PROMPT_TOKEN_BUDGETS = {
+    "daily_gcode": int(os.getenv("GEMINI_DAILY_PROMPT_TOKENS", "650")),
+    "period_forecast": int(os.getenv("GEMINI_PERIOD_PROMPT_TOKENS", "900")),
+}
+GEMINI_PROMPT_MAX_ORB = float(os.getenv("GEMINI_PROMPT_MAX_ORB", "3.0"))
+GEMINI_PROMPT_MAX_ASPECTS = int(os.getenv("GEMINI_PROMPT_MAX_ASPECTS", "8"))
+
+# G-Code Scoring
+# Partial override of ai_engine.scoring.DEFAULT_SCORE_WEIGHTS, e.g.
+# {"aspects": {"square": 6}, "orb_falloff": 0.5}
+GCODE_SCORE_WEIGHTS = {}
+
+# Nightly G-Code batch: users per iterator chunk and bulk upsert
+GCODE_BATCH_CHUNK_SIZE = int(os.getenv("GCODE_BATCH_CHUNK_SIZE", "500"))
+
+# Days after each nightly target date kept precomputed as DailyTransit rows
+# (rows are only rewritten when their inputs change)
+GCODE_PRECOMPUTE_HORIZON_DAYS = int(os.getenv("GCODE_PRECOMPUTE_HORIZON_DAYS", "14"))
+
+# Stale horizon days (besides the target date) recalculated per user per run,
+# so filling a new or invalidated horizon is spread over several nights
+GCODE_HORIZON_BACKFILL_DAYS = int(os.getenv("GCODE_HORIZON_BACKFILL_DAYS", "4"))
+
+# Share one AI interpretation between users with the same sun/moon/ascendant,
+# tone and orb-bucketed transit aspects on a day. Each copy is personalized
+# with per-field templates: ai_engine.archetypes.DEFAULT_PERSONALIZATION
+# unless GCODE_ARCHETYPE_PERSONALIZATION is set.
+GCODE_ARCHETYPE_DEDUP = os.getenv("GCODE_ARCHETYPE_DEDUP", "True") == "True"
+
+# Fan the nightly batch out to Celery workers instead of running it in the
+# cron process. Chunks are spread over GCODE_BATCH_SHARDS queues named
+# "gcode-nightly-<n>" (run workers with -Q gcode-nightly-0,...).
+GCODE_NIGHTLY_USE_CELERY = os.getenv("GCODE_NIGHTLY_USE_CELERY", "False") == "True"
+GCODE_BATCH_SHARDS = int(os.getenv("GCODE_BATCH_SHARDS", "1"))
+
+# Timezone-rolling scheduler: users are bucketed by timezone and each bucket
+# is calculated for its next local day this many minutes (plus up to the
+# jitter) before its local midnight
+GCODE_SCHEDULER_LEAD_MINUTES = int(os.getenv("GCODE_SCHEDULER_LEAD_MINUTES", "60"))
+GCODE_SCHEDULER_JITTER_MINUTES = int(os.getenv("GCODE_SCHEDULER_JITTER_MINUTES", "45"))
+GCODE_BUCKET_CONCURRENCY = int(os.getenv("GCODE_BUCKET_CONCURRENCY", "2"))
+
+# Platforms of the daily Spiritual Patch Notes, all generated in one AI call
+# per user (twitter, instagram, linkedin, blog)
+GCODE_PATCH_NOTE_PLATFORMS = os.getenv(
+    "GCODE_PATCH_NOTE_PLATFORMS", "twitter,instagram"
+).split(",")
+
+# Users whose patch notes are generated concurrently (AI calls stay under
+# GEMINI_MAX_CONCURRENCY through the shared rate limiter)
+GCODE_PATCH_NOTE_WORKERS = int(os.getenv("GCODE_PATCH_NOTE_WORKERS", "4"))
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -206,6 +301,9 @@ LOG_DIR = os.path.join(BASE_DIR.parent, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "django.log")
 
+# Per-stage timing reports of batch jobs (also stored in SystemLog.extra_data)
+BATCH_REPORT_DIR = os.getenv("BATCH_REPORT_DIR", os.path.join(LOG_DIR, "batch_reports"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -249,10 +347,10 @@ LOGGING = {
 
 # Crontab Configuration
 CRONJOBS = [
-    # Calculate Daily G-Code at 4:00 AM every day
+    # Calculate Daily G-Code per timezone bucket before each local midnight
     (
-        "0 4 * * *",
-        "scripts.calculate_daily_gcode.calculate_all_daily_gcodes",
+        "*/15 * * * *",
+        "scripts.calculate_daily_gcode.run_timezone_scheduler",
         ">> /tmp/gcode_calc.log",
     ),
     # Generate Spiritual Patch Notes at 5:00 AM every day
@@ -261,6 +359,12 @@ CRONJOBS = [
         "scripts.generate_patch_notes.generate_all_patch_notes",
         ">> /tmp/patch_notes.log",
     ),
+    # Precompute the celestial events calendar on the 1st of each month at 2:00 AM
+    (
+        "0 2 1 * *",
+        "scripts.build_celestial_calendar.build_celestial_calendars",
+        ">> /tmp/celestial_calendar.log",
+    ),
     # Clean up old data on Sundays at 3:00 AM
     ("0 3 * * 0", "scripts.cleanup_old_data.run_all_cleanup", ">> /tmp/cleanup.log"),
 ]
@@ -294,15 +398,27 @@ else:
     SESSION_COOKIE_SECURE = False
     CSRF_COOKIE_SECURE = False
 
-# Channels (WebSocket) Configuration
-CHANNEL_LAYERS = {
-    "default": {
-        # Use in-memory channel layer for development
-        # For production, change to 'channels_redis.core.RedisChannelLayer'
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    }
-}
-
 # Channel layer expiration (in seconds)
 # Messages expire after this time if not delivered
 CHANNEL_LAYER_EXPIRE = 3600  # 1 hour
+
+# Channels (WebSocket) Configuration. The in-memory layer only reaches
+# consumers in the same process, so events sent from Celery workers (e.g.
+# streamed content generation) need the Redis layer, which production uses.
+# CHANNEL_LAYER_BACKEND: "memory" (development default) or "redis".
+REDIS_CHANNEL_LAYER = {
+    "BACKEND": "channels_redis.core.RedisChannelLayer",
+    "CONFIG": {
+        "hosts": [
+            os.getenv("CHANNEL_LAYER_REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/1")
+        ],
+        "expiry": CHANNEL_LAYER_EXPIRE,
+    },
+}
+CHANNEL_LAYERS = {
+    "default": (
+        REDIS_CHANNEL_LAYER
+        if os.getenv("CHANNEL_LAYER_BACKEND", "memory") == "redis"
+        else {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    )
+}
@@ -73,5 +73,8 @@ LOGGING["handlers"]["console"] = {
 CELERY_TASK_ALWAYS_EAGER = False
 CELERY_TASK_EAGER_PROPAGATES = False
 
+# Channels - Redis layer, so Celery workers reach WebSocket consumers
+CHANNEL_LAYERS = {"default": REDIS_CHANNEL_LAYER}
+
 # Performance Optimization
 CONN_MAX_AGE = 600
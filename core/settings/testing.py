@@ -15,6 +15,14 @@ DATABASES = {
     }
 }
 
+# Cache - Use local memory cache for tests
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "spiritual-gcode-tests",
+    }
+}
+
 # Password Validation - Disable for faster tests
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -24,6 +32,8 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 # Celery - Always eager for tests
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BROKER_URL = "memory://"
+CELERY_RESULT_BACKEND = "cache+memory://"
 
 # Disable Logging for tests
 LOGGING = {
@@ -50,3 +60,9 @@ PASSWORD_HASHERS = [
 
 # Media files - Use temp directory
 MEDIA_ROOT = "/tmp/spiritual_gcode_media/"
+
+# Gemini prompt cache - Keep recorded responses in the test cache
+GEMINI_PROMPT_CACHE_BACKEND = "django"
+
+# Batch timing reports - Use temp directory
+BATCH_REPORT_DIR = "/tmp/spiritual_gcode_batch_reports/"
@@ -0,0 +1,65 @@
+"""
+Celestial Calendar Build Script
+
+This script precomputes the shared celestial events calendar (lunations,
+eclipses, void-of-course Moon windows) and the retrograde calendar (stations
+and shadow periods) for the previous, current and next year. API requests
+only read stored years, so this job is what makes them available.
+Runs monthly on the 1st at 2:00 AM; years already stored are skipped.
+"""
+
+import logging
+import os
+import sys
+from datetime import date
+
+import django
+
+# Setup Django environment
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.development")
+django.setup()
+
+from ai_engine.celestial_events import get_celestial_calendar  # noqa: E402
+from ai_engine.retrograde_calendar import get_retrograde_calendar  # noqa: E402
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def build_celestial_calendars(force=False):
+    """
+    Build the celestial events calendar for last year, this year and next.
+
+    Args:
+        force: Recompute years that are already stored
+    """
+    logger.info("Starting celestial calendar build...")
+
+    calendar = get_celestial_calendar()
+    retrogrades = get_retrograde_calendar()
+    this_year = date.today().year
+
+    for year in (this_year - 1, this_year, this_year + 1):
+        try:
+            event_count = calendar.build_year(year, force=force)
+            logger.info(f"✅ {event_count} celestial events stored for {year}")
+        except Exception as e:
+            logger.error(f"❌ Error building celestial calendar for {year}: {str(e)}")
+
+        try:
+            period_count = retrogrades.build_year(year, force=force)
+            logger.info(f"✅ {period_count} retrograde periods stored for {year}")
+        except Exception as e:
+            logger.error(f"❌ Error building retrograde calendar for {year}: {str(e)}")
+
+    logger.info("=" * 50)
+    logger.info("Celestial calendar build complete!")
+    logger.info("=" * 50)
+
+
+if __name__ == "__main__":
+    build_celestial_calendars(force="--force" in sys.argv)
@@ -1,8 +1,10 @@
 """
 Daily G-Code Calculation Script
 
-This script is triggered by Crontab at 4:00 AM daily to calculate
-Daily G-Code for all users with daily_gcode_enabled=True.
+This script is triggered by Crontab every 15 minutes
+(run_timezone_scheduler) to calculate Daily G-Code for users with
+daily_gcode_enabled=True, one timezone bucket at a time shortly before
+each bucket's local midnight.
 """
 
 import os
@@ -19,11 +21,17 @@ django.setup()
 import logging
 
 from django.conf import settings
-from django.core import mail
 
-from ai_engine.calculator import GCodeCalculator
-from ai_engine.gemini_client import GeminiGCodeClient
-from api.models import DailyTransit, NatalChart, User
+from ai_engine.batch_metrics import save_batch_report
+from ai_engine.collective_sky import get_collective_sky
+from ai_engine.nightly_batch import (
+    NightlyGCodeBatch,
+    get_nightly_ai_client,
+    log_batch_summary,
+    send_error_summary,
+)
+from ai_engine.run_ledger import RunLedger, recent_runs
+from ai_engine.timezone_scheduler import TimezoneScheduler
 
 # Configure logging
 logging.basicConfig(
@@ -32,143 +40,127 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def calculate_all_daily_gcodes():
+def calculate_all_daily_gcodes(target_date=None):
     """
     Calculate G-Code for all users with daily_gcode_enabled=True.
+
+    Progress is checkpointed in a BatchRun ledger: rerunning after a crash
+    resumes the unfinished run for the date and skips users already done.
+    Per-stage timings are written to SystemLog and BATCH_REPORT_DIR.
+
+    With GCODE_NIGHTLY_USE_CELERY the chunks are fanned out to Celery
+    workers (api.tasks.run_nightly_gcode). Otherwise they are processed
+    in this process, each chunk's DailyTransit rows written with a single
+    bulk upsert.
     """
+    # Get tomorrow's date (for next day's G-Code)
+    tomorrow = target_date or date.today() + timedelta(days=1)
+
+    if settings.GCODE_NIGHTLY_USE_CELERY:
+        from api.tasks import run_nightly_gcode
+
+        run_nightly_gcode.delay(tomorrow.isoformat())
+        logger.info(f"Dispatched Daily G-Code fan-out for {tomorrow}")
+        return
+
     logger.info("Starting Daily G-Code calculation...")
 
-    calculator = GCodeCalculator()
+    ai_client = get_nightly_ai_client()
 
+    # Build tomorrow's shared collective sky once, before any user needs it
     try:
-        ai_client = GeminiGCodeClient()
+        get_collective_sky().build_snapshot(tomorrow)
+        logger.info(f"✅ Collective sky ready for {tomorrow}")
     except Exception as e:
-        logger.error(f"Failed to initialize Gemini client: {str(e)}")
-        ai_client = None
+        logger.error(f"❌ Error building collective sky: {str(e)}")
 
-    # Get tomorrow's date (for next day's G-Code)
-    tomorrow = date.today() + timedelta(days=1)
-
-    # Get all users with daily G-Code enabled
-    users = User.objects.filter(daily_gcode_enabled=True, is_active=True)
-
-    logger.info(f"Processing {users.count()} users...")
-
-    success_count = 0
-    error_count = 0
-
-    for user in users:
-        try:
-            logger.info(f"Processing user: {user.username}")
-
-            # 1. Get or create natal chart
-            try:
-                natal_chart = user.natal_chart
-            except NatalChart.DoesNotExist:
-                logger.warning(f"No natal chart found for {user.username}, skipping...")
-                continue
-
-            # 2. Calculate planetary transits
-            logger.info(f"Calculating transits for {user.username}...")
-            transit_data = calculator.calculate_transits(
-                birth_date=user.birth_date,
-                birth_time=(
-                    user.birth_time.strftime("%H:%M") if user.birth_time else None
-                ),
-                birth_location=user.birth_location,
-                target_date=tomorrow,
-            )
-
-            # 3. Generate AI interpretation (if available)
-            if ai_client:
-                logger.info(f"Generating AI interpretation for {user.username}...")
-                gcode_interpretation = ai_client.generate_daily_gcode(
-                    natal_data={
-                        "sun_sign": natal_chart.sun_sign,
-                        "moon_sign": natal_chart.moon_sign,
-                        "ascendant": natal_chart.ascendant,
-                    },
-                    transit_data=transit_data,
-                    user_preferences={"tone": user.preferred_tone},
-                )
-
-                interpretation = gcode_interpretation.get("interpretation", "")
-                themes = gcode_interpretation.get("themes", [])
-                affirmation = gcode_interpretation.get("affirmation", "")
-                practical_guidance = gcode_interpretation.get("practical_guidance", [])
-                g_code_score = gcode_interpretation.get("g_code_score", 50)
-            else:
-                # Fallback without AI
-                logger.warning("Using fallback interpretation (no AI available)")
-                interpretation = (
-                    "Cosmic energies are shifting. Stay aligned with your intentions."
-                )
-                themes = ["#SpiritualGCode", "#DailyGCode"]
-                affirmation = "I am aligned with cosmic energies."
-                practical_guidance = ["Stay present", "Trust the process"]
-                g_code_score = 50
-
-            # 4. Determine intensity level
-            intensity_level = "medium"
-            if g_code_score >= 80:
-                intensity_level = "intense"
-            elif g_code_score >= 60:
-                intensity_level = "high"
-            elif g_code_score < 40:
-                intensity_level = "low"
-
-            # 5. Save or update daily transit
-            daily_transit, created = DailyTransit.objects.update_or_create(
-                user=user,
-                transit_date=tomorrow,
-                defaults={
-                    "transit_data": transit_data.get("planets", {}),
-                    "aspects_to_natal": transit_data.get("aspects", []),
-                    "g_code_score": g_code_score,
-                    "themes": themes,
-                    "intensity_level": intensity_level,
-                    "interpretation": interpretation,
-                    "affirmation": affirmation,
-                    "practical_guidance": practical_guidance,
-                },
-            )
-
-            if created:
-                logger.info(f"✅ Created Daily G-Code for {user.username}")
-                success_count += 1
-            else:
-                logger.info(f"✅ Updated Daily G-Code for {user.username}")
-                success_count += 1
-
-        except Exception as e:
-            logger.error(f"❌ Error processing {user.username}: {str(e)}")
-            error_count += 1
-            continue
-
-    # Summary
-    logger.info("=" * 50)
-    logger.info(f"Daily G-Code calculation complete!")
-    logger.info(f"Success: {success_count}")
-    logger.info(f"Errors: {error_count}")
-    logger.info("=" * 50)
+    batch = NightlyGCodeBatch(ai_client=ai_client)
+    ledger = RunLedger.start(tomorrow, batch.eligible_users())
+    if ledger.resumed:
+        logger.info(
+            f"Resuming run {ledger.run.run_id} after user {ledger.run.last_user_id} "
+            f"({ledger.run.processed_users}/{ledger.run.total_users} done)"
+        )
+
+    logger.info(f"Processing users in chunks of {batch.chunk_size}...")
+    try:
+        stats = batch.run(tomorrow, ledger=ledger)
+    except Exception:
+        ledger.finish("failed")
+        raise
+    ledger.finish()
+    log_batch_summary(stats)
+    save_batch_report(batch.metrics, tomorrow, stats, ledger.run.run_id)
 
     # Send summary email if configured
-    if settings.EMAIL_BACKEND and error_count > 0:
-        send_error_summary(error_count)
+    if settings.EMAIL_BACKEND and stats["errors"] > 0:
+        send_error_summary(stats["errors"])
 
 
-def send_error_summary(error_count):
-    """Send error summary email to admin."""
-    subject = f"Daily G-Code Calculation: {error_count} Errors"
-    message = f"Daily G-Code calculation completed with {error_count} errors."
+def run_timezone_scheduler():
+    """
+    Calculate every timezone bucket that is due (Crontab: every 15 minutes).
 
-    mail.send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [settings.ADMINS[0][1]] if settings.ADMINS else [],
-    )
+    Each bucket of users sharing a timezone is calculated for its next local
+    day shortly before its local midnight, spreading the load over the day.
+    """
+    results = TimezoneScheduler().tick()
+    for result in results:
+        logger.info(f"✅ {result['timezone']} bucket for {result['target_date']}")
+
+
+def print_schedule():
+    """Print the next run of every timezone bucket."""
+    for plan in TimezoneScheduler().schedule():
+        print(
+            f"{plan['run_at']}  {plan['timezone']:<32} "
+            f"{plan['users']:>6} users  -> {plan['target_date']}"
+        )
+
+
+def print_run_status(target_date=None):
+    """Print progress and throughput of recent runs."""
+    runs = recent_runs(target_date)
+    if not runs:
+        print("No Daily G-Code runs recorded.")
+        return
+
+    for run in runs:
+        eta = f", ETA {run['eta_seconds']}s" if run["eta_seconds"] is not None else ""
+        print(
+            f"{run['target_date']} [{run['status']}] run {run['run_id']}\n"
+            f"  {run['processed_users']}/{run['total_users']} users "
+            f"({run['percent']}%), {run['success']} ok, {run['errors']} errors\n"
+            f"  {run['users_per_second']} users/s over {run['elapsed_seconds']}s"
+            f"{eta}, checkpoint user {run['last_user_id']}"
+        )
 
 
 if __name__ == "__main__":
-    calculate_all_daily_gcodes()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calculate Daily G-Codes")
+    parser.add_argument(
+        "--status", action="store_true", help="Show progress of recent runs"
+    )
+    parser.add_argument(
+        "--schedule", action="store_true", help="Show next run per timezone bucket"
+    )
+    parser.add_argument(
+        "--tick", action="store_true", help="Calculate the timezone buckets due now"
+    )
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        help="Target date, YYYY-MM-DD (default: tomorrow)",
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        print_run_status(args.date)
+    elif args.schedule:
+        print_schedule()
+    elif args.tick:
+        run_timezone_scheduler()
+    else:
+        calculate_all_daily_gcodes(args.date)
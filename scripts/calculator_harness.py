@@ -0,0 +1,64 @@
+"""
+Calculator Differential Harness Script
+
+Runs the calculator backends over random birth data / date pairs and
+reports longitude error, aspect-set differences and calls per second
+against a reference backend. Run before and after any calculator
+performance change:
+
+    python scripts/calculator_harness.py --samples 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.calculator_harness import (  # noqa: E402
+    BACKENDS,
+    DEFAULT_SAMPLES,
+    CalculatorHarness,
+    format_report,
+    generate_cases,
+)
+
+
+def main(argv=None):
+    """Parse arguments and run the harness."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=int(os.getenv("GCODE_HARNESS_SAMPLES", DEFAULT_SAMPLES)),
+        help="Number of random birth data / date pairs",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--reference",
+        default="ephem",
+        choices=sorted(BACKENDS),
+        help="Backend treated as ground truth",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=sorted(BACKENDS),
+        help="Backends to compare (default: all others)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON output")
+    args = parser.parse_args(argv)
+
+    harness = CalculatorHarness(reference=args.reference, backends=args.backends)
+    result = harness.run(generate_cases(args.samples, seed=args.seed))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(format_report(result))
+
+
+if __name__ == "__main__":
+    main()
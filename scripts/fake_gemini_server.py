@@ -0,0 +1,86 @@
+"""
+Fake Gemini Server Script
+
+Serves a local stand-in for the Gemini generateContent API with
+configurable latency, error rate and rate limiting, for load-testing the
+AI pipeline without the real API:
+
+    python scripts/fake_gemini_server.py --latency lognormal:800:0.5 --error-rate 0.02
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8787 GEMINI_PROMPT_CACHE=off \
+        python scripts/calculate_daily_gcode.py
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.fake_gemini import (  # noqa: E402
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    FakeGeminiConfig,
+    FakeGeminiServer,
+)
+
+
+def main(argv=None):
+    """Parse arguments and serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Listen address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listen port")
+    parser.add_argument(
+        "--latency",
+        default=FakeGeminiConfig.latency,
+        help="Latency distribution in ms: fixed:MS, uniform:MIN:MAX, "
+        "normal:MEAN:SD or lognormal:MEDIAN:SIGMA",
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests failing 500"
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests answered 429 at random",
+    )
+    parser.add_argument(
+        "--rate-limit-per-minute",
+        type=float,
+        default=0.0,
+        help="Simulated quota; requests over it are answered 429 (0 disables)",
+    )
+    parser.add_argument(
+        "--stream-chunks",
+        type=int,
+        default=FakeGeminiConfig.stream_chunks,
+        help="Chunks per streamed response",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    args = parser.parse_args(argv)
+
+    server = FakeGeminiServer(
+        FakeGeminiConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            rate_limit_per_minute=args.rate_limit_per_minute,
+            stream_chunks=args.stream_chunks,
+            seed=args.seed,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Fake Gemini serving on {server.url} (stats at {server.url}/stats)")
+    print(f"Point the app at it with GEMINI_API_ENDPOINT={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
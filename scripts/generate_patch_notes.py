@@ -18,8 +18,9 @@ django.setup()
 
 import logging
 
+from ai_engine.batch_metrics import save_batch_report
 from ai_engine.gemini_client import GeminiGCodeClient
-from api.models import DailyTransit, GeneratedContent, User
+from ai_engine.patch_note_batch import PatchNoteBatch, log_patch_note_summary
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +32,12 @@ logger = logging.getLogger(__name__)
 def generate_all_patch_notes():
     """
     Generate Spiritual Patch Notes for all users with enabled auto-generation.
+
+    Today's transits are prefetched in one query, users are generated
+    concurrently (one AI call each covering GCODE_PATCH_NOTE_PLATFORMS) and
+    GeneratedContent rows are bulk-inserted in chunks (see
+    ai_engine.patch_note_batch). Per-stage timings (DB load, AI call, DB
+    write) are written to SystemLog and BATCH_REPORT_DIR.
     """
     logger.info("Starting content generation...")
 
@@ -43,94 +50,13 @@ def generate_all_patch_notes():
     # Get today's date
     today = date.today()
 
-    # Get users who want auto-generated content
-    users = User.objects.filter(
-        daily_gcode_enabled=True, is_active=True, email_notifications=True
-    )
-
-    logger.info(f"Generating content for {users.count()} users...")
-
-    success_count = 0
-    error_count = 0
-
-    for user in users:
-        try:
-            # Get today's G-Code
-            try:
-                transit = DailyTransit.objects.get(user=user, transit_date=today)
-            except DailyTransit.DoesNotExist:
-                logger.warning(
-                    f"No Daily G-Code found for {user.username}, skipping..."
-                )
-                continue
-
-            logger.info(f"Generating content for {user.username}...")
-
-            # Generate Twitter patch note
-            try:
-                twitter_content = ai_client.generate_spiritual_patch_note(
-                    daily_gcode={
-                        "themes": transit.themes,
-                        "g_code_score": transit.g_code_score,
-                        "interpretation": transit.interpretation,
-                        "transit_date": today,
-                    },
-                    platform="twitter",
-                )
-
-                GeneratedContent.objects.create(
-                    user=user,
-                    related_transit=transit,
-                    status="generated",
-                    **twitter_content,
-                )
-
-                logger.info(f"✅ Generated Twitter content for {user.username}")
-                success_count += 1
-
-            except Exception as e:
-                logger.error(
-                    f"Error generating Twitter content for {user.username}: {str(e)}"
-                )
-                error_count += 1
-
-            # Generate Instagram content (optional)
-            try:
-                instagram_content = ai_client.generate_spiritual_patch_note(
-                    daily_gcode={
-                        "themes": transit.themes,
-                        "g_code_score": transit.g_code_score,
-                        "interpretation": transit.interpretation,
-                        "transit_date": today,
-                    },
-                    platform="instagram",
-                )
-
-                GeneratedContent.objects.create(
-                    user=user,
-                    related_transit=transit,
-                    status="generated",
-                    **instagram_content,
-                )
-
-                logger.info(f"✅ Generated Instagram content for {user.username}")
-
-            except Exception as e:
-                logger.error(
-                    f"Error generating Instagram content for {user.username}: {str(e)}"
-                )
-
-        except Exception as e:
-            logger.error(f"❌ Error processing {user.username}: {str(e)}")
-            error_count += 1
-            continue
+    batch = PatchNoteBatch(ai_client)
+    stats = batch.run(today)
 
     # Summary
-    logger.info("=" * 50)
-    logger.info(f"Content generation complete!")
-    logger.info(f"Success: {success_count}")
-    logger.info(f"Errors: {error_count}")
-    logger.info("=" * 50)
+    log_patch_note_summary(stats)
+
+    save_batch_report(batch.metrics, today, stats)
 
 
 if __name__ == "__main__":
@@ -61,6 +61,42 @@ def test_daily_transit(test_user, test_natal_chart):
     return transit
 
 
+@pytest.fixture
+def make_user(db):
+    """
+    Return a factory for numbered users with a natal chart.
+
+    make_user(number, with_chart=True, **fields) creates user<number>;
+    extra fields (timezone, first_name, birth_date, ...) override the
+    defaults.
+    """
+
+    def factory(number, with_chart=True, **fields):
+        user = GCodeUser.objects.create_user(
+            **{
+                "username": f"user{number}",
+                "email": f"user{number}@example.com",
+                "password": "testpass123",
+                "birth_date": date(1980 + number, 1 + number % 12, 10),
+                "birth_location": "Taipei, Taiwan",
+                **fields,
+            }
+        )
+        if with_chart:
+            NatalChart.objects.create(
+                user=user,
+                chart_data={},
+                sun_sign="Aries",
+                moon_sign="Leo",
+                ascendant="Virgo",
+                dominant_elements={},
+                key_aspects=[],
+            )
+        return user
+
+    return factory
+
+
 @pytest.fixture
 def authenticated_client(client, test_user):
     """Return an authenticated client."""
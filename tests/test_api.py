@@ -2,11 +2,14 @@
 API Tests for Spiritual G-Code.
 """
 
+from datetime import date
+
 import pytest
 from django.urls import reverse
 from rest_framework import status
 
-from api.models import DailyTransit, GCodeUser, GeneratedContent
+from ai_engine.collective_sky import get_collective_sky
+from api.models import CollectiveSky, DailyTransit, GCodeUser, GeneratedContent
 
 
 @pytest.mark.django_db
@@ -109,3 +112,47 @@ class TestDashboard:
         response = authenticated_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
+
+    def test_weekly_forecast_survives_timeline_errors(
+        self, authenticated_client, test_natal_chart, monkeypatch
+    ):
+        """Test a failing transit timeline degrades the forecast, not the view."""
+        from ai_engine.transit_timeline import TransitTimelineService
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("timeline unavailable")
+
+        monkeypatch.setattr(TransitTimelineService, "daily_scores", fail)
+        url = reverse("dashboard-charts")
+        response = authenticated_client.get(url, {"type": "weekly_forecast"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["weekly_forecast"]) == 7
+        assert response.data["weekly_forecast"][0]["score"] == 50
+
+    def test_requests_do_not_build_sky_snapshots(self, authenticated_client):
+        """Test chart and solar system views only read stored snapshots."""
+        charts = authenticated_client.get(
+            reverse("dashboard-charts"), {"type": "collective_sky"}
+        )
+        solar = authenticated_client.get(
+            reverse("solar-system-transits"), {"date": "1900-01-01"}
+        )
+
+        assert charts.status_code == status.HTTP_200_OK
+        assert charts.data["collective_sky"] is None
+        assert solar.status_code == status.HTTP_200_OK
+        assert "collective_sky" not in solar.data
+        assert all("retrograde" not in body for body in solar.data["bodies"])
+        assert not CollectiveSky.objects.exists()
+
+    def test_solar_system_flags_stored_snapshot(self, authenticated_client):
+        """Test a stored snapshot enriches the solar system view."""
+        get_collective_sky().build_snapshot(date(2026, 3, 1))
+        response = authenticated_client.get(
+            reverse("solar-system-transits"), {"date": "2026-03-01"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["collective_sky"]["date"] == "2026-03-01"
+        assert all("retrograde" in body for body in response.data["bodies"])
@@ -0,0 +1,196 @@
+"""
+Interpretation Archetype Tests for Spiritual G-Code.
+"""
+
+import threading
+import time
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine.archetypes import ArchetypeStore, archetype_key, personalize
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.nightly_batch import NightlyGCodeBatch
+from api.models import DailyTransit
+
+DAY = date(2026, 3, 1)
+NATAL = {"sun_sign": "Aries", "moon_sign": "Leo", "ascendant": "Virgo"}
+BIRTH_DATE = date(1990, 5, 10)
+
+
+def transits(*orbs):
+    """Transit data with one Sun aspect per orb."""
+    return {
+        "aspects": [
+            {
+                "transit_planet": "sun",
+                "natal_planet": "moon",
+                "aspect": "trine",
+                "orb": orb,
+            }
+            for orb in orbs
+        ]
+    }
+
+
+class TestArchetypeKey:
+    """Test which inputs separate archetypes."""
+
+    def test_orbs_in_one_bucket_share_a_key(self):
+        """Test small orb differences do not split an archetype."""
+        assert archetype_key(NATAL, transits(0.4), "inspiring", DAY) == (
+            archetype_key(NATAL, transits(1.7), "inspiring", DAY)
+        )
+
+    def test_inputs_split_archetypes(self):
+        """Test orb bucket, tone, signs and date all change the key."""
+        key = archetype_key(NATAL, transits(0.4), "inspiring", DAY)
+
+        assert key != archetype_key(NATAL, transits(6.0), "inspiring", DAY)
+        assert key != archetype_key(NATAL, transits(0.4), "poetic", DAY)
+        assert key != archetype_key(
+            {**NATAL, "moon_sign": "Pisces"}, transits(0.4), "inspiring", DAY
+        )
+        assert key != archetype_key(NATAL, transits(0.4), "inspiring", date(2026, 3, 2))
+
+
+@pytest.mark.django_db
+class TestArchetypeDedup:
+    """Test shared interpretations and per-user personalization."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start each test with an empty shared store."""
+        cache.clear()
+
+    def test_personalize_fills_templates(self, make_user):
+        """Test templates are applied to a copy of the interpretation."""
+        user = make_user(1, first_name="Seeker1", birth_date=BIRTH_DATE)
+        shared = {"interpretation": "Trust the tide.", "affirmation": "I flow."}
+
+        result = personalize(
+            shared,
+            user,
+            DAY,
+            {"interpretation": "{name} ({sun_sign}), {date}: {text} {unknown}"},
+        )
+
+        assert result["interpretation"] == (
+            "Seeker1 (Aries), March 1: Trust the tide. {unknown}"
+        )
+        assert result["affirmation"] == "I flow."
+        assert shared["interpretation"] == "Trust the tide."
+
+    def test_batch_generates_once_per_archetype(self, make_user):
+        """Test users of one archetype share a single AI call."""
+        users = [
+            make_user(i, first_name=f"Seeker{i}", birth_date=BIRTH_DATE)
+            for i in range(4)
+        ]
+        other = make_user(9, first_name="Seeker9", birth_date=date(1971, 11, 23))
+        ai_client = MockGeminiGCodeClient()
+        calls = []
+        generate = ai_client.generate_daily_gcode
+
+        def counting_generate(**kwargs):
+            calls.append(kwargs)
+            return generate(**kwargs)
+
+        ai_client.generate_daily_gcode = counting_generate
+        batch = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=ai_client,
+            roll_timelines=False,
+            horizon_days=0,
+            archetypes=ArchetypeStore(),
+        )
+
+        batch.run(DAY)
+
+        assert len(calls) == 2
+        assert batch.archetypes.stats()["reused"] == 3
+        rows = DailyTransit.objects.filter(transit_date=DAY)
+        assert rows.count() == 5
+        first = rows.get(user=users[0]).interpretation
+        second = rows.get(user=users[1]).interpretation
+        assert first.startswith("Seeker0, here is your G-Code for March 1.")
+        assert first.split(". ", 1)[1] == second.split(". ", 1)[1]
+        assert rows.get(user=other).interpretation.startswith("Seeker9")
+
+    def test_hit_rate_with_differing_natal_positions(self, make_user):
+        """Test only users whose natal positions match share an archetype."""
+        # Same signs for everyone, but only users 0-3 share their birth data
+        users = [make_user(i, birth_date=BIRTH_DATE) for i in range(4)] + [
+            make_user(i, birth_date=date(1990, 5, i)) for i in range(4, 8)
+        ]
+        calculator = MockGCodeCalculator()
+        keys = {
+            archetype_key(
+                NATAL,
+                calculator.calculate_transits(
+                    birth_date=user.birth_date,
+                    birth_location=user.birth_location,
+                    target_date=DAY,
+                ),
+                user.preferred_tone,
+                DAY,
+            )
+            for user in users
+        }
+        batch = NightlyGCodeBatch(
+            calculator=calculator,
+            ai_client=MockGeminiGCodeClient(),
+            roll_timelines=False,
+            horizon_days=0,
+            archetypes=ArchetypeStore(),
+        )
+
+        batch.run(DAY)
+
+        stats = batch.archetypes.stats()
+        assert len(keys) == 5
+        assert stats["generated"] == len(keys)
+        assert stats["reused"] == len(users) - len(keys)
+        assert stats["dedup_rate"] == round(1 - len(keys) / len(users), 4)
+
+    def test_concurrent_misses_generate_once(self):
+        """Test callers missing the same archetype share one generation."""
+        store = ArchetypeStore()
+        calls = []
+        started = threading.Event()
+
+        def slow_generate():
+            calls.append(1)
+            started.set()
+            time.sleep(0.3)
+            return {"interpretation": "Shared"}
+
+        results = []
+        owner = threading.Thread(
+            target=lambda: results.append(store.get_or_generate("k", slow_generate))
+        )
+        owner.start()
+        started.wait(1)
+        results.append(store.get_or_generate("k", slow_generate))
+        owner.join()
+
+        assert len(calls) == 1
+        assert results == [{"interpretation": "Shared"}] * 2
+        assert store.stats() == {"generated": 1, "reused": 1, "dedup_rate": 0.5}
+
+    def test_fallback_interpretations_are_not_shared(self):
+        """Test a fallback answer is returned but not stored."""
+        store = ArchetypeStore()
+        answers = [
+            {"interpretation": "Mock", "fallback": True},
+            {"interpretation": "AI"},
+        ]
+
+        first = store.get_or_generate("k", lambda: answers.pop(0))
+        second = store.get_or_generate("k", lambda: answers.pop(0))
+
+        assert first["fallback"]
+        assert second == {"interpretation": "AI"}
+        assert store.get_or_generate("k", lambda: answers.pop(0)) == second
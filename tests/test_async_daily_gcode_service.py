@@ -0,0 +1,79 @@
+"""
+Async Daily G-Code Service Tests for Spiritual G-Code.
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from ai_engine.async_daily_gcode_service import AsyncDailyGCodeService
+from ai_engine.daily_gcode_service import DailyGCodeService
+
+START = date(2026, 3, 1)
+
+
+@pytest.mark.django_db
+class TestAsyncDailyGCodeService:
+    """Test concurrent AI calls and parity with the sync service."""
+
+    @pytest.fixture
+    def user(self, test_user):
+        """Return the test user as loaded from the database."""
+        test_user.refresh_from_db()
+        return test_user
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Return an async service whose AI calls are slow and tracked."""
+        cache.clear()
+        service = AsyncDailyGCodeService(concurrency=3)
+        service.in_flight = service.peak = 0
+        lock = threading.Lock()
+        generate = service.ai_client.generate_daily_gcode
+
+        def slow_generate(**kwargs):
+            with lock:
+                service.in_flight += 1
+                service.peak = max(service.peak, service.in_flight)
+            time.sleep(0.05)
+            with lock:
+                service.in_flight -= 1
+            return generate(**kwargs)
+
+        monkeypatch.setattr(service.ai_client, "generate_daily_gcode", slow_generate)
+        return service
+
+    def test_week_runs_ai_calls_concurrently(self, service, user):
+        """Test AI calls overlap but never exceed the concurrency limit."""
+        week = async_to_sync(service.acalculate_week)(user, START)
+
+        assert [d["transit_date"] for d in week["daily_gcodes"]] == [
+            START + timedelta(days=i) for i in range(7)
+        ]
+        assert week["end_date"] == START + timedelta(days=6)
+        assert 1 < service.peak <= 3
+
+    def test_matches_sync_service(self, service, user):
+        """Test transits and scores equal the sync calculation."""
+        result = async_to_sync(service.acalculate_daily_gcode_for_user)(
+            user, START, use_cache=False
+        )
+        expected = DailyGCodeService().calculate_daily_gcode_for_user(
+            user, START, use_cache=False
+        )
+
+        assert result["g_code_score"] == expected["g_code_score"]
+        assert result["transit_data"]["aspects"] == expected["transit_data"]["aspects"]
+        assert result["transit_data"]["planets"] == expected["transit_data"]["planets"]
+
+    def test_shares_result_cache(self, service, user):
+        """Test a second request is served from the result cache."""
+        first = async_to_sync(service.acalculate_daily_gcode_for_user)(user, START)
+        second = async_to_sync(service.acalculate_daily_gcode_for_user)(user, START)
+
+        assert first == second
+        assert service.result_cache.stats()["memory_hits"] == 1
@@ -0,0 +1,100 @@
+"""
+Batch Metrics Tests for Spiritual G-Code.
+"""
+
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+
+from ai_engine.batch_metrics import (
+    BatchMetrics,
+    merged_metrics,
+    save_batch_report,
+    summarize_stage,
+)
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.nightly_batch import NightlyGCodeBatch
+from api.models import SystemLog
+
+DAY = date(2026, 3, 1)
+
+
+class TestStageSummary:
+    """Test percentiles and histogram buckets."""
+
+    def test_percentiles_and_histogram(self):
+        """Test milliseconds, percentiles and non-empty buckets."""
+        seconds = np.array([0.0005] * 90 + [0.03] * 9 + [12.0])
+
+        summary = summarize_stage(seconds)
+
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == 0.5
+        assert summary["p95_ms"] == 30.0
+        assert summary["max_ms"] == 12000.0
+        assert summary["histogram"] == [[1, 90], [50, 9], [None, 1]]
+
+
+@pytest.mark.django_db
+class TestBatchReport:
+    """Test nightly runs record stages and save their report."""
+
+    def test_run_report_is_saved(self, make_user, settings, tmp_path):
+        """Test stage timings reach SystemLog and the report file."""
+        settings.BATCH_REPORT_DIR = str(tmp_path)
+        for i in range(3):
+            make_user(i)
+        batch = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            roll_timelines=False,
+            horizon_days=1,
+        )
+
+        stats = batch.run(DAY)
+        report = save_batch_report(batch.metrics, DAY, stats, run_id="run-1")
+
+        stages = report["stages"]
+        assert set(stages) == {
+            "db_load",
+            "transit_compute",
+            "ai_call",
+            "db_write",
+        }
+        assert stages["transit_compute"]["count"] == 6
+        assert report["counters"]["users"] == 3
+        assert report["counters"]["ai_calls"] == stages["ai_call"]["count"]
+        assert report["totals"] == stats
+
+        log = SystemLog.objects.get(function="BatchMetrics.save")
+        assert log.extra_data["run_id"] == "run-1"
+        with open(report["report_file"]) as report_file:
+            assert json.load(report_file)["stages"].keys() == stages.keys()
+
+    def test_stage_records_failures(self):
+        """Test a block raising an error is still timed."""
+        metrics = BatchMetrics("test")
+
+        with pytest.raises(ValueError):
+            with metrics.stage("ai_call"):
+                raise ValueError("quota")
+
+        assert metrics.report()["stages"]["ai_call"]["count"] == 1
+
+    def test_merged_chunk_metrics(self):
+        """Test exported chunk metrics combine into one report."""
+        chunks = []
+        for seconds in (0.001, 0.003):
+            metrics = BatchMetrics("test")
+            metrics.record("db_write", seconds)
+            metrics.count("users", 2)
+            chunks.append(json.loads(json.dumps(metrics.export())))
+
+        report = merged_metrics("test", chunks + [None]).report()
+
+        assert report["counters"] == {"users": 4}
+        assert report["stages"]["db_write"]["count"] == 2
+        assert report["stages"]["db_write"]["max_ms"] == 3.0
@@ -0,0 +1,40 @@
+"""
+Calculator Differential Harness Tests for Spiritual G-Code.
+
+Run only the harness with: pytest -m harness
+"""
+
+import os
+
+import pytest
+
+from ai_engine.calculator_harness import CalculatorHarness, generate_cases
+
+SAMPLES = int(os.getenv("GCODE_HARNESS_SAMPLES", "50"))
+
+# Fast paths must reproduce the reference to floating point precision
+MAX_LONGITUDE_ERROR = 1e-9
+
+
+@pytest.mark.harness
+class TestCalculatorHarness:
+    """Differential checks of calculator fast paths against PyEphem."""
+
+    @pytest.fixture(scope="class")
+    def result(self):
+        """Run the harness once for the class."""
+        harness = CalculatorHarness(reference="ephem", backends=["ephem_shared"])
+        return harness.run(generate_cases(SAMPLES, seed=1))
+
+    def test_shared_positions_match_reference(self, result):
+        """Test the shared-positions path changes no longitude or aspect."""
+        report = result["backends"][0]
+
+        assert report["errors"] == 0
+        assert report["bodies_compared"] > 0
+        assert report["max_longitude_error"] <= MAX_LONGITUDE_ERROR
+        assert report["aspect_mismatch_cases"] == 0
+
+    def test_cases_are_reproducible(self):
+        """Test the same seed yields the same cases."""
+        assert generate_cases(5, seed=3) == generate_cases(5, seed=3)
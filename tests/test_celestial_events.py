@@ -0,0 +1,105 @@
+"""
+Celestial Events Calendar Tests for Spiritual G-Code.
+"""
+
+from datetime import date
+
+import pytest
+
+from ai_engine.celestial_events import (
+    CelestialCalendarService,
+    CelestialEventCalculator,
+)
+from api.models import CelestialEvent
+
+
+class TestCelestialEventCalculator:
+    """Test celestial event calculation."""
+
+    @pytest.fixture(scope="class")
+    def february_2026(self):
+        """Return events for February 2026 (annular solar eclipse on the 17th)."""
+        calculator = CelestialEventCalculator()
+        return calculator.calculate_events(date(2026, 2, 1), date(2026, 2, 28))
+
+    def test_new_moon_is_solar_eclipse(self, february_2026):
+        """Test the Feb 17 new moon is found and flagged as an eclipse."""
+        new_moons = [e for e in february_2026 if e["event_type"] == "new_moon"]
+        eclipses = [e for e in february_2026 if e["event_type"] == "solar_eclipse"]
+
+        assert [e["starts_at"].date() for e in new_moons] == [date(2026, 2, 17)]
+        assert len(eclipses) == 1
+        assert eclipses[0]["sign"] == "Aquarius"
+
+    def test_void_of_course_windows(self, february_2026):
+        """Test void-of-course windows end at the next sign ingress."""
+        windows = [e for e in february_2026 if e["event_type"] == "void_of_course"]
+
+        assert len(windows) >= 10
+        for window in windows:
+            assert window["starts_at"] <= window["ends_at"]
+            assert window["data"]["next_sign"] != window["sign"]
+
+
+@pytest.mark.django_db
+class TestCelestialCalendarService:
+    """Test calendar persistence and lookup."""
+
+    @pytest.fixture
+    def service(self):
+        """Return a service with a coarse (fast) calculator."""
+        return CelestialCalendarService(CelestialEventCalculator(step_hours=6))
+
+    def test_year_is_built_once(self, service):
+        """Test a year is computed, stored and then served from storage."""
+        events = service.get_year(2026)
+        stored = CelestialEvent.objects.filter(year=2026).count()
+
+        assert stored == len(events)
+        assert service.build_year(2026) == stored
+
+    def test_lookup_without_build(self, service):
+        """Test lookups can skip building missing years."""
+        assert service.events_on(date(2031, 1, 1), build_missing=False) == []
+        assert not CelestialEvent.objects.filter(year=2031).exists()
+
+    def test_lunar_phase(self, service):
+        """Test lunar phase lookup from stored lunations."""
+        assert service.lunar_phase_on(date(2026, 3, 3)) == "full_moon"
+        assert service.lunar_phase_on(date(2026, 3, 6)) == "waning_gibbous"
+
+    def test_events_spanning_new_year_are_returned_once(self, service, monkeypatch):
+        """Test a window stored under both years is not duplicated."""
+        window = {
+            "event_type": "void_of_course",
+            "starts_at": "2026-12-31T20:00:00+00:00",
+            "ends_at": "2027-01-01T06:00:00+00:00",
+        }
+        monkeypatch.setattr(
+            service, "get_year", lambda year, build_missing=True: [window]
+        )
+
+        events = service.events_between(date(2026, 12, 30), date(2027, 1, 2))
+
+        assert events == [window]
+
+
+@pytest.mark.django_db
+class TestCelestialEventsView:
+    """Test the celestial events endpoint."""
+
+    def test_range_is_capped_and_years_are_not_built(self, authenticated_client):
+        """Test long ranges are rejected and requests never build years."""
+        too_long = authenticated_client.get(
+            "/api/calendar/events/",
+            {"start_date": "1900-01-01", "end_date": "2400-12-31"},
+        )
+        response = authenticated_client.get(
+            "/api/calendar/events/",
+            {"start_date": "2031-01-01", "end_date": "2031-12-31"},
+        )
+
+        assert too_long.status_code == 400
+        assert response.status_code == 200
+        assert response.data["events"] == []
+        assert not CelestialEvent.objects.filter(year=2031).exists()
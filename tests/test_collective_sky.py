@@ -0,0 +1,72 @@
+"""
+Collective Sky Tests for Spiritual G-Code.
+"""
+
+from datetime import date
+
+import pytest
+
+from ai_engine.collective_sky import CollectiveSkyService
+from ai_engine.mock_calculator import MockGCodeCalculator
+from api.models import CollectiveSky
+
+
+@pytest.mark.django_db
+class TestCollectiveSkyService:
+    """Test daily snapshot calculation and storage."""
+
+    @pytest.fixture
+    def service(self):
+        """Return a service backed by the mock calculator."""
+        return CollectiveSkyService(MockGCodeCalculator())
+
+    def test_snapshot_is_built_once(self, service):
+        """Test a day is computed, stored and then served from storage."""
+        day = date(2026, 3, 10)
+        snapshot = service.get_snapshot(day)
+
+        assert CollectiveSky.objects.filter(snapshot_date=day).count() == 1
+        assert service.build_snapshot(day).intensity_score == (
+            snapshot["intensity_score"]
+        )
+        assert service.get_snapshot(date(2026, 3, 11), build_missing=False) is None
+
+    def test_positions_match_per_user_transits(self, service):
+        """Test shared positions equal the per-user calculation."""
+        day = date(2026, 3, 10)
+        calculator = MockGCodeCalculator()
+        transits = calculator.calculate_transits(
+            birth_date=date(1990, 6, 15),
+            birth_location="Taipei, Taiwan",
+            target_date=day,
+        )
+        shared = calculator.calculate_transits(
+            birth_date=date(1990, 6, 15),
+            birth_location="Taipei, Taiwan",
+            target_date=day,
+            transit_positions=service.transit_positions(day),
+        )
+
+        for body, position in transits["planets"].items():
+            assert shared["planets"][body]["longitude"] == position["longitude"]
+        assert shared["aspects"] == transits["aspects"]
+
+    def test_ingresses(self, service):
+        """Test ingresses are sign changes since the previous day."""
+        snapshot = service.calculate_snapshot(date(2026, 3, 10))
+
+        assert snapshot["ingresses"]
+        for ingress in snapshot["ingresses"]:
+            assert ingress["from_sign"] != ingress["to_sign"]
+            assert snapshot["positions"][ingress["body"]]["sign"] == ingress["to_sign"]
+
+    def test_collective_score_uses_slower_body(self, service):
+        """Test tight mundane aspects are scored against the slower body."""
+        aspects = [
+            {"planet1": "moon", "planet2": "pluto", "aspect": "square", "orb": 1.0},
+            {"planet1": "sun", "planet2": "mars", "aspect": "trine", "orb": 6.0},
+            {"planet1": "ceres", "planet2": "mars", "aspect": "trine", "orb": 0.5},
+        ]
+
+        # 50 + square 5 + pluto 7; the wide and asteroid trines are ignored
+        assert service.score_aspects(aspects) == 62
@@ -0,0 +1,115 @@
+"""
+Streamed Content Generation Tests for Spiritual G-Code.
+"""
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.urls import reverse
+from rest_framework import status
+
+from ai_engine import gemini_client
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from api import tasks
+from api.models import GeneratedContent
+
+PARAMS = {"content_type": "insight", "platform": "twitter", "custom_instructions": ""}
+
+
+@pytest.fixture(autouse=True)
+def mock_client(monkeypatch):
+    """Generate with the mock client (it streams a few words per chunk)."""
+    monkeypatch.setattr(gemini_client, "GeminiGCodeClient", MockGeminiGCodeClient)
+
+
+def listen(user):
+    """Join the user's dashboard group; return a function draining events."""
+    layer = get_channel_layer()
+    channel = async_to_sync(layer.new_channel)()
+    async_to_sync(layer.group_add)(f"dashboard_{user.id}", channel)
+
+    def drain():
+        events = []
+        while True:
+            event = async_to_sync(layer.receive)(channel)
+            events.append(event)
+            if event["event"] in ("done", "error"):
+                return events
+
+    return drain
+
+
+@pytest.mark.django_db
+class TestStreamGeneratedContent:
+    """Test chunks reach the dashboard group and the content is saved."""
+
+    def test_chunks_then_done(self, test_user, test_daily_transit):
+        """Test start, chunks and done events and the saved content."""
+        drain = listen(test_user)
+
+        result = tasks.stream_generated_content(
+            test_user.id, test_daily_transit.id, PARAMS, "s1"
+        )
+
+        events = drain()
+        chunks = [e["text"] for e in events if e["event"] == "chunk"]
+        content = GeneratedContent.objects.get(pk=result["content_id"])
+        assert events[0]["event"] == "start"
+        assert len(chunks) > 1
+        assert "".join(chunks) == content.body
+        assert events[-1]["content"]["id"] == content.id
+        assert {e["stream_id"] for e in events} == {"s1"}
+        assert result["first_chunk_ms"] <= result["total_ms"]
+
+    def test_error_event(self, test_user, test_daily_transit, monkeypatch):
+        """Test a failing model sends an error event and saves nothing."""
+        drain = listen(test_user)
+
+        def failing_stream(self, **kwargs):
+            raise Exception("Error generating content: quota exceeded")
+            yield
+
+        monkeypatch.setattr(MockGeminiGCodeClient, "stream_content", failing_stream)
+
+        result = tasks.stream_generated_content(
+            test_user.id, test_daily_transit.id, PARAMS, "s2"
+        )
+
+        assert drain()[-1] == {
+            "type": "content_stream",
+            "stream_id": "s2",
+            "event": "error",
+            "message": "Error generating content: quota exceeded",
+        }
+        assert result["content_id"] is None
+        assert not GeneratedContent.objects.exists()
+
+    def test_generate_endpoint_streams(
+        self, authenticated_client, test_user, test_daily_transit
+    ):
+        """Test stream=true answers 202 and the content is generated."""
+        response = authenticated_client.post(
+            reverse("generated-content-generate"),
+            {"content_type": "insight", "platform": "twitter", "stream": True},
+            content_type="application/json",
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["group"] == f"dashboard_{test_user.id}"
+        assert GeneratedContent.objects.filter(user=test_user).count() == 1
+
+    def test_process_local_layer_falls_back_to_plain_generation(
+        self, authenticated_client, test_user, test_daily_transit, settings
+    ):
+        """Test stream=true without a shared channel layer answers 201."""
+        settings.CELERY_TASK_ALWAYS_EAGER = False
+
+        response = authenticated_client.post(
+            reverse("generated-content-generate"),
+            {"content_type": "insight", "platform": "twitter", "stream": True},
+            content_type="application/json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert GeneratedContent.objects.filter(user=test_user).count() == 1
+        assert not tasks.can_stream()
@@ -0,0 +1,121 @@
+"""
+Fake Gemini Server Tests for Spiritual G-Code.
+"""
+
+import json
+import random
+import urllib.request
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine import prompt_cache, resilience
+from ai_engine.fake_gemini import FakeGeminiConfig, FakeGeminiServer, LatencyModel
+from ai_engine.gemini_client import GeminiGCodeClient
+
+NATAL = {"sun_sign": "Aries", "moon_sign": "Leo", "ascendant": "Virgo"}
+TRANSITS = {
+    "planets": {"sun": {"sign": "Pisces", "degree": 10.0, "longitude": 340.0}},
+    "aspects": [
+        {
+            "transit_planet": "sun",
+            "natal_planet": "moon",
+            "aspect": "trine",
+            "orb": 1.0,
+        }
+    ],
+}
+
+
+class TestLatencyModel:
+    """Test latency distribution specs."""
+
+    def test_distributions(self):
+        """Test each distribution draws plausible non-negative latencies."""
+        rng = random.Random(1)
+
+        assert LatencyModel("fixed:250", rng).sample() == 0.25
+        assert 0.2 <= LatencyModel("uniform:200:300", rng).sample() <= 0.3
+        samples = [LatencyModel("lognormal:100:0.5", rng).sample() for _ in range(500)]
+        assert min(samples) >= 0
+        assert 0.08 < sorted(samples)[250] < 0.12
+
+    def test_invalid_spec(self):
+        """Test unknown distributions and wrong parameter counts."""
+        with pytest.raises(ValueError):
+            LatencyModel("poisson:3")
+        with pytest.raises(ValueError):
+            LatencyModel("uniform:200")
+
+
+class TestFakeGeminiServer:
+    """Test GeminiGCodeClient against the fake server."""
+
+    @pytest.fixture
+    def serve(self, settings, monkeypatch):
+        """Start a fake server and point the client settings at it."""
+        cache.clear()
+        settings.GEMINI_API_KEY = ""
+        settings.GEMINI_PROMPT_CACHE = "off"
+        settings.GEMINI_HEDGE = False
+        settings.GEMINI_FALLBACK = "none"
+        monkeypatch.setattr(prompt_cache, "_prompt_cache_instance", None)
+        monkeypatch.setattr(resilience, "_gemini_guard_instance", None)
+        servers = []
+
+        def start(**config):
+            server = FakeGeminiServer(
+                FakeGeminiConfig(latency="fixed:5", seed=1, **config), port=0
+            ).start()
+            servers.append(server)
+            settings.GEMINI_API_ENDPOINT = server.url
+            return server
+
+        yield start
+        for server in servers:
+            server.stop()
+
+    def test_generate_and_stream(self, serve):
+        """Test parsed daily G-Code and streamed content."""
+        server = serve(stream_chunks=4)
+        client = GeminiGCodeClient()
+
+        daily = client.generate_daily_gcode(NATAL, TRANSITS, {"tone": "calm"})
+        chunks = list(
+            client.stream_content(TRANSITS, "insight", "twitter", {"tone": "calm"})
+        )
+
+        assert len(daily["themes"]) == 3
+        assert daily["affirmation"] == "I trust the timing of my growth."
+        assert 1 < len(chunks) <= 4
+        assert "#" in "".join(chunks)
+        with urllib.request.urlopen(f"{server.url}/stats") as response:
+            stats = json.load(response)
+        assert stats["requests"] == 2
+        assert stats["streamed"] == 1
+
+    def test_errors_and_rate_limits_reach_the_client(self, serve):
+        """Test 500s and 429s surface as client errors."""
+        serve(error_rate=1.0)
+        with pytest.raises(Exception, match="Internal error"):
+            GeminiGCodeClient().generate_daily_gcode(NATAL, TRANSITS)
+
+        server = serve(rate_limit_per_minute=1)
+        client = GeminiGCodeClient()
+        client.generate_daily_gcode(NATAL, TRANSITS)
+        with pytest.raises(Exception, match="exhausted"):
+            client.generate_daily_gcode(NATAL, TRANSITS)
+        assert server.snapshot()["rate_limited"] == 1
+
+    def test_patch_notes_in_one_request(self, serve):
+        """Test a multi-platform patch note set costs one request."""
+        server = serve()
+
+        notes = GeminiGCodeClient().generate_patch_notes(
+            {"themes": ["#Clarity"], "g_code_score": 60, "interpretation": "Calm."},
+            ["twitter", "instagram", "linkedin", "blog"],
+        )
+
+        assert set(notes) == {"twitter", "instagram", "linkedin", "blog"}
+        assert "linkedin" in notes["linkedin"]["body"]
+        assert server.snapshot()["requests"] == 1
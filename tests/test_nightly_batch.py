@@ -0,0 +1,272 @@
+"""
+Nightly G-Code Batch Tests for Spiritual G-Code.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.nightly_batch import NightlyGCodeBatch, fallback_fingerprint
+from api.models import DailyTransit, GCodeUser, TransitTimeline
+
+DAY = date(2026, 3, 1)
+
+
+class FallingBackClient(MockGeminiGCodeClient):
+    """AI client answering like Gemini while its breaker is open."""
+
+    def generate_daily_gcode(self, *args, **kwargs):
+        return {**super().generate_daily_gcode(*args, **kwargs), "fallback": True}
+
+
+@pytest.mark.django_db
+class TestNightlyGCodeBatch:
+    """Test chunked calculation and bulk upserts."""
+
+    @pytest.fixture
+    def batch(self):
+        """Return a batch on the mock calculator with small chunks."""
+        return NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            chunk_size=3,
+            roll_timelines=False,
+        )
+
+    def test_run_stores_every_user(self, make_user, batch):
+        """Test users with a natal chart get a row, others are skipped."""
+        users = [make_user(i) for i in range(7)]
+        make_user(99, with_chart=False)
+
+        stats = batch.run(DAY)
+
+        assert stats == {"users": 7, "success": 7, "errors": 0, "chunks": 3}
+        assert set(
+            DailyTransit.objects.filter(transit_date=DAY).values_list(
+                "user_id", flat=True
+            )
+        ) == {user.pk for user in users}
+
+    def test_rerun_updates_in_place(self, make_user, batch):
+        """Test a second run updates the existing rows of the first nights."""
+        user = make_user(1)
+        batch.run(DAY)
+        DailyTransit.objects.filter(user=user).update(
+            interpretation="stale", input_fingerprint=""
+        )
+
+        batch.run(DAY)
+
+        transit = DailyTransit.objects.get(user=user, transit_date=DAY)
+        assert DailyTransit.objects.filter(user=user).count() == (
+            batch.backfill_days + 1
+        )
+        assert transit.interpretation != "stale"
+
+    def test_queries_scale_with_chunks(
+        self, make_user, batch, django_assert_max_num_queries
+    ):
+        """Test database round trips are per chunk, not per user."""
+        for i in range(9):
+            make_user(i)
+
+        # Per chunk: one iterator fetch, one fingerprint lookup and one upsert
+        with django_assert_max_num_queries(3 * 3 + 1):
+            stats = batch.run(DAY)
+
+        assert stats["chunks"] == 3
+
+    def test_timeline_rolls_are_per_chunk(
+        self, make_user, django_assert_max_num_queries
+    ):
+        """Test rolling transit timelines adds one read and one write per chunk."""
+        for i in range(4):
+            make_user(i)
+        batch = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            chunk_size=2,
+            horizon_days=0,
+        )
+
+        with django_assert_max_num_queries(2 * (3 + 2) + 1):
+            stats = batch.run(DAY)
+
+        assert stats["chunks"] == 2
+        assert TransitTimeline.objects.count() == 4
+
+    def test_errors_do_not_stop_the_chunk(self, make_user, batch, monkeypatch):
+        """Test a failing user is counted and the rest are stored."""
+        users = [make_user(i) for i in range(3)]
+        build = batch.build_daily_transit
+
+        def flaky_build(user, target_date, positions):
+            if user.pk == users[1].pk:
+                raise ValueError("bad birth data")
+            return build(user, target_date, positions)
+
+        monkeypatch.setattr(batch, "build_daily_transit", flaky_build)
+
+        stats = batch.run(DAY)
+
+        assert stats["success"] == 2
+        assert stats["errors"] == 1
+        assert DailyTransit.objects.filter(transit_date=DAY).count() == 2
+
+
+@pytest.mark.django_db
+class TestPrecomputeHorizon:
+    """Test the rolling horizon only writes missing or stale rows."""
+
+    @pytest.fixture
+    def batch(self):
+        """Return a batch keeping three days after the target date."""
+        return NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            roll_timelines=False,
+            horizon_days=3,
+        )
+
+    def test_run_fills_the_horizon(self, make_user, batch):
+        """Test the target date and every horizon day get a row."""
+        user = make_user(1)
+
+        result = batch.process_chunk(list(batch.eligible_users()), DAY)
+
+        assert result == {
+            "success": 1,
+            "errors": 0,
+            "rows": 4,
+            "unchanged": 0,
+            "deferred": 0,
+        }
+        assert list(
+            DailyTransit.objects.filter(user=user)
+            .order_by("transit_date")
+            .values_list("transit_date", flat=True)
+        ) == [DAY + timedelta(days=i) for i in range(4)]
+
+    def test_next_night_only_adds_the_new_day(self, make_user, batch):
+        """Test unchanged rows are kept and the horizon extends by one day."""
+        make_user(1)
+        batch.run(DAY)
+        DailyTransit.objects.update(interpretation="kept")
+
+        result = batch.process_chunk(
+            list(batch.eligible_users()), DAY + timedelta(days=1)
+        )
+
+        assert result["rows"] == 1
+        assert result["unchanged"] == 3
+        assert DailyTransit.objects.filter(interpretation="kept").count() == 4
+
+    def test_changed_inputs_refresh_the_horizon(self, make_user, batch):
+        """Test a changed tone rewrites every row of that user only."""
+        changed, kept = make_user(1), make_user(2)
+        batch.run(DAY)
+        DailyTransit.objects.update(interpretation="old")
+        GCodeUser.objects.filter(pk=changed.pk).update(preferred_tone="practical")
+
+        result = batch.process_chunk(list(batch.eligible_users()), DAY)
+
+        assert result["rows"] == 4
+        assert not DailyTransit.objects.filter(
+            user=changed, interpretation="old"
+        ).exists()
+        assert DailyTransit.objects.filter(user=kept, interpretation="old").count() == 4
+
+    def test_backfill_is_spread_over_nights(self, make_user):
+        """Test a new horizon is filled a few days per night, nearest first."""
+        make_user(1)
+        batch = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            roll_timelines=False,
+            horizon_days=6,
+            backfill_days=2,
+        )
+
+        first = batch.process_chunk(list(batch.eligible_users()), DAY)
+        second = batch.process_chunk(
+            list(batch.eligible_users()), DAY + timedelta(days=1)
+        )
+
+        assert (first["rows"], first["deferred"]) == (3, 4)
+        assert (second["rows"], second["deferred"]) == (2, 3)
+        assert sorted(DailyTransit.objects.values_list("transit_date", flat=True)) == [
+            DAY + timedelta(days=i) for i in range(5)
+        ]
+
+    def test_fallback_keeps_ai_text(self, make_user, batch):
+        """Test a run without AI refreshes scores but keeps AI-written text."""
+        user = make_user(1)
+        batch.run(DAY)
+        DailyTransit.objects.update(interpretation="written by AI", g_code_score=1)
+        GCodeUser.objects.filter(pk=user.pk).update(preferred_tone="practical")
+        fallback = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=None,
+            roll_timelines=False,
+            horizon_days=3,
+        )
+
+        fallback.process_chunk(list(fallback.eligible_users()), DAY)
+
+        assert DailyTransit.objects.filter(interpretation="written by AI").count() == 4
+        assert not DailyTransit.objects.filter(g_code_score=1).exists()
+
+        # The next run with AI rewrites the rows whose text is out of date
+        result = batch.process_chunk(list(batch.eligible_users()), DAY)
+
+        assert result["rows"] == 4
+        assert not DailyTransit.objects.filter(interpretation="written by AI").exists()
+
+    def test_fingerprint_ignores_ai_availability(self, make_user, batch):
+        """Test an AI outage alone does not make stored rows stale."""
+        make_user(1)
+        batch.run(DAY)
+        fallback = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=None,
+            roll_timelines=False,
+            horizon_days=3,
+        )
+
+        result = fallback.process_chunk(list(fallback.eligible_users()), DAY)
+
+        assert (result["rows"], result["unchanged"]) == (0, 4)
+
+    def test_ai_fallback_answers_are_not_stored_as_ai_text(self, make_user, batch):
+        """Test fallback answers keep AI text, skip archetypes and stay stale."""
+        user = make_user(1)
+        batch.run(DAY)
+        DailyTransit.objects.update(interpretation="written by AI", g_code_score=1)
+        GCodeUser.objects.filter(pk=user.pk).update(preferred_tone="practical")
+        outage = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=FallingBackClient(),
+            roll_timelines=False,
+            horizon_days=3,
+        )
+        user = outage.eligible_users().get()
+        # No archetype interpretation is shared yet for the new tone
+        cache.clear()
+
+        outage.process_chunk([user], DAY)
+
+        assert DailyTransit.objects.filter(interpretation="written by AI").count() == 4
+        assert not DailyTransit.objects.filter(g_code_score=1).exists()
+        assert set(
+            DailyTransit.objects.values_list("input_fingerprint", flat=True)
+        ) == {fallback_fingerprint(outage.input_fingerprint(user))}
+        assert outage.archetypes.stats()["reused"] == 0
+
+        # The next run with AI rewrites every row
+        result = batch.process_chunk(list(batch.eligible_users()), DAY)
+
+        assert result["rows"] == 4
+        assert not DailyTransit.objects.filter(interpretation="written by AI").exists()
@@ -0,0 +1,137 @@
+"""
+Patch Note Batch Tests for Spiritual G-Code.
+"""
+
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.patch_note_batch import PatchNoteBatch
+from api.models import DailyTransit, GeneratedContent
+
+DAY = date(2026, 3, 1)
+
+
+def make_transit(user, score):
+    """Create the user's DailyTransit for DAY."""
+    return DailyTransit.objects.create(
+        user=user,
+        transit_date=DAY,
+        transit_data={},
+        aspects_to_natal=[],
+        g_code_score=score,
+        themes=["#Clarity"],
+        intensity_level="medium",
+        interpretation="A steady day.",
+        affirmation="I am steady.",
+        practical_guidance=["Breathe"],
+    )
+
+
+class SlowMockClient(MockGeminiGCodeClient):
+    """Mock client that takes a while, tracks concurrency and can fail."""
+
+    def __init__(self, fail_for=(), bad_for=(), delay=0.05):
+        super().__init__()
+        self.fail_for = set(fail_for)
+        self.bad_for = set(bad_for)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_patch_notes(self, daily_gcode, platforms=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if daily_gcode["g_code_score"] in self.fail_for:
+                raise RuntimeError("quota")
+            notes = super().generate_patch_notes(daily_gcode, platforms, **kwargs)
+            if daily_gcode["g_code_score"] in self.bad_for:
+                # A row the database rejects (title is NOT NULL)
+                notes[platforms[-1]]["title"] = None
+            return notes
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.mark.django_db
+class TestPatchNoteBatch:
+    """Test prefetching, bounded concurrency and chunked writes."""
+
+    def test_concurrent_run_with_bulk_inserts(
+        self, make_user, django_assert_max_num_queries
+    ):
+        """Test every user is generated once and written in chunks."""
+        for i in range(6):
+            make_transit(make_user(i, with_chart=False), 60 + i)
+        make_user(9, with_chart=False)
+        client = SlowMockClient(delay=0.1)
+        batch = PatchNoteBatch(
+            client, platforms=["twitter", "instagram"], workers=3, chunk_size=4
+        )
+
+        started = time.monotonic()
+        # Count + prefetch, then 12 rows in inserts of at most 4 (each
+        # write also opens and releases a savepoint)
+        with django_assert_max_num_queries(2 + 4 + 2 * 4):
+            stats = batch.run(DAY)
+
+        # Sequential generation would take 0.6s
+        assert time.monotonic() - started < 0.45
+        assert client.calls == 6
+        assert client.max_in_flight == 3
+        assert stats == {
+            "users": 7,
+            "success": 6,
+            "errors": 0,
+            "skipped": 1,
+            "rows": 12,
+        }
+        assert GeneratedContent.objects.filter(platform="twitter").count() == 6
+        assert batch.metrics.report()["counters"]["ai_calls"] == 6
+
+    def test_failures_are_recorded_without_stopping(self, make_user):
+        """Test a failing user is recorded and the others are written."""
+        users = [make_user(i, with_chart=False) for i in range(4)]
+        for i, user in enumerate(users):
+            make_transit(user, 60 + i)
+        client = SlowMockClient(fail_for={61})
+        batch = PatchNoteBatch(client, platforms=["twitter"], workers=2)
+
+        stats = batch.run(DAY)
+
+        assert stats["success"] == 3
+        assert stats["errors"] == 1
+        assert batch.failures == {users[1].pk: "quota"}
+        assert not GeneratedContent.objects.filter(user=users[1]).exists()
+        assert GeneratedContent.objects.count() == 3
+
+    def test_failed_chunk_is_retried_per_user(self, make_user):
+        """Test a bad row fails only its own user, not the chunk."""
+        users = [make_user(i, with_chart=False) for i in range(5)]
+        for i, user in enumerate(users):
+            make_transit(user, 60 + i)
+        client = SlowMockClient(bad_for={62}, delay=0)
+        batch = PatchNoteBatch(
+            client, platforms=["twitter", "instagram"], workers=2, chunk_size=4
+        )
+
+        stats = batch.run(DAY)
+
+        assert stats["success"] == 4
+        assert stats["errors"] == 1
+        assert stats["rows"] == 8
+        assert list(batch.failures) == [users[2].pk]
+        assert "NOT NULL" in batch.failures[users[2].pk]
+        assert not GeneratedContent.objects.filter(user=users[2]).exists()
+        assert GeneratedContent.objects.count() == 8
+        assert batch.metrics.report()["counters"]["rows_written"] == 8
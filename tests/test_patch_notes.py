@@ -0,0 +1,169 @@
+"""
+Multi-Platform Patch Note Tests for Spiritual G-Code.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine import prompt_cache, resilience
+from ai_engine.gemini_client import GeminiGCodeClient
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.patch_notes import (
+    PATCH_NOTE_PLATFORMS,
+    check_platforms,
+    fit_to_limit,
+    parse_patch_note_set,
+)
+
+DAILY_GCODE = {
+    "themes": ["#Clarity", "#Growth"],
+    "g_code_score": 72,
+    "interpretation": "Mercury trine Jupiter opens the mind.",
+    "transit_date": "2026-03-01",
+}
+
+
+class TestPatchNoteValidation:
+    """Test platform checks, limits and response parsing."""
+
+    def test_fit_to_limit_cuts_at_a_word(self):
+        """Test long bodies end on a whole word within the limit."""
+        text = "word " * 100
+
+        fitted = fit_to_limit(text, 280)
+
+        assert len(fitted) <= 280
+        assert fitted.endswith("word...")
+        assert fit_to_limit("short", 280) == "short"
+
+    def test_check_platforms(self):
+        """Test duplicates are dropped and unknown platforms rejected."""
+        assert check_platforms(["twitter", "blog", "twitter"]) == ["twitter", "blog"]
+        with pytest.raises(ValueError, match="myspace"):
+            check_platforms(["twitter", "myspace"])
+
+    def test_parse_accepts_objects_and_strings(self):
+        """Test variants as objects or bare strings; empty bodies dropped."""
+        response = (
+            "```json\n"
+            + json.dumps(
+                {
+                    "twitter": {"body": "Hi", "hashtags": ["#a"]},
+                    "blog": "Long post",
+                    "linkedin": {"body": ""},
+                }
+            )
+            + "\n```"
+        )
+
+        variants = parse_patch_note_set(response)
+
+        assert variants == {
+            "twitter": {"body": "Hi", "hashtags": ["#a"]},
+            "blog": {"body": "Long post"},
+        }
+        assert parse_patch_note_set("not json") == {}
+
+
+class TestGeminiPatchNotes:
+    """Test one model call covers every platform."""
+
+    @pytest.fixture
+    def client(self, settings, monkeypatch):
+        """Gemini client whose model answers with a canned response."""
+        cache.clear()
+        settings.GEMINI_API_KEY = "test-key"
+        settings.GEMINI_PROMPT_CACHE = "off"
+        settings.GEMINI_HEDGE = False
+        monkeypatch.setattr(prompt_cache, "_prompt_cache_instance", None)
+        monkeypatch.setattr(resilience, "_gemini_guard_instance", None)
+        client = GeminiGCodeClient()
+
+        class CannedModel:
+            def __init__(self):
+                self.prompts = []
+                self.answers = []
+
+            def generate_content(self, prompt, stream=False):
+                self.prompts.append(prompt)
+                return SimpleNamespace(text=self.answers.pop(0))
+
+        client.model = CannedModel()
+        return client
+
+    def test_one_call_for_all_platforms(self, client):
+        """Test variants are parsed and fitted to each platform's limit."""
+        client.model.answers = [
+            json.dumps(
+                {
+                    "twitter": {"body": "cosmic " * 80, "hashtags": ["Clarity"]},
+                    "instagram": {"body": "Caption #Growth"},
+                    "linkedin": {"body": "Reflection", "hashtags": ["#Work"]},
+                    "blog": {"body": "Post", "title": "The Open Mind"},
+                }
+            )
+        ]
+
+        notes = client.generate_patch_notes(DAILY_GCODE, list(PATCH_NOTE_PLATFORMS))
+
+        assert len(client.model.prompts) == 1
+        assert '"twitter": at most 280 characters' in client.model.prompts[0]
+        assert list(notes) == ["twitter", "instagram", "linkedin", "blog"]
+        assert len(notes["twitter"]["body"]) <= 280
+        assert notes["twitter"]["hashtags"] == ["#Clarity"]
+        assert notes["instagram"]["hashtags"] == ["#Growth"]
+        assert notes["blog"]["title"] == "The Open Mind"
+        assert notes["linkedin"]["title"] == "Spiritual Patch Note - 2026-03-01"
+        assert all(note["content_type"] == "patch_note" for note in notes.values())
+
+    def test_missing_platform_is_generated_alone(self, client):
+        """Test a platform the model left out gets its own call."""
+        client.model.answers = [
+            json.dumps({"twitter": {"body": "Tweet"}}),
+            "Instagram caption #Glow",
+        ]
+
+        notes = client.generate_patch_notes(DAILY_GCODE, ["twitter", "instagram"])
+
+        assert len(client.model.prompts) == 2
+        assert notes["instagram"]["body"] == "Instagram caption #Glow"
+        assert notes["instagram"]["platform"] == "instagram"
+
+    @pytest.mark.parametrize(
+        "platform, heading",
+        [("linkedin", "for LinkedIn"), ("blog", "blog post")],
+    )
+    def test_missing_variant_uses_its_platform_template(
+        self, client, platform, heading
+    ):
+        """Test LinkedIn and blog variants can be generated alone."""
+        client.model.answers = [
+            json.dumps({"twitter": {"body": "Tweet"}}),
+            f"A {platform} reflection #Clarity",
+        ]
+
+        notes = client.generate_patch_notes(DAILY_GCODE, ["twitter", platform])
+
+        assert len(client.model.prompts) == 2
+        assert heading in client.model.prompts[1]
+        assert "Mercury trine Jupiter" in client.model.prompts[1]
+        assert notes[platform]["body"] == f"A {platform} reflection #Clarity"
+        assert notes[platform]["hashtags"] == ["#Clarity"]
+
+
+class TestMockPatchNotes:
+    """Test the mock client's multi-platform patch notes."""
+
+    def test_every_platform_within_its_limit(self):
+        """Test each requested platform gets a note within its limit."""
+        notes = MockGeminiGCodeClient().generate_patch_notes(
+            DAILY_GCODE, list(PATCH_NOTE_PLATFORMS)
+        )
+
+        assert list(notes) == list(PATCH_NOTE_PLATFORMS)
+        for platform, note in notes.items():
+            assert note["platform"] == platform
+            assert 0 < len(note["body"]) <= PATCH_NOTE_PLATFORMS[platform]["limit"]
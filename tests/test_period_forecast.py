@@ -0,0 +1,75 @@
+"""
+Period Forecast Tests for Spiritual G-Code.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from ai_engine.daily_gcode_service import DailyGCodeService
+from ai_engine.transit_timeline import get_transit_timeline
+
+START = date(2026, 3, 1)
+
+
+@pytest.mark.django_db
+class TestPeriodForecast:
+    """Test the batched weekly/monthly forecast path."""
+
+    @pytest.fixture
+    def user(self, test_user):
+        """Return the test user as loaded from the database."""
+        test_user.refresh_from_db()
+        return test_user
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Return a service that counts AI calls and forbids per-day transits."""
+        service = DailyGCodeService()
+        service.ai_calls = 0
+        generate = service.ai_client.generate_period_forecast
+
+        def counting_generate(**kwargs):
+            service.ai_calls += 1
+            return generate(**kwargs)
+
+        def per_day_transits(**kwargs):
+            raise AssertionError("per-day transit calculation")
+
+        monkeypatch.setattr(
+            service.ai_client, "generate_period_forecast", counting_generate
+        )
+        monkeypatch.setattr(service.calculator, "calculate_transits", per_day_transits)
+        return service
+
+    @pytest.mark.parametrize("period,days", [("week", 7), ("month", 30), (10, 10)])
+    def test_period_lengths(self, service, user, period, days):
+        """Test every day of the period is covered by one AI request."""
+        forecast = service.calculate_period_forecast(user, START, period=period)
+
+        assert forecast["days"] == days
+        assert forecast["end_date"] == START + timedelta(days=days - 1)
+        assert [d["transit_date"] for d in forecast["daily_gcodes"]] == [
+            START + timedelta(days=i) for i in range(days)
+        ]
+        assert all(d["theme"] for d in forecast["daily_gcodes"])
+        assert service.ai_calls == 1
+
+    def test_scores_match_timeline(self, service, user):
+        """Test per-day scores come from the transit timeline."""
+        forecast = service.calculate_weekly_forecast(user, START)
+        expected = get_transit_timeline().daily_scores(
+            user, START, START + timedelta(days=6)
+        )
+
+        assert [d["g_code_score"] for d in forecast["daily_gcodes"]] == [
+            d["score"] for d in expected
+        ]
+        assert (
+            forecast["peak_days"][0] == max(expected, key=lambda d: d["score"])["date"]
+        )
+
+    def test_invalid_period(self, service, user):
+        """Test unknown periods are rejected."""
+        with pytest.raises(ValueError):
+            service.calculate_period_forecast(user, START, period="decade")
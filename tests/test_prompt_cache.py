@@ -0,0 +1,215 @@
+"""
+Prompt Cache Tests for Spiritual G-Code.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine import prompt_cache, resilience
+from ai_engine.gemini_client import GeminiGCodeClient
+from ai_engine.prompt_cache import (
+    DjangoPromptStore,
+    PromptCache,
+    PromptCacheMiss,
+    SQLitePromptStore,
+    prompt_key,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with an empty Django cache."""
+    cache.clear()
+
+
+class Recorder:
+    """Model stand-in counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"response {self.calls}"
+
+
+class TestPromptKey:
+    """Test prompt normalization."""
+
+    def test_whitespace_is_normalized(self):
+        """Test indentation and trailing spaces do not change the key."""
+        assert prompt_key("gemini-pro", "Hello  world\n   next line \n") == (
+            prompt_key("gemini-pro", "Hello world\nnext line")
+        )
+
+    def test_model_and_text_change_the_key(self):
+        """Test the model and the prompt words are part of the key."""
+        key = prompt_key("gemini-pro", "Hello world")
+
+        assert key != prompt_key("gemini-ultra", "Hello world")
+        assert key != prompt_key("gemini-pro", "Hello there")
+
+
+class TestSQLitePromptStore:
+    """Test the SQLite backend's TTL and LRU limits."""
+
+    def test_ttl_expires_entries(self, tmp_path, monkeypatch):
+        """Test responses older than the TTL are misses."""
+        store = SQLitePromptStore(str(tmp_path / "prompts.sqlite3"), 60, 10)
+        store.set("a", "gemini-pro", "old")
+        now = time.time()
+        monkeypatch.setattr(prompt_cache.time, "time", lambda: now + 61)
+
+        assert store.get("a") is None
+        assert store.count() == 0
+
+    def test_lru_evicts_least_recently_used(self, tmp_path, monkeypatch):
+        """Test the entry not read for longest is evicted first."""
+        clock = iter(range(1000, 2000))
+        monkeypatch.setattr(prompt_cache.time, "time", lambda: next(clock))
+        store = SQLitePromptStore(str(tmp_path / "prompts.sqlite3"), 0, 2)
+        store.set("a", "gemini-pro", "A")
+        store.set("b", "gemini-pro", "B")
+        store.get("a")
+
+        store.set("c", "gemini-pro", "C")
+
+        assert store.count() == 2
+        assert store.get("b") is None
+        assert store.get("a") == "A"
+
+
+class TestPromptCacheModes:
+    """Test record, replay and off modes."""
+
+    def test_on_records_and_serves(self):
+        """Test a repeated prompt is served without calling the model."""
+        cache_ = PromptCache(DjangoPromptStore(60), "on")
+        model = Recorder()
+
+        first = cache_.get_or_generate("gemini-pro", "prompt", model)
+        second = cache_.get_or_generate("gemini-pro", " prompt ", model)
+
+        assert first == second == "response 1"
+        assert model.calls == 1
+        assert cache_.stats()["hits"] == 1
+
+    def test_replay_never_calls_the_model(self):
+        """Test replay serves recordings and raises on unknown prompts."""
+        store = DjangoPromptStore(60)
+        PromptCache(store, "on").get_or_generate("gemini-pro", "known", Recorder())
+        replay = PromptCache(store, "replay")
+        model = Recorder()
+
+        assert replay.get_or_generate("gemini-pro", "known", model) == "response 1"
+        with pytest.raises(PromptCacheMiss):
+            replay.get_or_generate("gemini-pro", "unknown", model)
+        assert model.calls == 0
+
+    def test_off_always_calls_the_model(self):
+        """Test off mode bypasses the store."""
+        cache_ = PromptCache(DjangoPromptStore(60), "off")
+        model = Recorder()
+
+        cache_.get_or_generate("gemini-pro", "prompt", model)
+        cache_.get_or_generate("gemini-pro", "prompt", model)
+
+        assert model.calls == 2
+
+    def test_invalid_responses_are_not_recorded(self):
+        """Test a response failing the check is returned but not recorded."""
+        cache_ = PromptCache(DjangoPromptStore(60), "on")
+        model = Recorder()
+
+        def valid(text):
+            return text.endswith("2")
+
+        first = cache_.get_or_generate("gemini-pro", "prompt", model, valid)
+        second = cache_.get_or_generate("gemini-pro", "prompt", model, valid)
+        third = cache_.get_or_generate("gemini-pro", "prompt", model, valid)
+
+        assert (first, second, third) == ("response 1", "response 2", "response 2")
+        assert model.calls == 2
+
+    def test_invalid_mode(self):
+        """Test unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            PromptCache(DjangoPromptStore(60), "record")
+
+
+class TestClientReplay:
+    """Test the Gemini client runs offline in replay mode."""
+
+    def test_client_replays_without_api_key(self, settings, monkeypatch):
+        """Test a recorded patch note is served with no key or network."""
+        settings.GEMINI_API_KEY = ""
+        settings.GEMINI_PROMPT_CACHE = "replay"
+        monkeypatch.setattr(prompt_cache, "_prompt_cache_instance", None)
+        client = GeminiGCodeClient()
+        daily_gcode = {"themes": ["#Growth"], "g_code_score": 70}
+        prompt = client._load_template("patch_note_twitter").format(
+            themes="#Growth", score=70, interpretation=""
+        )
+        client.prompt_cache.store.set(
+            prompt_key(settings.GEMINI_MODEL, prompt),
+            settings.GEMINI_MODEL,
+            "Recorded note #Growth",
+        )
+
+        note = client.generate_spiritual_patch_note(daily_gcode)
+
+        assert client.model is None
+        assert note["body"] == "Recorded note #Growth"
+        assert note["hashtags"] == ["#Growth"]
+
+
+class TestClientRecording:
+    """Test what the Gemini client records in "on" mode."""
+
+    @pytest.fixture
+    def client(self, settings, monkeypatch):
+        """Gemini client recording into the test cache, canned model."""
+        settings.GEMINI_API_KEY = "test-key"
+        settings.GEMINI_PROMPT_CACHE = "on"
+        settings.GEMINI_HEDGE = False
+        monkeypatch.setattr(prompt_cache, "_prompt_cache_instance", None)
+        monkeypatch.setattr(resilience, "_gemini_guard_instance", None)
+        client = GeminiGCodeClient()
+
+        class CannedModel:
+            def __init__(self):
+                self.answers = []
+
+            def generate_content(self, prompt, stream=False):
+                return SimpleNamespace(text=self.answers.pop(0))
+
+        client.model = CannedModel()
+        return client
+
+    def test_unparseable_daily_response_is_retried(self, client):
+        """Test a daily response without JSON is not served again."""
+        client.model.answers = ["Not JSON at all", '{"interpretation": "Clear"}']
+        natal = {"sun_sign": "Aries"}
+
+        first = client.generate_daily_gcode(natal, {"aspects": []})
+        second = client.generate_daily_gcode(natal, {"aspects": []})
+        third = client.generate_daily_gcode(natal, {"aspects": []})
+
+        assert first["interpretation"] == "Not JSON at all"
+        assert second["interpretation"] == third["interpretation"] == "Clear"
+        assert client.model.answers == []
+
+    def test_user_facing_content_is_never_cached(self, client):
+        """Test generate_content asks the model every time."""
+        client.model.answers = ["First post", "Second post"]
+
+        bodies = [
+            client.generate_content({}, "social_post", "twitter", {})["body"]
+            for _ in range(2)
+        ]
+
+        assert bodies == ["First post", "Second post"]
+        assert client.prompt_cache.stats()["hits"] == 0
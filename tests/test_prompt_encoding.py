@@ -0,0 +1,128 @@
+"""
+Prompt Encoding Tests for Spiritual G-Code.
+"""
+
+from datetime import date
+
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.prompt_encoding import PromptEncoder, estimate_tokens, verbose_transits
+
+
+def aspect(transit_planet, kind, orb, natal_planet="moon"):
+    """Transit-to-natal aspect."""
+    return {
+        "transit_planet": transit_planet,
+        "natal_planet": natal_planet,
+        "aspect": kind,
+        "orb": orb,
+    }
+
+
+TRANSITS = {
+    "planets": {
+        "sun": {"sign": "Aquarius", "degree": 9.21, "longitude": 309.21},
+        "mercury": {
+            "sign": "Pisces",
+            "degree": 28.7,
+            "longitude": 358.7,
+            "retrograde": True,
+        },
+    },
+    "aspects": [
+        aspect("sun", "sextile", 2.5),
+        aspect("pluto", "square", 0.4),
+        aspect("mars", "trine", 6.0),
+        aspect("sun", "square", 0.4),
+    ],
+    "celestial_events": [{"event_type": "full_moon", "sign": "Virgo"}],
+}
+
+
+class TestRankAspects:
+    """Test aspect selection."""
+
+    def test_tight_aspects_ranked_by_significance(self):
+        """Test wide orbs are dropped and heavy bodies and aspects lead."""
+        ranked = PromptEncoder(max_orb=3.0).rank_aspects(TRANSITS["aspects"])
+
+        assert [(a["transit_planet"], a["aspect"]) for a in ranked] == [
+            ("pluto", "square"),
+            ("sun", "square"),
+            ("sun", "sextile"),
+        ]
+
+    def test_max_aspects_caps_the_selection(self):
+        """Test at most max_aspects are kept."""
+        encoder = PromptEncoder(max_aspects=1)
+
+        assert encoder.rank_aspects(TRANSITS["aspects"]) == [TRANSITS["aspects"][1]]
+
+
+class TestEncodeTransits:
+    """Test the compact transit section."""
+
+    def test_compact_format(self):
+        """Test abbreviated positions, retrogrades, aspects and events."""
+        text = PromptEncoder().encode_transits(TRANSITS, "daily_gcode")
+
+        assert "Sky: Su 9Aqu Me 28Pis R" in text
+        assert "- Pl sqr natal Mo 0.4" in text
+        assert "Events: full moon in Vir" in text
+        assert "{'sign'" not in text
+        assert "tri natal" not in text
+
+    def test_budget_drops_least_significant_aspects(self):
+        """Test a tight budget keeps positions and the top aspects only."""
+        fixed = "x" * 200
+        encoder = PromptEncoder(budgets={"daily_gcode": 95})
+        text = encoder.encode_transits(TRANSITS, "daily_gcode", fixed)
+
+        assert estimate_tokens(fixed + text) <= 95
+        assert text.split("\n")[1:] == [
+            "Sky: Su 9Aqu Me 28Pis R",
+            "Aspects to natal:",
+            "- Pl sqr natal Mo 0.4",
+        ]
+
+    def test_savings_reported_for_a_full_chart(self):
+        """Test a real transit chart costs fewer tokens than the old format."""
+        transits = MockGCodeCalculator().calculate_transits(
+            date(1990, 5, 10), "Taipei, Taiwan", date(2026, 3, 1)
+        )
+        encoder = PromptEncoder()
+
+        text = encoder.encode_transits(transits, "daily_gcode")
+        stats = encoder.stats()
+
+        assert stats["prompts"] == 1
+        assert stats["tokens"] == estimate_tokens(text)
+        assert stats["baseline_tokens"] == estimate_tokens(verbose_transits(transits))
+        assert stats["saved_tokens"] > 0
+        assert 0 < stats["saved_rate"] < 1
+
+
+class TestEncodePeriod:
+    """Test the period forecast section."""
+
+    def test_budget_trims_the_longest_days_first(self):
+        """Test scores stay while aspects are trimmed to fit."""
+        days = [
+            {
+                "date": f"2026-03-0{day}",
+                "score": 60 + day,
+                "intensity": "high",
+                "aspects": [f"sun trine natal moon {n}" for n in range(day * 2)],
+            }
+            for day in range(1, 4)
+        ]
+        encoder = PromptEncoder(budgets={"period_forecast": 40})
+
+        text = encoder.encode_period(days, "period_forecast")
+
+        assert estimate_tokens(text) <= 40
+        assert [line.split(" (")[0] for line in text.split("\n")] == [
+            "- 2026-03-01: 61",
+            "- 2026-03-02: 62",
+            "- 2026-03-03: 63",
+        ]
+        assert encoder.stats()["saved_tokens"] > 0
@@ -0,0 +1,174 @@
+"""
+Prompt Template Registry Tests for Spiritual G-Code.
+"""
+
+import os
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine.prompt_templates import (
+    CompiledTemplate,
+    PromptTemplateRegistry,
+    TemplateError,
+    get_template_registry,
+)
+from api.models import GCodeTemplate
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with an empty Django cache."""
+    cache.clear()
+
+
+@pytest.fixture
+def prompts_dir(tmp_path):
+    """Template directory with one file."""
+    (tmp_path / "greeting.txt").write_text("Hello {name}, {{literal}} {score:03d}")
+    return tmp_path
+
+
+class TestCompiledTemplate:
+    """Test parsing, validation and rendering."""
+
+    def test_render_matches_str_format(self):
+        """Test a compiled template renders like str.format."""
+        text = "Sun {sun_sign!r} at {score:>5}; {{json}} {sun_sign}"
+        template = CompiledTemplate("t", text)
+
+        assert template.variables == {"sun_sign", "score"}
+        assert template.render(sun_sign="Leo", score=7, extra=1) == text.format(
+            sun_sign="Leo", score=7
+        )
+
+    def test_invalid_templates_are_rejected(self):
+        """Test malformed, positional and undeclared placeholders."""
+        with pytest.raises(TemplateError):
+            CompiledTemplate("t", "Unclosed {name")
+        with pytest.raises(TemplateError):
+            CompiledTemplate("t", "Positional {}")
+        with pytest.raises(TemplateError):
+            CompiledTemplate("t", "Attribute {user.name}")
+        with pytest.raises(TemplateError):
+            CompiledTemplate("t", "{name} {tone}", allowed=["name"])
+
+    def test_missing_variable_is_reported(self):
+        """Test rendering without a placeholder's value fails clearly."""
+        with pytest.raises(TemplateError, match="missing variables: tone"):
+            CompiledTemplate("t", "{name} {tone}").render(name="Ada")
+
+
+class TestRegistryFiles:
+    """Test file-based templates."""
+
+    def test_files_compile_once_and_reload_on_mtime(self, prompts_dir):
+        """Test a file is recompiled only after it changes."""
+        registry = PromptTemplateRegistry(prompts_dir, use_db=False, check_interval=0)
+        template = registry.get("greeting")
+
+        assert template.source == "file"
+        assert template.render(name="Ada", score=7) == "Hello Ada, {literal} 007"
+        assert registry.get("greeting") is template
+
+        path = prompts_dir / "greeting.txt"
+        path.write_text("Hi {name}")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert registry.get("greeting").render(name="Ada") == "Hi Ada"
+
+    def test_unknown_names_use_the_default(self, prompts_dir):
+        """Test defaults are compiled once per name."""
+        registry = PromptTemplateRegistry(prompts_dir, use_db=False)
+        calls = []
+
+        def default(name):
+            calls.append(name)
+            return "Default {tone}"
+
+        assert registry.get("other", default).render(tone="calm") == "Default calm"
+        assert registry.get("other", default).source == "default"
+        assert calls == ["other"]
+        with pytest.raises(TemplateError):
+            registry.get("missing")
+
+    def test_invalid_file_is_skipped(self, prompts_dir):
+        """Test a malformed file falls back to the default."""
+        (prompts_dir / "broken.txt").write_text("Oops {name")
+        registry = PromptTemplateRegistry(prompts_dir, use_db=False)
+
+        assert registry.get("broken", lambda name: "Fallback").render() == "Fallback"
+
+
+@pytest.mark.django_db
+class TestRegistryDatabase:
+    """Test GCodeTemplate overrides."""
+
+    def test_db_template_overrides_file_until_deactivated(self, prompts_dir):
+        """Test saves and deletes reload DB templates."""
+        registry = PromptTemplateRegistry(prompts_dir, check_interval=0)
+        assert registry.get("greeting").source == "file"
+
+        row = GCodeTemplate.objects.create(
+            name="greeting",
+            category="daily",
+            prompt_template="Welcome {name}",
+            variables=["name"],
+        )
+        assert registry.get("greeting").render(name="Ada") == "Welcome Ada"
+
+        row.is_active = False
+        row.save()
+        assert registry.get("greeting").source == "file"
+
+    def test_invalid_db_template_is_skipped(self, prompts_dir):
+        """Test a row using undeclared variables does not replace the file."""
+        GCodeTemplate.objects.create(
+            name="greeting",
+            category="daily",
+            prompt_template="Welcome {name} {secret}",
+            variables=["name"],
+        )
+        registry = PromptTemplateRegistry(prompts_dir)
+
+        assert registry.get("greeting").source == "file"
+
+    def test_db_error_is_retried_on_next_check(self, prompts_dir, monkeypatch):
+        """Test a failed DB load does not mark the version as loaded."""
+        GCodeTemplate.objects.create(
+            name="greeting",
+            category="daily",
+            prompt_template="Welcome {name}",
+            variables=["name"],
+        )
+        registry = PromptTemplateRegistry(prompts_dir, check_interval=0)
+
+        def unavailable(**kwargs):
+            raise RuntimeError("database is unavailable")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(GCodeTemplate.objects, "filter", unavailable)
+            assert registry.get("greeting").source == "file"
+
+        assert registry.get("greeting").source == "db"
+
+    def test_gemini_client_renders_from_registry(self, settings):
+        """Test the client's prompts come from the shared registry."""
+        from ai_engine.gemini_client import GeminiGCodeClient
+
+        settings.GEMINI_API_KEY = "test-key"
+        client = GeminiGCodeClient()
+        GCodeTemplate.objects.create(
+            name="content_meditation",
+            category="educational",
+            prompt_template="Meditation for {platform} ({tone})",
+            variables=["platform", "tone"],
+        )
+
+        prompt = client._build_content_prompt(
+            "meditation", "instagram", {"tone": "calm"}, ""
+        )
+
+        assert client.templates is get_template_registry()
+        assert prompt == "Meditation for instagram (calm)"
@@ -0,0 +1,144 @@
+"""
+Rate Limiter Tests for Spiritual G-Code.
+"""
+
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Clock that only advances when the limiter sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with no limiter state."""
+    cache.clear()
+
+
+def make_limiter(clock, **kwargs):
+    """Limiter of 60 requests per minute on the fake clock."""
+    return RateLimiter(
+        "test",
+        rate_per_minute=kwargs.pop("rate_per_minute", 60),
+        clock=clock.time,
+        sleep=clock.sleep,
+        **kwargs,
+    )
+
+
+class TestTokenBucket:
+    """Test bursts, queueing and the exposed wait time."""
+
+    def test_burst_then_queue(self):
+        """Test the burst is immediate and later requests queue in turn."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, burst=3)
+
+        waits = [limiter.reserve() for _ in range(5)]
+
+        assert waits == [0.0, 0.0, 0.0, 1.0, 2.0]
+        assert limiter.wait_time() == 3.0
+
+    def test_tokens_refill_over_time(self):
+        """Test the bucket refills at the sustained rate."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, burst=2)
+        for _ in range(4):
+            limiter.reserve()
+
+        clock.now += 10
+
+        assert limiter.wait_time() == 0.0
+        assert limiter.reserve() == 0.0
+
+    def test_limit_is_shared_by_name(self):
+        """Test two limiter instances (processes) share one bucket."""
+        clock = FakeClock()
+        first, second = make_limiter(clock), make_limiter(clock)
+
+        first.reserve()
+
+        assert second.reserve() == 1.0
+
+    def test_acquire_sleeps_instead_of_failing(self):
+        """Test a request over the limit waits its turn."""
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        calls = []
+
+        for _ in range(3):
+            with limiter.acquire():
+                calls.append(clock.now)
+
+        assert calls == [1000.0, 1001.0, 1002.0]
+        assert limiter.status()["waited"] == 2
+
+
+class TestConcurrencyCap:
+    """Test the cross-process concurrency slots."""
+
+    def test_in_flight_never_exceeds_cap(self):
+        """Test threads queue for slots instead of exceeding the cap."""
+        limiter = RateLimiter("slots", rate_per_minute=0, max_concurrency=2)
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def call():
+            with limiter.acquire():
+                with lock:
+                    state["in_flight"] += 1
+                    state["peak"] = max(state["peak"], state["in_flight"])
+                time.sleep(0.05)
+                with lock:
+                    state["in_flight"] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert state["peak"] == 2
+        assert limiter.in_flight() == 0
+
+    def test_saturated_slots_add_call_duration(self):
+        """Test wait time includes a call duration when slots are full."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, rate_per_minute=0, max_concurrency=1)
+        with limiter.acquire():
+            clock.now += 4
+
+        with limiter.acquire():
+            assert limiter.wait_time() == 4.0
+
+    def test_admit_without_blocking(self):
+        """Test a non-blocking admit neither queues nor takes a token."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, burst=2, max_concurrency=1)
+        release = limiter.admit()
+
+        assert limiter.admit(block=False) is None
+        release()
+        assert limiter.in_flight() == 0
+
+        limiter.admit(block=False)()
+        assert limiter.admit(block=False) is None
+        assert limiter.wait_time() == 1.0
+        assert clock.sleeps == []
@@ -0,0 +1,336 @@
+"""
+AI Call Resilience Tests for Spiritual G-Code.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine import prompt_cache, resilience
+from ai_engine.gemini_client import GeminiGCodeClient
+from ai_engine.resilience import (
+    CallGuard,
+    CircuitBreaker,
+    CircuitOpen,
+    DeadlineExceeded,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start each test with a closed circuit."""
+    cache.clear()
+
+
+class FakeClock:
+    """Settable wall clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Calls:
+    """Model stand-in whose nth call sleeps, fails or answers."""
+
+    def __init__(self, *behaviours):
+        self.behaviours = list(behaviours)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            index = self.count
+            self.count += 1
+        behaviour = self.behaviours[min(index, len(self.behaviours) - 1)]
+        if isinstance(behaviour, Exception):
+            raise behaviour
+        if isinstance(behaviour, float):
+            time.sleep(behaviour)
+            return f"slow {index}"
+        return behaviour
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the threshold opens the circuit and a success resets it."""
+        breaker = CircuitBreaker("test", failure_threshold=3, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state() == "open"
+        assert not breaker.allow()
+
+    def test_half_open_lets_one_probe_through(self):
+        """Test one probe after the reset timeout decides the state."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            "test", failure_threshold=1, reset_timeout=30, clock=clock
+        )
+        breaker.record_failure()
+        clock.now += 31
+
+        assert breaker.state() == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state() == "open"
+
+        clock.now += 31
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state() == "closed"
+        assert breaker.allow()
+
+
+class TestCallGuard:
+    """Test deadlines and hedging."""
+
+    def test_deadline_bounds_a_slow_call(self):
+        """Test a hung request is abandoned at the deadline."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=0.1, hedge=False)
+        started = time.monotonic()
+
+        with pytest.raises(DeadlineExceeded):
+            guard.call(Calls(0.5))
+
+        assert time.monotonic() - started < 0.4
+        assert guard.status()["timeouts"] == 1
+        assert guard.breaker.status()["consecutive_failures"] == 1
+
+    def test_hedge_answers_when_first_request_is_slow(self):
+        """Test a second request wins the race against a slow first one."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=2, hedge_delay=0.05)
+        model = Calls(0.5, "fast")
+
+        assert guard.call(model) == "fast"
+        assert model.count == 2
+        assert guard.status()["hedge_wins"] == 1
+
+    def test_hedge_retries_an_early_failure(self):
+        """Test a failed first request is hedged immediately."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=2, hedge_delay=1.0)
+
+        assert guard.call(Calls(RuntimeError("boom"), "ok")) == "ok"
+
+    def test_errors_propagate_and_open_the_circuit(self):
+        """Test failing calls raise their error until the breaker opens."""
+        guard = CallGuard(
+            CircuitBreaker("test", failure_threshold=2), timeout=1, hedge=False
+        )
+        model = Calls(RuntimeError("boom"))
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                guard.call(model)
+        with pytest.raises(CircuitOpen):
+            guard.call(model)
+
+        assert model.count == 2
+        assert guard.status()["rejected"] == 1
+
+    def test_other_errors_leave_the_circuit_closed(self):
+        """Test only failure_types errors count towards the breaker."""
+        guard = CallGuard(
+            CircuitBreaker("test", failure_threshold=1),
+            timeout=1,
+            hedge=False,
+            failure_types=(OSError,),
+        )
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                guard.call(Calls(ValueError("blocked")))
+
+        assert guard.breaker.state() == "closed"
+        with pytest.raises(ConnectionError):
+            guard.call(Calls(ConnectionError("reset")))
+        assert guard.breaker.state() == "open"
+
+
+class TestGuardStream:
+    """Test the per-chunk deadline of streamed calls."""
+
+    @staticmethod
+    def chunks(*items):
+        """Stream stand-in yielding strings and sleeping on floats."""
+
+        def stream():
+            for item in items:
+                if isinstance(item, float):
+                    time.sleep(item)
+                else:
+                    yield item
+
+        return stream
+
+    def test_stream_yields_every_chunk(self):
+        """Test a healthy stream passes through and closes the circuit."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=0.5)
+
+        assert list(guard.stream(self.chunks("a", 0.05, "b"))) == ["a", "b"]
+        assert guard.breaker.state() == "closed"
+
+    def test_stalled_stream_misses_its_deadline(self):
+        """Test a stall before or between chunks raises DeadlineExceeded."""
+        guard = CallGuard(CircuitBreaker("test", failure_threshold=2), timeout=0.1)
+        received = []
+        started = time.monotonic()
+
+        with pytest.raises(DeadlineExceeded):
+            list(guard.stream(self.chunks(0.5, "late")))
+        with pytest.raises(DeadlineExceeded):
+            for chunk in guard.stream(self.chunks("first", 0.5, "late")):
+                received.append(chunk)
+
+        assert time.monotonic() - started < 0.5
+        assert received == ["first"]
+        assert guard.status()["timeouts"] == 2
+        assert guard.breaker.state() == "open"
+
+
+class TestGuardAdmission:
+    """Test rate limiter turns are taken outside the deadline."""
+
+    class Admit:
+        """admit() stand-in that queues blocking callers and tracks turns."""
+
+        def __init__(self, queue=0.0, free=True):
+            self.queue = queue
+            self.free = free
+            self.held = 0
+            self.calls = []
+
+        def __call__(self, block):
+            self.calls.append(block)
+            if not block and not self.free:
+                return None
+            time.sleep(self.queue if block else 0.0)
+            self.held += 1
+
+            def release():
+                self.held -= 1
+
+            return release
+
+    def test_queue_time_does_not_count_towards_the_deadline(self):
+        """Test a request that queued longer than the timeout still runs."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=0.2, hedge=False)
+        admit = self.Admit(queue=0.3)
+
+        assert guard.call(Calls(0.05), admit=admit) == "slow 0"
+        assert admit.calls == [True]
+        assert admit.held == 0
+
+    def test_queued_hedge_is_skipped(self):
+        """Test no hedge is sent when it would have to queue."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=2, hedge_delay=0.05)
+        admit = self.Admit(free=False)
+        model = Calls(0.2, "fast")
+
+        assert guard.call(model, admit=admit) == "slow 0"
+        assert model.count == 1
+        assert admit.calls == [True, False]
+        assert guard.status()["hedges_skipped"] == 1
+
+    def test_admitted_hedge_holds_its_own_turn(self):
+        """Test a hedge takes a non-blocking turn and both are released."""
+        guard = CallGuard(CircuitBreaker("test"), timeout=2, hedge_delay=0.05)
+        admit = self.Admit()
+
+        assert guard.call(Calls(0.3, "fast"), admit=admit) == "fast"
+        assert admit.calls == [True, False]
+        time.sleep(0.4)
+        assert admit.held == 0
+
+
+class TestClientFallback:
+    """Test the Gemini client answers from the mock when AI is unavailable."""
+
+    @pytest.fixture
+    def client(self, settings, monkeypatch):
+        """Gemini client with a hanging model and a short deadline."""
+        settings.GEMINI_API_KEY = "test-key"
+        settings.GEMINI_PROMPT_CACHE = "off"
+        settings.GEMINI_TIMEOUT_SECONDS = 0.1
+        settings.GEMINI_HEDGE = False
+        settings.GEMINI_BREAKER_FAILURES = 1
+        monkeypatch.setattr(prompt_cache, "_prompt_cache_instance", None)
+        monkeypatch.setattr(resilience, "_gemini_guard_instance", None)
+        client = GeminiGCodeClient()
+
+        class HangingModel:
+            calls = 0
+
+            def generate_content(self, prompt, stream=False):
+                HangingModel.calls += 1
+                time.sleep(0.5)
+
+        client.model = HangingModel()
+        return client
+
+    def test_timeout_then_open_circuit_fall_back_to_mock(self, client):
+        """Test a timed-out call and calls behind the open breaker."""
+        kwargs = {
+            "transit_data": {},
+            "content_type": "insight",
+            "platform": "twitter",
+            "user_preferences": {"tone": "inspiring"},
+        }
+        started = time.monotonic()
+
+        first = client.generate_content(**kwargs)
+        second = client.generate_content(**kwargs)
+        streamed = "".join(client.stream_content(**kwargs))
+
+        assert time.monotonic() - started < 0.5
+        assert client.model.calls == 1
+        assert client.guard.breaker.state() == "open"
+        assert first["body"] and second["body"] and streamed
+        assert first["content_type"] == "insight"
+
+    def test_stalled_stream_falls_back_before_the_first_chunk(self, client):
+        """Test a stream with no first chunk in time is answered by the mock."""
+
+        class StallingModel:
+            def generate_content(self, prompt, stream=False):
+                time.sleep(0.5)
+                yield SimpleNamespace(text="too late")
+
+        client.model = StallingModel()
+        started = time.monotonic()
+
+        streamed = "".join(
+            client.stream_content({}, "insight", "twitter", {"tone": "inspiring"})
+        )
+
+        assert time.monotonic() - started < 0.4
+        assert streamed and "too late" not in streamed
+        assert client.guard.breaker.state() == "open"
+
+    def test_fallback_interpretations_are_marked(self, client):
+        """Test mock interpretations say they are not Gemini output."""
+        natal = {"sun_sign": "Aries", "moon_sign": "Leo", "ascendant": "Virgo"}
+
+        interpretation = client.generate_daily_gcode(natal, {"aspects": []})
+        content = client.generate_content(
+            {}, "insight", "twitter", {"tone": "inspiring"}
+        )
+
+        assert interpretation["fallback"] is True
+        assert interpretation["interpretation"]
+        assert "fallback" not in content
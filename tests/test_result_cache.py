@@ -0,0 +1,116 @@
+"""
+Result Cache Tests for Spiritual G-Code.
+"""
+
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine.daily_gcode_service import DailyGCodeService
+from ai_engine.result_cache import ResultCache
+
+DAY = date(2026, 3, 1)
+
+
+class TestResultCache:
+    """Test the two-level cache itself."""
+
+    @pytest.fixture
+    def result_cache(self):
+        """Return an empty cache with a tiny in-process level."""
+        cache.clear()
+        return ResultCache(prefix="test_results", timeout=60, memo_size=2)
+
+    def test_levels_and_stats(self, result_cache):
+        """Test misses, in-process hits and shared-cache hits are counted."""
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"value": len(calls)}
+
+        assert result_cache.get_or_compute("a", compute) == {"value": 1}
+        assert result_cache.get_or_compute("a", compute) == {"value": 1}
+
+        # A new process only sees the shared level
+        other = ResultCache(prefix="test_results", timeout=60, memo_size=2)
+        assert other.get_or_compute("a", compute) == {"value": 1}
+
+        assert len(calls) == 1
+        assert result_cache.stats()["misses"] == 1
+        assert result_cache.stats()["memory_hits"] == 1
+        assert other.stats()["cache_hits"] == 1
+        assert result_cache.stats()["hit_rate"] == 0.5
+
+    def test_results_are_copies(self, result_cache):
+        """Test mutating a returned result does not change the cache."""
+        result_cache.set("a", {"themes": ["#Growth"]})
+        result_cache.get("a")["themes"].append("#Chaos")
+
+        assert result_cache.get("a") == {"themes": ["#Growth"]}
+
+    def test_lru_eviction_and_invalidate(self, result_cache):
+        """Test the in-process level is bounded and invalidation clears both."""
+        for key in "abc":
+            result_cache.set(key, key)
+
+        assert result_cache.stats()["memory_size"] == 2
+        assert result_cache.get("a") == "a"  # Served from the shared level
+
+        result_cache.invalidate("a")
+        assert result_cache.get("a") is None
+
+
+@pytest.mark.django_db
+class TestDailyGCodeResultCache:
+    """Test daily G-Code results are cached per user, date and birth data."""
+
+    @pytest.fixture
+    def user(self, test_user):
+        """Return the test user as loaded from the database."""
+        test_user.refresh_from_db()
+        return test_user
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        """Return a service counting AI interpretation calls."""
+        cache.clear()
+        service = DailyGCodeService()
+        service.ai_calls = 0
+        generate = service.ai_client.generate_daily_gcode
+
+        def counting_generate(**kwargs):
+            service.ai_calls += 1
+            return generate(**kwargs)
+
+        monkeypatch.setattr(
+            service.ai_client, "generate_daily_gcode", counting_generate
+        )
+        return service
+
+    def test_repeat_calls_hit(self, service, user):
+        """Test the same user and day is interpreted once."""
+        first = service.calculate_daily_gcode_for_user(user, DAY)
+        second = service.calculate_daily_gcode_for_user(user, DAY)
+
+        assert first == second
+        assert service.ai_calls == 1
+        assert service.result_cache.stats()["memory_hits"] == 1
+
+    def test_birth_data_change_misses(self, service, user):
+        """Test changing birth data recalculates."""
+        service.calculate_daily_gcode_for_user(user, DAY)
+        user.birth_location = "Kyoto, Japan"
+        service.calculate_daily_gcode_for_user(user, DAY)
+
+        assert service.ai_calls == 2
+
+    def test_bypass_and_invalidate(self, service, user):
+        """Test use_cache=False and invalidation force a recalculation."""
+        service.calculate_daily_gcode_for_user(user, DAY)
+        service.calculate_daily_gcode_for_user(user, DAY, use_cache=False)
+        service.invalidate_daily_gcode(user, DAY)
+        service.calculate_daily_gcode_for_user(user, DAY)
+
+        assert service.ai_calls == 3
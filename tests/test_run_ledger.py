@@ -0,0 +1,119 @@
+"""
+Run Ledger Tests for Spiritual G-Code.
+"""
+
+from datetime import date
+
+import pytest
+
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.nightly_batch import NightlyGCodeBatch
+from ai_engine.run_ledger import RunLedger, recent_runs
+from api.models import BatchRun, DailyTransit
+
+DAY = date(2026, 3, 1)
+
+
+@pytest.mark.django_db
+class TestRunLedger:
+    """Test checkpointing, resuming and status of nightly runs."""
+
+    @pytest.fixture
+    def users(self, make_user):
+        """Create five eligible users."""
+        return [make_user(i) for i in range(5)]
+
+    def make_batch(self, processed):
+        """Return a batch recording the users it calculates."""
+        batch = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            chunk_size=2,
+            roll_timelines=False,
+            horizon_days=0,
+        )
+        build = batch.build_daily_transit
+
+        def recording_build(user, target_date, positions):
+            processed.append(user.pk)
+            return build(user, target_date, positions)
+
+        batch.build_daily_transit = recording_build
+        return batch
+
+    def run(self, batch):
+        """Run the batch through a ledger like the nightly script does."""
+        ledger = RunLedger.start(DAY, batch.eligible_users())
+        try:
+            stats = batch.run(DAY, ledger=ledger)
+        except Exception:
+            ledger.finish("failed")
+            raise
+        ledger.finish()
+        return ledger, stats
+
+    def test_crash_resumes_from_checkpoint(self, users, monkeypatch):
+        """Test a restarted run skips users done before the crash."""
+        processed = []
+        batch = self.make_batch(processed)
+        upsert = batch.upsert
+        calls = []
+
+        def crashing_upsert(rows, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("worker killed")
+            upsert(rows, **kwargs)
+
+        batch.upsert = crashing_upsert
+        with pytest.raises(RuntimeError):
+            self.run(batch)
+
+        run = BatchRun.objects.get()
+        assert run.status == "failed"
+        assert run.last_user_id == users[1].pk
+        assert run.success_count == 2
+
+        processed.clear()
+        ledger, stats = self.run(self.make_batch(processed))
+
+        assert ledger.run.run_id == run.run_id
+        assert processed == [user.pk for user in users[2:]]
+        assert ledger.run.status == "completed"
+        assert ledger.run.success_count == 5
+        assert DailyTransit.objects.filter(transit_date=DAY).count() == 5
+
+    def test_rerun_skips_done_users_and_retries_errors(self, users):
+        """Test a new run for the date only redoes failed users."""
+        processed = []
+        batch = self.make_batch(processed)
+        build = batch.build_daily_transit
+
+        def failing_build(user, target_date, positions):
+            if user.pk == users[3].pk:
+                raise ValueError("bad birth data")
+            return build(user, target_date, positions)
+
+        batch.build_daily_transit = failing_build
+        first, _ = self.run(batch)
+        assert (first.run.success_count, first.run.error_count) == (4, 1)
+
+        processed.clear()
+        second, stats = self.run(self.make_batch(processed))
+
+        assert second.run.run_id != first.run.run_id
+        assert processed == [users[3].pk]
+        assert stats["success"] == 1
+
+    def test_status(self, users):
+        """Test status reports progress and throughput."""
+        self.run(self.make_batch([]))
+
+        (status,) = recent_runs(DAY)
+
+        assert status["status"] == "completed"
+        assert status["processed_users"] == status["total_users"] == 5
+        assert status["percent"] == 100.0
+        assert status["users_per_second"] >= 0
+        assert status["eta_seconds"] is None
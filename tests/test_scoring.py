@@ -0,0 +1,97 @@
+"""
+G-Code Scoring Tests for Spiritual G-Code.
+"""
+
+import random
+
+import pytest
+
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.scoring import GCodeScorer
+
+
+def legacy_mock_score(aspects):
+    """Original MockGCodeCalculator heuristic, kept as the reference."""
+    score = 50
+    for aspect in aspects:
+        if aspect["aspect"] in ["conjunction", "opposition", "square"]:
+            score += 5
+        elif aspect["aspect"] in ["trine", "sextile"]:
+            score += 3
+    for aspect in aspects:
+        if aspect.get("transit_planet") in ["uranus", "neptune", "pluto"]:
+            score += 7
+    for aspect in aspects:
+        if aspect.get("transit_planet") == "moon":
+            score += 4
+    return max(1, min(100, score))
+
+
+def random_aspects(rng, count):
+    """Build a random aspect list."""
+    aspect_types = [
+        "conjunction",
+        "opposition",
+        "square",
+        "trine",
+        "sextile",
+        "quincunx",
+    ]
+    planets = ["sun", "moon", "mercury", "mars", "uranus", "neptune", "pluto", "chiron"]
+    return [
+        {
+            "transit_planet": rng.choice(planets),
+            "natal_planet": rng.choice(planets),
+            "aspect": rng.choice(aspect_types),
+            "orb": rng.uniform(0, 8),
+        }
+        for _ in range(count)
+    ]
+
+
+class TestGCodeScorer:
+    """Test the shared scoring engine."""
+
+    @pytest.fixture
+    def charts(self):
+        """Return a batch of random aspect lists, including empty and saturated ones."""
+        rng = random.Random(42)
+        return [random_aspects(rng, rng.randint(0, 12)) for _ in range(200)]
+
+    def test_matches_legacy_mock_scorer(self, charts):
+        """Test default weights reproduce the original mock scores exactly."""
+        scorer = GCodeScorer()
+
+        assert scorer.score_many(charts) == [legacy_mock_score(a) for a in charts]
+
+    def test_calculator_delegates(self, charts):
+        """Test the mock calculator uses the shared engine."""
+        calculator = MockGCodeCalculator()
+
+        for aspects in charts[:20]:
+            assert calculator.calculate_g_code_intensity({}, aspects) == (
+                legacy_mock_score(aspects)
+            )
+
+    def test_weight_overrides(self):
+        """Test partial overrides and orb falloff."""
+        scorer = GCodeScorer({"aspects": {"square": 10}, "orb_falloff": 0.5})
+        aspects = [
+            {"transit_planet": "mars", "aspect": "square", "orb": 0.0},
+            {"transit_planet": "mars", "aspect": "square", "orb": 8.0},
+            {"transit_planet": "mars", "aspect": "trine", "orb": 4.0},
+        ]
+
+        # 50 + 10 + 10 * 0.5 + 3 * 0.75
+        assert scorer.score(aspects) == 67
+
+    def test_intensity_level(self):
+        """Test intensity level boundaries."""
+        scorer = GCodeScorer()
+
+        assert [scorer.intensity_level(s) for s in (1, 25, 50, 75)] == [
+            "low",
+            "medium",
+            "high",
+            "intense",
+        ]
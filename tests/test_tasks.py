@@ -0,0 +1,105 @@
+"""
+Celery Task Tests for Spiritual G-Code.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from api import tasks
+from api.models import BatchRun, DailyTransit, GCodeUser, SystemLog
+
+DAY = date(2026, 3, 1)
+
+
+@pytest.mark.django_db
+class TestNightlyFanOut:
+    """Test the sharded nightly chord in eager mode."""
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, settings, monkeypatch, tmp_path):
+        """Use three-user chunks over two shards and skip timeline rolls."""
+        settings.GCODE_BATCH_CHUNK_SIZE = 3
+        settings.GCODE_BATCH_SHARDS = 2
+        settings.BATCH_REPORT_DIR = str(tmp_path)
+        monkeypatch.setattr(
+            "ai_engine.nightly_batch.NightlyGCodeBatch._roll_timelines",
+            lambda self, users: None,
+        )
+
+    def test_chord_aggregates_chunks(self, make_user, monkeypatch):
+        """Test every chunk runs and the callback sums their counts."""
+        users = [make_user(i) for i in range(7)]
+        totals = []
+        aggregate = tasks.aggregate_daily_gcode_results.run
+
+        def record(results, target_date, run_id):
+            totals.append(aggregate(results, target_date, run_id))
+            return totals[-1]
+
+        monkeypatch.setattr(tasks.aggregate_daily_gcode_results, "run", record)
+
+        dispatched = tasks.run_nightly_gcode.delay(DAY.isoformat()).get()
+
+        assert dispatched["chunks"] == 3
+        assert totals == [
+            {"users": 7, "success": 7, "errors": 0, "skipped": 0, "chunks": 3}
+        ]
+        assert DailyTransit.objects.filter(transit_date=DAY).count() == len(users)
+
+        run = BatchRun.objects.get(run_id=dispatched["run_id"])
+        assert run.status == "completed"
+        assert run.success_count == len(users)
+
+        # One report for the run, merged from every chunk's metrics
+        report = SystemLog.objects.get(function="BatchMetrics.save").extra_data
+        assert report["run_id"] == dispatched["run_id"]
+        assert report["counters"]["users"] == len(users)
+        assert report["stages"]["db_write"]["count"] == 3
+
+    def test_rerun_dispatches_nothing_when_done(self, make_user):
+        """Test users done for the date are not resharded."""
+        make_user(1)
+        tasks.run_nightly_gcode.delay(DAY.isoformat())
+
+        dispatched = tasks.run_nightly_gcode.delay(DAY.isoformat()).get()
+
+        assert dispatched["chunks"] == 0
+
+    def test_default_date_is_tomorrow(self, make_user):
+        """Test a bare dispatch calculates tomorrow, like the script."""
+        make_user(1)
+
+        dispatched = tasks.run_nightly_gcode.delay().get()
+
+        run = BatchRun.objects.get(run_id=dispatched["run_id"])
+        assert run.target_date == date.today() + timedelta(days=1)
+
+    def test_chunk_skips_ineligible_users(self, make_user, settings):
+        """Test users that lost eligibility after sharding are skipped."""
+        settings.GCODE_PRECOMPUTE_HORIZON_DAYS = 0
+        kept, disabled = make_user(1), make_user(2)
+        GCodeUser.objects.filter(pk=disabled.pk).update(daily_gcode_enabled=False)
+
+        result = tasks.calculate_daily_gcode_chunk(
+            [kept.pk, disabled.pk], DAY.isoformat()
+        )
+
+        assert result.pop("metrics")["counters"]["users"] == 1
+        assert result == {
+            "success": 1,
+            "errors": 0,
+            "rows": 1,
+            "unchanged": 0,
+            "deferred": 0,
+            "users": 2,
+            "skipped": 1,
+        }
+
+    def test_shard_queues(self):
+        """Test chunks round-robin over the configured shard queues."""
+        assert [tasks.shard_queue(i) for i in range(3)] == [
+            "gcode-nightly-0",
+            "gcode-nightly-1",
+            "gcode-nightly-0",
+        ]
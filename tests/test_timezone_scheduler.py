@@ -0,0 +1,110 @@
+"""
+Timezone Scheduler Tests for Spiritual G-Code.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from django.core.cache import cache
+
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.mock_gemini_client import MockGeminiGCodeClient
+from ai_engine.nightly_batch import NightlyGCodeBatch
+from ai_engine.timezone_scheduler import TimezoneScheduler, bucket_job
+from api.models import BatchRun, DailyTransit, SystemLog
+
+# 23:30 in Taipei, 10:30 in New York
+NOW = datetime(2026, 3, 1, 15, 30, tzinfo=timezone.utc)
+
+
+@pytest.mark.django_db
+class TestTimezoneScheduler:
+    """Test bucket timing, dedupe and processing."""
+
+    @pytest.fixture
+    def scheduler(self):
+        """Return a scheduler without jitter on the mock calculator."""
+        cache.clear()
+        batch = NightlyGCodeBatch(
+            calculator=MockGCodeCalculator(),
+            ai_client=MockGeminiGCodeClient(),
+            roll_timelines=False,
+        )
+        return TimezoneScheduler(
+            lead_minutes=60, jitter_minutes=0, concurrency=2, batch=batch
+        )
+
+    def test_only_buckets_near_local_midnight_are_due(self, make_user, scheduler):
+        """Test Taipei is due for its next local day and New York is not."""
+        make_user(1, timezone="Asia/Taipei")
+        make_user(2, timezone="America/New_York")
+
+        due = scheduler.due_buckets(NOW)
+
+        assert [(b["timezone"], b["target_date"]) for b in due] == [
+            ("Asia/Taipei", date(2026, 3, 2))
+        ]
+
+    def test_tick_processes_each_bucket_once(self, make_user, scheduler):
+        """Test a due bucket is calculated for its local date exactly once."""
+        taipei = make_user(1, timezone="Asia/Taipei")
+        new_york = make_user(2, timezone="America/New_York")
+
+        results = scheduler.tick(NOW, use_celery=False)
+        cache.clear()
+        again = scheduler.tick(NOW + timedelta(minutes=15), use_celery=False)
+
+        assert [r["success"] for r in results] == [1]
+        assert again == []
+        assert DailyTransit.objects.filter(
+            user=taipei, transit_date=date(2026, 3, 2)
+        ).exists()
+        assert not DailyTransit.objects.filter(user=new_york).exists()
+        assert BatchRun.objects.get(job=bucket_job("Asia/Taipei")).status == (
+            "completed"
+        )
+
+    def test_missed_bucket_is_caught_up_after_midnight(self, make_user, scheduler):
+        """Test a bucket missed before midnight still runs for its new day."""
+        make_user(1, timezone="Asia/Taipei")
+
+        # 00:30 in Taipei on 2 March
+        due = scheduler.due_buckets(NOW + timedelta(hours=1))
+
+        assert [b["target_date"] for b in due] == [date(2026, 3, 2)]
+
+    def test_jitter_is_stable_and_bounded(self):
+        """Test jitter spreads buckets within the window, stable per day."""
+        scheduler = TimezoneScheduler(jitter_minutes=45)
+        day = date(2026, 3, 2)
+        offsets = {
+            tz: scheduler.jitter(tz, day)
+            for tz in ("Europe/Paris", "Europe/Berlin", "Europe/Rome")
+        }
+
+        assert all(timedelta() <= o < timedelta(minutes=45) for o in offsets.values())
+        assert len(set(offsets.values())) > 1
+        assert scheduler.jitter("Europe/Paris", day) == offsets["Europe/Paris"]
+
+    def test_celery_bucket_caps_lanes(self, make_user, scheduler, settings, tmp_path):
+        """Test the Celery path splits a bucket into capped lanes."""
+        from api.tasks import run_timezone_bucket
+
+        settings.BATCH_REPORT_DIR = str(tmp_path)
+        settings.GCODE_BATCH_CHUNK_SIZE = 1
+        settings.GCODE_BUCKET_CONCURRENCY = 2
+        for i in range(3):
+            make_user(i, timezone="Asia/Taipei")
+
+        result = run_timezone_bucket("Asia/Taipei", "2026-03-02")
+
+        assert (result["chunks"], result["lanes"]) == (3, 2)
+        run = BatchRun.objects.get(job=bucket_job("Asia/Taipei"))
+        assert (run.status, run.success_count) == ("completed", 3)
+
+        # The lanes' metrics end up in one report for the bucket
+        report = SystemLog.objects.get(function="BatchMetrics.save").extra_data
+        assert report["job"] == bucket_job("Asia/Taipei")
+        assert report["counters"]["users"] == 3
+        assert report["totals"]["success"] == 3
+        assert report["totals"]["chunks"] == 3
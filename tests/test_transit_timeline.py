@@ -0,0 +1,179 @@
+"""
+Transit Timeline Tests for Spiritual G-Code.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from ai_engine.mock_calculator import MockGCodeCalculator
+from ai_engine.transit_timeline import (
+    TransitTimelineService,
+    pack_intervals,
+    unpack_intervals,
+)
+from api.models import TransitTimeline
+
+TODAY = date(2026, 3, 1)
+
+
+def aspect_keys(aspects):
+    """Reduce aspects to comparable (transit, natal, aspect) tuples."""
+    return sorted(
+        (a["transit_planet"], a["natal_planet"], a["aspect"]) for a in aspects
+    )
+
+
+@pytest.mark.django_db
+class TestTransitTimelineService:
+    """Test timeline building, lookups and incremental updates."""
+
+    @pytest.fixture
+    def service(self):
+        """Return a fresh timeline service."""
+        return TransitTimelineService()
+
+    @pytest.fixture
+    def user(self, test_user):
+        """Return the test user as loaded from the database."""
+        test_user.refresh_from_db()
+        return test_user
+
+    def transits_on(self, user, day):
+        """Calculate transits the per-day way."""
+        return MockGCodeCalculator().calculate_transits(
+            birth_date=user.birth_date,
+            birth_time=user.birth_time.strftime("%H:%M"),
+            birth_location=user.birth_location,
+            target_date=day,
+        )
+
+    def test_active_matches_calculate_transits(self, service, user):
+        """Test the aspects active on a day equal the per-day calculation."""
+        for offset in (0, 10, 200):
+            day = TODAY + timedelta(days=offset)
+            transits = self.transits_on(user, day)
+            active = service.active_on(user, day, today=TODAY)
+
+            assert aspect_keys(active) == aspect_keys(transits["aspects"])
+
+    def test_daily_scores_match_scorer(self, service, user):
+        """Test timeline scores equal scoring the per-day aspects."""
+        calculator = MockGCodeCalculator()
+        days = service.daily_scores(
+            user, TODAY - timedelta(days=20), TODAY + timedelta(days=3), TODAY
+        )
+
+        for day in days[::6]:
+            transits = self.transits_on(user, date.fromisoformat(day["date"]))
+            assert day["score"] == calculator.calculate_g_code_intensity(
+                transits["planets"], transits["aspects"]
+            )
+
+    def test_incremental_roll_forward(self, service, user):
+        """Test rolling the horizon forward matches a full rebuild."""
+        service.get_timeline(user, today=TODAY)
+        rolled = service.get_timeline(user, today=TODAY + timedelta(days=5))
+        rebuilt = TransitTimelineService().calculator.calculate(
+            service.calculator.natal_positions(user),
+            rolled.horizon_start,
+            rolled.horizon_end,
+        )
+
+        def key(interval):
+            return (interval["start"], interval["end"], *aspect_keys([interval]))
+
+        # Intervals already running at the new horizon start keep their
+        # original start day; everything else must match exactly
+        horizon_start = rolled.horizon_start.isoformat()
+        assert sorted(
+            key({**i, "start": max(i["start"], horizon_start)})
+            for i in service.intervals(rolled)
+        ) == sorted(key(i) for i in rebuilt)
+
+    def test_roll_timelines_reads_and_writes_once(
+        self, service, make_user, django_assert_num_queries
+    ):
+        """Test a chunk's timelines are rolled with one read and one upsert."""
+        users = [make_user(i, with_chart=False) for i in range(2)]
+        with django_assert_num_queries(2):
+            assert service.roll_timelines(users, today=TODAY) == {}
+
+        later = TODAY + timedelta(days=5)
+        with django_assert_num_queries(2):
+            service.roll_timelines(users, today=later)
+        with django_assert_num_queries(1):
+            service.roll_timelines(users, today=later)
+
+        start, end = service.horizon(later)
+        rolled = TransitTimeline.objects.filter(user__in=users)
+        assert rolled.count() == 2
+        assert {(t.horizon_start, t.horizon_end) for t in rolled} == {(start, end)}
+
+    def test_birth_data_change_rebuilds(self, service, user):
+        """Test changing birth data invalidates the stored timeline."""
+        first = service.get_timeline(user, today=TODAY).birth_fingerprint
+
+        user.birth_location = "Kyoto, Japan"
+        user.save()
+        second = service.get_timeline(user, today=TODAY).birth_fingerprint
+
+        assert first != second
+        assert TransitTimeline.objects.filter(user=user).count() == 1
+
+    def test_upcoming(self, service, user):
+        """Test upcoming intervals start within the window."""
+        upcoming = service.upcoming(user, TODAY, days=30, today=TODAY)
+
+        assert upcoming
+        for interval in upcoming:
+            assert "2026-03-01" <= interval["start"] <= "2026-03-31"
+
+    def test_lookups_read_stored_timeline_without_building(self, service, user):
+        """Test lookups never build, and match per-day aspects across the seam."""
+        assert service.active_on(user, TODAY, today=TODAY) is not None
+        assert not TransitTimeline.objects.filter(user=user).exists()
+
+        timeline = service.get_timeline(user, today=TODAY)
+        for day in (
+            TODAY,
+            timeline.horizon_start - timedelta(days=2),
+            timeline.horizon_end + timedelta(days=3),
+        ):
+            active = service.active_on(user, day, today=TODAY)
+            assert aspect_keys(active) == aspect_keys(
+                self.transits_on(user, day)["aspects"]
+            )
+
+    def test_packed_storage_round_trips(self, service, user):
+        """Test the stored format holds one record per aspect and unpacks exactly."""
+        natal = service.calculator.natal_positions(user)
+        intervals = service.calculator.calculate(
+            natal, TODAY, TODAY + timedelta(days=60)
+        )
+
+        records = pack_intervals(intervals, TODAY)
+
+        assert len(records) < len(intervals)
+        assert len({aspect_keys([r])[0] for r in records}) == len(records)
+
+        def key(interval):
+            return (interval["start"], *aspect_keys([interval]))
+
+        assert sorted(unpack_intervals(records, TODAY), key=key) == sorted(
+            intervals, key=key
+        )
+
+    def test_positions_are_shared_between_users(self, service, user):
+        """Test daily positions are calculated once per date."""
+        calls = []
+        calculate = service.calculator.calculator.calculate_transit_positions
+        service.calculator.calculator.calculate_transit_positions = lambda day: (
+            calls.append(day) or calculate(day)
+        )
+        natal = service.calculator.natal_positions(user)
+
+        service.calculator.calculate(natal, TODAY, TODAY + timedelta(days=9))
+        service.calculator.calculate({**natal}, TODAY, TODAY + timedelta(days=9))
+
+        assert len(calls) == 10